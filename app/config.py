@@ -1,33 +1,189 @@
 """
 Configurações centralizadas da aplicação
+
+As configurações são lidas do ambiente (e do arquivo .env) uma única vez, na
+primeira chamada a get_settings(). Importar este módulo não acessa o disco
+nem a rede.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Optional
+
+from pydantic import BaseSettings, validator
 
 # Configuração de diretórios
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Carregar .env
-load_dotenv(BASE_DIR / '.env')
-
 # Informações da Aplicação
 APP_NAME = "Certificates on Solana"
 APP_VERSION = "1.0.0"
 APP_DESCRIPTION = "Sistema de Registro de Certificados na Blockchain Solana"
 
-# Configuração Solana
-SOLANA_NETWORK = os.getenv("SOLANA_NETWORK", "devnet")
-SOLANA_URL = os.getenv("SOLANA_URL", "https://api.devnet.solana.com")
 
-# Configuração da carteira
-SOLANA_WALLET_PATH = BASE_DIR / os.getenv("SOLANA_WALLET_PATH", "wallet/certificates-wallet.json")
-SOLANA_WALLET_PATH.parent.mkdir(parents=True, exist_ok=True)
+class Settings(BaseSettings):
+    """Configurações da aplicação (variáveis de ambiente com o mesmo nome em maiúsculas)"""
+
+    # Configuração Solana
+    solana_network: str = "devnet"
+    solana_url: str = "https://api.devnet.solana.com"
+    rpc_timeout: float = 30
+    rpc_breaker_failures: int = 5  # falhas seguidas até abrir o disjuntor do RPC
+    rpc_breaker_reset: float = 30  # segundos com o disjuntor aberto antes de testar de novo
+
+    # Monitor de saúde (/health/ready)
+    health_interval: float = 10
+    health_max_rpc_age: float = 30  # idade máxima da última chamada RPC bem-sucedida
+    health_max_blockhash_age: float = 60
+    health_max_outbox: int = 5000  # certificados aguardando envio
+
+    # Configuração da carteira
+    solana_wallet_path: Path = Path("wallet/certificates-wallet.json")
+    wallet_configured: bool = True
+    use_real_transactions: bool = True
+    require_manual_setup: bool = True
+
+    # URL pública da API (links de verificação e QR codes)
+    public_base_url: str = "http://localhost:8000"
+
+    # Configuração dos certificados em PDF
+    certificate_title: str = "CERTIFICADO"
+    certificate_issuer: str = "Sistema de Certificados Blockchain"
+    pdf_workers: int = os.cpu_count() or 1
+    pdf_mode: str = "template"  # "template" (layout em cache) ou "completo"
+    pdf_qrcode: bool = True
+    pdf_upload_max_bytes: int = 5 * 1024 * 1024
+
+    # Autenticação por API key (ver app/middleware/auth.py)
+    api_key: Optional[str] = None
+    api_keys: str = ""
+    api_key_hashes: str = ""
+    api_rate_limit: float = 0
+    api_rate_burst: int = 20
+    # Nomes das API keys com acesso às rotas /admin e à revogação (vazio = nenhuma, com autenticação ativa)
+    admin_api_keys: str = ""
+
+    # Importação em lote (CSV/NDJSON)
+    import_chunk_size: int = 50
+    import_max_line_bytes: int = 64 * 1024
+
+    # Jobs em lote com eventos de progresso (SSE) (ver app/services/jobs.py)
+    jobs_max_items: int = 10000
+    jobs_retention: float = 3600  # segundos que um job concluído continua consultável
+    jobs_heartbeat: float = 15  # intervalo dos comentários de keep-alive no stream
+
+    # Armazenamento local de certificados
+    certificate_store_path: Path = Path("data/certificados.db")
+    store_cache_size: int = 10000
+    bloom_capacity: int = 1_000_000
+    bloom_error_rate: float = 0.001
+
+    # Implantação com vários workers e estado compartilhado entre eles
+    workers: int = 1
+    state_backend: str = "sqlite"  # "memoria" (um worker), "sqlite" (mesma máquina) ou "redis"
+    state_path: Path = Path("data/estado.db")
+    redis_url: str = "redis://localhost:6379/0"
+    blockhash_ttl: float = 20
+    balance_ttl: float = 60
+    payer_max_in_flight: int = 8
+    payer_lease_ttl: float = 30
+    idempotency_ttl: float = 24 * 60 * 60
+
+    # Formato e empacotamento dos memos (ver app/services/memo.py)
+    memo_format: str = "compacto"  # "compacto" (v2, binário em base64) ou "json" (v1.0)
+    pack_window_ms: float = 0  # 0 = junta apenas os registros que chegam juntos
+    pack_max_memos: int = 16
+
+    # Pipeline de envio: trabalhadores de assinatura e de envio e tamanho das filas entre eles
+    pipeline_signers: int = 2
+    pipeline_senders: int = 4
+    pipeline_queue_size: int = 32
+
+    # Opções de envio (sendTransaction) e commitment de leitura na verificação;
+    # os padrões são os do cliente solana-py (simulação prévia em "finalized")
+    send_skip_preflight: bool = False
+    send_preflight_commitment: str = "finalized"  # processed, confirmed ou finalized
+    send_max_retries: Optional[int] = None  # None = o nó reenvia até o blockhash expirar
+    verify_commitment: str = "finalized"  # confirmed ou finalized
+    # max-age (s) das verificações finalizadas em GET /certificados/verify/{txid};
+    # uma revogação chega aos caches (CDN, navegadores) em até esse tempo
+    verify_cache_max_age: int = 3600
+
+    # Livro-razão: solana (RPC) ou simulado (em memória, para testes de carga; ver app/services/ledger.py)
+    ledger_backend: str = "solana"
+    sim_seed: int = 0
+    sim_send_latency_ms: float = 0
+    sim_confirm_ms: float = 400
+    sim_finalize_ms: float = 13000
+    sim_failure_rate: float = 0  # fração dos envios recusados
+    sim_drop_rate: float = 0  # fração das transações aceitas que nunca confirmam
+
+    # Agendamento justo dos envios entre API keys (ver app/services/agendador.py)
+    scheduler_tenants: str = ""
+    scheduler_queue_limit: int = 1000
+    scheduler_burst: int = 0
+
+    # Indexador do histórico da carteira emissora
+    indexer_enabled: bool = False
+    indexer_interval: float = 60
+    indexer_page_size: int = 1000
+    indexer_batch_size: int = 50
+    indexer_concurrency: int = 4
+
+    # Auditoria periódica dos certificados na blockchain (ver app/services/auditoria.py)
+    audit_enabled: bool = False
+    audit_interval: float = 3600
+    audit_mode: str = "varredura"  # varredura (contínua, por rowid) ou amostra
+    audit_per_round: int = 1000  # certificados conferidos por rodada
+    audit_batch_size: int = 20  # transações por requisição JSON-RPC em lote
+    audit_rpc_rate: float = 2  # orçamento próprio: getTransaction por segundo
+    audit_rpc_url: Optional[str] = None  # RPC da auditoria (padrão: SOLANA_URL, fora do disjuntor)
+    audit_min_age: float = 300  # certificados não confirmados só são auditados após esta idade (s)
+    audit_yield_interval: float = 1  # espera enquanto houver envios de usuários pendentes (s)
+
+    # Frontend servido pela API (ver app/services/frontend.py)
+    frontend_enabled: bool = True
+    frontend_dir: Path = BASE_DIR / "frontend"
+
+    # Listagem de certificados por evento (GET /certificados/events/{event})
+    events_page_size: int = 100
+    events_page_max: int = 500
+
+    # Logs estruturados em segundo plano (ver app/services/logs.py)
+    log_level: str = "INFO"
+    log_format: str = "json"  # json ou texto
+    log_sample_rates: str = ""  # "tipo:taxa,...", ex.: "requisicao:0.01,envio:0.1"
+
+    # Perfilamento de requisições (ver app/middleware/perfil.py)
+    profile_enabled: bool = False
+    profile_sample_rate: float = 0  # fração das requisições perfiladas (além das com X-Profile: 1)
+    profile_paths: str = "/certificados/register,/certificados/verify"
+    profile_dir: Path = Path("data/perfis")
+    profile_retention: int = 50
+
+    class Config:
+        env_file = BASE_DIR / ".env"
+        env_file_encoding = "utf-8"
+
+    @validator("solana_wallet_path", "certificate_store_path", "state_path", "profile_dir")
+    def _relativo_ao_projeto(cls, caminho: Path) -> Path:
+        return caminho if caminho.is_absolute() else BASE_DIR / caminho
+
+    @validator("public_base_url")
+    def _sem_barra_final(cls, url: str) -> str:
+        return url.rstrip("/")
+
+    @validator("send_preflight_commitment", "verify_commitment")
+    def _commitment_valido(cls, nivel: str, field) -> str:
+        # getTransaction não aceita "processed"
+        validos = ("confirmed", "finalized") if field.name == "verify_commitment" else ("processed", "confirmed", "finalized")
+        if nivel not in validos:
+            raise ValueError(f"use {', '.join(validos)}")
+        return nivel
+
 
-# Log simplificado
-print(f"\n═══ Configuração Solana ═══")
-print(f"Network: {SOLANA_NETWORK}")
-print(f"URL: {SOLANA_URL}")
-print(f"Wallet: {SOLANA_WALLET_PATH}")
-print(f"Wallet exists: {SOLANA_WALLET_PATH.exists()}\n")
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Carrega as configurações (uma única vez por processo)"""
+    return Settings()
@@ -3,18 +3,89 @@ Sistema de Registro de Certificados na Blockchain Solana
 Ponto de entrada principal da aplicação FastAPI
 """
 
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 
+from app.routes.formatos import RespostaJSON
+
 # Importações das rotas
 from app.routes.certificados import router as certificados_router
+from app.routes.pdf import router as pdf_router
+from app.routes.indexer import router as indexer_router
+from app.routes.importacao import router as importacao_router
+from app.routes.jobs import router as jobs_router
+from app.routes.admin import router as admin_router
+from app.routes.frontend import router as frontend_router
 
 # Configurações
-from app.config import APP_NAME, APP_VERSION, APP_DESCRIPTION
+from app.config import APP_NAME, APP_VERSION, APP_DESCRIPTION, get_settings
+
+# Middlewares de autenticação, compressão e perfilamento
+from app.middleware import APIKeyMiddleware, GZipMiddleware, LogMiddleware, perfil_middleware
+
+from app.services.blockchain import obter_registry
+from app.services.pdf_generator import encerrar_pool_pdf
+from app.services.indexer import obter_indexer
+from app.services.auditoria import obter_auditor
+from app.services.store import obter_store, fechar_store
+from app.services.estado import fechar_estado
+from app.services.saude import obter_monitor
+from app.services.frontend import obter_frontend
+from app.services.logs import configurar_logs, encerrar_logs
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida da aplicação: tarefas em segundo plano e recursos compartilhados.
+
+    Configurações, carteira e armazenamento são carregados aqui, e não na
+    importação dos módulos, para que importar a aplicação seja barato e
+    livre de efeitos colaterais.
+    """
+    settings = get_settings()
+    configurar_logs(settings)
+    logger.info(
+        "Iniciando %s v%s (rede=%s, rpc=%s, pdf_mode=%s)",
+        APP_NAME, APP_VERSION, settings.solana_network, settings.solana_url, settings.pdf_mode
+    )
+
+    if settings.workers > 1 and settings.state_backend == "memoria":
+        logger.warning("STATE_BACKEND=memoria com vários workers: blockhash, idempotência e saldo não serão compartilhados")
+
+    registry = obter_registry()
+    obter_store()
+    # Lê e comprime os arquivos do frontend antes da primeira requisição
+    obter_frontend()
+    tarefas = [asyncio.create_task(obter_monitor().executar_periodicamente(settings.health_interval))]
+
+    indexer = obter_indexer() if settings.indexer_enabled else None
+    if indexer:
+        tarefas.append(asyncio.create_task(indexer.executar_periodicamente(settings.indexer_interval)))
+
+    if settings.audit_enabled:
+        tarefas.append(asyncio.create_task(obter_auditor().executar_periodicamente(settings.audit_interval)))
+
+    yield
+
+    for tarefa in tarefas:
+        tarefa.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await tarefa
+    await registry.parar_pipeline()
+    encerrar_pool_pdf()
+    fechar_store()
+    fechar_estado()
+    encerrar_logs()
 
-# Middleware de autenticação
-from app.middleware import api_key_middleware
 
 # Criar instância da aplicação FastAPI
 app = FastAPI(
@@ -22,11 +93,20 @@ app = FastAPI(
     version=APP_VERSION,
     description=APP_DESCRIPTION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=RespostaJSON,
+    lifespan=lifespan
 )
 
+# Perfilamento opcional de requisições (PROFILE_ENABLED), apenas de chamadas já autenticadas;
+# desligado, não acrescenta nenhuma camada
+app.add_middleware(perfil_middleware)
+
 # Registrar middleware de API Key (ANTES dos outros middlewares)
-app.middleware("http")(api_key_middleware)
+app.add_middleware(APIKeyMiddleware)
+
+# Comprimir respostas grandes (lotes, NDJSON) para clientes que aceitam gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Configurar CORS
 app.add_middleware(
@@ -36,39 +116,64 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+# Contexto de log (request_id) e linha de acesso; a camada mais externa mede a requisição inteira
+app.add_middleware(LogMiddleware)
     
 # Incluir rotas
 app.include_router(certificados_router)
+app.include_router(pdf_router)
+app.include_router(indexer_router)
+app.include_router(importacao_router)
+app.include_router(jobs_router)
+app.include_router(admin_router)
+app.include_router(frontend_router)
+
+@app.get("/health/live")
+async def health_live():
+    """
+    Liveness: o processo está de pé e o event loop responde.
+
+    Não faz chamadas de rede nem de disco.
+
+    Returns:
+        dict: Status e tempo desde o início do processo
+    """
+    return obter_monitor().vivo()
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """
+    Readiness: a instância pode registrar certificados.
+
+    Avalia, a partir do estado mantido pelo monitor em segundo plano, a última
+    chamada RPC bem-sucedida, o disjuntor do RPC, a idade do blockhash, a
+    carteira pagadora e a fila de envios. Não faz chamadas de rede.
+
+    Returns:
+        dict: Resultado de cada verificação (HTTP 503 se alguma falhar)
+    """
+    prontidao = obter_monitor().prontidao()
+    return RespostaJSON(prontidao, status_code=200 if prontidao["pronto"] else 503)
+
 
 @app.get("/health")
 async def health_check():
     """
-    Endpoint de health check para verificar se a aplicação está funcionando.
+    Endpoint de health check (resumo de /health/ready, sempre HTTP 200).
     
     Returns:
         dict: Status da aplicação e informações básicas
     """
-    
-    try:
-        # Testar conectividade com Solana
-        from app.services.blockchain import obter_info_rede
-        info_rede = await obter_info_rede()
-        
-        return {
-            "status": "healthy",
-            "app": APP_NAME,
-            "version": APP_VERSION,
-            "solana_network": info_rede.get("network", "unknown"),
-            "solana_status": info_rede.get("status", "unknown")
-        }
-        
-    except Exception as e:
-        return {
-            "status": "partial",
-            "app": APP_NAME,
-            "version": APP_VERSION,
-            "error": str(e)
-        }
+    prontidao = obter_monitor().prontidao()
+    return {
+        "status": "healthy" if prontidao["pronto"] else "partial",
+        "app": APP_NAME,
+        "version": APP_VERSION,
+        "solana_network": get_settings().solana_network,
+        "solana_status": "connected" if prontidao["verificacoes"]["rpc"]["ok"] else "disconnected"
+    }
 
 
 if __name__ == "__main__":
@@ -1,5 +1,11 @@
 """Middleware package"""
 
-from .auth import api_key_middleware
+from .auth import APIKeyMiddleware, obter_controle
+from .compressao import GZipMiddleware
+from .logs import LogMiddleware
+from .perfil import PerfilMiddleware, listar_perfis, perfil_middleware
 
-__all__ = ["api_key_middleware"]
+__all__ = [
+    "APIKeyMiddleware", "obter_controle", "GZipMiddleware", "LogMiddleware",
+    "PerfilMiddleware", "listar_perfis", "perfil_middleware"
+]
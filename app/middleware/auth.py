@@ -1,53 +1,185 @@
 """
-Middleware de autenticação por API Key
+Middleware de autenticação por API Key (ASGI puro)
+
+As chaves são carregadas uma única vez (na primeira requisição) e guardadas
+apenas como hash SHA-256. A chave recebida no cabeçalho x-api-key é
+comparada com todas as chaves conhecidas em tempo constante. Cada chave tem
+um limite de requisições por segundo (token bucket) e contadores de uso.
+
+Configuração (variáveis de ambiente):
+    API_KEYS        "nome:chave[:req/s],..." (chaves em texto)
+    API_KEY_HASHES  "nome:sha256hex[:req/s],..." (apenas os hashes)
+    API_KEY         chave única (compatibilidade; nome "default")
+    API_RATE_LIMIT  limite padrão por chave em req/s (0 = sem limite)
+    API_RATE_BURST  rajada máxima do token bucket
 """
 
-import os
-from fastapi import Request, Response, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Callable
-
-
-async def api_key_middleware(request: Request, call_next: Callable) -> Response:
-    """
-    Middleware para validação de API Key
-    
-    Args:
-        request: Request object do FastAPI
-        call_next: Próximo middleware/handler na cadeia
-        
-    Returns:
-        Response: Resposta HTTP
-    """
-    
-    # Rotas que não precisam de autenticação
-    public_routes = ["/health", "/docs", "/redoc", "/openapi.json"]
-    
-    # Verificar se é uma rota pública
-    if request.url.path in public_routes:
-        return await call_next(request)
-    
-    # Pegar API key válida do ambiente
-    valid_api_key = os.getenv("API_KEY")
-    
-    if not valid_api_key:
-        # Se não há API key configurada, permite acesso (modo desenvolvimento)
-        return await call_next(request)
-    
-    # Verificar se a requisição tem o header x-api-key
-    provided_api_key = request.headers.get("x-api-key")
-    
-    if not provided_api_key:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Invalid API Key"}
-        )
-    
-    if provided_api_key != valid_api_key:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Invalid API Key"}
-        )
-    
-    # API key válida, continuar com a requisição
-    return await call_next(request)
+import hashlib
+import hmac
+import math
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..config import get_settings
+from ..services.agendador import inquilino_atual
+
+# Rotas que não precisam de autenticação
+ROTAS_PUBLICAS = frozenset({"/", "/health", "/health/live", "/health/ready", "/docs", "/redoc", "/openapi.json"})
+PREFIXOS_PUBLICOS = ("/assets/",)
+# Públicas só para GET: a verificação aberta pelo QR code e cacheada por CDNs
+PREFIXOS_PUBLICOS_GET = ("/certificados/verify/",)
+
+
+class ChaveAPI(NamedTuple):
+    nome: str
+    hash: bytes
+    limite: float  # requisições por segundo (0 = sem limite)
+
+
+def _hash_chave(chave: str) -> bytes:
+    return hashlib.sha256(chave.encode("utf-8")).digest()
+
+
+def _ler_entradas(valor: str, em_hash: bool, limite_padrao: float) -> List[ChaveAPI]:
+    chaves = []
+    for entrada in filter(None, (item.strip() for item in valor.split(","))):
+        partes = entrada.split(":")
+        if len(partes) not in (2, 3):
+            raise ValueError(f"Entrada de API key inválida (use nome:chave[:req/s]): {partes[0]}")
+        nome, segredo = partes[0], partes[1]
+        limite = float(partes[2]) if len(partes) == 3 else limite_padrao
+        chaves.append(ChaveAPI(nome, bytes.fromhex(segredo) if em_hash else _hash_chave(segredo), limite))
+    return chaves
+
+
+def carregar_chaves() -> List[ChaveAPI]:
+    """Lê as chaves configuradas, guardando apenas o hash SHA-256 de cada uma"""
+    settings = get_settings()
+    chaves = _ler_entradas(settings.api_keys, False, settings.api_rate_limit)
+    chaves += _ler_entradas(settings.api_key_hashes, True, settings.api_rate_limit)
+    if settings.api_key:
+        chaves.append(ChaveAPI("default", _hash_chave(settings.api_key), settings.api_rate_limit))
+    return chaves
+
+
+class ControleAcesso:
+    """Chaves conhecidas, token buckets e contadores de uso por chave"""
+
+    def __init__(self, chaves: List[ChaveAPI], rajada: int = 20, workers: int = 1):
+        self.chaves = chaves
+        self.rajada = rajada
+        # O limite vale para a implantação inteira: cada worker aplica a sua fração
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._baldes: Dict[str, List[float]] = {}
+        self.uso: Dict[str, dict] = {
+            chave.nome: {"requisicoes": 0, "limitadas": 0, "ultima_requisicao": None}
+            for chave in chaves
+        }
+        self.rejeitadas = 0
+
+    def identificar(self, fornecida: Optional[bytes]) -> Optional[ChaveAPI]:
+        """Compara a chave recebida com todas as conhecidas, sem atalhos dependentes do conteúdo"""
+        digest = hashlib.sha256(fornecida or b"").digest()
+        encontrada = None
+        for chave in self.chaves:
+            if hmac.compare_digest(digest, chave.hash) and fornecida:
+                encontrada = chave
+        if encontrada is None:
+            self.rejeitadas += 1
+        return encontrada
+
+    def consumir(self, chave: ChaveAPI) -> float:
+        """
+        Consome um token do balde da chave.
+
+        Returns:
+            float: 0 se a requisição pode seguir; caso contrário, segundos até o próximo token
+        """
+        agora = time.monotonic()
+        uso = self.uso[chave.nome]
+        with self._lock:
+            uso["ultima_requisicao"] = time.time()
+            if chave.limite <= 0:
+                uso["requisicoes"] += 1
+                return 0.0
+
+            taxa = chave.limite / self.workers
+            capacidade = max(1.0, self.rajada / self.workers)
+            balde = self._baldes.setdefault(chave.nome, [capacidade, agora])
+            balde[0] = min(capacidade, balde[0] + (agora - balde[1]) * taxa)
+            balde[1] = agora
+            if balde[0] < 1:
+                uso["limitadas"] += 1
+                return (1 - balde[0]) / taxa
+            balde[0] -= 1
+            uso["requisicoes"] += 1
+            return 0.0
+
+
+_controle: Optional[ControleAcesso] = None
+
+
+def obter_controle() -> ControleAcesso:
+    """Retorna o controle de acesso, carregando as chaves na primeira chamada"""
+    global _controle
+    if _controle is None:
+        settings = get_settings()
+        _controle = ControleAcesso(carregar_chaves(), settings.api_rate_burst, settings.workers)
+    return _controle
+
+
+def _cabecalho(scope: Scope, nome: bytes) -> Optional[bytes]:
+    for chave, valor in scope["headers"]:
+        if chave == nome:
+            return valor
+    return None
+
+
+class APIKeyMiddleware:
+    """Valida o cabeçalho x-api-key; sem chaves configuradas, permite acesso (modo desenvolvimento)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"] in ROTAS_PUBLICAS
+            or scope["path"].startswith(PREFIXOS_PUBLICOS)
+            or (scope["method"] in ("GET", "HEAD") and scope["path"].startswith(PREFIXOS_PUBLICOS_GET))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        controle = obter_controle()
+        if not controle.chaves:
+            await self.app(scope, receive, send)
+            return
+
+        chave = controle.identificar(_cabecalho(scope, b"x-api-key"))
+        if chave is None:
+            await JSONResponse(status_code=401, content={"detail": "Invalid API Key"})(scope, receive, send)
+            return
+
+        espera = controle.consumir(chave)
+        if espera:
+            resposta = JSONResponse(
+                status_code=429,
+                content={"detail": "Limite de requisições excedido para esta API key"},
+                headers={"Retry-After": str(math.ceil(espera))}
+            )
+            await resposta(scope, receive, send)
+            return
+
+        # Disponível para as rotas em request.state.api_key e para o agendador de envios
+        scope.setdefault("state", {})["api_key"] = chave.nome
+        token = inquilino_atual.set(chave.nome)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            inquilino_atual.reset(token)
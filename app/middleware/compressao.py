@@ -0,0 +1,97 @@
+"""
+Middleware de compressão gzip (ASGI puro)
+
+Comprime respostas grandes quando o cliente aceita gzip. Diferente do
+GZipMiddleware do Starlette:
+
+- não recomprime conteúdo já compactado (ZIP, PDF, imagens);
+- em respostas em streaming (NDJSON, SSE) cada parte é descarregada com
+  Z_SYNC_FLUSH, de modo que o cliente recebe cada linha assim que ela é
+  gerada em vez de esperar o buffer do compressor encher;
+- um ETag forte da resposta passa a fraco (W/) no corpo comprimido, já que os
+  bytes não são mais os mesmos; a revalidação por If-None-Match continua
+  valendo (comparação fraca) e o 304 devolve o ETag na forma que o cliente
+  guardou.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+NAO_COMPRIMIR = ("application/zip", "application/pdf", "application/gzip", "image/")
+
+
+class GZipMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, compresslevel: int = 6) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requisicao = Headers(scope=scope)
+        if "gzip" not in requisicao.get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+        if_none_match = requisicao.get("if-none-match", "")
+
+        inicio: Message = {}
+        compressor = None
+        repassar = False
+
+        async def enviar(message: Message) -> None:
+            nonlocal inicio, compressor, repassar
+
+            if message["type"] == "http.response.start":
+                inicio = message
+                headers = Headers(raw=message["headers"])
+                etag = headers.get("etag", "")
+                if message["status"] == 304 and etag and "W/" + etag in if_none_match:
+                    MutableHeaders(raw=message["headers"])["ETag"] = "W/" + etag
+                tipo = headers.get("content-type", "")
+                repassar = "content-encoding" in headers or tipo.startswith(NAO_COMPRIMIR)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            corpo = message.get("body", b"")
+            mais = message.get("more_body", False)
+
+            if compressor is None and not repassar and (mais or len(corpo) >= self.minimum_size):
+                compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 31)
+            elif compressor is None:
+                repassar = True
+
+            if repassar:
+                if inicio:
+                    await send(inicio)
+                    inicio = {}
+                await send(message)
+                return
+
+            dados = compressor.compress(corpo)
+            dados += compressor.flush(zlib.Z_SYNC_FLUSH if mais else zlib.Z_FINISH)
+
+            if inicio:
+                headers = MutableHeaders(raw=inicio["headers"])
+                headers["Content-Encoding"] = "gzip"
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if mais:
+                    if "content-length" in headers:
+                        del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(dados))
+                await send(inicio)
+                inicio = {}
+
+            await send({"type": "http.response.body", "body": dados, "more_body": mais})
+
+        await self.app(scope, receive, enviar)
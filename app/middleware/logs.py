@@ -0,0 +1,61 @@
+"""
+Contexto de log por requisição e linha de acesso (ASGI puro)
+
+Cada requisição recebe um request_id (o do cabeçalho X-Request-ID ou um
+novo), devolvido no mesmo cabeçalho. Ao final é emitida uma linha
+"requisicao" com status, latência e os campos anexados pelas rotas (uuid,
+txid...), sujeita à amostragem de LOG_SAMPLE_RATES.
+"""
+
+import logging
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.logs import contexto_log
+
+logger = logging.getLogger(__name__)
+
+
+class LogMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for chave, valor in scope["headers"]:
+            if chave == b"x-request-id":
+                request_id = valor.decode("latin-1")[:64]
+                break
+        contexto = {"request_id": request_id or uuid.uuid4().hex, "metodo": scope["method"], "rota": scope["path"]}
+        token = contexto_log.set(contexto)
+        inicio = time.perf_counter()
+        status = 500
+
+        async def enviar(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = contexto["request_id"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "%s %s %d", scope["method"], scope["path"], status,
+                    extra={
+                        "tipo": "requisicao",
+                        "status": status,
+                        "latencia_ms": round((time.perf_counter() - inicio) * 1000, 2),
+                        "cliente": scope.get("state", {}).get("api_key")
+                    }
+                )
+            contexto_log.reset(token)
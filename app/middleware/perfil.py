@@ -0,0 +1,136 @@
+"""
+Perfilamento de requisições individuais (cProfile)
+
+Desligado por padrão. Com PROFILE_ENABLED=true, as requisições às rotas de
+PROFILE_PATHS são perfiladas quando trazem o cabeçalho X-Profile: 1 ou
+quando sorteadas (PROFILE_SAMPLE_RATE). O perfil (formato pstats, para
+pstats, snakeviz ou gprof2dot) é gravado em PROFILE_DIR, mantendo apenas os
+PROFILE_RETENTION mais recentes, e o nome do arquivo volta no cabeçalho
+X-Profile-Id da resposta.
+
+O cProfile mede a thread do event loop inteira: corrotinas de outras
+requisições que rodarem no mesmo intervalo aparecem no perfil, e o trabalho
+feito em threads (asyncio.to_thread) aparece apenas como espera. Por isso só
+uma requisição é perfilada por vez; as demais seguem sem perfil.
+
+Com o modo desligado (padrão) perfil_middleware devolve a própria aplicação:
+a pilha de middlewares, montada na inicialização, não ganha nenhuma camada.
+"""
+
+import asyncio
+import cProfile
+import random
+import re
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import get_settings
+
+EXTENSAO = ".prof"
+_NOME_PERFIL = re.compile(r"^(\d+)-([a-z0-9_]+)-(\d+)ms\.prof$")
+
+
+def listar_perfis(diretorio: Optional[Path] = None) -> List[dict]:
+    """
+    Lista os perfis gravados, do mais recente para o mais antigo.
+
+    Returns:
+        list: nome, rota, duracao_ms, criado_em (unix) e bytes de cada perfil
+    """
+    diretorio = diretorio or get_settings().profile_dir
+    if not diretorio.is_dir():
+        return []
+    perfis = []
+    for arquivo in diretorio.iterdir():
+        encontrado = _NOME_PERFIL.match(arquivo.name)
+        if not encontrado:
+            continue
+        perfis.append({
+            "nome": arquivo.name,
+            "rota": "/" + encontrado.group(2).replace("_", "/"),
+            "duracao_ms": int(encontrado.group(3)),
+            "criado_em": int(encontrado.group(1)) / 1000,
+            "bytes": arquivo.stat().st_size
+        })
+    return sorted(perfis, key=lambda perfil: perfil["criado_em"], reverse=True)
+
+
+def _gravar(perfil: cProfile.Profile, diretorio: Path, caminho: str, duracao: float, retencao: int) -> str:
+    diretorio.mkdir(parents=True, exist_ok=True)
+    rota = "_".join(caminho.strip("/").split("/")[:2]) or "raiz"
+    nome = f"{int(time.time() * 1000)}-{re.sub(r'[^a-z0-9_]', '', rota.lower())}-{int(duracao * 1000)}ms{EXTENSAO}"
+    perfil.dump_stats(str(diretorio / nome))
+
+    for antigo in listar_perfis(diretorio)[max(0, retencao):]:
+        (diretorio / antigo["nome"]).unlink(missing_ok=True)
+    return nome
+
+
+class PerfilMiddleware:
+    """Perfila com cProfile as requisições marcadas (X-Profile: 1) ou sorteadas"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._rotas = None
+        self._ocupado = False
+
+    def _deve_perfilar(self, scope: Scope) -> bool:
+        settings = get_settings()
+        if self._rotas is None:
+            self._rotas = tuple(filter(None, (rota.strip() for rota in settings.profile_paths.split(","))))
+        if not scope["path"].startswith(self._rotas):
+            return False
+        if (b"x-profile", b"1") in scope["headers"]:
+            return True
+        return random.random() < settings.profile_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._ocupado or not self._deve_perfilar(scope):
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        perfil = cProfile.Profile()
+        inicio_resposta: Optional[Message] = None
+        gravado = False
+
+        async def gravar() -> str:
+            perfil.disable()
+            return await asyncio.to_thread(
+                _gravar, perfil, settings.profile_dir, scope["path"],
+                time.perf_counter() - inicio, settings.profile_retention
+            )
+
+        async def enviar(message: Message) -> None:
+            nonlocal inicio_resposta, gravado
+            if message["type"] == "http.response.start":
+                # Segura o início da resposta para informar nele o nome do perfil
+                inicio_resposta = message
+                return
+            if inicio_resposta is not None:
+                if not message.get("more_body", False):
+                    nome = await gravar()
+                    gravado = True
+                    inicio_resposta["headers"] = [*inicio_resposta["headers"], (b"x-profile-id", nome.encode())]
+                await send(inicio_resposta)
+                inicio_resposta = None
+            await send(message)
+
+        self._ocupado = True
+        inicio = time.perf_counter()
+        perfil.enable()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # Respostas em streaming ou com erro: o perfil é gravado sem o cabeçalho
+            if not gravado:
+                await gravar()
+            self._ocupado = False
+
+
+def perfil_middleware(app: ASGIApp) -> ASGIApp:
+    """Fábrica usada em app.add_middleware: PerfilMiddleware se PROFILE_ENABLED, senão o próprio app"""
+    return PerfilMiddleware(app) if get_settings().profile_enabled else app
@@ -0,0 +1,162 @@
+"""
+Rotas administrativas (uso da API)
+
+Com autenticação ativa, só as API keys listadas em ADMIN_API_KEYS (pelo
+nome) acessam estas rotas: os dados aqui são de todos os clientes.
+"""
+
+import io
+import pstats
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from ..config import get_settings
+from ..middleware.auth import obter_controle
+from ..middleware.perfil import listar_perfis
+from ..services.agendador import obter_agendador
+from ..services.auditoria import STATUS_AUSENTE, STATUS_DIVERGENTE, STATUS_HASH_LOCAL, obter_auditor
+from ..services.blockchain import obter_registry
+from ..services.store import obter_store
+
+
+def exigir_admin(request: Request) -> None:
+    """Dependência que recusa (403) API keys sem acesso administrativo"""
+    if not obter_controle().chaves:
+        # Sem chaves configuradas não há autenticação (modo desenvolvimento)
+        return
+    admins = {nome.strip() for nome in get_settings().admin_api_keys.split(",") if nome.strip()}
+    if getattr(request.state, "api_key", None) not in admins:
+        raise HTTPException(status_code=403, detail="API key sem acesso às rotas administrativas")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(exigir_admin)])
+
+
+@router.get("/api-keys")
+async def uso_api_keys():
+    """
+    Contadores de uso por API key (desde o início deste worker).
+
+    Returns:
+        dict: Requisições aceitas, limitadas (429) e última requisição por chave,
+        além do total de requisições rejeitadas por chave inválida
+    """
+    controle = obter_controle()
+    return {
+        "chaves": [
+            {"nome": chave.nome, "limite_req_s": chave.limite or None, **controle.uso[chave.nome]}
+            for chave in controle.chaves
+        ],
+        "rejeitadas": controle.rejeitadas
+    }
+
+
+@router.get("/envios")
+async def fila_envios():
+    """
+    Fila de envios de transações por cliente (agendamento justo entre API keys).
+
+    Returns:
+        dict: Vagas de envio do worker e, por cliente, peso, cota, profundidade
+        da fila, envios em voo, concluídos, recusados e latências de espera/envio;
+        em "empacotamento", certificados por transação e taxa por certificado;
+        em "pipeline", vazão, espera na fila e profundidade de cada estágio
+        (montagem, assinatura e envio); em "ledger", o backend em uso (e, no
+        simulado, transações aceitas, recusadas e descartadas)
+    """
+    registry = obter_registry()
+    return {
+        **obter_agendador().metricas(),
+        "empacotamento": registry.metricas_empacotamento(),
+        "pipeline": registry.metricas_pipeline(),
+        "ledger": registry.ledger.metricas() if registry.ledger else None
+    }
+
+
+@router.get("/perfis")
+async def perfis():
+    """
+    Perfis de requisições gravados (PROFILE_ENABLED), do mais recente ao mais antigo.
+
+    Returns:
+        dict: Configuração do perfilamento e nome, rota, duração e tamanho de cada perfil
+    """
+    settings = get_settings()
+    return {
+        "ativo": settings.profile_enabled,
+        "taxa_amostragem": settings.profile_sample_rate,
+        "retencao": settings.profile_retention,
+        "perfis": listar_perfis()
+    }
+
+
+@router.get("/perfis/{nome}")
+async def baixar_perfil(
+    nome: str,
+    top: Optional[int] = Query(None, ge=1, le=500, description="Resumo em texto com as N funções de maior tempo acumulado")
+):
+    """
+    Baixa um perfil (pstats) ou, com ?top=N, devolve um resumo em texto.
+
+    Args:
+        nome (str): Nome do perfil (de GET /admin/perfis)
+        top (int, opcional): Quantidade de funções no resumo
+
+    Returns:
+        FileResponse | PlainTextResponse: Arquivo .prof ou resumo ordenado por tempo acumulado
+    """
+    if nome not in {perfil["nome"] for perfil in listar_perfis()}:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    caminho = get_settings().profile_dir / nome
+    if top is None:
+        return FileResponse(caminho, media_type="application/octet-stream", filename=nome)
+
+    saida = io.StringIO()
+    pstats.Stats(str(caminho), stream=saida).sort_stats("cumulative").print_stats(top)
+    return PlainTextResponse(saida.getvalue())
+
+
+@router.get("/auditoria")
+async def auditoria(limite: int = Query(20, ge=1, le=500, description="Problemas listados por status")):
+    """
+    Estado da auditoria periódica dos certificados na blockchain.
+
+    Args:
+        limite (int): Quantidade de certificados listados em cada status de problema
+
+    Returns:
+        dict: Configuração, estado do auditor (rodadas, consultas RPC, esperas
+        por tráfego de usuários), certificados por status da última auditoria
+        e os problemas mais recentes (ausente, divergente, hash_local_divergente)
+    """
+    settings = get_settings()
+    store = obter_store()
+    return {
+        "ativo": settings.audit_enabled,
+        "modo": settings.audit_mode,
+        "orcamento_rpc_s": settings.audit_rpc_rate,
+        **obter_auditor().status,
+        "por_status": store.resumo_auditoria(),
+        "problemas_recentes": {
+            status: store.listar_auditoria(status, limite)
+            for status in (STATUS_AUSENTE, STATUS_DIVERGENTE, STATUS_HASH_LOCAL)
+        }
+    }
+
+
+@router.post("/auditoria/executar", status_code=202)
+async def executar_auditoria(background_tasks: BackgroundTasks):
+    """
+    Dispara uma rodada de auditoria em segundo plano (com o mesmo orçamento de RPC).
+
+    Returns:
+        dict: Confirmação do agendamento
+    """
+    auditor = obter_auditor()
+    if auditor.status["em_execucao"]:
+        raise HTTPException(status_code=409, detail="Auditoria já em execução")
+    background_tasks.add_task(auditor.auditar)
+    return {"status": "agendada"}
@@ -2,27 +2,42 @@
 Rotas para registro de certificados na blockchain
 """
 
+import hashlib
 import json
 import uuid
 import urllib.request
 import urllib.parse
 import logging
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
 from datetime import datetime
-from pathlib import Path
-
-from ..services.hashing import gerar_hash_texto
-from ..services.blockchain import registrar_hash_solana, obter_info_rede
-
-# Importar config APÓS ela ter carregado o .env
-from ..config import SOLANA_NETWORK, SOLANA_URL, SOLANA_WALLET_PATH
-from ..wallet_config import USE_REAL_TRANSACTIONS, ACTIVE_NETWORK, WALLET_CONFIGURED
+from typing import Callable, Literal, Optional
+
+from ..services.hashing import gerar_hash_texto, gerar_hash_sha256, gerar_json_canonico
+from ..services.blockchain import OpcoesEnvio, registrar_hash_solana, revogar_hash_solana, obter_info_rede, obter_transacao
+from ..services.agendador import FilaCheiaError
+from ..services.verificacao_pdf import extrair_metadados_pdf, url_verificacao
+from ..services.memo import decodificar_memos_transacao
+from ..services.store import nivel_confirmacao, obter_store
+from ..services.logs import anexar_ao_log
+from ..services.estado import obter_estado
+from ..services.frontend import etag_corresponde
+
+from ..config import get_settings
+from .formatos import FormatoResposta, RespostaJSON, formato_resposta, responder
+from .admin import exigir_admin
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/certificados", tags=["certificados"])
 
+# Segundos em que uma revogação em andamento bloqueia outra do mesmo certificado
+TTL_REVOGACAO_EM_ANDAMENTO = 120
+
+# Incrementar quando o conteúdo das respostas de verificação mudar (invalida os ETags)
+VERSAO_ETAG_VERIFICACAO = "1"
+
 
 class CertificadoRequest(BaseModel):
     name: str
@@ -31,6 +46,11 @@ class CertificadoRequest(BaseModel):
     certificate_code: str
 
 
+class RevogacaoRequest(BaseModel):
+    hash: Optional[str] = Field(None, description="Hash do certificado (obrigatório se a transação tiver vários)")
+    motivo: Optional[str] = Field(None, max_length=200)
+
+
 class CertificadoVerificacao(BaseModel):
     event: str
     uuid: str
@@ -40,18 +60,140 @@ class CertificadoVerificacao(BaseModel):
     time: str
 
 
+def opcoes_envio(
+    skip_preflight: Optional[bool] = Query(None, description="Pula a simulação prévia do sendTransaction"),
+    preflight_commitment: Optional[Literal["processed", "confirmed", "finalized"]] = Query(
+        None, description="Commitment da simulação prévia"
+    ),
+    max_retries: Optional[int] = Query(None, ge=0, description="Reenvios do nó RPC ao líder")
+) -> Optional[OpcoesEnvio]:
+    """Dependência com as opções de envio da requisição; campos ausentes usam as configuradas (SEND_*)"""
+    if skip_preflight is None and preflight_commitment is None and max_retries is None:
+        return None
+    settings = get_settings()
+    return OpcoesEnvio(
+        settings.send_skip_preflight if skip_preflight is None else skip_preflight,
+        preflight_commitment or settings.send_preflight_commitment,
+        settings.send_max_retries if max_retries is None else max_retries
+    )
+
+
+def commitment_leitura(
+    commitment: Optional[Literal["confirmed", "finalized"]] = Query(
+        None, description="Commitment da consulta à blockchain (padrão: VERIFY_COMMITMENT)"
+    )
+) -> str:
+    """Dependência com o commitment de leitura da verificação"""
+    return commitment or get_settings().verify_commitment
+
+
 @router.post("/register")
-async def registrar_certificado(request: CertificadoRequest):
+async def registrar_certificado(
+    request: CertificadoRequest,
+    idempotency_key: Optional[str] = Header(None),
+    formato: Optional[FormatoResposta] = Depends(formato_resposta),
+    opcoes: Optional[OpcoesEnvio] = Depends(opcoes_envio)
+):
     """
     Registra um certificado na blockchain Solana usando JSON canonizado.
 
+    Com o cabeçalho Idempotency-Key, repetições da mesma requisição (em
+    qualquer worker) devolvem a resposta do primeiro registro em vez de
+    gravar um novo memo na blockchain.
+
     Args:
         request (CertificadoRequest): Dados do certificado
+        idempotency_key (str, opcional): Chave de idempotência do cliente
+        formato (FormatoResposta, opcional): Formato da resposta (compacto/MessagePack)
+        opcoes (OpcoesEnvio, opcional): skip_preflight, preflight_commitment e max_retries do envio
 
     Returns:
         dict: Dados do certificado registrado com TXID da blockchain
     """
 
+    resposta = await _registrar_idempotente(request, idempotency_key, opcoes)
+    registrado = resposta["certificado"]
+    anexar_ao_log(uuid=registrado["uuid"], hash=registrado["hash_sha256"], txid=registrado["txid_solana"])
+    if formato is not None and formato.compacto:
+        resposta = _compactar_registro(resposta)
+    return responder(resposta, formato)
+
+
+def _compactar_registro(resposta: dict) -> dict:
+    certificado = resposta["certificado"]
+    return {
+        "status": resposta["status"],
+        "uuid": certificado["uuid"],
+        "hash_sha256": certificado["hash_sha256"],
+        "txid_solana": certificado["txid_solana"]
+    }
+
+
+def _compactar_verificacao(resultado: dict, uuid_certificado: str) -> dict:
+    validacao = resultado.get("validacao", {})
+    compacto = {
+        "status": resultado["status"],
+        "uuid": uuid_certificado,
+        "hash_sha256": validacao.get("hash_gerado", resultado.get("hash_gerado")),
+        "txid": resultado.get("txid"),
+        "certificado_autentico": validacao.get("certificado_autentico", False)
+    }
+    if "pdf" in resultado:
+        compacto["pdf_integro"] = resultado["pdf"]["metadados_integros"]
+    return compacto
+
+
+async def _registrar_idempotente(
+    request: CertificadoRequest,
+    idempotency_key: Optional[str],
+    opcoes: Optional[OpcoesEnvio] = None,
+    ao_calcular_hash: Optional[Callable[[str], None]] = None
+) -> dict:
+    """Registra o certificado, reaproveitando a resposta anterior da mesma Idempotency-Key"""
+
+    if not idempotency_key:
+        return await _registrar(request, opcoes, ao_calcular_hash)
+
+    estado = obter_estado()
+    ttl = get_settings().idempotency_ttl
+    chave = f"idem:register:{idempotency_key}"
+    impressao = gerar_hash_texto(gerar_json_canonico(request.dict()))
+
+    if not estado.definir_se_ausente(chave, json.dumps({"payload": impressao}), ttl=ttl):
+        anterior = json.loads(estado.obter(chave) or "{}")
+        if anterior.get("payload", impressao) != impressao:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key já utilizada com dados diferentes"
+            )
+        if "resposta" not in anterior:
+            raise HTTPException(
+                status_code=409,
+                detail="Requisição com a mesma Idempotency-Key ainda em processamento"
+            )
+        return anterior["resposta"]
+
+    try:
+        resposta = await _registrar(request, opcoes, ao_calcular_hash)
+    except BaseException:
+        estado.remover(chave)
+        raise
+    estado.definir(chave, json.dumps({"payload": impressao, "resposta": resposta}), ttl=ttl)
+    return resposta
+
+
+async def _registrar(
+    request: CertificadoRequest,
+    opcoes: Optional[OpcoesEnvio] = None,
+    ao_calcular_hash: Optional[Callable[[str], None]] = None
+) -> dict:
+    """
+    Gera o JSON canonizado, registra o hash na blockchain e grava no índice local.
+
+    ao_calcular_hash, se informado, é chamado com o hash antes do envio (usado
+    pelos jobs em lote para publicar o progresso).
+    """
+
     try:
         certificate_uuid = str(uuid.uuid4())
         current_time = datetime.now()
@@ -65,11 +207,14 @@ async def registrar_certificado(request: CertificadoRequest):
             "time": current_time.strftime("%Y-%m-%d %H:%M:%S")
         }
 
-        json_canonico = json.dumps(certificate_data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        json_canonico = gerar_json_canonico(certificate_data)
         certificado_hash = gerar_hash_texto(json_canonico)
+        rede = get_settings().solana_network
+        if ao_calcular_hash is not None:
+            ao_calcular_hash(certificado_hash)
 
         try:
-            txid_solana = await registrar_hash_solana(certificado_hash, request.name, request.event, request.certificate_code, request.email)
+            txid_solana = await registrar_hash_solana(certificado_hash, request.name, request.event, request.certificate_code, request.email, opcoes)
             
             if not txid_solana:
                 raise HTTPException(
@@ -77,8 +222,10 @@ async def registrar_certificado(request: CertificadoRequest):
                     detail="Falha ao obter TXID da blockchain"
                 )
                 
+        except FilaCheiaError as e:
+            raise HTTPException(status_code=429, detail=str(e))
         except Exception as blockchain_error:
-            logger.error(f"Erro na blockchain: {blockchain_error}")
+            logger.error("Erro na blockchain: %s", blockchain_error)
             raise HTTPException(
                 status_code=500,  # Service Unavailable
                 detail={
@@ -89,7 +236,20 @@ async def registrar_certificado(request: CertificadoRequest):
                 }
             )
         
-        print(f"Certificado hash: {certificado_hash}")
+        logger.debug("Certificado hash: %s", certificado_hash)
+
+        try:
+            obter_store().salvar([{
+                **certificate_data,
+                "doc_hash": certificado_hash,
+                "code": certificate_data["certificate_code"],
+                "txid": txid_solana,
+                "network": rede,
+                "origem": "registro"
+            }])
+        except Exception as store_error:
+            # O certificado já está na blockchain; o índice local pode ser refeito pelo indexador
+            logger.warning("Falha ao gravar certificado no índice local: %s", store_error)
         
         return {
             "status": "sucesso",
@@ -102,14 +262,14 @@ async def registrar_certificado(request: CertificadoRequest):
                 "json_canonico": certificate_data,
                 "hash_sha256": certificado_hash,
                 "txid_solana": txid_solana,
-                "network": SOLANA_NETWORK,
+                "network": rede,
                 "timestamp": current_time.strftime("%Y-%m-%d %H:%M:%S"),
                 "timestamp_unix": int(current_time.timestamp())
             },
             "blockchain": {
-                "rede": f"Solana {SOLANA_NETWORK.title()}",
-                "explorer_url": f"https://explorer.solana.com/tx/{txid_solana}?cluster={SOLANA_NETWORK}",
-                "verificacao_url": f"http://localhost:8000/certificados/verify/{txid_solana}",
+                "rede": f"Solana {rede.title()}",
+                "explorer_url": f"https://explorer.solana.com/tx/{txid_solana}?cluster={rede}",
+                "verificacao_url": url_verificacao(txid_solana, certificado_hash),
                 "memo_program": "MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr"
             },
             "validacao": {
@@ -125,118 +285,404 @@ async def registrar_certificado(request: CertificadoRequest):
         raise
     except Exception as e:
         # Catch any other unexpected errors
-        logger.error(f"Erro inesperado ao registrar certificado: {str(e)}", exc_info=True)
+        logger.error("Erro inesperado ao registrar certificado: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Erro interno do servidor: {str(e)}"
         )
 
 
+def _dados_canonicos(certificado_data: "CertificadoVerificacao") -> dict:
+    """Dados do certificado na forma usada para gerar o JSON canonizado"""
+    return {
+        "event": certificado_data.event.lower(),
+        "uuid": certificado_data.uuid.lower(),
+        "name": certificado_data.name.lower(),
+        "email": certificado_data.email.lower(),
+        "certificate_code": certificado_data.certificate_code.lower(),
+        "time": certificado_data.time
+    }
+
+
+async def _confirmar_na_blockchain(txid: str, doc_hash: str, commitment: str = "finalized") -> Optional[dict]:
+    """Busca a transação e confirma que algum memo dela contém o doc_hash"""
+    data = await obter_transacao(txid, commitment)
+    transacao = data.get("result")
+    if not transacao:
+        return None
+    for metadados in decodificar_memos_transacao(transacao):
+        if (metadados.get("doc_hash") or "").lower() == doc_hash:
+            return {"slot": transacao.get("slot"), "block_time": transacao.get("blockTime"), "memo": metadados}
+    return None
+
+
+@router.post("/verify")
+async def verificar_certificado_por_hash(
+    certificado_data: CertificadoVerificacao,
+    formato: Optional[FormatoResposta] = Depends(formato_resposta),
+    commitment: str = Depends(commitment_leitura)
+):
+    """
+    Verifica um certificado sem o TXID, a partir apenas dos dados do certificado.
+
+    O hash do JSON canonizado é consultado no índice local (filtro de Bloom,
+    cache em memória e SQLite). A blockchain só é consultada quando o
+    certificado está no índice mas ainda não foi confirmado no commitment
+    pedido: uma confirmação "confirmed" é promovida a "finalized" quando uma
+    verificação posterior pede ?commitment=finalized.
+
+    Args:
+        certificado_data (CertificadoVerificacao): Dados do certificado para validação
+        formato (FormatoResposta, opcional): Formato da resposta (compacto/MessagePack)
+        commitment (str): Commitment da consulta (confirmed ou finalized)
+
+    Returns:
+        dict: Status da verificação com o TXID encontrado e o commitment alcançado
+    """
+
+    anexar_ao_log(uuid=certificado_data.uuid)
+    resultado = await _verificar_por_hash(certificado_data, commitment)
+    anexar_ao_log(txid=resultado.get("txid"))
+    if formato is not None and formato.compacto:
+        resultado = _compactar_verificacao(resultado, certificado_data.uuid)
+    return responder(resultado, formato)
+
+
+async def _verificar_por_hash(certificado_data: CertificadoVerificacao, commitment: str = "finalized") -> dict:
+    certificate_dict = _dados_canonicos(certificado_data)
+    json_canonico = gerar_json_canonico(certificate_dict)
+    doc_hash = gerar_hash_texto(json_canonico)
+
+    store = obter_store()
+    registro = store.buscar_por_hash(doc_hash) if store.pode_conter(doc_hash) else None
+
+    if not registro:
+        return {
+            "status": "nao_encontrado",
+            "mensagem": "Nenhum certificado registrado com este hash",
+            "hash_gerado": doc_hash
+        }
+
+    fonte = "indice_local"
+    nivel = nivel_confirmacao(registro)
+    if nivel != "finalized" and nivel != commitment:
+        try:
+            confirmacao = await _confirmar_na_blockchain(registro["txid"], doc_hash, commitment)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erro ao verificar certificado: {str(e)}"
+            )
+        if confirmacao:
+            store.marcar_confirmado(doc_hash, confirmacao["slot"], confirmacao["block_time"], commitment)
+            nivel = commitment
+            fonte = "blockchain"
+        elif nivel is None:
+            return {
+                "status": "nao_confirmado",
+                "mensagem": "Certificado registrado, mas a transação ainda não foi encontrada na blockchain",
+                "txid": registro["txid"],
+                "hash_gerado": doc_hash,
+                "commitment": commitment
+            }
+
+    txid = registro["txid"]
+    rede = get_settings().solana_network
+    return _marcar_revogacao({
+        "status": "encontrado",
+        "txid": txid,
+        "rede": f"Solana {rede.title()}",
+        "explorer_url": f"https://explorer.solana.com/tx/{txid}?cluster={rede}",
+        "fonte": fonte,
+        # "confirmed" enquanto a transação não for finalizada
+        "commitment": nivel,
+        "validacao": {
+            "hash_blockchain": doc_hash,
+            "hash_gerado": doc_hash,
+            "hash_valido": True,
+            "json_canonico_usado": json_canonico,
+            "certificado_autentico": True
+        },
+        "certificado_dados": certificate_dict
+    }, doc_hash)
+
+
+@router.post("/verify/pdf")
+async def verificar_certificado_pdf(
+    request: Request,
+    formato: Optional[FormatoResposta] = Depends(formato_resposta),
+    commitment: str = Depends(commitment_leitura)
+):
+    """
+    Verifica um certificado a partir do próprio PDF enviado no corpo da requisição.
+
+    O JSON canonizado, o hash e o TXID são lidos dos metadados do PDF (sem
+    renderizar a página), o hash é recalculado e o registro é conferido na
+    blockchain.
+
+    Args:
+        request (Request): Requisição com o PDF (application/pdf) no corpo
+        formato (FormatoResposta, opcional): Formato da resposta (compacto/MessagePack)
+        commitment (str): Commitment da consulta (confirmed ou finalized)
+
+    Returns:
+        dict: Resultado da verificação na blockchain e da integridade do PDF
+    """
+
+    limite = get_settings().pdf_upload_max_bytes
+    conteudo = bytearray()
+    async for parte in request.stream():
+        conteudo.extend(parte)
+        if len(conteudo) > limite:
+            raise HTTPException(
+                status_code=413,
+                detail=f"PDF maior que o limite de {limite} bytes"
+            )
+
+    try:
+        metadados = extrair_metadados_pdf(bytes(conteudo))
+        certificado_data = CertificadoVerificacao(**json.loads(metadados["json_canonico"]))
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"PDF inválido: {str(e)}"
+        )
+
+    hash_pdf = gerar_hash_sha256(metadados["json_canonico"].encode('utf-8'))
+    integridade = {
+        "hash_metadados": metadados["doc_hash"],
+        "hash_json_metadados": hash_pdf,
+        "metadados_integros": hash_pdf == metadados["doc_hash"]
+    }
+
+    if not integridade["metadados_integros"]:
+        resultado = {
+            "status": "pdf_adulterado",
+            "mensagem": "O JSON canonizado do PDF não corresponde ao hash gravado",
+            "txid": metadados["txid"],
+            "pdf": integridade
+        }
+    else:
+        resultado = await _verificar_por_txid(metadados["txid"], certificado_data, commitment)
+        resultado["pdf"] = integridade
+
+    if formato is not None and formato.compacto:
+        resultado = _compactar_verificacao(resultado, certificado_data.uuid)
+    return responder(resultado, formato)
+
+
 @router.post("/verify/{txid}")
-async def verificar_certificado(txid: str, certificado_data: CertificadoVerificacao):
+async def verificar_certificado(
+    txid: str,
+    certificado_data: CertificadoVerificacao,
+    formato: Optional[FormatoResposta] = Depends(formato_resposta),
+    commitment: str = Depends(commitment_leitura)
+):
     """
     Verifica um certificado na blockchain Solana comparando o hash.
 
+    Com ?commitment=confirmed a transação é encontrada segundos após o envio;
+    repetir a verificação com ?commitment=finalized confirma que ela não será
+    revertida.
+
     Args:
         txid (str): Transaction ID da Solana
         certificado_data (CertificadoVerificacao): Dados do certificado para validação
+        formato (FormatoResposta, opcional): Formato da resposta (compacto/MessagePack)
+        commitment (str): Commitment da consulta (confirmed ou finalized)
 
     Returns:
         dict: Status da verificação com comparação de hash
     """
 
-    try:
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getTransaction",
-            "params": [
-                txid,
-                {"encoding": "json", "maxSupportedTransactionVersion": 0}
-            ]
-        }
+    anexar_ao_log(uuid=certificado_data.uuid, txid=txid)
+    resultado = await _verificar_por_txid(txid, certificado_data, commitment)
+    if formato is not None and formato.compacto:
+        resultado = _compactar_verificacao(resultado, certificado_data.uuid)
+    return responder(resultado, formato)
+
+
+@router.get("/verify/{txid}")
+async def verificar_certificado_get(
+    txid: str,
+    hash_certificado: Optional[str] = Query(
+        None, alias="hash", pattern="^[0-9a-fA-F]{64}$", description="Hash do certificado (no lugar dos campos)"
+    ),
+    event: Optional[str] = Query(None),
+    uuid_certificado: Optional[str] = Query(None, alias="uuid"),
+    name: Optional[str] = Query(None),
+    email: Optional[str] = Query(None),
+    certificate_code: Optional[str] = Query(None),
+    time: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    formato: Optional[FormatoResposta] = Depends(formato_resposta),
+    commitment: str = Depends(commitment_leitura)
+):
+    """
+    Verifica um certificado por GET (link do QR code), com cache HTTP.
 
-        json_data = json.dumps(payload).encode('utf-8')
+    O certificado é informado pelo hash (?hash=) ou pelos mesmos campos do
+    POST, na query; sem nenhum deles, vale o único certificado da transação
+    (links antigos, só com o TXID). Verificações finalizadas de transações encontradas não
+    mudam mais, exceto por uma revogação: a resposta leva um ETag forte
+    (TXID, hash, formato e revogação) e Cache-Control público, de modo que
+    CDNs e navegadores atendem as repetições. Com If-None-Match igual ao
+    ETag, a resposta é 304 sem consultar a blockchain.
 
-        req = urllib.request.Request(
-            SOLANA_URL,
-            data=json_data,
-            headers={'Content-Type': 'application/json'}
+    Args:
+        txid (str): Transaction ID da Solana
+        hash_certificado (str, opcional): Hash SHA-256 do certificado (?hash=)
+        event, uuid_certificado, name, email, certificate_code, time (str, opcionais): Dados do certificado
+        if_none_match (str, opcional): ETag de uma verificação anterior
+        formato (FormatoResposta, opcional): Formato da resposta (compacto/MessagePack)
+        commitment (str): Commitment da consulta (confirmed ou finalized)
+
+    Returns:
+        dict: Status da verificação com comparação de hash (ou 304)
+    """
+    campos = {
+        "event": event, "uuid": uuid_certificado, "name": name, "email": email,
+        "certificate_code": certificate_code, "time": time
+    }
+    certificado_data = None
+    if hash_certificado is not None:
+        doc_hash = hash_certificado.lower()
+    elif all(valor is not None for valor in campos.values()):
+        certificado_data = CertificadoVerificacao(**campos)
+        certificate_dict = _dados_canonicos(certificado_data)
+        json_canonico = gerar_json_canonico(certificate_dict)
+        doc_hash = gerar_hash_texto(json_canonico)
+    elif all(valor is None for valor in campos.values()):
+        # Só o TXID (links de QR code anteriores ao ?hash=): vale para transações com um único certificado
+        doc_hash = await _hash_unico_da_transacao(txid, commitment)
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Informe o hash ou todos os campos do certificado (event, uuid, name, email, certificate_code, time)"
         )
 
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode('utf-8'))
+    anexar_ao_log(uuid=uuid_certificado, txid=txid, hash=doc_hash)
+    # O ETag depende só da requisição e do conjunto de revogações em memória:
+    # a revalidação não consulta a blockchain
+    etag = _etag_verificacao(txid, doc_hash, certificado_data is not None, formato, obter_store().revogado(doc_hash))
+    cabecalhos = {"Vary": "Accept, Prefer"}
+    if commitment == "finalized":
+        cabecalhos["ETag"] = etag
+        if etag_corresponde(if_none_match, etag):
+            cabecalhos["Cache-Control"] = _cache_control_verificacao()
+            return Response(status_code=304, headers=cabecalhos)
+
+    if certificado_data is not None:
+        resultado = await _conferir_transacao(txid, doc_hash, commitment, certificate_dict, json_canonico)
+    else:
+        resultado = await _conferir_transacao(txid, doc_hash, commitment)
+
+    if commitment == "finalized" and resultado["status"] in ("encontrado", "revogado"):
+        cabecalhos["Cache-Control"] = _cache_control_verificacao()
+    else:
+        # Transação ainda não encontrada (ou só confirmada): pode mudar, sem cache
+        cabecalhos.pop("ETag", None)
+        cabecalhos["Cache-Control"] = "no-cache"
+
+    if formato is not None and formato.compacto:
+        resultado = _compactar_verificacao(resultado, uuid_certificado)
+    resposta = responder(resultado, formato)
+    if isinstance(resposta, dict):
+        resposta = RespostaJSON(resposta)
+    resposta.headers.update(cabecalhos)
+    return resposta
+
+
+async def _hash_unico_da_transacao(txid: str, commitment: str) -> str:
+    """Hash do único certificado da transação (índice local ou, se ausente dele, os memos da transação)"""
+    hashes = {registro["doc_hash"] for registro in obter_store().buscar_por_txid(txid)}
+    if not hashes:
+        transacao = (await obter_transacao(txid, commitment)).get("result")
+        if not transacao:
+            raise HTTPException(status_code=404, detail="Transação não encontrada na blockchain")
+        hashes = {(memo.get("doc_hash") or "").lower() for memo in decodificar_memos_transacao(transacao)}
+    if len(hashes) != 1:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A transação tem {len(hashes)} certificados: informe o hash ou os campos do certificado"
+        )
+    return hashes.pop()
+
+
+def _etag_verificacao(
+    txid: str, doc_hash: str, com_dados: bool, formato: Optional[FormatoResposta], revogado: bool
+) -> str:
+    """ETag forte de uma verificação finalizada (muda com o formato da resposta e com a revogação)"""
+    variante = formato or FormatoResposta()
+    chave = "|".join((
+        VERSAO_ETAG_VERIFICACAO, get_settings().solana_network, txid, doc_hash,
+        "dados" if com_dados else "hash", str(int(variante.compacto)), str(int(variante.msgpack)), str(int(revogado))
+    ))
+    return '"' + hashlib.sha256(chave.encode()).hexdigest()[:32] + '"'
+
+
+def _cache_control_verificacao() -> str:
+    return f"public, max-age={get_settings().verify_cache_max_age}"
+
+
+async def _verificar_por_txid(txid: str, certificado_data: CertificadoVerificacao, commitment: str = "finalized") -> dict:
+    certificate_dict = _dados_canonicos(certificado_data)
+    json_canonico = gerar_json_canonico(certificate_dict)
+    return await _conferir_transacao(txid, gerar_hash_texto(json_canonico), commitment, certificate_dict, json_canonico)
+
+
+async def _conferir_transacao(
+    txid: str,
+    generated_hash: str,
+    commitment: str = "finalized",
+    certificate_dict: Optional[dict] = None,
+    json_canonico: Optional[str] = None
+) -> dict:
+    """Confere se o hash está entre os memos da transação (com os dados do certificado, se informados)"""
+    settings = get_settings()
+
+    try:
+        data = await obter_transacao(txid, commitment)
 
         if "result" in data and data["result"]:
             transaction_result = data["result"]
 
-            memo_data_extraido = {} 
-            blockchain_doc_hash = None
-            if "meta" in transaction_result and "logMessages" in transaction_result["meta"]:
-                for log_message in transaction_result["meta"]["logMessages"]:
-                    if "Program log: Memo" in log_message and "doc_hash" in log_message:
-                        try:
-                            start = log_message.find('"{')
-                            end = log_message.rfind('}"') + 2
-                            if start != -1 and end != -1:
-                                memo_json_str = log_message[start+1:end-1]
-                                memo_json_str = memo_json_str.replace('\\"', '"')
-                                memo_data = json.loads(memo_json_str)
-                                blockchain_doc_hash = memo_data.get("doc_hash")
-
-                                # extact memo metadata
-                                metadata_memo = {
-                                    "version": memo_data.get("version"),
-                                    "tipo": memo_data.get("tipo"),
-                                    "code": memo_data.get("code"),
-                                    "name": memo_data.get("name"),
-                                    "email": memo_data.get("email"),
-                                    "evento": memo_data.get("evento"),
-                                    "timestamp": memo_data.get("timestamp"),
-                                    "doc_hash": memo_data.get("doc_hash"),
-                                    "network": memo_data.get("network"),
-                                    "emissor": memo_data.get("emissor")
-                                }
-                                
-                                break
-                        except (json.JSONDecodeError, KeyError):
-                            continue
-                        
-            # Generate hash from provided certificate data
-            certificate_dict = {
-                "event": certificado_data.event.lower(),
-                "uuid": certificado_data.uuid.lower(),
-                "name": certificado_data.name.lower(),
-                "email": certificado_data.email.lower(),
-                "certificate_code": certificado_data.certificate_code.lower(),
-                "time": certificado_data.time
-            }
-
-            json_canonico = json.dumps(certificate_dict, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
-            generated_hash = gerar_hash_texto(json_canonico)
+            # Uma transação pode levar vários certificados: usa o memo com este hash
+            memos = decodificar_memos_transacao(transaction_result)
+            metadata_memo = next(
+                (memo for memo in memos if (memo.get("doc_hash") or "").lower() == generated_hash),
+                memos[0] if memos else {}
+            )
+            blockchain_doc_hash = metadata_memo.get("doc_hash")
 
             hash_valido = blockchain_doc_hash == generated_hash
 
-            return {
+            validacao = {
+                "hash_blockchain": blockchain_doc_hash,
+                "hash_gerado": generated_hash,
+                "hash_valido": hash_valido
+            }
+            if json_canonico is not None:
+                validacao["json_canonico_usado"] = json_canonico
+            validacao["certificado_autentico"] = hash_valido
+            resultado = {
                 "status": "encontrado",
                 "txid": txid,
-                "rede": f"Solana {SOLANA_NETWORK.title()}",
-                "explorer_url": f"https://explorer.solana.com/tx/{txid}?cluster={SOLANA_NETWORK}",
+                "rede": f"Solana {settings.solana_network.title()}",
+                "explorer_url": f"https://explorer.solana.com/tx/{txid}?cluster={settings.solana_network}",
+                "commitment": commitment,
                 "metadata_memo": metadata_memo,
-                "validacao": {
-                    "hash_blockchain": blockchain_doc_hash,
-                    "hash_gerado": generated_hash,
-                    "hash_valido": hash_valido,
-                    "json_canonico_usado": json_canonico,
-                    "certificado_autentico": hash_valido
-                },
-                "certificado_dados": certificate_dict
+                "validacao": validacao
             }
+            if certificate_dict is not None:
+                resultado["certificado_dados"] = certificate_dict
+            return _marcar_revogacao(resultado, generated_hash if hash_valido else None)
         else:
             return {
                 "status": "nao_encontrado",
                 "mensagem": "Transação não encontrada na blockchain",
                 "txid": txid,
+                "commitment": commitment,
                 "error": data.get("error", "Transação não existe")
             }
 
@@ -247,6 +693,136 @@ async def verificar_certificado(txid: str, certificado_data: CertificadoVerifica
         )
 
 
+def _marcar_revogacao(resultado: dict, doc_hash: Optional[str]) -> dict:
+    """
+    Marca como revogado um certificado encontrado cujo hash está nas revogações.
+
+    A consulta é ao conjunto em memória do armazenamento local (sem RPC); só
+    os certificados revogados leem os dados da revogação no SQLite.
+    """
+    revogacao = obter_store().buscar_revogacao(doc_hash) if doc_hash else None
+    if revogacao is None:
+        return resultado
+    resultado["status"] = "revogado"
+    resultado["mensagem"] = "Certificado autêntico, mas revogado pelo emissor"
+    resultado["validacao"]["certificado_autentico"] = False
+    resultado["validacao"]["revogado"] = True
+    resultado["revogacao"] = {
+        "txid": revogacao["txid"],
+        "motivo": revogacao["motivo"],
+        "revogado_em": revogacao["revogado_em"]
+    }
+    return resultado
+
+
+async def _certificados_da_transacao(txid: str) -> list:
+    """Hashes dos certificados emitidos em uma transação (índice local, ou a própria transação)"""
+    registros = obter_store().buscar_por_txid(txid)
+    if registros:
+        return [registro["doc_hash"] for registro in registros]
+
+    from ..services.blockchain import obter_registry
+
+    keypair = obter_registry().keypair
+    data = await obter_transacao(txid, "confirmed")
+    transacao = data.get("result")
+    if not transacao:
+        raise HTTPException(status_code=404, detail="Transação não encontrada na blockchain")
+    chaves = transacao.get("transaction", {}).get("message", {}).get("accountKeys", [])
+    if keypair is None or not chaves or chaves[0] != str(keypair.pubkey()):
+        raise HTTPException(status_code=403, detail="Transação não foi emitida pela carteira desta API")
+    return [(memo["doc_hash"] or "").lower() for memo in decodificar_memos_transacao(transacao) if memo.get("doc_hash")]
+
+
+@router.post("/revoke/{txid}", dependencies=[Depends(exigir_admin)])
+async def revogar_certificado(
+    txid: str,
+    revogacao: Optional[RevogacaoRequest] = None,
+    opcoes: Optional[OpcoesEnvio] = Depends(opcoes_envio)
+):
+    """
+    Revoga um certificado emitido pela carteira desta API. Com autenticação
+    ativa, só as API keys de ADMIN_API_KEYS podem revogar.
+
+    Grava na blockchain um memo de revogação com o hash do certificado e o
+    TXID da emissão, e acrescenta o hash às revogações do índice local. A
+    partir daí, as verificações desse certificado respondem status
+    "revogado" (sem consultas extras à blockchain).
+
+    Args:
+        txid (str): TXID da transação de emissão
+        revogacao (RevogacaoRequest, opcional): Hash do certificado (se a
+            transação tiver vários) e motivo
+        opcoes (OpcoesEnvio, opcional): Opções de envio (ver /register)
+
+    Returns:
+        dict: Hash revogado, TXID da emissão e TXID da revogação
+    """
+
+    revogacao = revogacao or RevogacaoRequest()
+    try:
+        hashes = await _certificados_da_transacao(txid)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar a transação: {str(e)}")
+
+    if revogacao.hash:
+        doc_hash = revogacao.hash.lower()
+        if doc_hash not in hashes:
+            raise HTTPException(status_code=404, detail="Certificado não encontrado nesta transação")
+    elif len(hashes) == 1:
+        doc_hash = hashes[0]
+    elif not hashes:
+        raise HTTPException(status_code=404, detail="Nenhum certificado nesta transação")
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A transação tem {len(hashes)} certificados: informe o hash do certificado a revogar"
+        )
+    anexar_ao_log(hash=doc_hash, txid=txid)
+
+    store = obter_store()
+    if store.revogado(doc_hash):
+        raise HTTPException(status_code=409, detail="Certificado já revogado")
+
+    # Evita duas revogações simultâneas do mesmo certificado (também entre workers)
+    estado = obter_estado()
+    chave = f"revogacao:{doc_hash}"
+    if not estado.definir_se_ausente(chave, "1", ttl=TTL_REVOGACAO_EM_ANDAMENTO):
+        raise HTTPException(status_code=409, detail="Revogação deste certificado já em andamento")
+    if store.revogado(doc_hash):
+        # Outra revogação terminou (e liberou a chave) entre a consulta acima e a trava
+        estado.remover(chave)
+        raise HTTPException(status_code=409, detail="Certificado já revogado")
+    try:
+        txid_revogacao = await revogar_hash_solana(doc_hash, txid, revogacao.motivo, opcoes)
+        store.salvar_revogacoes([{
+            "doc_hash": doc_hash,
+            "txid": txid_revogacao,
+            "txid_original": txid,
+            "motivo": revogacao.motivo,
+            "origem": "revogacao"
+        }])
+    except FilaCheiaError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error("Erro na revogação: %s", e)
+        raise HTTPException(status_code=500, detail=f"Falha ao revogar certificado na blockchain: {str(e)}")
+    finally:
+        estado.remover(chave)
+
+    rede = get_settings().solana_network
+    return {
+        "status": "revogado",
+        "hash_sha256": doc_hash,
+        "txid_original": txid,
+        "txid_revogacao": txid_revogacao,
+        "motivo": revogacao.motivo,
+        "explorer_url": f"https://explorer.solana.com/tx/{txid_revogacao}?cluster={rede}"
+    }
+
+
 @router.get("/wallet-info")
 async def obter_informacoes_carteira():
     """
@@ -257,49 +833,48 @@ async def obter_informacoes_carteira():
     """
 
     try:
-        from ..services.blockchain import _registry
-        
-        logger.info(f"[WALLET-INFO DEBUG] SOLANA_WALLET_PATH na rota: {SOLANA_WALLET_PATH}")
-        logger.info(f"[WALLET-INFO DEBUG] WALLET_CONFIGURED: {WALLET_CONFIGURED}")
-        logger.info(f"[WALLET-INFO DEBUG] _registry.keypair: {_registry.keypair}")
+        from ..services.blockchain import obter_registry
+
+        settings = get_settings()
+        registry = obter_registry()
 
-        if not WALLET_CONFIGURED:
-            logger.warning(f"[WALLET-INFO DEBUG] Carteira não configurada")
+        if not settings.wallet_configured:
+            logger.warning("Carteira não configurada")
             return {
                 "status": "carteira_nao_configurada",
                 "mensagem": "Você precisa configurar sua própria carteira",
                 "instrucoes": {
                     "passo_1": "Crie sua carteira Solana usando: solana-keygen new",
-                    "passo_2": f"Salve o arquivo JSON em: {SOLANA_WALLET_PATH}",
-                    "passo_3": "Configure WALLET_CONFIGURED = True",
+                    "passo_2": f"Salve o arquivo JSON em: {settings.solana_wallet_path}",
+                    "passo_3": "Configure WALLET_CONFIGURED=true",
                     "passo_4": "Transfira SOL para sua carteira",
                     "alternativa": "Ou use o sistema em modo simulação (padrão atual)"
                 },
                 "configuracao_atual": {
                     "carteira_configurada": False,
-                    "transacoes_reais": USE_REAL_TRANSACTIONS,
-                    "rede": ACTIVE_NETWORK,
+                    "transacoes_reais": settings.use_real_transactions,
+                    "rede": settings.solana_network,
                     "modo": "simulacao_completa",
-                    "wallet_path_esperado": str(SOLANA_WALLET_PATH)
+                    "wallet_path_esperado": str(settings.solana_wallet_path)
                 }
             }
 
-        if not _registry.keypair:
-            logger.error(f"[WALLET-INFO DEBUG] Carteira configurada mas keypair não carregado")
+        if not registry.keypair:
+            logger.error("Carteira configurada mas keypair não carregado")
             return {
                 "status": "erro",
                 "mensagem": "Carteira configurada mas não carregada corretamente"
             }
 
-        wallet_address = str(_registry.keypair.pubkey())
-        logger.info(f"[WALLET-INFO DEBUG] Carteira carregada: {wallet_address}")
+        wallet_address = str(registry.keypair.pubkey())
+        logger.debug("Carteira carregada: %s", wallet_address)
 
         # Get balance using direct RPC call
         balance_sol = "simulacao"
         balance_lamports = "N/A"
         
         try:
-            print(f"Consultando saldo para: {wallet_address}")
+            logger.debug("Consultando saldo para: %s", wallet_address)
             
             payload = {
                 "jsonrpc": "2.0",
@@ -310,7 +885,7 @@ async def obter_informacoes_carteira():
             
             json_data = json.dumps(payload).encode('utf-8')
             req = urllib.request.Request(
-                SOLANA_URL,
+                settings.solana_url,
                 data=json_data,
                 headers={'Content-Type': 'application/json'}
             )
@@ -321,13 +896,13 @@ async def obter_informacoes_carteira():
             if "result" in balance_data and "value" in balance_data["result"]:
                 balance_lamports = balance_data["result"]["value"]
                 balance_sol = balance_lamports / 1_000_000_000
-                print(f"Balance: {balance_lamports} lamports = {balance_sol} SOL")
+                logger.debug("Saldo: %s lamports = %s SOL", balance_lamports, balance_sol)
             else:
                 balance_sol = "erro_rpc_response"
                 balance_lamports = "erro_rpc_response"
                 
         except Exception as e:
-            print(f"Erro ao consultar saldo via RPC: {str(e)}")
+            logger.warning("Erro ao consultar saldo via RPC: %s", e)
             balance_sol = f"erro_rpc: {str(e)}"
             balance_lamports = f"erro_rpc: {str(e)}"
 
@@ -337,15 +912,15 @@ async def obter_informacoes_carteira():
                 "endereco": wallet_address,
                 "saldo_sol": balance_sol,
                 "saldo_lamports": balance_lamports,
-                "rede": ACTIVE_NETWORK,
-                "transacoes_reais": USE_REAL_TRANSACTIONS,
-                "modo": "real" if USE_REAL_TRANSACTIONS else "simulacao",
+                "rede": settings.solana_network,
+                "transacoes_reais": settings.use_real_transactions,
+                "modo": "real" if settings.use_real_transactions else "simulacao",
                 "debug_info": {
-                    "wallet_configured": WALLET_CONFIGURED,
-                    "use_real_transactions": USE_REAL_TRANSACTIONS,
-                    "active_network": ACTIVE_NETWORK,
-                    "wallet_path": str(SOLANA_WALLET_PATH),
-                    "wallet_path_exists": Path(SOLANA_WALLET_PATH).exists()
+                    "wallet_configured": settings.wallet_configured,
+                    "use_real_transactions": settings.use_real_transactions,
+                    "active_network": settings.solana_network,
+                    "wallet_path": str(settings.solana_wallet_path),
+                    "wallet_path_exists": settings.solana_wallet_path.exists()
                 }
             },
             "custos": {
@@ -353,12 +928,12 @@ async def obter_informacoes_carteira():
                 "saldo_recomendado": "0.01 SOL"
             },
             "instrucoes": {
-                "obter_sol": f"Transfira SOL para: {wallet_address}" if USE_REAL_TRANSACTIONS else "Configure sua carteira primeiro"
+                "obter_sol": f"Transfira SOL para: {wallet_address}" if settings.use_real_transactions else "Configure sua carteira primeiro"
             }
         }
 
     except Exception as e:
-        logger.error(f"[WALLET-INFO ERROR] {str(e)}", exc_info=True)
+        logger.error("Erro ao consultar a carteira: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao obter informações da carteira: {str(e)}"
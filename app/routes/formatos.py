@@ -0,0 +1,61 @@
+"""
+Formatos de resposta da API
+
+- JSON serializado com orjson, quando instalado (classe padrão da aplicação);
+- MessagePack, quando o cliente envia Accept: application/msgpack;
+- representação compacta (?format=compact ou Prefer: return=minimal) nas
+  rotas de registro e verificação.
+"""
+
+from typing import NamedTuple, Optional
+
+from fastapi import Header, Query
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+TIPOS_MSGPACK = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# Classe de resposta padrão da aplicação
+RespostaJSON = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+class FormatoResposta(NamedTuple):
+    compacto: bool = False
+    msgpack: bool = False
+
+
+def formato_resposta(
+    formato: Optional[str] = Query(None, alias="format", description="compact: apenas uuid, hash, txid e status"),
+    prefer: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None)
+) -> FormatoResposta:
+    """Dependência que lê o formato pedido pelo cliente (parâmetro format, Prefer e Accept)"""
+    compacto = formato == "compact" or "return=minimal" in (prefer or "")
+    usa_msgpack = MSGPACK_AVAILABLE and any(tipo in (accept or "") for tipo in TIPOS_MSGPACK)
+    return FormatoResposta(compacto, usa_msgpack)
+
+
+def responder(dados: dict, formato: Optional[FormatoResposta]):
+    """Serializa a resposta em MessagePack se pedido; caso contrário, usa a classe padrão"""
+    if formato is not None and formato.msgpack:
+        return MsgPackResponse(dados)
+    return dados
@@ -0,0 +1,47 @@
+"""
+Rotas do frontend (página inicial e arquivos estáticos pré-comprimidos)
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response
+
+from ..services.frontend import Arquivo, etag_corresponde, obter_frontend
+
+router = APIRouter(tags=["frontend"])
+
+
+def _responder(arquivo: Arquivo, accept_encoding: Optional[str], if_none_match: Optional[str]) -> Response:
+    variante = arquivo.escolher(accept_encoding or "")
+    if etag_corresponde(if_none_match, variante.headers["ETag"]):
+        headers = {chave: valor for chave, valor in variante.headers.items() if chave != "Content-Type"}
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+    return Response(variante.corpo, headers=variante.headers)
+
+
+@router.api_route("/", methods=["GET", "HEAD"], include_in_schema=False)
+async def pagina_inicial(
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Página inicial do frontend (revalidada pelo ETag a cada acesso)"""
+    frontend = obter_frontend()
+    if frontend is None:
+        raise HTTPException(status_code=404, detail="Frontend não disponível")
+    return _responder(frontend.index, accept_encoding, if_none_match)
+
+
+@router.api_route("/assets/{caminho:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def arquivo_estatico(
+    caminho: str,
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Arquivo do frontend com hash no nome (cache imutável)"""
+    frontend = obter_frontend()
+    arquivo = frontend.obter(f"/assets/{caminho}") if frontend else None
+    if arquivo is None:
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+    return _responder(arquivo, accept_encoding, if_none_match)
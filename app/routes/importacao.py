@@ -0,0 +1,144 @@
+"""
+Rota de importação em lote de participantes (CSV/NDJSON)
+"""
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from ..config import get_settings
+from ..services.importacao import Registro, detectar_formato, ler_registros
+from .certificados import CertificadoRequest, registrar_certificado
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/certificados", tags=["importacao"])
+
+
+class _RespostaNDJSON(StreamingResponse):
+    """
+    Resposta NDJSON que é enviada enquanto o corpo da requisição ainda é lido.
+
+    A StreamingResponse padrão escuta a desconexão do cliente consumindo
+    receive(), o que disputaria as mensagens do corpo com o leitor; aqui a
+    desconexão é percebida pelo próprio request.stream().
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _linha(dados: dict) -> bytes:
+    return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def _registrar_linha(registro: Registro, idempotency_key: Optional[str]) -> dict:
+    """Valida e registra um participante, devolvendo o resultado da linha"""
+    numero, dados, erro = registro
+    if erro is not None:
+        return {"linha": numero, "status": "invalido", "erros": [erro]}
+
+    try:
+        certificado = CertificadoRequest(**dados)
+    except ValidationError as e:
+        erros = [f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in e.errors()]
+        return {"linha": numero, "status": "invalido", "erros": erros}
+
+    chave = f"{idempotency_key}:{numero}" if idempotency_key else None
+    try:
+        resposta = await registrar_certificado(certificado, idempotency_key=chave, formato=None, opcoes=None)
+    except HTTPException as e:
+        detalhe = e.detail.get("message", e.detail) if isinstance(e.detail, dict) else e.detail
+        return {"linha": numero, "status": "erro", "erro": detalhe}
+
+    registrado = resposta["certificado"]
+    return {
+        "linha": numero,
+        "status": "sucesso",
+        "uuid": registrado["uuid"],
+        "hash_sha256": registrado["hash_sha256"],
+        "txid_solana": registrado["txid_solana"]
+    }
+
+
+async def _processar(
+    registros: AsyncIterator[Registro],
+    tamanho_bloco: int,
+    idempotency_key: Optional[str]
+) -> AsyncIterator[bytes]:
+    """Registra os participantes em blocos e emite uma linha NDJSON por registro"""
+    resumo = {"total": 0, "sucesso": 0, "invalido": 0, "erro": 0}
+    bloco: List[Registro] = []
+
+    async def descarregar():
+        resultados = await asyncio.gather(*(
+            _registrar_linha(registro, idempotency_key) for registro in bloco
+        ))
+        bloco.clear()
+        for resultado in resultados:
+            resumo["total"] += 1
+            resumo[resultado["status"]] += 1
+        return b"".join(_linha(resultado) for resultado in resultados)
+
+    try:
+        async for registro in registros:
+            bloco.append(registro)
+            if len(bloco) >= tamanho_bloco:
+                yield await descarregar()
+        if bloco:
+            yield await descarregar()
+    except ValueError as e:
+        # Conteúdo ilegível: os registros anteriores já foram processados
+        if bloco:
+            yield await descarregar()
+        yield _linha({"status": "abortado", "erro": str(e)})
+
+    yield _linha({"resumo": resumo})
+
+
+@router.post("/import")
+async def importar_participantes(
+    request: Request,
+    formato: Optional[str] = Query(None, description="csv ou ndjson (padrão: pelo Content-Type)"),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """
+    Importa uma lista de participantes e registra um certificado para cada um.
+
+    O corpo (CSV com cabeçalho name,event,email,certificate_code ou NDJSON com
+    um objeto por linha) é lido de forma incremental; os resultados de cada
+    linha são devolvidos em NDJSON enquanto o restante do arquivo ainda está
+    sendo processado. A última linha traz o resumo da importação.
+
+    Com Idempotency-Key, cada linha usa a chave "<chave>:<linha>", de modo que
+    reenviar o mesmo arquivo após uma falha não registra de novo as linhas já
+    concluídas.
+
+    Args:
+        request (Request): Requisição com o arquivo no corpo
+        formato (str, opcional): Formato do arquivo, se o Content-Type não o indicar
+        idempotency_key (str, opcional): Chave de idempotência da importação
+
+    Returns:
+        StreamingResponse: Resultados em NDJSON (application/x-ndjson)
+    """
+
+    formato_arquivo = detectar_formato(request.headers.get("content-type"), formato)
+    if formato_arquivo is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Envie text/csv ou application/x-ndjson (ou informe ?formato=csv|ndjson)"
+        )
+
+    settings = get_settings()
+    registros = ler_registros(request.stream(), formato_arquivo, settings.import_max_line_bytes)
+    return _RespostaNDJSON(_processar(registros, settings.import_chunk_size, idempotency_key))
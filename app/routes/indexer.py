@@ -0,0 +1,213 @@
+"""
+Rotas do indexador de certificados da carteira emissora
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ..config import get_settings
+from ..services.indexer import obter_indexer
+from ..services.rpc import rpc_batch_async
+from ..services.store import nivel_confirmacao, obter_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/certificados", tags=["indexador"])
+
+# Referência da sincronização disparada manualmente (evita coleta da task)
+_sincronizacao = None
+
+# Máximo de assinaturas por chamada getSignatureStatuses
+ASSINATURAS_POR_CONSULTA = 256
+
+# Campos da listagem por evento (o e-mail não é exposto)
+CAMPOS_EVENTO = (
+    "uuid", "name", "event", "code", "time", "doc_hash", "txid",
+    "network", "origem", "slot", "block_time"
+)
+
+
+def _codificar_cursor(chave: Tuple[str, str]) -> str:
+    bruto = json.dumps(list(chave), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(bruto).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        chave = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        chave = None
+    if not (isinstance(chave, list) and len(chave) == 2 and all(isinstance(c, str) for c in chave)):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return chave[0], chave[1]
+
+
+async def _status_onchain(txids: List[str]) -> Dict[str, Optional[dict]]:
+    """Consulta getSignatureStatuses das transações, em lotes de até 256 numa única requisição"""
+    blocos = [txids[i:i + ASSINATURAS_POR_CONSULTA] for i in range(0, len(txids), ASSINATURAS_POR_CONSULTA)]
+    respostas = await rpc_batch_async([
+        ("getSignatureStatuses", [bloco, {"searchTransactionHistory": True}])
+        for bloco in blocos
+    ])
+
+    status = {}
+    for bloco, resposta in zip(blocos, respostas):
+        if "error" in resposta:
+            raise RuntimeError(f"getSignatureStatuses: {resposta['error']}")
+        for txid, valor in zip(bloco, resposta["result"]["value"]):
+            status[txid] = valor
+    return status
+
+
+@router.get("/hash/{doc_hash}")
+async def buscar_certificado_por_hash(doc_hash: str):
+    """
+    Busca um certificado no índice local pelo hash, sem precisar do TXID.
+
+    Args:
+        doc_hash (str): Hash SHA-256 do JSON canonizado
+
+    Returns:
+        dict: Certificado indexado com o TXID correspondente
+    """
+
+    certificado = obter_store().buscar_por_hash(doc_hash)
+    if not certificado:
+        raise HTTPException(
+            status_code=404,
+            detail="Hash não encontrado no índice local"
+        )
+    return {"status": "encontrado", "certificado": certificado}
+
+
+@router.get("/indexer/status")
+async def status_indexador():
+    """
+    Obtém o estado do indexador e do armazenamento local.
+
+    Returns:
+        dict: Estado da última sincronização e total de certificados
+    """
+
+    indexer = obter_indexer()
+    if not indexer:
+        raise HTTPException(
+            status_code=503,
+            detail="Carteira não carregada: indexador indisponível"
+        )
+    return {
+        "status": "sucesso",
+        "endereco": indexer.endereco,
+        "indexador": indexer.status,
+        "certificados_no_indice": obter_store().contar()
+    }
+
+
+@router.post("/indexer/sync", status_code=202)
+async def sincronizar_indexador(completo: bool = False):
+    """
+    Dispara uma sincronização do indexador em segundo plano.
+
+    Args:
+        completo (bool): Descarta os checkpoints e reindexa todo o histórico
+
+    Returns:
+        dict: Confirmação do agendamento
+    """
+
+    global _sincronizacao
+
+    indexer = obter_indexer()
+    if not indexer:
+        raise HTTPException(
+            status_code=503,
+            detail="Carteira não carregada: indexador indisponível"
+        )
+    if indexer.status["em_execucao"]:
+        raise HTTPException(
+            status_code=409,
+            detail="Sincronização já em andamento"
+        )
+
+    _sincronizacao = asyncio.create_task(
+        indexer.ressincronizar() if completo else indexer.sincronizar()
+    )
+    return {"status": "agendado", "completo": completo}
+
+
+@router.get("/events/{event:path}")
+async def listar_certificados_evento(
+    event: str,
+    limite: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    status_onchain: bool = False
+):
+    """
+    Lista os certificados de um evento no índice local, em ordem de emissão.
+
+    A paginação é por cursor (keyset em time, uuid): proximo_cursor aponta
+    para o último certificado da página e cada página é uma busca direta no
+    índice, com o mesmo custo do início ao fim do evento.
+
+    Args:
+        event (str): Nome do evento
+        limite (int, opcional): Certificados por página (até events_page_max)
+        cursor (str, opcional): proximo_cursor da página anterior
+        status_onchain (bool): Consulta na blockchain o status das transações da página
+
+    Returns:
+        dict: Certificados da página e o cursor da próxima (None na última)
+    """
+
+    settings = get_settings()
+    limite = min(limite or settings.events_page_size, settings.events_page_max)
+    apos = _decodificar_cursor(cursor) if cursor else None
+
+    store = obter_store()
+    linhas = await asyncio.to_thread(store.buscar_por_evento, event, limite + 1, apos)
+    proximo_cursor = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo_cursor = _codificar_cursor((linhas[-1]["ordem_time"], linhas[-1]["ordem_uuid"]))
+
+    certificados = []
+    for linha in linhas:
+        certificado = {campo: linha[campo] for campo in CAMPOS_EVENTO}
+        certificado["commitment"] = nivel_confirmacao(linha)
+        certificados.append(certificado)
+
+    if status_onchain:
+        txids = list(dict.fromkeys(c["txid"] for c in certificados if c["txid"]))
+        try:
+            status = await _status_onchain(txids) if txids else {}
+        except Exception as e:
+            raise HTTPException(
+                status_code=502,
+                detail=f"Erro ao consultar o status das transações: {str(e)}"
+            )
+        for certificado in certificados:
+            valor = status.get(certificado["txid"])
+            certificado["status_onchain"] = valor and {
+                "confirmation_status": valor.get("confirmationStatus"),
+                "slot": valor.get("slot"),
+                "erro": valor.get("err")
+            }
+            if valor and valor.get("err") is None and valor.get("confirmationStatus") in ("confirmed", "finalized"):
+                if certificado["commitment"] not in ("finalized", valor["confirmationStatus"]):
+                    store.marcar_confirmado(
+                        certificado["doc_hash"], valor.get("slot"), None, valor["confirmationStatus"]
+                    )
+                    certificado["commitment"] = valor["confirmationStatus"]
+
+    return {
+        "evento": event,
+        "quantidade": len(certificados),
+        "certificados": certificados,
+        "proximo_cursor": proximo_cursor
+    }
@@ -0,0 +1,269 @@
+"""
+Rotas de jobs em lote (registro e verificação) com progresso em Server-Sent Events
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from ..config import get_settings
+from ..services.agendador import inquilino_atual
+from ..services.blockchain import OpcoesEnvio
+from ..services.hashing import gerar_hash_texto, gerar_json_canonico
+from ..services.jobs import Job, obter_jobs
+from .certificados import (
+    CertificadoRequest,
+    CertificadoVerificacao,
+    _dados_canonicos,
+    _registrar_idempotente,
+    _verificar_por_hash,
+    _verificar_por_txid,
+    commitment_leitura,
+    opcoes_envio
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/certificados/jobs", tags=["jobs"])
+
+
+class LoteRegistroRequest(BaseModel):
+    certificados: List[CertificadoRequest]
+
+
+class ItemVerificacao(CertificadoVerificacao):
+    txid: Optional[str] = None
+
+
+class LoteVerificacaoRequest(BaseModel):
+    certificados: List[ItemVerificacao]
+
+
+def _detalhe(erro: HTTPException) -> str:
+    return erro.detail.get("message", erro.detail) if isinstance(erro.detail, dict) else erro.detail
+
+
+def _validar_tamanho(total: int) -> None:
+    limite = get_settings().jobs_max_items
+    if total > limite:
+        raise HTTPException(status_code=413, detail=f"Lote com mais de {limite} certificados")
+
+
+def _criado(job: Job) -> dict:
+    return {
+        "job_id": job.id,
+        "total": job.total,
+        "status_url": f"/certificados/jobs/{job.id}",
+        "eventos_url": f"/certificados/jobs/{job.id}/events"
+    }
+
+
+async def _executar_item(job: Job, indice: int, tarefa: Callable[[], Awaitable[None]]) -> None:
+    """Executa um certificado do lote; um erro inesperado vira o evento failed dele, sem interromper o job"""
+    try:
+        await tarefa()
+    except Exception as e:
+        logger.error("Job %s: certificado %d falhou: %s", job.id, indice, e)
+        job.registrar(indice, "failed", erro=str(e))
+
+
+async def _executar(job: Job, tarefas: List[Callable[[], Awaitable[None]]]) -> None:
+    """Processa o lote em blocos de import_chunk_size certificados simultâneos"""
+    tamanho = get_settings().import_chunk_size
+    try:
+        for inicio in range(0, len(tarefas), tamanho):
+            await asyncio.gather(*(
+                _executar_item(job, inicio + deslocamento, tarefa)
+                for deslocamento, tarefa in enumerate(tarefas[inicio:inicio + tamanho])
+            ))
+    except Exception as e:
+        logger.error("Job %s interrompido: %s", job.id, e)
+    finally:
+        # O evento done sai sempre: é ele que encerra o EventSource do cliente
+        job.concluir()
+
+
+async def _registrar_item(
+    job: Job,
+    indice: int,
+    certificado: CertificadoRequest,
+    chave: Optional[str],
+    opcoes: Optional[OpcoesEnvio]
+) -> None:
+    calculado = []
+
+    def ao_calcular_hash(doc_hash: str) -> None:
+        calculado.append(doc_hash)
+        job.registrar(indice, "hashed", hash=doc_hash)
+
+    try:
+        resposta = await _registrar_idempotente(certificado, chave, opcoes, ao_calcular_hash)
+    except HTTPException as e:
+        job.registrar(indice, "failed", erro=_detalhe(e))
+        return
+
+    registrado = resposta["certificado"]
+    if not calculado:
+        # Resposta reaproveitada pela Idempotency-Key
+        job.registrar(indice, "hashed", hash=registrado["hash_sha256"])
+    job.registrar(
+        indice, "sent",
+        uuid=registrado["uuid"],
+        hash=registrado["hash_sha256"],
+        txid=registrado["txid_solana"]
+    )
+
+
+async def _verificar_item(job: Job, indice: int, item: ItemVerificacao, commitment: str) -> None:
+    dados = CertificadoVerificacao(**item.dict(exclude={"txid"}))
+    job.registrar(indice, "hashed", hash=gerar_hash_texto(gerar_json_canonico(_dados_canonicos(dados))))
+
+    try:
+        if item.txid:
+            resultado = await _verificar_por_txid(item.txid, dados, commitment)
+        else:
+            resultado = await _verificar_por_hash(dados, commitment)
+    except HTTPException as e:
+        job.registrar(indice, "failed", erro=_detalhe(e))
+        return
+
+    if resultado["status"] == "encontrado" and resultado["validacao"]["certificado_autentico"]:
+        job.registrar(indice, "confirmed", txid=resultado["txid"], commitment=resultado.get("commitment"))
+    else:
+        job.registrar(indice, "failed", status=resultado["status"], txid=resultado.get("txid"))
+
+
+@router.post("/register", status_code=202)
+async def criar_job_registro(
+    lote: LoteRegistroRequest,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None),
+    opcoes: Optional[OpcoesEnvio] = Depends(opcoes_envio)
+):
+    """
+    Cria um job que registra um lote de certificados.
+
+    A resposta volta imediatamente com o id do job; o progresso de cada
+    certificado (hashed, sent ou failed) é publicado em eventos_url.
+
+    Com Idempotency-Key, cada certificado usa a chave "<chave>:<posição>",
+    como na importação.
+
+    Args:
+        lote (LoteRegistroRequest): Certificados a registrar
+        idempotency_key (str, opcional): Chave de idempotência do lote
+        opcoes (OpcoesEnvio, opcional): Opções de envio (ver /register)
+
+    Returns:
+        dict: job_id, total e as URLs de status e de eventos
+    """
+
+    _validar_tamanho(len(lote.certificados))
+    job = obter_jobs().criar("registro", len(lote.certificados), inquilino_atual.get())
+    tarefas = [
+        (lambda i=i, certificado=certificado: _registrar_item(
+            job, i, certificado, f"{idempotency_key}:{i}" if idempotency_key else None, opcoes
+        ))
+        for i, certificado in enumerate(lote.certificados)
+    ]
+    background_tasks.add_task(_executar, job, tarefas)
+    return _criado(job)
+
+
+@router.post("/verify", status_code=202)
+async def criar_job_verificacao(
+    lote: LoteVerificacaoRequest,
+    background_tasks: BackgroundTasks,
+    commitment: str = Depends(commitment_leitura)
+):
+    """
+    Cria um job que verifica um lote de certificados.
+
+    Certificados com txid são conferidos na transação; os demais, pelo hash
+    no índice local. O progresso (hashed, confirmed ou failed) é publicado
+    em eventos_url.
+
+    Args:
+        lote (LoteVerificacaoRequest): Certificados a verificar (txid opcional)
+        commitment (str): Commitment da consulta (confirmed ou finalized)
+
+    Returns:
+        dict: job_id, total e as URLs de status e de eventos
+    """
+
+    _validar_tamanho(len(lote.certificados))
+    job = obter_jobs().criar("verificacao", len(lote.certificados), inquilino_atual.get())
+    tarefas = [
+        (lambda i=i, item=item: _verificar_item(job, i, item, commitment))
+        for i, item in enumerate(lote.certificados)
+    ]
+    background_tasks.add_task(_executar, job, tarefas)
+    return _criado(job)
+
+
+def _job_do_cliente(job_id: str) -> Job:
+    job = obter_jobs().obter(job_id)
+    if job is None or job.cliente != inquilino_atual.get():
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
+
+
+@router.get("/{job_id}")
+async def status_job(job_id: str):
+    """
+    Resumo do job: total, contagem por estado e se já foi concluído.
+
+    Args:
+        job_id (str): Id devolvido na criação do job
+
+    Returns:
+        dict: Resumo do job
+    """
+    return _job_do_cliente(job_id).resumo()
+
+
+async def _transmitir(job: Job, vistos: int, intervalo: float) -> AsyncIterator[bytes]:
+    yield b"retry: 3000\n\n"
+    while True:
+        if len(job.eventos) > vistos:
+            # Os eventos acumulados desde a última escrita saem juntos
+            pendentes = job.eventos[vistos:]
+            vistos += len(pendentes)
+            yield b"".join(pendentes)
+            continue
+        if job.concluido:
+            return
+        await job.aguardar(vistos, intervalo)
+        if len(job.eventos) == vistos:
+            yield b": ping\n\n"
+
+
+@router.get("/{job_id}/events")
+async def eventos_job(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Progresso do job em Server-Sent Events.
+
+    Cada certificado gera eventos hashed, sent (registro), confirmed
+    (verificação) ou failed, com o índice do certificado no lote. O stream
+    termina com o evento done (resumo). Ao reconectar com Last-Event-ID, só
+    os eventos seguintes são enviados.
+
+    Args:
+        job_id (str): Id devolvido na criação do job
+        last_event_id (str, opcional): Último evento recebido pelo cliente
+
+    Returns:
+        StreamingResponse: Eventos em text/event-stream
+    """
+
+    job = _job_do_cliente(job_id)
+    vistos = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        _transmitir(job, min(vistos, len(job.eventos)), get_settings().jobs_heartbeat),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
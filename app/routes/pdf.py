@@ -0,0 +1,151 @@
+"""
+Rotas para geração de certificados em PDF
+"""
+
+import re
+import logging
+from typing import List, Optional
+
+import base58
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from ..services.hashing import gerar_hash_texto
+from ..services.memo import hash_valido
+from ..services.pdf_generator import renderizar_certificado_pdf, gerar_zip_certificados, nome_arquivo_pdf
+from ..services.pdf_template import caracteres_sem_suporte
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/certificados", tags=["pdf"])
+
+
+class CertificadoPDFRequest(BaseModel):
+    name: str
+    event: str
+    hash_sha256: str
+    txid_solana: str
+    json_canonico: Optional[str] = None
+
+
+class ParticipantePDF(BaseModel):
+    name: str
+    hash_sha256: str
+    txid_solana: str
+    json_canonico: Optional[str] = None
+
+
+class LotePDFRequest(BaseModel):
+    event: str
+    certificados: List[ParticipantePDF]
+
+
+def _validar_json_canonico(certificado) -> None:
+    """Garante que o JSON canonizado gravado no PDF corresponde ao hash informado"""
+    if certificado.json_canonico is not None and gerar_hash_texto(certificado.json_canonico) != certificado.hash_sha256:
+        raise HTTPException(
+            status_code=400,
+            detail=f"json_canonico não corresponde ao hash {certificado.hash_sha256}"
+        )
+
+
+def _validar_identificadores(certificado) -> None:
+    """Recusa hash e TXID malformados, que iriam para o PDF e para o link do QR code"""
+    if not hash_valido(certificado.hash_sha256):
+        raise HTTPException(status_code=400, detail="hash_sha256 deve ter 64 caracteres hexadecimais")
+    try:
+        assinatura = base58.b58decode(certificado.txid_solana)
+    except ValueError:
+        assinatura = b""
+    if len(assinatura) != 64:
+        raise HTTPException(status_code=400, detail="txid_solana não é uma assinatura Solana em base58")
+
+
+def _validar_texto_pdf(**campos: str) -> None:
+    """Recusa textos que as fontes do PDF não representam (antes de renderizar, igual nos dois modos)"""
+    for campo, valor in campos.items():
+        invalidos = caracteres_sem_suporte(valor)
+        if invalidos:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{campo} contém caracteres não suportados pela fonte do PDF (latin-1): {invalidos}"
+            )
+
+
+def _nome_zip(evento: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", evento.lower()).strip("-")
+    return f"certificados_{slug or 'evento'}.zip"
+
+
+@router.post("/pdf")
+async def gerar_pdf(request: CertificadoPDFRequest):
+    """
+    Gera o PDF de um certificado já registrado na blockchain.
+
+    Args:
+        request (CertificadoPDFRequest): Dados do certificado registrado
+
+    Returns:
+        Response: PDF do certificado
+    """
+
+    _validar_identificadores(request)
+    _validar_json_canonico(request)
+    _validar_texto_pdf(name=request.name, event=request.event)
+
+    try:
+        item = request.dict()
+        pdf_bytes = await renderizar_certificado_pdf(item)
+    except Exception as e:
+        logger.error("Erro ao gerar PDF: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao gerar PDF do certificado: {str(e)}"
+        )
+
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{nome_arquivo_pdf(item)}"'}
+    )
+
+
+@router.post("/pdf/lote")
+async def gerar_pdf_lote(request: LotePDFRequest):
+    """
+    Gera os PDFs de todos os certificados de um evento em um único ZIP.
+
+    A renderização é distribuída no pool de processos e o ZIP é enviado em
+    streaming conforme os PDFs ficam prontos.
+
+    Args:
+        request (LotePDFRequest): Evento e lista de certificados registrados
+
+    Returns:
+        StreamingResponse: Arquivo ZIP com um PDF por certificado
+    """
+
+    if not request.certificados:
+        raise HTTPException(
+            status_code=400,
+            detail="Lote sem certificados"
+        )
+
+    # Tudo é validado antes do streaming: depois do status 200 não há como recusar o lote
+    _validar_texto_pdf(event=request.event)
+    for certificado in request.certificados:
+        _validar_identificadores(certificado)
+        _validar_json_canonico(certificado)
+        _validar_texto_pdf(name=certificado.name)
+
+    itens = (
+        {**certificado.dict(), "event": request.event}
+        for certificado in request.certificados
+    )
+
+    return StreamingResponse(
+        gerar_zip_certificados(itens),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{_nome_zip(request.event)}"'}
+    )
@@ -0,0 +1,244 @@
+"""
+Agendamento justo dos envios de transações entre clientes (API keys)
+
+Todos os clientes compartilham a mesma carteira pagadora e o mesmo limite de
+transações em voo. Sem agendamento, um organizador importando 50 mil
+certificados ocupa todas as vagas e os demais esperam atrás da fila dele.
+
+O AgendadorJusto mantém uma fila por cliente e distribui as vagas de envio
+por Deficit Round Robin: a cada turno o cliente recebe crédito proporcional
+ao seu peso e envia enquanto tiver crédito. Cada cliente tem ainda:
+
+- limite de fila (cota): pedidos além dele são recusados com FilaCheiaError;
+- rajada: máximo de envios simultâneos do cliente, mesmo com vagas ociosas.
+
+O agendamento vale para o worker; o limite global de transações em voo por
+carteira continua sendo aplicado pelas vagas no estado compartilhado.
+
+Configuração (variáveis de ambiente):
+    SCHEDULER_TENANTS      "nome:peso[:fila[:rajada]],..." (por API key)
+    SCHEDULER_QUEUE_LIMIT  limite de fila padrão por cliente
+    SCHEDULER_BURST        rajada padrão por cliente (0 = sem limite)
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional, Tuple
+
+from ..config import get_settings
+
+# Cliente da requisição atual (nome da API key, definido pelo middleware)
+inquilino_atual: ContextVar[str] = ContextVar("inquilino_atual", default="anonimo")
+
+AMOSTRAS_LATENCIA = 1000
+
+
+class FilaCheiaError(Exception):
+    """O cliente já tem o máximo de envios pendentes permitido"""
+
+
+class _Inquilino:
+    def __init__(self, nome: str, peso: float, limite_fila: int, rajada: int):
+        self.nome = nome
+        self.peso = peso
+        self.limite_fila = limite_fila
+        self.rajada = rajada
+        self.fila: Deque[Tuple[float, asyncio.Future, float]] = deque()
+        self.deficit = 0.0
+        self.em_voo = 0
+        self.concluidos = 0
+        self.recusados = 0
+        self.esperas: Deque[float] = deque(maxlen=AMOSTRAS_LATENCIA)
+        self.duracoes: Deque[float] = deque(maxlen=AMOSTRAS_LATENCIA)
+
+    def metricas(self) -> dict:
+        esperas = sorted(self.esperas)
+        return {
+            "nome": self.nome,
+            "peso": self.peso,
+            "limite_fila": self.limite_fila,
+            "rajada": self.rajada or None,
+            "fila": len(self.fila),
+            "em_voo": self.em_voo,
+            "concluidos": self.concluidos,
+            "recusados": self.recusados,
+            "espera_media_ms": round(sum(esperas) / len(esperas) * 1000, 1) if esperas else None,
+            "espera_p95_ms": round(esperas[int(len(esperas) * 0.95)] * 1000, 1) if esperas else None,
+            "envio_medio_ms": round(sum(self.duracoes) / len(self.duracoes) * 1000, 1) if self.duracoes else None
+        }
+
+
+def _ler_inquilinos(valor: str) -> Dict[str, Tuple[float, Optional[int], Optional[int]]]:
+    """Lê "nome:peso[:fila[:rajada]],..." em {nome: (peso, fila, rajada)}"""
+    inquilinos = {}
+    for entrada in filter(None, (item.strip() for item in valor.split(","))):
+        partes = entrada.split(":")
+        if not 2 <= len(partes) <= 4:
+            raise ValueError(f"Entrada de SCHEDULER_TENANTS inválida (use nome:peso[:fila[:rajada]]): {entrada}")
+        fila = int(partes[2]) if len(partes) > 2 and partes[2] else None
+        rajada = int(partes[3]) if len(partes) > 3 and partes[3] else None
+        inquilinos[partes[0]] = (float(partes[1]), fila, rajada)
+    return inquilinos
+
+
+class AgendadorJusto:
+    """Distribui vagas de envio entre clientes por Deficit Round Robin"""
+
+    def __init__(
+        self,
+        concorrencia: int,
+        configuracao: Optional[Dict[str, Tuple[float, Optional[int], Optional[int]]]] = None,
+        limite_fila: int = 1000,
+        rajada: int = 0
+    ):
+        self.concorrencia = max(1, concorrencia)
+        self.livres = self.concorrencia
+        self.configuracao = configuracao or {}
+        self.limite_fila = limite_fila
+        self.rajada = rajada
+        self._inquilinos: Dict[str, _Inquilino] = {}
+        self._ativos: Deque[str] = deque()
+        self._novo_turno = True
+
+    def _inquilino(self, nome: str) -> _Inquilino:
+        inquilino = self._inquilinos.get(nome)
+        if inquilino is None:
+            peso, fila, rajada = self.configuracao.get(nome, (1.0, None, None))
+            inquilino = _Inquilino(
+                nome,
+                peso,
+                fila if fila is not None else self.limite_fila,
+                rajada if rajada is not None else self.rajada
+            )
+            self._inquilinos[nome] = inquilino
+        return inquilino
+
+    def _proximo(self) -> Optional[_Inquilino]:
+        """Cliente que recebe a próxima vaga (o do início da roda, enquanto tiver crédito)"""
+        bloqueados = 0
+        while self._ativos:
+            inquilino = self._inquilinos[self._ativos[0]]
+            if not inquilino.fila:
+                inquilino.deficit = 0.0
+                self._ativos.popleft()
+                self._novo_turno = True
+                continue
+            if inquilino.rajada and inquilino.em_voo >= inquilino.rajada:
+                # Cliente no limite de rajada: passa a vez sem ganhar crédito
+                bloqueados += 1
+                if bloqueados >= len(self._ativos):
+                    return None
+                self._ativos.rotate(-1)
+                self._novo_turno = True
+                continue
+            bloqueados = 0
+            if self._novo_turno:
+                inquilino.deficit += inquilino.peso
+                self._novo_turno = False
+            if inquilino.deficit >= inquilino.fila[0][0]:
+                return inquilino
+            self._ativos.rotate(-1)
+            self._novo_turno = True
+        return None
+
+    def _despachar(self) -> None:
+        while self.livres > 0:
+            inquilino = self._proximo()
+            if inquilino is None:
+                return
+            custo, futuro, _ = inquilino.fila.popleft()
+            inquilino.deficit -= custo
+            if futuro.done():
+                continue
+            inquilino.em_voo += 1
+            self.livres -= 1
+            futuro.set_result(None)
+            if not inquilino.fila:
+                inquilino.deficit = 0.0
+                self._ativos.popleft()
+                self._novo_turno = True
+
+    def _liberar(self, inquilino: _Inquilino) -> None:
+        inquilino.em_voo -= 1
+        self.livres += 1
+        self._despachar()
+
+    @asynccontextmanager
+    async def vez(self, nome: str, custo: float = 1.0):
+        """
+        Aguarda a vez do cliente e ocupa uma vaga de envio enquanto o bloco executa.
+
+        Args:
+            nome (str): Cliente (nome da API key)
+            custo (float): Custo do envio em unidades de crédito
+
+        Raises:
+            FilaCheiaError: Se o cliente já tiver limite_fila envios pendentes
+        """
+        inquilino = self._inquilino(nome)
+        if len(inquilino.fila) + inquilino.em_voo >= inquilino.limite_fila:
+            inquilino.recusados += 1
+            raise FilaCheiaError(
+                f"Limite de {inquilino.limite_fila} envios pendentes atingido para '{nome}'"
+            )
+
+        futuro = asyncio.get_running_loop().create_future()
+        chegada = time.monotonic()
+        inquilino.fila.append((custo, futuro, chegada))
+        if nome not in self._ativos:
+            self._ativos.append(nome)
+        self._despachar()
+
+        try:
+            await futuro
+        except asyncio.CancelledError:
+            if futuro.done() and not futuro.cancelled():
+                # A vaga foi concedida junto com o cancelamento
+                self._liberar(inquilino)
+            else:
+                for item in inquilino.fila:
+                    if item[1] is futuro:
+                        inquilino.fila.remove(item)
+                        break
+            raise
+
+        inicio = time.monotonic()
+        inquilino.esperas.append(inicio - chegada)
+        try:
+            yield
+        finally:
+            inquilino.duracoes.append(time.monotonic() - inicio)
+            inquilino.concluidos += 1
+            self._liberar(inquilino)
+
+    def pendentes(self) -> int:
+        """Envios na fila ou em andamento, somando todos os clientes"""
+        return sum(len(inquilino.fila) + inquilino.em_voo for inquilino in self._inquilinos.values())
+
+    def metricas(self) -> dict:
+        return {
+            "concorrencia": self.concorrencia,
+            "vagas_livres": self.livres,
+            "clientes": [inquilino.metricas() for inquilino in self._inquilinos.values()]
+        }
+
+
+_agendador: Optional[AgendadorJusto] = None
+
+
+def obter_agendador() -> AgendadorJusto:
+    """Retorna o agendador de envios, criado na primeira chamada"""
+    global _agendador
+    if _agendador is None:
+        settings = get_settings()
+        _agendador = AgendadorJusto(
+            # Cada transação em voo leva até pack_max_memos certificados
+            concorrencia=settings.payer_max_in_flight // max(1, settings.workers) * settings.pack_max_memos,
+            configuracao=_ler_inquilinos(settings.scheduler_tenants),
+            limite_fila=settings.scheduler_queue_limit,
+            rajada=settings.scheduler_burst
+        )
+    return _agendador
@@ -0,0 +1,269 @@
+"""
+Auditoria periódica dos certificados do índice local na blockchain
+
+A cada rodada, um lote de certificados do armazenamento local (varredura
+contínua por rowid ou amostra aleatória) é conferido novamente:
+
+- o hash é recalculado a partir dos campos gravados (certificados emitidos
+  por esta API) e comparado ao doc_hash;
+- as transações são buscadas em lotes JSON-RPC (getTransaction, commitment
+  finalized) e o doc_hash precisa estar entre os memos da transação.
+
+O resultado de cada certificado (ok, ausente, divergente ou
+hash_local_divergente) fica na tabela auditoria do armazenamento.
+
+A auditoria não disputa o RPC com os usuários:
+
+- as consultas têm um orçamento próprio (AUDIT_RPC_RATE chamadas
+  getTransaction por segundo, em token bucket) e podem ir para outro nó
+  (AUDIT_RPC_URL);
+- mesmo no RPC padrão, as chamadas não passam pelo disjuntor, de modo que
+  falhas da auditoria nunca bloqueiam registros e verificações;
+- antes de cada lote, a auditoria espera enquanto houver envios na fila ou
+  o disjuntor do RPC padrão não estiver fechado;
+- com vários workers, cada rodada é executada por um único worker.
+
+Checkpoint (gravado ao fim de cada rodada):
+    auditoria:cursor  rowid do último certificado auditado na varredura
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+from ..config import Settings, get_settings
+from .agendador import obter_agendador
+from .estado import obter_estado
+from .hashing import gerar_hash_texto, gerar_json_canonico
+from .memo import decodificar_memos_transacao
+from .rpc import DisjuntorRPC, obter_disjuntor
+from .store import CertificateStore, obter_store
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_CURSOR = "auditoria:cursor"
+
+STATUS_OK = "ok"
+STATUS_AUSENTE = "ausente"
+STATUS_DIVERGENTE = "divergente"
+STATUS_HASH_LOCAL = "hash_local_divergente"
+
+# Campos do JSON canonizado e a coluna correspondente no armazenamento
+_CAMPOS_CANONICOS = {
+    "event": "event", "uuid": "uuid", "name": "name", "email": "email",
+    "certificate_code": "code", "time": "time"
+}
+
+
+class OrcamentoRPC:
+    """Token bucket das chamadas RPC da auditoria (chamadas por segundo)"""
+
+    def __init__(self, taxa: float, rajada: Optional[float] = None):
+        self.taxa = taxa
+        self.rajada = rajada or max(taxa, 1.0)
+        self.fichas = self.rajada
+        self.atualizado = time.monotonic()
+
+    async def consumir(self, quantidade: int) -> None:
+        """Aguarda até haver fichas para quantidade chamadas"""
+        while True:
+            agora = time.monotonic()
+            self.fichas = min(self.rajada, self.fichas + (agora - self.atualizado) * self.taxa)
+            self.atualizado = agora
+            # Um lote maior que a rajada espera o bucket encher e fica devendo a diferença
+            if self.fichas >= min(quantidade, self.rajada):
+                self.fichas -= quantidade
+                return
+            await asyncio.sleep((min(quantidade, self.rajada) - self.fichas) / self.taxa)
+
+
+def hash_local(registro: dict) -> Optional[str]:
+    """Hash recalculado dos campos gravados (None se o certificado não tem todos, ex.: vindo do indexador)"""
+    dados = {campo: registro.get(coluna) for campo, coluna in _CAMPOS_CANONICOS.items()}
+    if any(valor is None for valor in dados.values()):
+        return None
+    return gerar_hash_texto(gerar_json_canonico(dados))
+
+
+class AuditorCertificados:
+    """Confere periodicamente os certificados do índice local contra a blockchain"""
+
+    def __init__(
+        self,
+        store: Optional[CertificateStore] = None,
+        ledger=None,
+        disjuntor: Optional[DisjuntorRPC] = None,
+        settings: Optional[Settings] = None
+    ):
+        self.settings = settings or get_settings()
+        self.store = store or obter_store()
+        self._ledger = ledger
+        self.disjuntor = disjuntor or obter_disjuntor()
+        self.orcamento = OrcamentoRPC(self.settings.audit_rpc_rate)
+        self._aleatorio = random.Random()
+        self._lock = asyncio.Lock()
+        self.status = {
+            "em_execucao": False,
+            "ultima_execucao": None,
+            "ultimo_erro": None,
+            "rodadas": 0,
+            "varreduras_completas": 0,
+            "certificados_auditados": 0,
+            "consultas_rpc": 0,
+            "erros_rpc": 0,
+            "esperas_trafego": 0,
+            "problemas": 0
+        }
+
+    @property
+    def ledger(self):
+        if self._ledger is None:
+            from .blockchain import obter_registry
+            self._ledger = obter_registry().ledger
+        return self._ledger
+
+    async def _aguardar_trafego(self) -> None:
+        """Espera enquanto houver envios de usuários pendentes ou o RPC padrão estiver com problemas"""
+        esperou = False
+        while obter_agendador().pendentes() > 0 or (
+            not self.settings.audit_rpc_url and self.disjuntor.estado != DisjuntorRPC.FECHADO
+        ):
+            esperou = True
+            await asyncio.sleep(self.settings.audit_yield_interval)
+        self.status["esperas_trafego"] += esperou
+
+    def _selecionar(self) -> List[dict]:
+        """Certificados da rodada: os próximos da varredura ou uma amostra"""
+        quantidade = self.settings.audit_per_round
+        registrado_ate = time.time() - self.settings.audit_min_age
+        if self.settings.audit_mode == "amostra":
+            return self.store.amostra_auditoria(quantidade, registrado_ate, self._aleatorio)
+
+        cursor = int(self.store.obter_checkpoint(CHECKPOINT_CURSOR) or 0)
+        return self.store.pagina_auditoria(cursor, quantidade, registrado_ate)
+
+    async def _auditar_lote(self, registros: List[dict]) -> List[dict]:
+        txids = list(dict.fromkeys(registro["txid"] for registro in registros))
+        await self._aguardar_trafego()
+        await self.orcamento.consumir(len(txids))
+        try:
+            respostas = await self.ledger.obter_transacoes(txids, "finalized", self.settings.audit_rpc_url or self.settings.solana_url)
+        except Exception as e:
+            # Lote inteiro recusado (ex.: 429 do provedor): segue adiante depois de uma pausa
+            self.status["erros_rpc"] += len(txids)
+            logger.warning("Auditoria: falha ao consultar %d transações: %s", len(txids), e)
+            await asyncio.sleep(self.settings.audit_yield_interval)
+            return []
+        self.status["consultas_rpc"] += len(txids)
+
+        memos: Dict[str, Optional[set]] = {}
+        for txid, resposta in zip(txids, respostas):
+            if "error" in resposta:
+                self.status["erros_rpc"] += 1
+                continue
+            transacao = resposta.get("result")
+            memos[txid] = None if not transacao else {
+                (memo.get("doc_hash") or "").lower() for memo in decodificar_memos_transacao(transacao)
+            }
+
+        resultados = []
+        for registro in registros:
+            resultado = {"doc_hash": registro["doc_hash"], "txid": registro["txid"], "status": STATUS_OK}
+            calculado = hash_local(registro)
+            if calculado is not None and calculado != registro["doc_hash"]:
+                resultado.update(status=STATUS_HASH_LOCAL, detalhe=f"hash dos campos gravados: {calculado}")
+            elif registro["txid"] not in memos:
+                # Erro de RPC nesta transação: fica para a próxima rodada
+                continue
+            elif memos[registro["txid"]] is None:
+                resultado.update(status=STATUS_AUSENTE, detalhe="transação não encontrada (finalized)")
+            elif registro["doc_hash"] not in memos[registro["txid"]]:
+                resultado.update(status=STATUS_DIVERGENTE, detalhe="doc_hash não está nos memos da transação")
+            resultados.append(resultado)
+        return resultados
+
+    async def auditar(self) -> dict:
+        """
+        Executa uma rodada de auditoria.
+
+        Returns:
+            dict: Certificados auditados e quantidade por status nesta rodada
+        """
+        async with self._lock:
+            self.status["em_execucao"] = True
+            self.status["ultimo_erro"] = None
+            contagem: Dict[str, int] = {}
+            try:
+                registros = self._selecionar()
+                # Certificados da mesma transação (empacotados) são conferidos com uma única consulta
+                por_txid: Dict[str, List[dict]] = {}
+                for registro in registros:
+                    por_txid.setdefault(registro["txid"], []).append(registro)
+                txids = list(por_txid)
+                tamanho = self.settings.audit_batch_size
+
+                for inicio in range(0, len(txids), tamanho):
+                    lote = [registro for txid in txids[inicio:inicio + tamanho] for registro in por_txid[txid]]
+                    resultados = await self._auditar_lote(lote)
+                    self.store.salvar_auditoria(resultados)
+                    for resultado in resultados:
+                        contagem[resultado["status"]] = contagem.get(resultado["status"], 0) + 1
+                        if resultado["status"] != STATUS_OK:
+                            logger.warning(
+                                "Auditoria: certificado %s %s (txid %s)",
+                                resultado["doc_hash"], resultado["status"], resultado["txid"],
+                                extra={"tipo": "auditoria", "status": resultado["status"]}
+                            )
+
+                if self.settings.audit_mode != "amostra":
+                    if len(registros) < self.settings.audit_per_round:
+                        # Fim do armazenamento: a próxima rodada recomeça do início
+                        self.status["varreduras_completas"] += 1
+                        self.store.salvar_checkpoint(CHECKPOINT_CURSOR, None)
+                    else:
+                        self.store.salvar_checkpoint(CHECKPOINT_CURSOR, str(registros[-1]["rowid"]))
+
+                auditados = sum(contagem.values())
+                self.status["rodadas"] += 1
+                self.status["certificados_auditados"] += auditados
+                self.status["problemas"] += auditados - contagem.get(STATUS_OK, 0)
+                logger.info("Auditoria: %d certificados conferidos %s", auditados, contagem)
+                return {"auditados": auditados, "por_status": contagem}
+
+            except Exception as e:
+                self.status["ultimo_erro"] = str(e)
+                logger.error("Erro na auditoria: %s", e)
+                raise
+            finally:
+                self.status["em_execucao"] = False
+                self.status["ultima_execucao"] = time.time()
+
+    async def executar_periodicamente(self, intervalo: float) -> None:
+        """
+        Laço da auditoria em segundo plano.
+
+        Com vários workers, cada rodada só é executada pelo worker que obtiver
+        o arrendamento da rodada no estado compartilhado.
+        """
+        while True:
+            try:
+                if obter_estado().definir_se_ausente("auditoria:rodada", "1", ttl=intervalo * 0.9):
+                    await self.auditar()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            await asyncio.sleep(intervalo)
+
+
+_auditor: Optional[AuditorCertificados] = None
+
+
+def obter_auditor() -> AuditorCertificados:
+    """Retorna o auditor de certificados, criado na primeira chamada"""
+    global _auditor
+    if _auditor is None:
+        _auditor = AuditorCertificados()
+    return _auditor
@@ -1,95 +1,216 @@
 """Serviço de integração com a blockchain Solana"""
 
 import asyncio
+import contextvars
+import hashlib
 import secrets
 import time
 import json
 import logging
-from typing import Optional
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 
-# Importar config PRIMEIRO (que já carregou o .env)
-from ..config import SOLANA_NETWORK, SOLANA_URL, SOLANA_WALLET_PATH
-from ..wallet_config import (
-    USE_REAL_TRANSACTIONS, RPC_URL, ACTIVE_NETWORK, 
-    WALLET_CONFIGURED, REQUIRE_MANUAL_SETUP
-)
+from ..config import Settings, get_settings
+from .estado import SharedState, obter_estado
+from .agendador import inquilino_atual, obter_agendador
+from .ledger import LedgerBackend, SimulatedLedger, criar_ledger
+from .memo import TIPO_REVOGACAO, CampoMemoLongoError, codificar_memo_v2, codificar_revogacao
+from .rpc import RPCIndisponivelError, obter_disjuntor
 
 logger = logging.getLogger(__name__)
 
-# DEBUG: Log das configurações carregadas
-logger.info(f"[BLOCKCHAIN DEBUG] SOLANA_NETWORK (config): {SOLANA_NETWORK}")
-logger.info(f"[BLOCKCHAIN DEBUG] SOLANA_URL (config): {SOLANA_URL}")
-logger.info(f"[BLOCKCHAIN DEBUG] SOLANA_WALLET_PATH (config): {SOLANA_WALLET_PATH}")
-logger.info(f"[BLOCKCHAIN DEBUG] ACTIVE_NETWORK (wallet_config): {ACTIVE_NETWORK}")
-logger.info(f"[BLOCKCHAIN DEBUG] RPC_URL (wallet_config): {RPC_URL}")
-logger.info(f"[BLOCKCHAIN DEBUG] WALLET_CONFIGURED (wallet_config): {WALLET_CONFIGURED}")
-
 
 try:
-    from solana.rpc.api import Client
     from solders.keypair import Keypair
+    from solders.hash import Hash
     from solders.pubkey import Pubkey
     from solders.instruction import Instruction
-    from solders.transaction import Transaction
+    from solders.transaction import Transaction, VersionedTransaction
     from solders.message import MessageV0
+    from solders.signature import Signature
+    from solana.rpc.types import TxOpts
     SOLANA_AVAILABLE = True
 except ImportError:
     SOLANA_AVAILABLE = False
-    logger.warning("Bibliotecas Solana não instaladas. Executando em modo simulação.")
+    logger.warning("Bibliotecas Solana não instaladas: registro de certificados indisponível.")
+
+# Tamanho máximo de uma transação serializada (PACKET_DATA_SIZE)
+LIMITE_TRANSACAO_BYTES = 1232
+
+# Níveis de commitment do RPC, do mais rápido ao mais seguro
+COMMITMENTS = ("processed", "confirmed", "finalized")
+
+
+class OpcoesEnvio(NamedTuple):
+    """Opções do sendTransaction"""
+    skip_preflight: bool = False
+    preflight_commitment: str = "finalized"
+    max_retries: Optional[int] = None
+
+
+def opcoes_envio_padrao(settings: Settings) -> OpcoesEnvio:
+    return OpcoesEnvio(
+        settings.send_skip_preflight,
+        settings.send_preflight_commitment,
+        settings.send_max_retries
+    )
+
+
+def combinar_opcoes(opcoes: List[OpcoesEnvio]) -> OpcoesEnvio:
+    """
+    Opções de uma transação compartilhada por vários certificados.
+
+    Vale a escolha mais cautelosa de cada campo: a simulação só é pulada se
+    todos pedirem, o commitment da simulação é o mais alto pedido e o número
+    de reenvios, o maior (sem limite se algum não limitar).
+    """
+    return OpcoesEnvio(
+        skip_preflight=all(opcao.skip_preflight for opcao in opcoes),
+        preflight_commitment=max((opcao.preflight_commitment for opcao in opcoes), key=COMMITMENTS.index),
+        max_retries=None if any(opcao.max_retries is None for opcao in opcoes) else max(opcao.max_retries for opcao in opcoes)
+    )
+
+
+def _tamanho_compact_u16(valor: int) -> int:
+    return 1 if valor < 0x80 else 2 if valor < 0x4000 else 3
+
+
+def _tamanho_instrucao_memo(memo: bytes) -> int:
+    """Bytes de uma instrução do Memo Program na mensagem compilada"""
+    # índice do programa (u8) + lista de contas vazia + tamanho dos dados + dados
+    return 1 + 1 + _tamanho_compact_u16(len(memo)) + len(memo)
+
+
+AMOSTRAS_ESTAGIO = 1000
+
+
+class _Estagio:
+    """Vazão e espera na fila de um estágio do pipeline de envio"""
+
+    def __init__(self, trabalhadores: int):
+        self.trabalhadores = trabalhadores
+        self.processados = 0
+        self.erros = 0
+        self.ocupado = 0.0
+        self.esperas: Deque[float] = deque(maxlen=AMOSTRAS_ESTAGIO)
+        self.conclusoes: Deque[float] = deque(maxlen=AMOSTRAS_ESTAGIO)
+
+    def registrar(self, espera: float, inicio: float, itens: int = 1, erro: bool = False) -> None:
+        agora = time.monotonic()
+        self.ocupado += agora - inicio
+        self.esperas.append(espera)
+        self.conclusoes.append(agora)
+        self.processados += itens
+        if erro:
+            self.erros += itens
+
+    def metricas(self, fila: Optional[asyncio.Queue] = None) -> dict:
+        esperas = sorted(self.esperas)
+        janela = self.conclusoes[-1] - self.conclusoes[0] if len(self.conclusoes) > 1 else 0
+        return {
+            "trabalhadores": self.trabalhadores,
+            "fila": fila.qsize() if fila is not None else None,
+            "processados": self.processados,
+            "erros": self.erros,
+            # Vazão nas últimas AMOSTRAS_ESTAGIO execuções
+            "vazao_por_s": round((len(self.conclusoes) - 1) / janela, 1) if janela else None,
+            "espera_media_ms": round(sum(esperas) / len(esperas) * 1000, 2) if esperas else None,
+            "espera_p95_ms": round(esperas[int(len(esperas) * 0.95)] * 1000, 2) if esperas else None,
+            "ocupado_s": round(self.ocupado, 3)
+        }
 
 
 class SolanaCertificateRegistry:
     """Classe para registro de certificados na blockchain Solana"""
     
     MEMO_PROGRAM_ID = "MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr"
+    TAXA_ESTIMADA_LAMPORTS = 5000
+    SALDO_MINIMO_LAMPORTS = 1_000_000  # 0.001 SOL
     
-    def __init__(self):
-        self.network = ACTIVE_NETWORK
-        self.rpc_url = RPC_URL
-        self.use_real_transactions = USE_REAL_TRANSACTIONS
+    def __init__(self, settings: Optional[Settings] = None, estado: Optional[SharedState] = None):
+        self.settings = settings or get_settings()
+        self.network = self.settings.solana_network
+        self.rpc_url = self.settings.solana_url
+        self.use_real_transactions = self.settings.use_real_transactions
+        self.estado = estado or obter_estado()
+        # Livro-razão (RPC real ou simulado); client só é definido com a carteira carregada
+        self.ledger: Optional[LedgerBackend] = None
         self.client = None
         self.keypair = None
+        self._tamanho_base: Optional[int] = None
+        self._pendentes: List[Tuple[bytes, asyncio.Future, float, OpcoesEnvio]] = []
+        self._descarga: Optional[asyncio.Handle] = None
+        self._envios: set = set()
+        self._loop_pipeline: Optional[asyncio.AbstractEventLoop] = None
+        self._fila_assinatura: Optional[asyncio.Queue] = None
+        self._fila_envio: Optional[asyncio.Queue] = None
+        self._trabalhadores: List[asyncio.Task] = []
+        self.estagios: Dict[str, _Estagio] = {
+            "montagem": _Estagio(1),
+            "assinatura": _Estagio(max(1, self.settings.pipeline_signers)),
+            "envio": _Estagio(max(1, self.settings.pipeline_senders))
+        }
+        self.metricas_envio = {"transacoes": 0, "certificados": 0, "taxa_lamports": 0}
         
         self._initialize_client()
     
     def _initialize_client(self):
-        """Inicializa cliente e carteira conforme configuração"""
-        logger.info(f"[INIT DEBUG] Iniciando com network={self.network}, rpc_url={self.rpc_url}")
-        
-        if REQUIRE_MANUAL_SETUP and not WALLET_CONFIGURED:
-            logger.warning("Carteira não configurada - usuário deve configurar manualmente")
-            return
-            
+        """Inicializa livro-razão e carteira conforme configuração"""
+        logger.debug("Iniciando com network=%s, rpc_url=%s", self.network, self.rpc_url)
+        wallet_configured = self.settings.wallet_configured
+
         if not SOLANA_AVAILABLE:
-            logger.info(f"Modo simulação completa ({self.network})")
+            logger.info("Sem bibliotecas Solana: envio e verificação indisponíveis (%s)", self.network)
             return
-            
-        logger.info(f"Conectando à Solana {self.network.upper()}")
-        self.client = Client(self.rpc_url)
+
+        self.ledger = criar_ledger(self.settings)
+        wallet_path = Path(self.settings.solana_wallet_path)
+
+        if self.simulado:
+            # Testes de carga: sem RPC e sem exigir carteira; a carteira derivada
+            # de SIM_SEED mantém os TXIDs iguais entre execuções
+            logger.info("Livro-razão simulado (%s)", self.network)
+            self.client = self.ledger
+            if wallet_configured and wallet_path.exists():
+                self.keypair = self._load_wallet(wallet_path)
+            else:
+                self.keypair = Keypair.from_seed(hashlib.sha256(f"simulado:{self.settings.sim_seed}".encode()).digest())
+            return
+
+        if self.settings.require_manual_setup and not wallet_configured:
+            logger.warning("Carteira não configurada - usuário deve configurar manualmente")
+            return
+
+        logger.info("Conectando à Solana %s", self.network.upper())
+        self.client = self.ledger
         
-        wallet_path = Path(SOLANA_WALLET_PATH)
-        logger.info(f"[WALLET DEBUG] WALLET_CONFIGURED={WALLET_CONFIGURED}, wallet_path={wallet_path}, exists={wallet_path.exists()}")
+        logger.debug("WALLET_CONFIGURED=%s, wallet_path=%s", wallet_configured, wallet_path)
         
-        if WALLET_CONFIGURED and wallet_path.exists():
-            logger.info(f"[WALLET DEBUG] Tentando carregar carteira de {wallet_path}")
+        if wallet_configured and wallet_path.exists():
+            logger.debug("Tentando carregar carteira de %s", wallet_path)
             self.keypair = self._load_wallet(wallet_path)
         else:
-            logger.warning(f"[WALLET DEBUG] Criando carteira temporária. WALLET_CONFIGURED={WALLET_CONFIGURED}, path_exists={wallet_path.exists()}")
+            logger.warning("Criando carteira temporária (WALLET_CONFIGURED=%s, arquivo=%s)", wallet_configured, wallet_path)
             self.keypair = Keypair()
-            logger.info(f"Criando carteira temporária: {str(self.keypair.pubkey())}")
-    
+            logger.info("Criando carteira temporária: %s", self.keypair.pubkey())
+
+    @property
+    def simulado(self) -> bool:
+        return isinstance(self.ledger, SimulatedLedger)
+
     def _load_wallet(self, wallet_path: Path):
         """Carrega carteira existente do arquivo"""
         try:
-            logger.info(f"[LOAD_WALLET DEBUG] Carregando carteira de {wallet_path}")
+            logger.debug("Carregando carteira de %s", wallet_path)
             with open(wallet_path, 'r') as f:
                 keypair_data = json.load(f)
-                logger.info(f"[LOAD_WALLET DEBUG] Carteira carregada com sucesso")
+                logger.debug("Carteira carregada com sucesso")
                 return Keypair.from_bytes(bytes(keypair_data))
         except Exception as e:
-            logger.error(f"[LOAD_WALLET ERROR] Erro ao carregar carteira: {e}")
+            logger.error("Erro ao carregar carteira: %s", e)
             return None
         
     def mask_name(self, nome: str) -> str:
@@ -111,7 +232,15 @@ class SolanaCertificateRegistry:
             return "mascarado"
 
     def _create_metadata(self, certificado_hash: str, nome_participante: str, evento: str, codigo_certificado: str, email_participante: str) -> str:
-        """Cria e otimiza metadados do certificado"""
+        """
+        Cria e otimiza metadados do certificado.
+
+        Usa o formato compacto v2 (memo_format="compacto", padrão) ou o JSON
+        v1.0 (memo_format="json"); ver app/services/memo.py. Um campo longo
+        demais para o v2 (mais de 255 bytes) leva ao JSON v1.0. O timestamp
+        é gravado em UTC.
+        """
+        agora = datetime.now(timezone.utc)
         metadata = {
             "version": "1.0",
             "tipo": "certificado_participacao",
@@ -119,16 +248,27 @@ class SolanaCertificateRegistry:
             "name": self.mask_name(nome_participante).lower(),
             "email": self.mask_email(email_participante).lower(),
             "evento": evento.lower(),
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": agora.strftime("%Y-%m-%d %H:%M:%S"),
             "doc_hash": certificado_hash.lower(),
             "network": self.network,
             "emissor": "Sistema de Certificados Blockchain"            
         }
         
-        memo_data = json.dumps(metadata, ensure_ascii=False, separators=(',', ':'))
+        memo_data = None
+        if self.settings.memo_format == "compacto":
+            try:
+                memo_data = codificar_memo_v2(
+                    metadata["doc_hash"], agora,
+                    code=metadata["code"], name=metadata["name"], email=metadata["email"],
+                    evento=metadata["evento"], network=metadata["network"], emissor=metadata["emissor"]
+                )
+            except CampoMemoLongoError as e:
+                logger.info("Memo compacto indisponível (%s); usando JSON v1.0", e)
+        if memo_data is None:
+            memo_data = json.dumps(metadata, ensure_ascii=False, separators=(',', ':'))
         
-        # Otimiza se muito grande
-        if len(memo_data.encode('utf-8')) > 1232:
+        # Reduz o memo se ele não couber nem sozinho em uma transação
+        if not self._cabe_sozinho(memo_data.encode('utf-8')):
             compact_metadata = {
                 "tipo": "cert",
                 "participante": nome_participante[:50],
@@ -139,29 +279,47 @@ class SolanaCertificateRegistry:
             memo_data = json.dumps(compact_metadata, separators=(',', ':'))
         
         return memo_data
+
+    def _create_revocation_metadata(self, certificado_hash: str, txid_original: Optional[str], motivo: Optional[str]) -> str:
+        """Cria o memo de revogação (formato "r2:" ou JSON, conforme memo_format; JSON se o motivo passar de 255 bytes)"""
+        agora = datetime.now(timezone.utc)
+        if self.settings.memo_format == "compacto":
+            try:
+                return codificar_revogacao(certificado_hash.lower(), agora, txid=txid_original, motivo=motivo)
+            except CampoMemoLongoError as e:
+                logger.info("Memo de revogação compacto indisponível (%s); usando JSON", e)
+        return json.dumps({
+            "version": "1.0",
+            "tipo": TIPO_REVOGACAO,
+            "doc_hash": certificado_hash.lower(),
+            "txid": txid_original,
+            "motivo": motivo,
+            "timestamp": agora.strftime("%Y-%m-%d %H:%M:%S")
+        }, ensure_ascii=False, separators=(',', ':'))
     
-    def _create_transaction(self, memo_data: str):
-        """Cria transação Solana com os metadados"""
-        memo_bytes = memo_data.encode('utf-8')
+    def _create_transaction(self, memos: List[bytes], recent_blockhash=None):
+        """
+        Cria a transação Solana com uma instrução do Memo Program por certificado.
+
+        Não há tabela de endereços (ALT): o Memo Program é o programa invocado
+        e programas invocados precisam estar entre as chaves estáticas da
+        mensagem, e as instruções de memo não usam outras contas.
+        """
         memo_pubkey = Pubkey.from_string(self.MEMO_PROGRAM_ID)
         
-        instruction = Instruction(
-            program_id=memo_pubkey,
-            accounts=[],
-            data=memo_bytes
-        )
+        instructions = [
+            Instruction(program_id=memo_pubkey, accounts=[], data=memo)
+            for memo in memos
+        ]
         
-        recent_blockhash_response = self.client.get_latest_blockhash()
-        recent_blockhash = recent_blockhash_response.value.blockhash
+        if recent_blockhash is None:
+            recent_blockhash = self._blockhash_recente()
         
         # Usa método que funcionava antes do refactor
         try:
-            from solders.message import MessageV0
-            from solders.transaction import VersionedTransaction
-            
             message = MessageV0.try_compile(
                 payer=self.keypair.pubkey(),
-                instructions=[instruction],
+                instructions=instructions,
                 address_lookup_table_accounts=[],
                 recent_blockhash=recent_blockhash
             )
@@ -169,98 +327,465 @@ class SolanaCertificateRegistry:
             return VersionedTransaction(message, [self.keypair])
             
         except Exception as e:
-            logger.warning(f"Erro ao criar transação VersionedTransaction: {e}, tentando método alternativo.")
+            logger.warning("Erro ao criar transação VersionedTransaction: %s, tentando método alternativo.", e)
+
+    def _medir_transacao(self, memos: List[bytes]) -> int:
+        """Tamanho exato da transação serializada com estes memos (assinatura e blockhash fictícios)"""
+        pagador = self.keypair.pubkey() if self.keypair else Pubkey.default()
+        memo_pubkey = Pubkey.from_string(self.MEMO_PROGRAM_ID)
+        message = MessageV0.try_compile(
+            payer=pagador,
+            instructions=[Instruction(program_id=memo_pubkey, accounts=[], data=memo) for memo in memos],
+            address_lookup_table_accounts=[],
+            recent_blockhash=Hash.default()
+        )
+        return len(bytes(VersionedTransaction.populate(message, [Signature.default()])))
+
+    def _tamanho_transacao(self, memos: List[bytes]) -> int:
+        """
+        Tamanho da transação serializada: parte fixa (medida uma vez, com um
+        memo vazio) mais o tamanho de cada instrução de memo.
+        """
+        if self._tamanho_base is None:
+            self._tamanho_base = self._medir_transacao([b""]) - _tamanho_instrucao_memo(b"")
+        return self._tamanho_base + sum(_tamanho_instrucao_memo(memo) for memo in memos)
+
+    def _cabe_sozinho(self, memo: bytes) -> bool:
+        return self._tamanho_transacao([memo]) <= LIMITE_TRANSACAO_BYTES
+
+    def planejar_transacoes(self, memos: List[bytes]) -> List[List[int]]:
+        """
+        Distribui os memos no menor número de transações (first-fit decreasing).
+
+        Cada transação respeita o limite de 1232 bytes serializados e o limite
+        de pack_max_memos instruções.
+
+        Args:
+            memos (List[bytes]): Memos a enviar
+
+        Returns:
+            List[List[int]]: Índices dos memos de cada transação, na ordem original
+
+        Raises:
+            ValueError: Se algum memo não couber sozinho em uma transação
+        """
+        maximo = max(1, self.settings.pack_max_memos)
+        base = self._tamanho_transacao([])
+        grupos: List[Tuple[int, List[int]]] = []
+
+        for indice in sorted(range(len(memos)), key=lambda i: -len(memos[i])):
+            tamanho = _tamanho_instrucao_memo(memos[indice])
+            if base + tamanho > LIMITE_TRANSACAO_BYTES:
+                raise ValueError(f"Memo de {len(memos[indice])} bytes não cabe em uma transação")
+            for posicao, (ocupado, indices) in enumerate(grupos):
+                if ocupado + tamanho <= LIMITE_TRANSACAO_BYTES and len(indices) < maximo:
+                    indices.append(indice)
+                    grupos[posicao] = (ocupado + tamanho, indices)
+                    break
+            else:
+                grupos.append((base + tamanho, [indice]))
+
+        return [sorted(indices) for _, indices in grupos]
+
+    async def _enviar_memo(self, memo: bytes, opcoes: Optional[OpcoesEnvio] = None) -> str:
+        """
+        Enfileira o memo para a próxima transação e aguarda o TXID.
+
+        Os memos que chegam juntos (na mesma volta do event loop ou dentro de
+        pack_window_ms) são empacotados no menor número de transações; as
+        opções de envio de cada transação combinam as dos seus memos.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop_pipeline is not loop:
+            self._iniciar_pipeline(loop)
+        futuro = loop.create_future()
+        self._pendentes.append((memo, futuro, time.monotonic(), opcoes or opcoes_envio_padrao(self.settings)))
+
+        if len(self._pendentes) >= self.settings.pack_max_memos:
+            self._descarregar()
+        elif self._descarga is None:
+            janela = self.settings.pack_window_ms / 1000
+            self._descarga = loop.call_later(janela, self._descarregar) if janela > 0 else loop.call_soon(self._descarregar)
+        return await futuro
+
+    def _iniciar_pipeline(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Cria as filas e os trabalhadores do pipeline de envio no event loop atual.
+
+        Estágios, ligados por filas limitadas (pipeline_queue_size):
+
+        - montagem: memos pendentes são empacotados em grupos (_descarregar);
+        - assinatura: pipeline_signers trabalhadores obtêm o blockhash, compilam
+          e assinam a transação de cada grupo;
+        - envio: pipeline_senders trabalhadores enviam as transações assinadas
+          ao RPC em threads, liberando o event loop para montar e assinar as
+          próximas enquanto as anteriores estão na rede.
+
+        Com a fila de envio cheia, a assinatura espera; com a de assinatura
+        cheia, os grupos aguardam em _enfileirar.
+        """
+        self._descarga = None
+        self._pendentes = []
+        self._loop_pipeline = loop
+        self._fila_assinatura = asyncio.Queue(maxsize=self.settings.pipeline_queue_size)
+        self._fila_envio = asyncio.Queue(maxsize=self.settings.pipeline_queue_size)
+        # Contexto vazio: os trabalhadores atendem todas as requisições e não devem
+        # herdar o contexto de log (request_id) da que os iniciou
+        self._trabalhadores = [
+            loop.create_task(self._assinar_continuamente(), context=contextvars.Context())
+            for _ in range(self.estagios["assinatura"].trabalhadores)
+        ] + [
+            loop.create_task(self._enviar_continuamente(), context=contextvars.Context())
+            for _ in range(self.estagios["envio"].trabalhadores)
+        ]
+
+    async def parar_pipeline(self) -> None:
+        """Encerra os trabalhadores do pipeline (no desligamento da aplicação)"""
+        trabalhadores, self._trabalhadores = self._trabalhadores, []
+        for tarefa in trabalhadores:
+            tarefa.cancel()
+        await asyncio.gather(*trabalhadores, return_exceptions=True)
+        self._loop_pipeline = None
+
+    def _descarregar(self) -> None:
+        if self._descarga is not None:
+            self._descarga.cancel()
+            self._descarga = None
+        pendentes, self._pendentes = self._pendentes, []
+        if not pendentes:
+            return
+
+        inicio = time.monotonic()
+        estagio = self.estagios["montagem"]
+        try:
+            grupos = self.planejar_transacoes([pendente[0] for pendente in pendentes])
+        except Exception as e:
+            estagio.registrar(inicio - pendentes[0][2], inicio, len(pendentes), erro=True)
+            self._falhar([pendente[:2] for pendente in pendentes], e)
+            return
+        estagio.registrar(inicio - pendentes[0][2], inicio, len(pendentes))
+
+        lotes = [
+            ([pendentes[i][:2] for i in grupo], combinar_opcoes([pendentes[i][3] for i in grupo]))
+            for grupo in grupos
+        ]
+        tarefa = asyncio.ensure_future(self._enfileirar(lotes))
+        self._envios.add(tarefa)
+        tarefa.add_done_callback(self._envios.discard)
+
+    async def _enfileirar(self, lotes: List[Tuple[List[Tuple[bytes, asyncio.Future]], OpcoesEnvio]]) -> None:
+        for itens, opcoes in lotes:
+            await self._fila_assinatura.put((itens, opcoes, time.monotonic()))
+
+    @staticmethod
+    def _falhar(itens: List[Tuple[bytes, asyncio.Future]], erro: Exception) -> None:
+        for _, futuro in itens:
+            if not futuro.done():
+                futuro.set_exception(erro)
+
+    async def _blockhash_assinatura(self):
+        """Blockhash em cache ou, na falta dele, buscado no RPC sem bloquear o event loop"""
+        em_cache = self.estado.obter(f"blockhash:{self.network}")
+        if em_cache:
+            return Hash.from_string(em_cache)
+        return await asyncio.to_thread(self._blockhash_recente)
+
+    async def _assinar_continuamente(self) -> None:
+        """Trabalhador do estágio de assinatura"""
+        estagio = self.estagios["assinatura"]
+        while True:
+            itens, opcoes, entrada = await self._fila_assinatura.get()
+            inicio = time.monotonic()
+            try:
+                recent_blockhash = await self._blockhash_assinatura()
+                transaction = self._create_transaction([memo for memo, _ in itens], recent_blockhash)
+
+                if not transaction:
+                    raise ValueError("Falha ao criar transação Solana")
+                if len(bytes(transaction)) > LIMITE_TRANSACAO_BYTES:
+                    raise ValueError(f"Transação com {len(itens)} memos excede {LIMITE_TRANSACAO_BYTES} bytes")
+            except Exception as e:
+                estagio.registrar(inicio - entrada, inicio, erro=True)
+                self._falhar(itens, e)
+                continue
+            estagio.registrar(inicio - entrada, inicio)
+            await self._fila_envio.put((transaction, itens, opcoes, time.monotonic()))
+
+    async def _enviar_continuamente(self) -> None:
+        """Trabalhador do estágio de envio"""
+        estagio = self.estagios["envio"]
+        while True:
+            transaction, itens, opcoes, entrada = await self._fila_envio.get()
+            inicio = time.monotonic()
+            try:
+                tx_signature = await self._enviar_transacao(transaction, len(itens), opcoes)
+            except Exception as e:
+                estagio.registrar(inicio - entrada, inicio, erro=True)
+                self._falhar(itens, e)
+                continue
+            estagio.registrar(inicio - entrada, inicio)
+
+            self.metricas_envio["transacoes"] += 1
+            self.metricas_envio["certificados"] += len(itens)
+            self.metricas_envio["taxa_lamports"] += self.TAXA_ESTIMADA_LAMPORTS
+            for _, futuro in itens:
+                if not futuro.done():
+                    futuro.set_result(tx_signature)
+
+    async def _enviar_transacao(self, transaction, certificados: int, opcoes: OpcoesEnvio) -> str:
+        """Envia a transação assinada e devolve o TXID"""
+        disjuntor = obter_disjuntor()
+        if not disjuntor.permite():
+            raise RPCIndisponivelError("RPC indisponível; circuito aberto")
+        async with self._arrendar_pagador():
+            logger.info(
+                "Enviando transação com %d certificado(s) para Solana %s",
+                certificados, self.network, extra={"tipo": "envio", "certificados": certificados}
+            )
+            try:
+                response = await asyncio.to_thread(
+                    self.client.send_transaction,
+                    transaction,
+                    opts=TxOpts(
+                        skip_preflight=opcoes.skip_preflight,
+                        preflight_commitment=opcoes.preflight_commitment,
+                        max_retries=opcoes.max_retries
+                    )
+                )
+            except Exception:
+                disjuntor.registrar_falha()
+                raise
+            disjuntor.registrar_sucesso()
+
+            if not response or not response.value:
+                raise ValueError("Falha ao enviar transação para a blockchain")
+
+        self.estado.incrementar(self._chave_saldo(), -self.TAXA_ESTIMADA_LAMPORTS)
+
+        tx_signature = str(response.value)
+        if not tx_signature or len(tx_signature) < 32:
+            raise ValueError("TXID inválido retornado pela blockchain")
+        return tx_signature
+
+    def metricas_empacotamento(self) -> dict:
+        """Certificados por transação e taxa por certificado desde o início do worker"""
+        transacoes = self.metricas_envio["transacoes"]
+        certificados = self.metricas_envio["certificados"]
+        return {
+            **self.metricas_envio,
+            "certificados_por_transacao": round(certificados / transacoes, 2) if transacoes else None,
+            "taxa_por_certificado_lamports": round(self.metricas_envio["taxa_lamports"] / certificados) if certificados else None
+        }
+
+    def metricas_pipeline(self) -> dict:
+        """Vazão, espera na fila e profundidade de cada estágio do pipeline de envio"""
+        return {
+            "montagem": self.estagios["montagem"].metricas(),
+            "assinatura": self.estagios["assinatura"].metricas(self._fila_assinatura),
+            "envio": self.estagios["envio"].metricas(self._fila_envio)
+        }
+
+    def _blockhash_recente(self):
+        """
+        Blockhash recente, compartilhado entre os workers.
+
+        Um blockhash continua válido por ~60-90 s; reutilizá-lo por alguns
+        segundos evita uma chamada getLatestBlockhash por transação.
+        """
+        chave = f"blockhash:{self.network}"
+        em_cache = self.estado.obter(chave)
+        if em_cache:
+            return Hash.from_string(em_cache)
+
+        disjuntor = obter_disjuntor()
+        try:
+            blockhash = self.client.get_latest_blockhash().value.blockhash
+        except Exception:
+            disjuntor.registrar_falha()
+            raise
+        disjuntor.registrar_sucesso()
+        self.estado.definir(chave, str(blockhash), ttl=self.settings.blockhash_ttl)
+        return blockhash
+
+    def _chave_saldo(self) -> str:
+        return f"saldo:{self.keypair.pubkey()}"
 
     async def _ensure_balance_for_devnet(self):
-        """Garante saldo na devnet via airdrop se necessário"""
+        """
+        Garante saldo na devnet via airdrop se necessário.
+
+        O saldo é consultado no RPC uma vez por balance_ttl e depois estimado
+        (descontando a taxa de cada envio) no estado compartilhado. Apenas um
+        worker por vez solicita o airdrop.
+        """
         if not self.keypair or self.network != "devnet":
             return
             
         try:
-            balance_response = self.client.get_balance(self.keypair.pubkey())
-            balance_sol = balance_response.value / 1_000_000_000
+            saldo = self.estado.obter(self._chave_saldo())
+            if saldo is None:
+                # Chamadas RPC síncronas: em uma thread para não bloquear o event loop
+                saldo = (await asyncio.to_thread(self.client.get_balance, self.keypair.pubkey())).value
+                self.estado.definir(self._chave_saldo(), str(saldo), ttl=self.settings.balance_ttl)
             
-            if balance_sol < 0.001:  # Menos de 0.001 SOL
+            if int(saldo) < self.SALDO_MINIMO_LAMPORTS:
+                if not self.estado.definir_se_ausente(f"airdrop:{self.keypair.pubkey()}", "1", ttl=30):
+                    return
                 logger.info("Solicitando airdrop na devnet...")
-                airdrop_response = self.client.request_airdrop(self.keypair.pubkey(), 1_000_000_000)
+                await asyncio.to_thread(self.client.request_airdrop, self.keypair.pubkey(), 1_000_000_000)
+                self.estado.remover(self._chave_saldo())
                 await asyncio.sleep(3)
         except Exception as e:
-            logger.warning(f"Erro no airdrop: {e}")
+            logger.warning("Erro no airdrop: %s", e)
+
+    @asynccontextmanager
+    async def _arrendar_pagador(self):
+        """
+        Reserva uma das payer_max_in_flight vagas de envio do pagador.
+
+        As vagas são chaves no estado compartilhado com TTL, de modo que o
+        total de transações em voo por carteira vale para todos os workers
+        (e uma vaga de um worker encerrado expira sozinha).
+        """
+        token = secrets.token_hex(8)
+        prazo = time.monotonic() + self.settings.payer_lease_ttl
+        pagador = str(self.keypair.pubkey())
+        while True:
+            for vaga in range(self.settings.payer_max_in_flight):
+                chave = f"lease:{pagador}:{vaga}"
+                if self.estado.definir_se_ausente(chave, token, ttl=self.settings.payer_lease_ttl):
+                    try:
+                        yield
+                    finally:
+                        self.estado.remover(chave, token)
+                    return
+            if time.monotonic() > prazo:
+                raise RuntimeError("Nenhuma vaga de envio disponível para a carteira pagadora")
+            await asyncio.sleep(0.05)
     
-    def _generate_simulated_txid(self) -> str:
-        """Gera TXID simulado no formato Solana"""
-        base58_alphabet = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
-        import random
-        return ''.join(random.choice(base58_alphabet) for _ in range(88))
-
-    async def register_certificate(self, certificado_hash: str, nome_participante: str, evento: str = "Evento Geral", codigo_certificado: str = "Código do Certificado", email_participante: str = "email@exemplo.com") -> str:
-        """Registra certificado na blockchain com fallback automático"""
-                
+    async def register_certificate(self, certificado_hash: str, nome_participante: str, evento: str = "Evento Geral", codigo_certificado: str = "Código do Certificado", email_participante: str = "email@exemplo.com", opcoes: Optional[OpcoesEnvio] = None) -> str:
+        """
+        Registra certificado na blockchain com fallback automático.
+
+        O envio aguarda a vez do cliente atual (API key) no agendador justo.
+        Sem opcoes, usa as de envio configuradas (SEND_*).
+
+        Raises:
+            FilaCheiaError: Se o cliente já tiver o máximo de envios pendentes
+        """
+        async with obter_agendador().vez(inquilino_atual.get()):
+            return await self._registrar(certificado_hash, nome_participante, evento, codigo_certificado, email_participante, opcoes)
+
+    async def _registrar(self, certificado_hash: str, nome_participante: str, evento: str, codigo_certificado: str, email_participante: str, opcoes: Optional[OpcoesEnvio] = None) -> str:
         try:
             # Garante saldo na devnet
             await self._ensure_balance_for_devnet()
             
             # Cria metadados e transação
-            memo_data = self._create_metadata(certificado_hash, nome_participante, evento, codigo_certificado, email_participante)
-            logger.debug(f"Tamanho do memo: {len(memo_data.encode('utf-8'))} bytes")
-            
-            transaction = self._create_transaction(memo_data)
+            memo = self._create_metadata(certificado_hash, nome_participante, evento, codigo_certificado, email_participante).encode('utf-8')
+            logger.debug("Tamanho do memo: %d bytes", len(memo))
             
-            if not transaction:
-                raise ValueError("Falha ao criar transação Solana")
+            # Envia junto com os demais memos pendentes
+            tx_signature = await self._enviar_memo(memo, opcoes)
             
-            # Envia transação
-            logger.info(f"Enviando transação para Solana {self.network}...")
-            response = self.client.send_transaction(transaction)
-            
-            if not response or not response.value:
-                raise ValueError("Falha ao enviar transação para a blockchain")
-                
-            tx_signature = str(response.value)
-            
-            if not tx_signature or len(tx_signature) < 32:
-                raise ValueError("TXID inválido retornado pela blockchain")
-            
-            logger.info(f"Certificado registrado - TXID: {tx_signature}")
+            logger.info("Certificado registrado - TXID: %s", tx_signature, extra={"tipo": "registro", "txid": tx_signature})
             return tx_signature
             
         except Exception as e:
-            logger.error(f"Erro no registro: {e}")
+            logger.error("Erro no registro: %s", e)
             # Re-raise a exceção para ser capturada na rota
             raise Exception(f"Falha ao registrar certificado na blockchain: {str(e)}")
 
+    async def revoke_certificate(self, certificado_hash: str, txid_original: Optional[str] = None, motivo: Optional[str] = None, opcoes: Optional[OpcoesEnvio] = None) -> str:
+        """
+        Grava na blockchain o memo de revogação de um certificado.
+
+        O memo passa pelo mesmo agendador e pipeline de envio dos registros
+        (e pode ser empacotado com eles).
+
+        Args:
+            certificado_hash (str): Hash do certificado revogado
+            txid_original (str, opcional): TXID da emissão
+            motivo (str, opcional): Motivo da revogação
+            opcoes (OpcoesEnvio, opcional): Opções de envio
+
+        Returns:
+            str: TXID da transação de revogação
+
+        Raises:
+            FilaCheiaError: Se o cliente já tiver o máximo de envios pendentes
+        """
+        async with obter_agendador().vez(inquilino_atual.get()):
+            try:
+                await self._ensure_balance_for_devnet()
+                memo = self._create_revocation_metadata(certificado_hash, txid_original, motivo).encode('utf-8')
+                tx_signature = await self._enviar_memo(memo, opcoes)
+                logger.info("Certificado revogado - TXID: %s", tx_signature, extra={"tipo": "revogacao", "txid": tx_signature})
+                return tx_signature
+            except Exception as e:
+                logger.error("Erro na revogação: %s", e)
+                raise Exception(f"Falha ao revogar certificado na blockchain: {str(e)}")
+
 
-# Instância global
-_registry = SolanaCertificateRegistry()
+# Instância global, construída sob demanda (ou no lifespan da aplicação)
+_registry: Optional[SolanaCertificateRegistry] = None
 
 
-async def registrar_hash_solana(certificado_hash: str, nome_participante: str = "Participante", evento: str = "Evento Geral", codigo_certificado: str = "Código do Certificado", email_participante: str = "email@exemplo.com") -> str:
+def obter_registry() -> SolanaCertificateRegistry:
+    """Retorna o registro de certificados, inicializando cliente e carteira na primeira chamada"""
+    global _registry
+    if _registry is None:
+        _registry = SolanaCertificateRegistry()
+    return _registry
+
+
+async def obter_transacao(txid: str, commitment: str = "finalized") -> dict:
+    """Resposta de getTransaction do livro-razão configurado (RPC ou simulado)"""
+    ledger = obter_registry().ledger
+    if ledger is None:
+        raise RuntimeError("Livro-razão indisponível: bibliotecas Solana não instaladas")
+    return await ledger.obter_transacao(txid, commitment)
+
+
+async def registrar_hash_solana(certificado_hash: str, nome_participante: str = "Participante", evento: str = "Evento Geral", codigo_certificado: str = "Código do Certificado", email_participante: str = "email@exemplo.com", opcoes: Optional[OpcoesEnvio] = None) -> str:
     """Registra o hash do certificado na blockchain Solana"""
-    return await _registry.register_certificate(certificado_hash, nome_participante, evento, codigo_certificado, email_participante)
+    return await obter_registry().register_certificate(certificado_hash, nome_participante, evento, codigo_certificado, email_participante, opcoes)
+
+async def revogar_hash_solana(certificado_hash: str, txid_original: Optional[str] = None, motivo: Optional[str] = None, opcoes: Optional[OpcoesEnvio] = None) -> str:
+    """Grava a revogação do certificado na blockchain Solana"""
+    return await obter_registry().revoke_certificate(certificado_hash, txid_original, motivo, opcoes)
 
 async def obter_info_rede() -> dict:
-    """Obtém informações básicas da rede Solana"""
+    """
+    Obtém informações básicas da rede Solana.
+
+    Não consulta o RPC: usa o estado mantido pelo monitor de saúde.
+    """
+    from .saude import obter_monitor
+
     try:
-        await asyncio.sleep(0.2)
+        registry = obter_registry()
+        monitor = obter_monitor()
+        conectado = monitor.prontidao()["verificacoes"]["rpc"]["ok"]
         
         base_info = {
-            "network": _registry.network,
-            "version": "1.18.0",
-            "url": _registry.rpc_url,
-            "keypair_loaded": _registry.keypair is not None,
-            "explorer": f"https://explorer.solana.com/?cluster={_registry.network}"
+            "network": registry.network,
+            "version": monitor.versao_no,
+            "url": registry.rpc_url,
+            "keypair_loaded": registry.keypair is not None,
+            "explorer": f"https://explorer.solana.com/?cluster={registry.network}"
         }
         
         return {
             **base_info,
-            "status": "connected",
+            "status": "connected" if conectado else "disconnected",
             "biblioteca_solana": "instalada",
             "modo": "blockchain_real_gratuita",
-            "airdrop_disponivel": _registry.network == "devnet"
+            "airdrop_disponivel": registry.network == "devnet"
         }
         
     except Exception as e:
-        logger.error(f"Erro ao obter info da rede: {e}")
+        logger.error("Erro ao obter info da rede: %s", e)
 
 
 # Compatibilidade com código existente
@@ -0,0 +1,40 @@
+"""
+Filtro de Bloom para hashes SHA-256 de certificados
+"""
+
+import math
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom em memória para hashes SHA-256 (hex).
+
+    Como a entrada já é um hash uniforme, as posições são derivadas
+    diretamente dos bytes do hash (double hashing), sem recalcular hashes.
+    """
+
+    def __init__(self, capacidade: int, taxa_erro: float = 0.001):
+        capacidade = max(capacidade, 1)
+        self.tamanho = max(8, int(-capacidade * math.log(taxa_erro) / math.log(2) ** 2))
+        self.funcoes = max(1, round(self.tamanho / capacidade * math.log(2)))
+        self.bits = bytearray((self.tamanho + 7) // 8)
+        self.quantidade = 0
+
+    def _posicoes(self, doc_hash: str):
+        digest = bytes.fromhex(doc_hash)
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.funcoes):
+            yield (h1 + i * h2) % self.tamanho
+
+    def adicionar(self, doc_hash: str) -> None:
+        for posicao in self._posicoes(doc_hash):
+            self.bits[posicao >> 3] |= 1 << (posicao & 7)
+        self.quantidade += 1
+
+    def __contains__(self, doc_hash: str) -> bool:
+        try:
+            return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._posicoes(doc_hash))
+        except ValueError:
+            # Não é um hash hexadecimal: não pode estar no filtro
+            return False
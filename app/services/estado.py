@@ -0,0 +1,267 @@
+"""
+Estado compartilhado entre processos (workers do uvicorn/gunicorn)
+
+Guarda o que não pode ficar só na memória de um worker: o blockhash recente,
+as chaves de idempotência, a estimativa de saldo da carteira e os
+arrendamentos (leases) do pagador de taxas. Todas as chaves aceitam TTL.
+
+Backends:
+    memoria  dicionário do próprio processo (apenas um worker)
+    sqlite   arquivo SQLite local compartilhado pelos workers da máquina
+    redis    servidor Redis (ou compatível), para workers em várias máquinas
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ..config import get_settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class SharedState:
+    """Interface do armazenamento chave-valor compartilhado"""
+
+    def obter(self, chave: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def definir(self, chave: str, valor: str, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def definir_se_ausente(self, chave: str, valor: str, ttl: Optional[float] = None) -> bool:
+        """Grava a chave apenas se ela não existir (ou tiver expirado); True se gravou"""
+        raise NotImplementedError
+
+    def remover(self, chave: str, valor: Optional[str] = None) -> bool:
+        """Remove a chave; com valor, remove apenas se o valor atual for igual"""
+        raise NotImplementedError
+
+    def incrementar(self, chave: str, delta: int) -> Optional[int]:
+        """Soma delta a um contador existente; None se a chave não existir"""
+        raise NotImplementedError
+
+    def fechar(self) -> None:
+        pass
+
+
+class MemoryState(SharedState):
+    """Estado em memória do processo (modo de um único worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados: Dict[str, Tuple[str, Optional[float]]] = {}
+
+    def _atual(self, chave: str) -> Optional[str]:
+        item = self._dados.get(chave)
+        if item is None:
+            return None
+        valor, expira_em = item
+        if expira_em is not None and expira_em <= time.time():
+            del self._dados[chave]
+            return None
+        return valor
+
+    def obter(self, chave: str) -> Optional[str]:
+        with self._lock:
+            return self._atual(chave)
+
+    def definir(self, chave: str, valor: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._dados[chave] = (valor, time.time() + ttl if ttl else None)
+
+    def definir_se_ausente(self, chave: str, valor: str, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._atual(chave) is not None:
+                return False
+            self._dados[chave] = (valor, time.time() + ttl if ttl else None)
+            return True
+
+    def remover(self, chave: str, valor: Optional[str] = None) -> bool:
+        with self._lock:
+            atual = self._atual(chave)
+            if atual is None or (valor is not None and atual != valor):
+                return False
+            del self._dados[chave]
+            return True
+
+    def incrementar(self, chave: str, delta: int) -> Optional[int]:
+        with self._lock:
+            atual = self._atual(chave)
+            if atual is None:
+                return None
+            novo = int(atual) + delta
+            self._dados[chave] = (str(novo), self._dados[chave][1])
+            return novo
+
+
+class SQLiteState(SharedState):
+    """Estado em um arquivo SQLite (WAL) compartilhado pelos workers da máquina"""
+
+    def __init__(self, caminho: Path):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # isolation_level=None: transações explícitas (BEGIN IMMEDIATE) nas operações condicionais
+        self._conexao = sqlite3.connect(str(self.caminho), check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+            self._conexao.execute("PRAGMA busy_timeout=5000")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS estado ("
+                "chave TEXT PRIMARY KEY, valor TEXT NOT NULL, expira_em REAL)"
+            )
+
+    def _transacao(self, operacao):
+        with self._lock:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                resultado = operacao(self._conexao, time.time())
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("COMMIT")
+            return resultado
+
+    def obter(self, chave: str) -> Optional[str]:
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT valor FROM estado WHERE chave = ? AND (expira_em IS NULL OR expira_em > ?)",
+                (chave, time.time())
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def definir(self, chave: str, valor: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._conexao.execute(
+                "INSERT INTO estado (chave, valor, expira_em) VALUES (?, ?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor, expira_em = excluded.expira_em",
+                (chave, valor, time.time() + ttl if ttl else None)
+            )
+
+    def definir_se_ausente(self, chave: str, valor: str, ttl: Optional[float] = None) -> bool:
+        def operacao(conexao, agora):
+            conexao.execute("DELETE FROM estado WHERE chave = ? AND expira_em <= ?", (chave, agora))
+            cursor = conexao.execute(
+                "INSERT OR IGNORE INTO estado (chave, valor, expira_em) VALUES (?, ?, ?)",
+                (chave, valor, agora + ttl if ttl else None)
+            )
+            return cursor.rowcount == 1
+        return self._transacao(operacao)
+
+    def remover(self, chave: str, valor: Optional[str] = None) -> bool:
+        with self._lock:
+            if valor is None:
+                cursor = self._conexao.execute("DELETE FROM estado WHERE chave = ?", (chave,))
+            else:
+                cursor = self._conexao.execute(
+                    "DELETE FROM estado WHERE chave = ? AND valor = ?", (chave, valor)
+                )
+        return cursor.rowcount == 1
+
+    def incrementar(self, chave: str, delta: int) -> Optional[int]:
+        def operacao(conexao, agora):
+            linha = conexao.execute(
+                "UPDATE estado SET valor = CAST(valor AS INTEGER) + ? "
+                "WHERE chave = ? AND (expira_em IS NULL OR expira_em > ?) RETURNING valor",
+                (delta, chave, agora)
+            ).fetchone()
+            return int(linha[0]) if linha else None
+        return self._transacao(operacao)
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+
+_INCREMENTAR_EXISTENTE = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+_REMOVER_SE_IGUAL = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisState(SharedState):
+    """Estado em um servidor Redis (ou compatível)"""
+
+    def __init__(self, url: str):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("Backend redis selecionado, mas a biblioteca redis não está instalada")
+        self._cliente = redis.Redis.from_url(url, decode_responses=True)
+        self._incrementar = self._cliente.register_script(_INCREMENTAR_EXISTENTE)
+        self._remover_se_igual = self._cliente.register_script(_REMOVER_SE_IGUAL)
+
+    def obter(self, chave: str) -> Optional[str]:
+        return self._cliente.get(chave)
+
+    def definir(self, chave: str, valor: str, ttl: Optional[float] = None) -> None:
+        self._cliente.set(chave, valor, px=int(ttl * 1000) if ttl else None)
+
+    def definir_se_ausente(self, chave: str, valor: str, ttl: Optional[float] = None) -> bool:
+        return bool(self._cliente.set(chave, valor, px=int(ttl * 1000) if ttl else None, nx=True))
+
+    def remover(self, chave: str, valor: Optional[str] = None) -> bool:
+        if valor is None:
+            return self._cliente.delete(chave) == 1
+        return self._remover_se_igual(keys=[chave], args=[valor]) == 1
+
+    def incrementar(self, chave: str, delta: int) -> Optional[int]:
+        resultado = self._incrementar(keys=[chave], args=[delta])
+        return int(resultado) if resultado is not None else None
+
+    def fechar(self) -> None:
+        self._cliente.close()
+
+
+def criar_estado(backend: str) -> SharedState:
+    """
+    Cria o backend de estado compartilhado.
+
+    Args:
+        backend (str): "memoria", "sqlite" ou "redis"
+
+    Returns:
+        SharedState: Backend configurado
+    """
+    settings = get_settings()
+    if backend == "memoria":
+        return MemoryState()
+    if backend == "sqlite":
+        return SQLiteState(settings.state_path)
+    if backend == "redis":
+        return RedisState(settings.redis_url)
+    raise ValueError(f"Backend de estado desconhecido: {backend}")
+
+
+_estado: Optional[SharedState] = None
+
+
+def obter_estado() -> SharedState:
+    """Retorna o estado compartilhado, criando-o sob demanda"""
+    global _estado
+    if _estado is None:
+        _estado = criar_estado(get_settings().state_backend)
+    return _estado
+
+
+def fechar_estado() -> None:
+    """Fecha o estado compartilhado; a próxima chamada a obter_estado() o reabre"""
+    global _estado
+    if _estado is not None:
+        _estado.fechar()
+        _estado = None
@@ -0,0 +1,144 @@
+"""
+Arquivos do frontend servidos pela própria API
+
+Na inicialização, cada arquivo de frontend/ (exceto o index.html) é lido uma
+única vez, recebe um nome com o hash do conteúdo (main.js ->
+main.3f2a9c1b7d04.js) e é comprimido em gzip e, se o pacote brotli estiver
+instalado, em brotli. O index.html é reescrito para apontar para esses nomes.
+
+Assim, cada requisição apenas escolhe a variante já pronta pelo
+Accept-Encoding:
+
+- arquivos com hash no nome nunca mudam: Cache-Control immutable por um ano;
+- o index.html é revalidado a cada acesso (no-cache) pelo ETag, respondendo
+  304 quando o navegador já tem a versão atual.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+from ..config import get_settings
+
+PREFIXO_ASSETS = "/assets/"
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "no-cache"
+
+# Variantes não compensam abaixo deste tamanho
+TAMANHO_MINIMO_COMPRESSAO = 256
+
+
+class Variante(NamedTuple):
+    corpo: bytes
+    headers: Dict[str, str]
+
+
+class Arquivo:
+    """Arquivo do frontend com suas variantes (identity, gzip, br) já prontas"""
+
+    def __init__(self, conteudo: bytes, tipo: str, cache: str):
+        self.etag = hashlib.sha256(conteudo).hexdigest()[:16]
+        self.variantes: Dict[str, Variante] = {}
+
+        comprimidas = {}
+        if len(conteudo) >= TAMANHO_MINIMO_COMPRESSAO:
+            comprimidas["gzip"] = gzip.compress(conteudo, compresslevel=9, mtime=0)
+            if BROTLI_AVAILABLE:
+                comprimidas["br"] = brotli.compress(conteudo, quality=11)
+
+        for codificacao, corpo in [("identity", conteudo), *comprimidas.items()]:
+            if len(corpo) >= len(conteudo) and codificacao != "identity":
+                continue
+            headers = {
+                "Content-Type": tipo,
+                "Cache-Control": cache,
+                # ETag forte por variante: os bytes de cada codificação são diferentes
+                "ETag": f'"{self.etag}"' if codificacao == "identity" else f'"{self.etag}-{codificacao}"',
+                "Vary": "Accept-Encoding"
+            }
+            if codificacao != "identity":
+                headers["Content-Encoding"] = codificacao
+            self.variantes[codificacao] = Variante(corpo, headers)
+
+    def escolher(self, accept_encoding: str) -> Variante:
+        """Variante mais compacta aceita pelo cliente (br, gzip ou sem compressão)"""
+        aceitas = {
+            parte.split(";")[0].strip()
+            for parte in accept_encoding.lower().split(",")
+            if not parte.replace(" ", "").endswith(";q=0")
+        }
+        for codificacao in ("br", "gzip"):
+            if codificacao in aceitas and codificacao in self.variantes:
+                return self.variantes[codificacao]
+        return self.variantes["identity"]
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """Indica se o If-None-Match do cliente inclui o ETag (ou é *)"""
+    if not if_none_match:
+        return False
+    candidatos = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+    return "*" in candidatos or etag in candidatos
+
+
+class Frontend:
+    """index.html e arquivos estáticos com nome por conteúdo, carregados na memória"""
+
+    def __init__(self, diretorio: Path):
+        self.diretorio = Path(diretorio)
+        self.arquivos: Dict[str, Arquivo] = {}
+        # Nome original (css/main.css) -> caminho servido (/assets/css/main.<hash>.css)
+        self.nomes: Dict[str, str] = {}
+
+        for caminho in sorted(self.diretorio.rglob("*")):
+            relativo = caminho.relative_to(self.diretorio).as_posix()
+            if not caminho.is_file() or relativo == "index.html":
+                continue
+            conteudo = caminho.read_bytes()
+            tipo = mimetypes.guess_type(caminho.name)[0] or "application/octet-stream"
+            if tipo.startswith("text/") or tipo == "application/javascript":
+                tipo += "; charset=utf-8"
+            digest = hashlib.sha256(conteudo).hexdigest()[:12]
+            servido = f"{PREFIXO_ASSETS}{Path(relativo).with_suffix(f'.{digest}{caminho.suffix}').as_posix()}"
+            self.nomes[relativo] = servido
+            self.arquivos[servido] = Arquivo(conteudo, tipo, CACHE_IMUTAVEL)
+
+        html = (self.diretorio / "index.html").read_text(encoding="utf-8")
+        for relativo, servido in self.nomes.items():
+            html = html.replace(f'"{relativo}"', f'"{servido}"')
+        self.index = Arquivo(html.encode("utf-8"), "text/html; charset=utf-8", CACHE_REVALIDAR)
+
+    def obter(self, caminho: str) -> Optional[Arquivo]:
+        return self.arquivos.get(caminho)
+
+    def metricas(self) -> dict:
+        todos = [self.index, *self.arquivos.values()]
+        return {
+            "arquivos": len(todos),
+            "bytes": {
+                codificacao: sum(len(a.variantes.get(codificacao, a.variantes["identity"]).corpo) for a in todos)
+                for codificacao in ("identity", "gzip", "br")
+            },
+            "brotli": BROTLI_AVAILABLE
+        }
+
+
+_frontend: Optional[Frontend] = None
+
+
+def obter_frontend() -> Optional[Frontend]:
+    """Retorna o frontend carregado na primeira chamada (None se desativado ou ausente)"""
+    global _frontend
+    settings = get_settings()
+    if _frontend is None and settings.frontend_enabled and (settings.frontend_dir / "index.html").is_file():
+        _frontend = Frontend(settings.frontend_dir)
+    return _frontend
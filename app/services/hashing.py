@@ -3,6 +3,7 @@ Serviço de hashing para gerar hashes SHA-256 dos certificados
 """
 
 import hashlib
+import json
 
 
 def gerar_hash_sha256(conteudo_bytes: bytes) -> str:
@@ -30,4 +31,17 @@ def gerar_hash_texto(texto: str) -> str:
     Returns:
         str: Hash SHA-256 em formato hexadecimal
     """
-    return gerar_hash_sha256(texto.encode('utf-8'))
\ No newline at end of file
+    return gerar_hash_sha256(texto.encode('utf-8'))
+
+
+def gerar_json_canonico(dados: dict) -> str:
+    """
+    Serializa os dados do certificado no JSON canonizado usado para o hash.
+    
+    Args:
+        dados (dict): Dados do certificado
+        
+    Returns:
+        str: JSON com chaves ordenadas e sem espaços
+    """
+    return json.dumps(dados, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
@@ -0,0 +1,128 @@
+"""
+Leitura incremental de listas de participantes (CSV ou NDJSON)
+
+O corpo da requisição é consumido em partes e cada registro é entregue assim
+que termina de chegar, de modo que a memória usada não depende do tamanho do
+arquivo: no máximo uma linha (limitada) e o trecho ainda não processado.
+"""
+
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+FORMATOS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+
+# (número da linha, dados ou None, erro ou None)
+Registro = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detectar_formato(content_type: Optional[str], formato: Optional[str] = None) -> Optional[str]:
+    """
+    Determina o formato do arquivo enviado.
+
+    Args:
+        content_type (str, opcional): Cabeçalho Content-Type da requisição
+        formato (str, opcional): Formato explícito ("csv" ou "ndjson")
+
+    Returns:
+        str: "csv", "ndjson" ou None se não reconhecido
+    """
+    if formato:
+        return formato if formato in ("csv", "ndjson") else None
+    tipo = (content_type or "").split(";")[0].strip().lower()
+    return FORMATOS.get(tipo)
+
+
+async def _linhas(partes: AsyncIterator[bytes], max_bytes_linha: int) -> AsyncIterator[str]:
+    """Divide o fluxo de bytes em linhas de texto (UTF-8, BOM opcional)"""
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    pendente = ""
+    async for parte in partes:
+        pendente += decodificador.decode(parte)
+        *completas, pendente = pendente.split("\n")
+        for linha in completas:
+            yield linha.rstrip("\r")
+        if len(pendente) > max_bytes_linha:
+            raise ValueError(f"Linha maior que o limite de {max_bytes_linha} bytes")
+    pendente += decodificador.decode(b"", final=True)
+    if pendente:
+        yield pendente.rstrip("\r")
+
+
+async def _registros_ndjson(linhas: AsyncIterator[str]) -> AsyncIterator[Registro]:
+    numero = 0
+    async for linha in linhas:
+        numero += 1
+        if not linha.strip():
+            continue
+        try:
+            dados = json.loads(linha)
+        except json.JSONDecodeError as e:
+            yield numero, None, f"JSON inválido: {e.msg}"
+            continue
+        if not isinstance(dados, dict):
+            yield numero, None, "Cada linha deve ser um objeto JSON"
+            continue
+        yield numero, dados, None
+
+
+async def _registros_csv(linhas: AsyncIterator[str], max_bytes_linha: int) -> AsyncIterator[Registro]:
+    """Registros CSV com cabeçalho; campos entre aspas podem conter quebras de linha"""
+    cabecalho = None
+    numero = 0
+    inicio = 0
+    registro = ""
+    async for linha in linhas:
+        numero += 1
+        if not registro:
+            inicio = numero
+        registro = f"{registro}\n{linha}" if registro else linha
+        # Aspas em número ímpar: o campo continua na próxima linha física
+        if registro.count('"') % 2:
+            if len(registro) > max_bytes_linha:
+                raise ValueError(f"Registro maior que o limite de {max_bytes_linha} bytes")
+            continue
+
+        valores = next(csv.reader([registro]), [])
+        registro = ""
+        if not any(valor.strip() for valor in valores):
+            continue
+        if cabecalho is None:
+            cabecalho = [valor.strip().lower() for valor in valores]
+            continue
+        if len(valores) != len(cabecalho):
+            yield inicio, None, f"Esperadas {len(cabecalho)} colunas, encontradas {len(valores)}"
+            continue
+        yield inicio, dict(zip(cabecalho, (valor.strip() for valor in valores))), None
+
+    if registro:
+        yield inicio, None, "Campo entre aspas não terminado"
+
+
+def ler_registros(partes: AsyncIterator[bytes], formato: str, max_bytes_linha: int) -> AsyncIterator[Registro]:
+    """
+    Lê os registros de um fluxo CSV ou NDJSON à medida que chegam.
+
+    Args:
+        partes (AsyncIterator[bytes]): Corpo da requisição em partes
+        formato (str): "csv" ou "ndjson"
+        max_bytes_linha (int): Tamanho máximo de uma linha (ou registro CSV)
+
+    Returns:
+        AsyncIterator: (número da linha, dados ou None, erro ou None)
+
+    Raises:
+        ValueError: Se o conteúdo não for UTF-8 ou uma linha exceder o limite
+    """
+    linhas = _linhas(partes, max_bytes_linha)
+    if formato == "csv":
+        return _registros_csv(linhas, max_bytes_linha)
+    return _registros_ndjson(linhas)
@@ -0,0 +1,217 @@
+"""
+Indexador do histórico de certificados da carteira emissora
+
+Percorre getSignaturesForAddress da carteira (fee payer), busca as transações
+em lotes de getTransaction, decodifica os memos de certificado e alimenta o
+armazenamento local indexado por doc_hash, código e evento. Memos de
+revogação gravados pela carteira entram nas revogações do armazenamento.
+
+getSignaturesForAddress devolve toda transação que menciona a carteira, não
+só as emitidas por ela: memos de transações pagas por outra conta são
+ignorados (qualquer um poderia gravar um memo de certificado falso ou
+revogar um certificado alheio).
+
+Checkpoints:
+    indexer:head         assinatura mais recente já sincronizada por completo
+    indexer:pending_head assinatura mais recente da sincronização em andamento
+    indexer:cursor       última assinatura processada na sincronização em andamento
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from ..config import get_settings
+from .estado import obter_estado
+from .memo import decodificar_memos_transacao, decodificar_revogacoes_transacao
+from .rpc import rpc_call_async, rpc_batch_async
+from .store import CertificateStore, obter_store
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_HEAD = "indexer:head"
+CHECKPOINT_PENDING_HEAD = "indexer:pending_head"
+CHECKPOINT_CURSOR = "indexer:cursor"
+
+
+class ChainIndexer:
+    """Sincroniza o armazenamento local com os memos gravados pela carteira emissora"""
+
+    def __init__(self, endereco: str, store: Optional[CertificateStore] = None):
+        self.endereco = endereco
+        self.store = store or obter_store()
+        self.settings = get_settings()
+        self._lock = asyncio.Lock()
+        self.status = {
+            "em_execucao": False,
+            "ultima_execucao": None,
+            "ultimo_erro": None,
+            "transacoes_processadas": 0,
+            "certificados_indexados": 0
+        }
+
+    async def _pagina_assinaturas(self, antes: Optional[str], ate: Optional[str]) -> List[dict]:
+        opcoes = {"limit": self.settings.indexer_page_size}
+        if antes:
+            opcoes["before"] = antes
+        if ate:
+            opcoes["until"] = ate
+        resposta = await rpc_call_async("getSignaturesForAddress", [self.endereco, opcoes])
+        if "error" in resposta:
+            raise RuntimeError(f"getSignaturesForAddress: {resposta['error']}")
+        return resposta.get("result") or []
+
+    def _emitida_pela_carteira(self, transacao: dict) -> bool:
+        """Indica se o fee payer (primeira conta, sempre signatária) é a carteira emissora"""
+        chaves = transacao.get("transaction", {}).get("message", {}).get("accountKeys", [])
+        return bool(chaves) and chaves[0] == self.endereco
+
+    async def _processar_lote(self, assinaturas: List[dict], limite: asyncio.Semaphore) -> int:
+        chamadas = [
+            ("getTransaction", [a["signature"], {"encoding": "json", "maxSupportedTransactionVersion": 0}])
+            for a in assinaturas
+        ]
+        async with limite:
+            respostas = await rpc_batch_async(chamadas)
+
+        registros = []
+        revogacoes = []
+        for assinatura, resposta in zip(assinaturas, respostas):
+            transacao = resposta.get("result")
+            if not transacao:
+                if "error" in resposta:
+                    raise RuntimeError(f"getTransaction {assinatura['signature']}: {resposta['error']}")
+                continue
+            # Certificados e revogações só valem em transações pagas (e assinadas) pela carteira
+            if not self._emitida_pela_carteira(transacao):
+                logger.warning(
+                    "Indexador: transação %s não foi paga pela carteira, memos ignorados", assinatura["signature"]
+                )
+                continue
+            for metadados in decodificar_memos_transacao(transacao):
+                registros.append({
+                    "doc_hash": (metadados["doc_hash"] or "").lower(),
+                    "txid": assinatura["signature"],
+                    "event": metadados["evento"],
+                    "code": metadados["code"],
+                    "network": metadados["network"] or self.settings.solana_network,
+                    "origem": "indice",
+                    "confirmado": True,
+                    "commitment": "finalized",
+                    "slot": transacao.get("slot"),
+                    "block_time": transacao.get("blockTime")
+                })
+            for revogacao in decodificar_revogacoes_transacao(transacao):
+                revogacoes.append({
+                    "doc_hash": revogacao["doc_hash"],
+                    "txid": assinatura["signature"],
+                    "txid_original": revogacao["txid"],
+                    "motivo": revogacao["motivo"],
+                    "origem": "indice",
+                    "revogado_em": transacao.get("blockTime")
+                })
+
+        registros = [r for r in registros if r["doc_hash"]]
+        self.store.salvar(registros)
+        self.store.salvar_revogacoes(revogacoes)
+        return len(registros)
+
+    async def _processar_pagina(self, pagina: List[dict]) -> int:
+        """Busca as transações da página em lotes paralelos (limitados)"""
+        validas = [a for a in pagina if a.get("err") is None]
+        limite = asyncio.Semaphore(self.settings.indexer_concurrency)
+        tamanho = self.settings.indexer_batch_size
+        lotes = [validas[i:i + tamanho] for i in range(0, len(validas), tamanho)]
+        indexados = await asyncio.gather(*(self._processar_lote(lote, limite) for lote in lotes))
+        self.status["transacoes_processadas"] += len(validas)
+        return sum(indexados)
+
+    async def sincronizar(self) -> int:
+        """
+        Sincroniza do topo do histórico até o último checkpoint.
+
+        Se uma execução anterior foi interrompida, retoma a partir do cursor
+        salvo sem reprocessar as páginas já indexadas.
+
+        Returns:
+            int: Quantidade de certificados indexados nesta execução
+        """
+        async with self._lock:
+            self.status["em_execucao"] = True
+            self.status["ultimo_erro"] = None
+            total = 0
+            try:
+                head = self.store.obter_checkpoint(CHECKPOINT_HEAD)
+                novo_head = self.store.obter_checkpoint(CHECKPOINT_PENDING_HEAD)
+                cursor = self.store.obter_checkpoint(CHECKPOINT_CURSOR) if novo_head else None
+
+                while True:
+                    pagina = await self._pagina_assinaturas(cursor, head)
+                    if not pagina:
+                        break
+                    if novo_head is None:
+                        novo_head = pagina[0]["signature"]
+                        self.store.salvar_checkpoint(CHECKPOINT_PENDING_HEAD, novo_head)
+
+                    total += await self._processar_pagina(pagina)
+                    cursor = pagina[-1]["signature"]
+                    self.store.salvar_checkpoint(CHECKPOINT_CURSOR, cursor)
+
+                    if len(pagina) < self.settings.indexer_page_size:
+                        break
+
+                if novo_head:
+                    self.store.salvar_checkpoint(CHECKPOINT_HEAD, novo_head)
+                self.store.salvar_checkpoint(CHECKPOINT_PENDING_HEAD, None)
+                self.store.salvar_checkpoint(CHECKPOINT_CURSOR, None)
+
+                self.status["certificados_indexados"] += total
+                logger.info("Indexador: %d certificados indexados", total)
+                return total
+
+            except Exception as e:
+                self.status["ultimo_erro"] = str(e)
+                logger.error("Erro no indexador: %s", e)
+                raise
+            finally:
+                self.status["em_execucao"] = False
+                self.status["ultima_execucao"] = time.time()
+
+    async def ressincronizar(self) -> int:
+        """Descarta os checkpoints e reindexa todo o histórico"""
+        for chave in (CHECKPOINT_HEAD, CHECKPOINT_PENDING_HEAD, CHECKPOINT_CURSOR):
+            self.store.salvar_checkpoint(chave, None)
+        return await self.sincronizar()
+
+    async def executar_periodicamente(self, intervalo: float) -> None:
+        """
+        Laço de sincronização em segundo plano.
+
+        Com vários workers, cada rodada só é executada pelo worker que obtiver
+        o arrendamento da rodada no estado compartilhado.
+        """
+        while True:
+            try:
+                if obter_estado().definir_se_ausente(f"indexer:rodada:{self.endereco}", "1", ttl=intervalo * 0.9):
+                    await self.sincronizar()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            await asyncio.sleep(intervalo)
+
+
+_indexer: Optional[ChainIndexer] = None
+
+
+def obter_indexer() -> Optional[ChainIndexer]:
+    """Retorna o indexador da carteira emissora (None se não houver carteira carregada)"""
+    global _indexer
+    if _indexer is None:
+        from .blockchain import obter_registry
+        registry = obter_registry()
+        if not registry.keypair:
+            return None
+        _indexer = ChainIndexer(str(registry.keypair.pubkey()))
+    return _indexer
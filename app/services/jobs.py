@@ -0,0 +1,119 @@
+"""
+Jobs de registro e verificação em lote com eventos de progresso
+
+Um job guarda, em ordem, os eventos de cada certificado do lote:
+
+- hashed: o hash do JSON canonizado foi calculado;
+- sent: a transação com o memo foi enviada (TXID disponível);
+- confirmed: a verificação encontrou o certificado autêntico na blockchain;
+- failed: o certificado não pôde ser registrado ou verificado.
+
+Ao final é emitido um evento done com o resumo. Os eventos são numerados a
+partir de 1, de modo que um cliente SSE que reconecta com Last-Event-ID
+recebe apenas os que perdeu.
+
+Os jobs ficam na memória do worker que os criou e são descartados
+jobs_retention segundos depois de concluídos.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from ..config import get_settings
+
+ESTADOS = ("hashed", "sent", "confirmed", "failed")
+
+
+class Job:
+    """Lote de certificados em processamento e seus eventos"""
+
+    def __init__(self, tipo: str, total: int, cliente: str):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.total = total
+        self.cliente = cliente
+        self.criado_em = time.time()
+        self.concluido_em: Optional[float] = None
+        self.contagem = {estado: 0 for estado in ESTADOS}
+        self.eventos: List[bytes] = []
+        self._novo = asyncio.Event()
+
+    @property
+    def concluido(self) -> bool:
+        return self.concluido_em is not None
+
+    def _publicar(self, tipo: str, dados: dict) -> None:
+        numero = len(self.eventos) + 1
+        corpo = json.dumps(dados, ensure_ascii=False, separators=(",", ":"))
+        self.eventos.append(f"id: {numero}\nevent: {tipo}\ndata: {corpo}\n\n".encode("utf-8"))
+        # Acorda quem aguarda e prepara o próximo aviso
+        self._novo.set()
+        self._novo = asyncio.Event()
+
+    def registrar(self, indice: int, estado: str, **dados) -> None:
+        """Publica o evento de um certificado do lote (indice a partir de 0)"""
+        self.contagem[estado] += 1
+        self._publicar(estado, {"indice": indice, **dados})
+
+    def concluir(self) -> None:
+        self.concluido_em = time.time()
+        self._publicar("done", self.resumo())
+
+    async def aguardar(self, vistos: int, tempo_maximo: float) -> None:
+        """Aguarda até haver mais de `vistos` eventos, o job terminar ou o tempo acabar"""
+        if len(self.eventos) > vistos:
+            return
+        try:
+            await asyncio.wait_for(self._novo.wait(), tempo_maximo)
+        except asyncio.TimeoutError:
+            pass
+
+    def resumo(self) -> dict:
+        falhas = self.contagem["failed"]
+        finais = self.contagem["sent"] if self.tipo == "registro" else self.contagem["confirmed"]
+        return {
+            "job_id": self.id,
+            "tipo": self.tipo,
+            "total": self.total,
+            "processados": finais + falhas,
+            "contagem": dict(self.contagem),
+            "concluido": self.concluido,
+            "criado_em": self.criado_em,
+            "duracao_s": round((self.concluido_em or time.time()) - self.criado_em, 3)
+        }
+
+
+class GerenciadorJobs:
+    """Jobs do worker, com descarte dos concluídos após o tempo de retenção"""
+
+    def __init__(self, retencao: float = 3600):
+        self.retencao = retencao
+        self._jobs: Dict[str, Job] = {}
+
+    def _descartar_expirados(self) -> None:
+        limite = time.time() - self.retencao
+        for job_id in [j.id for j in self._jobs.values() if j.concluido and j.concluido_em < limite]:
+            del self._jobs[job_id]
+
+    def criar(self, tipo: str, total: int, cliente: str) -> Job:
+        self._descartar_expirados()
+        job = Job(tipo, total, cliente)
+        self._jobs[job.id] = job
+        return job
+
+    def obter(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+
+_jobs: Optional[GerenciadorJobs] = None
+
+
+def obter_jobs() -> GerenciadorJobs:
+    """Retorna o gerenciador de jobs, criado na primeira chamada"""
+    global _jobs
+    if _jobs is None:
+        _jobs = GerenciadorJobs(get_settings().jobs_retention)
+    return _jobs
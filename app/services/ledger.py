@@ -0,0 +1,270 @@
+"""
+Backends do livro-razão usado pelo registro de certificados
+
+O registro monta, empacota e assina as transações sempre da mesma forma; o
+backend é apenas a fronteira com a rede:
+
+- solana: RPC do nó configurado em SOLANA_URL (solana-py para os envios e
+  JSON-RPC direto para as leituras);
+- simulado: livro-razão em memória, para testes de carga da aplicação inteira
+  sem blockchain. As transações assinadas são aceitas, seus memos guardados e
+  devolvidos por getTransaction no mesmo formato do RPC, de modo que a
+  verificação funciona sem alterações.
+
+O TXID de uma transação simulada é a própria assinatura Ed25519, que é
+determinística: com a mesma carteira (ou a derivada de SIM_SEED) e o mesmo
+conteúdo, o TXID se repete entre execuções. Os atrasos de confirmação e as
+taxas de falha são configuráveis:
+
+    SIM_SEND_LATENCY_MS  latência do sendTransaction
+    SIM_CONFIRM_MS       tempo até a transação aparecer com commitment confirmed
+    SIM_FINALIZE_MS      tempo até aparecer com commitment finalized
+    SIM_FAILURE_RATE     fração dos envios recusados pelo "nó"
+    SIM_DROP_RATE        fração das transações aceitas que nunca chegam a um bloco
+"""
+
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, NamedTuple, Optional
+
+import base58
+
+from ..config import Settings
+from .memo import MEMO_PROGRAM_ID
+from .rpc import rpc_batch_async, rpc_call_async
+
+# Intervalo entre slots da Solana
+DURACAO_SLOT_S = 0.4
+
+
+class LedgerBackend(ABC):
+    """
+    Interface do livro-razão.
+
+    Os métodos de envio seguem o Client do solana-py (respostas com .value),
+    que é o que o registro já usava; as leituras devolvem a resposta JSON-RPC
+    completa (com "result" ou "error"). Um backend que não implementa todos
+    os métodos abstratos falha já ao ser instanciado.
+    """
+
+    nome = "base"
+
+    @abstractmethod
+    def get_latest_blockhash(self):
+        ...
+
+    @abstractmethod
+    def send_transaction(self, txn, opts=None):
+        ...
+
+    @abstractmethod
+    def get_balance(self, pubkey):
+        ...
+
+    @abstractmethod
+    def request_airdrop(self, pubkey, lamports: int):
+        ...
+
+    @abstractmethod
+    async def obter_transacao(self, txid: str, commitment: str = "finalized") -> dict:
+        """Resposta de getTransaction (encoding json) para o TXID"""
+
+    async def obter_transacoes(self, txids: List[str], commitment: str = "finalized", url: Optional[str] = None) -> List[dict]:
+        """
+        Respostas de getTransaction para vários TXIDs, na mesma ordem.
+
+        Args:
+            txids (list): TXIDs consultados
+            commitment (str): Commitment da consulta
+            url (str, opcional): RPC alternativo (fora do disjuntor do RPC padrão)
+        """
+        return list(await asyncio.gather(*(self.obter_transacao(txid, commitment) for txid in txids)))
+
+    def metricas(self) -> dict:
+        return {"backend": self.nome}
+
+
+class SolanaLedger(LedgerBackend):
+    """Nó Solana real, via RPC"""
+
+    nome = "solana"
+
+    def __init__(self, url: str):
+        self.url = url
+        self._client = None
+
+    @property
+    def client(self):
+        """Cliente solana-py, criado no primeiro envio (as leituras usam JSON-RPC direto)"""
+        if self._client is None:
+            # Import tardio: o cliente RPC (httpx) é o maior custo de importação
+            from solana.rpc.api import Client
+            self._client = Client(self.url)
+        return self._client
+
+    def get_latest_blockhash(self):
+        return self.client.get_latest_blockhash()
+
+    def send_transaction(self, txn, opts=None):
+        return self.client.send_transaction(txn, opts=opts)
+
+    def get_balance(self, pubkey):
+        return self.client.get_balance(pubkey)
+
+    def request_airdrop(self, pubkey, lamports: int):
+        return self.client.request_airdrop(pubkey, lamports)
+
+    async def obter_transacao(self, txid: str, commitment: str = "finalized") -> dict:
+        return await rpc_call_async(
+            "getTransaction",
+            [txid, {"encoding": "json", "maxSupportedTransactionVersion": 0, "commitment": commitment}]
+        )
+
+    async def obter_transacoes(self, txids: List[str], commitment: str = "finalized", url: Optional[str] = None) -> List[dict]:
+        """Uma única requisição JSON-RPC em lote"""
+        opcoes = {"encoding": "json", "maxSupportedTransactionVersion": 0, "commitment": commitment}
+        return await rpc_batch_async([("getTransaction", [txid, opcoes]) for txid in txids], url)
+
+
+class _TransacaoSimulada(NamedTuple):
+    pagador: str
+    memos: List[bytes]
+    enviada_em: float
+    slot: int
+    descartada: bool
+
+
+class SimulatedLedger(LedgerBackend):
+    """Livro-razão em memória com atrasos de confirmação e falhas configuráveis"""
+
+    nome = "simulado"
+    SALDO_LAMPORTS = 1_000_000_000_000
+
+    def __init__(
+        self,
+        semente: int = 0,
+        latencia_envio: float = 0,
+        atraso_confirmacao: float = 0.4,
+        atraso_finalizacao: float = 13,
+        taxa_falha: float = 0,
+        taxa_descarte: float = 0
+    ):
+        from solders.hash import Hash
+
+        self.semente = semente
+        self.latencia_envio = latencia_envio
+        self.atraso_confirmacao = atraso_confirmacao
+        self.atraso_finalizacao = max(atraso_finalizacao, atraso_confirmacao)
+        self.taxa_falha = taxa_falha
+        self.taxa_descarte = taxa_descarte
+        self.blockhash = Hash(hashlib.sha256(f"blockhash:{semente}".encode()).digest())
+        self.inicio = time.monotonic()
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self._transacoes: Dict[str, _TransacaoSimulada] = {}
+        self._renderizadas: Dict[str, dict] = {}
+        self.contadores = {"enviadas": 0, "recusadas": 0, "descartadas": 0, "memos": 0}
+
+    def get_latest_blockhash(self):
+        return SimpleNamespace(value=SimpleNamespace(blockhash=self.blockhash, last_valid_block_height=0))
+
+    def send_transaction(self, txn, opts=None):
+        """Aceita a transação assinada; o TXID é a primeira assinatura"""
+        if self.latencia_envio:
+            # Chamado em uma thread (asyncio.to_thread), como o envio real
+            time.sleep(self.latencia_envio)
+
+        mensagem = txn.message
+        chaves = mensagem.account_keys
+        memos = [
+            bytes(instrucao.data) for instrucao in mensagem.instructions
+            if str(chaves[instrucao.program_id_index]) == MEMO_PROGRAM_ID
+        ]
+        txid = str(txn.signatures[0])
+        with self._lock:
+            if self._aleatorio.random() < self.taxa_falha:
+                self.contadores["recusadas"] += 1
+                raise RuntimeError("Falha simulada no sendTransaction")
+            descartada = self._aleatorio.random() < self.taxa_descarte
+            if txid not in self._transacoes:
+                self._transacoes[txid] = _TransacaoSimulada(
+                    str(chaves[0]), memos, time.time(), self._slot_atual(), descartada
+                )
+                self.contadores["enviadas"] += 1
+                self.contadores["memos"] += len(memos)
+                self.contadores["descartadas"] += descartada
+        return SimpleNamespace(value=txn.signatures[0])
+
+    def get_balance(self, pubkey):
+        return SimpleNamespace(value=self.SALDO_LAMPORTS)
+
+    def request_airdrop(self, pubkey, lamports: int):
+        return SimpleNamespace(value=None)
+
+    def _slot_atual(self) -> int:
+        return int((time.monotonic() - self.inicio) / DURACAO_SLOT_S) + 1
+
+    def _visivel(self, transacao: _TransacaoSimulada, commitment: str) -> bool:
+        if transacao.descartada:
+            return False
+        atraso = self.atraso_finalizacao if commitment == "finalized" else self.atraso_confirmacao
+        return time.time() - transacao.enviada_em >= atraso
+
+    def _renderizar(self, txid: str, transacao: _TransacaoSimulada) -> dict:
+        return {
+            "slot": transacao.slot,
+            "blockTime": int(transacao.enviada_em),
+            "transaction": {
+                "signatures": [txid],
+                "message": {
+                    "accountKeys": [transacao.pagador, MEMO_PROGRAM_ID],
+                    "instructions": [
+                        {"programIdIndex": 1, "accounts": [], "data": base58.b58encode(memo).decode("ascii")}
+                        for memo in transacao.memos
+                    ]
+                }
+            },
+            "meta": {"err": None, "fee": 5000, "logMessages": []}
+        }
+
+    async def obter_transacao(self, txid: str, commitment: str = "finalized") -> dict:
+        transacao = self._transacoes.get(txid)
+        if transacao is None or not self._visivel(transacao, commitment):
+            return {"jsonrpc": "2.0", "id": 1, "result": None}
+        # A transação não muda depois de aceita: o base58 dos memos é calculado uma vez
+        resultado = self._renderizadas.get(txid)
+        if resultado is None:
+            resultado = self._renderizadas[txid] = self._renderizar(txid, transacao)
+        return {"jsonrpc": "2.0", "id": 1, "result": resultado}
+
+    def metricas(self) -> dict:
+        return {"backend": self.nome, "transacoes": len(self._transacoes), **self.contadores}
+
+
+def criar_ledger(settings: Settings) -> LedgerBackend:
+    """
+    Cria o backend do livro-razão.
+
+    Args:
+        settings (Settings): Configurações (LEDGER_BACKEND e SIM_*)
+
+    Returns:
+        LedgerBackend: "solana" ou "simulado"
+    """
+    if settings.ledger_backend == "solana":
+        return SolanaLedger(settings.solana_url)
+    if settings.ledger_backend == "simulado":
+        return SimulatedLedger(
+            semente=settings.sim_seed,
+            latencia_envio=settings.sim_send_latency_ms / 1000,
+            atraso_confirmacao=settings.sim_confirm_ms / 1000,
+            atraso_finalizacao=settings.sim_finalize_ms / 1000,
+            taxa_falha=settings.sim_failure_rate,
+            taxa_descarte=settings.sim_drop_rate
+        )
+    raise ValueError(f"Backend de livro-razão desconhecido: {settings.ledger_backend}")
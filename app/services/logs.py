@@ -0,0 +1,178 @@
+"""
+Logs estruturados (JSON) gravados em segundo plano
+
+Os loggers da aplicação (app.*) escrevem em uma fila; uma thread
+(QueueListener) formata e grava as linhas em stdout. Quem chama o logger
+paga apenas a criação do registro e o put na fila:
+
+- a mensagem usa formatação preguiçosa (logger.info("... %s", valor)) e só é
+  montada na thread de gravação;
+- registros abaixo de LOG_LEVEL nem são criados;
+- cada tipo de mensagem (extra={"tipo": ...}) pode ser amostrado: com
+  LOG_SAMPLE_RATES="requisicao:0.01", uma a cada 100 linhas de acesso é
+  gravada (com o campo "amostragem"). Avisos e erros nunca são descartados.
+
+Campos da requisição (request_id, método, rota e os que as rotas anexarem,
+como uuid e txid) ficam em um contexto por requisição e entram em todas as
+linhas emitidas durante ela.
+
+Configuração (variáveis de ambiente):
+    LOG_LEVEL         nível mínimo (padrão INFO)
+    LOG_FORMAT        json ou texto
+    LOG_SAMPLE_RATES  "tipo:taxa,..." (taxa entre 0 e 1)
+"""
+
+import json
+import logging
+import queue
+import sys
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from ..config import Settings, get_settings
+
+# Campos da requisição atual (dicionário mutável: as rotas anexam campos a ele)
+contexto_log: ContextVar[Optional[dict]] = ContextVar("contexto_log", default=None)
+
+# Atributos de todo LogRecord; os demais vieram de extra={...}
+_ATRIBUTOS_PADRAO = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "contexto", "amostragem"}
+
+
+def anexar_ao_log(**campos) -> None:
+    """Acrescenta campos (ex.: uuid, txid) às linhas de log da requisição atual"""
+    contexto = contexto_log.get()
+    if contexto is not None:
+        contexto.update(campos)
+
+
+def _ler_taxas(valor: str) -> Dict[str, float]:
+    """Lê "tipo:taxa,..." em {tipo: taxa}"""
+    taxas = {}
+    for entrada in filter(None, (item.strip() for item in valor.split(","))):
+        tipo, _, taxa = entrada.partition(":")
+        if not taxa:
+            raise ValueError(f"Entrada de LOG_SAMPLE_RATES inválida (use tipo:taxa): {entrada}")
+        taxas[tipo] = min(1.0, max(0.0, float(taxa)))
+    return taxas
+
+
+class FiltroAmostragem(logging.Filter):
+    """Mantém uma a cada 1/taxa mensagens de cada tipo amostrado (contagem, não sorteio)"""
+
+    def __init__(self, taxas: Dict[str, float]):
+        super().__init__()
+        self.taxas = taxas
+        self._contadores: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        tipo = getattr(record, "tipo", None)
+        taxa = self.taxas.get(tipo)
+        if taxa is None or taxa >= 1 or record.levelno >= logging.WARNING:
+            return True
+        if taxa <= 0:
+            return False
+        contador = self._contadores.get(tipo, 0)
+        self._contadores[tipo] = contador + 1
+        if contador % round(1 / taxa):
+            return False
+        record.amostragem = taxa
+        return True
+
+
+class HandlerFila(QueueHandler):
+    """
+    Enfileira o registro sem formatá-lo.
+
+    O QueueHandler padrão monta a mensagem na thread de quem chamou; aqui só
+    o contexto da requisição é copiado (variáveis de contexto não existem na
+    thread de gravação).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        contexto = contexto_log.get()
+        record.contexto = dict(contexto) if contexto else None
+        return record
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro: horário, nível, logger, mensagem, contexto e campos extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        linha = {
+            "ts": round(record.created, 3),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        contexto = getattr(record, "contexto", None)
+        if contexto:
+            linha.update(contexto)
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO:
+                linha[chave] = valor
+        amostragem = getattr(record, "amostragem", None)
+        if amostragem is not None:
+            linha["amostragem"] = amostragem
+        if record.exc_info:
+            linha["exc"] = self.formatException(record.exc_info)
+        return json.dumps(linha, ensure_ascii=False, default=str)
+
+
+class FormatadorTexto(logging.Formatter):
+    """Formato legível para desenvolvimento, com o contexto ao final da linha"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        texto = super().format(record)
+        campos = {**(getattr(record, "contexto", None) or {})}
+        campos.update((chave, valor) for chave, valor in vars(record).items() if chave not in _ATRIBUTOS_PADRAO)
+        if campos:
+            texto += " " + " ".join(f"{chave}={valor}" for chave, valor in campos.items())
+        return texto
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[HandlerFila] = None
+
+
+def configurar_logs(settings: Optional[Settings] = None, destino=None) -> None:
+    """
+    Direciona os loggers da aplicação (app.*) para a fila e inicia a thread de gravação.
+
+    Args:
+        settings (Settings, opcional): Configurações (LOG_*)
+        destino (stream, opcional): Onde gravar as linhas (padrão: stdout)
+    """
+    global _listener, _handler
+    settings = settings or get_settings()
+    encerrar_logs()
+
+    saida = logging.StreamHandler(destino or sys.stdout)
+    saida.setFormatter(FormatadorJSON() if settings.log_format == "json" else FormatadorTexto())
+
+    fila: queue.SimpleQueue = queue.SimpleQueue()
+    _handler = HandlerFila(fila)
+    _handler.addFilter(FiltroAmostragem(_ler_taxas(settings.log_sample_rates)))
+    _listener = QueueListener(fila, saida, respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger("app")
+    logger.setLevel(settings.log_level.upper())
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+
+def encerrar_logs() -> None:
+    """Grava o que restou na fila e devolve os loggers da aplicação à configuração padrão"""
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logger = logging.getLogger("app")
+        logger.removeHandler(_handler)
+        logger.propagate = True
+        _handler = None
@@ -0,0 +1,317 @@
+"""
+Codificação e decodificação dos memos de certificado gravados na blockchain
+
+Formatos aceitos:
+
+- v1.0: JSON com todos os campos ({"version":"1.0","doc_hash":...});
+- compacto legado: JSON reduzido ({"tipo":"cert","hash":...});
+- v2 (compacto binário): "c2:" seguido do base64 (sem padding) de
+
+      versão (1 byte) | hash SHA-256 (32 bytes) | timestamp unix (4 bytes)
+      | campos: tag (1 byte) + tamanho (1 byte) + valor UTF-8
+
+  O timestamp é lido e escrito em UTC, e cada campo tem no máximo 255
+  bytes: um valor maior não é truncado (CampoMemoLongoError), e quem
+  codifica recorre ao JSON v1.0.
+
+  Campos com tag desconhecida são ignorados, de modo que novas tags podem
+  ser acrescentadas sem quebrar leitores antigos.
+
+Revogações usam o mesmo cabeçalho com o prefixo "r2:" (campos: txid da
+emissão e motivo) ou, com memo_format="json", um JSON com
+"tipo":"revogacao". Um memo de revogação nunca é lido como certificado.
+"""
+
+import binascii
+import json
+import logging
+import re
+import struct
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import base58
+
+MEMO_PROGRAM_ID = "MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr"
+
+PREFIXO_V2 = "c2:"
+PREFIXO_REVOGACAO = "r2:"
+TIPO_REVOGACAO = "revogacao"
+VERSAO_V2 = 2
+EMISSOR_PADRAO = "Sistema de Certificados Blockchain"
+TIPO_PADRAO = "certificado_participacao"
+
+# Tags dos campos opcionais do formato v2
+TAGS_V2 = {1: "code", 2: "name", 3: "email", 4: "evento", 5: "network", 6: "emissor"}
+_TAG_POR_CAMPO = {campo: tag for tag, campo in TAGS_V2.items()}
+# Tags dos campos opcionais da revogação
+TAGS_REVOGACAO = {1: "txid", 2: "motivo"}
+_TAG_POR_CAMPO_REVOGACAO = {campo: tag for tag, campo in TAGS_REVOGACAO.items()}
+_FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+_CABECALHO_V2 = struct.Struct(">B32sI")
+_HASH_HEX = re.compile(r"[0-9a-fA-F]{64}")
+
+logger = logging.getLogger(__name__)
+
+
+class CampoMemoLongoError(ValueError):
+    """Campo do memo compacto maior que 255 bytes (use o formato JSON)"""
+
+
+def hash_valido(doc_hash) -> bool:
+    """Indica se doc_hash é um SHA-256 em hexadecimal (64 caracteres)"""
+    return isinstance(doc_hash, str) and _HASH_HEX.fullmatch(doc_hash) is not None
+
+
+def codificar_memo_v2(doc_hash: str, timestamp: datetime, **campos: Optional[str]) -> str:
+    """
+    Codifica um memo de certificado no formato compacto v2.
+
+    Args:
+        doc_hash (str): Hash SHA-256 do certificado (hex)
+        timestamp (datetime): Data do registro (precisão de segundos; sem fuso
+            horário, é tratada como UTC)
+        **campos: code, name, email, evento, network e emissor (omitidos se vazios;
+            emissor também é omitido quando igual ao padrão)
+
+    Returns:
+        str: Memo "c2:<base64>"
+
+    Raises:
+        CampoMemoLongoError: Se algum campo passar de 255 bytes em UTF-8
+    """
+    if campos.get("emissor") == EMISSOR_PADRAO:
+        campos = {**campos, "emissor": None}
+    return _codificar_binario(PREFIXO_V2, _TAG_POR_CAMPO, doc_hash, timestamp, campos)
+
+
+def codificar_revogacao(doc_hash: str, timestamp: datetime, **campos: Optional[str]) -> str:
+    """
+    Codifica um memo de revogação no formato compacto ("r2:").
+
+    Args:
+        doc_hash (str): Hash SHA-256 do certificado revogado (hex)
+        timestamp (datetime): Data da revogação (precisão de segundos; sem fuso
+            horário, é tratada como UTC)
+        **campos: txid (da emissão) e motivo (omitidos se vazios)
+
+    Returns:
+        str: Memo "r2:<base64>"
+
+    Raises:
+        CampoMemoLongoError: Se algum campo passar de 255 bytes em UTF-8
+    """
+    return _codificar_binario(PREFIXO_REVOGACAO, _TAG_POR_CAMPO_REVOGACAO, doc_hash, timestamp, campos)
+
+
+def _codificar_binario(prefixo: str, tags: dict, doc_hash: str, timestamp: datetime, campos: dict) -> str:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    dados = bytearray(_CABECALHO_V2.pack(VERSAO_V2, bytes.fromhex(doc_hash), int(timestamp.timestamp())))
+    for campo, valor in campos.items():
+        if not valor:
+            continue
+        valor_bytes = valor.encode("utf-8")
+        if len(valor_bytes) > 255:
+            raise CampoMemoLongoError(f"Campo '{campo}' com {len(valor_bytes)} bytes (máximo de 255 no memo compacto)")
+        dados += struct.pack(">BB", tags[campo], len(valor_bytes)) + valor_bytes
+    return prefixo + binascii.b2a_base64(bytes(dados), newline=False).decode("ascii").rstrip("=")
+
+
+def _decodificar_binario(memo: str, prefixo: str, tags: dict, metadados: dict) -> Optional[dict]:
+    """Preenche metadados com doc_hash, timestamp e os campos do memo (None se inválido)"""
+    codificado = memo[len(prefixo):]
+    try:
+        dados = binascii.a2b_base64(codificado + "=" * (-len(codificado) % 4))
+        versao, doc_hash, timestamp = _CABECALHO_V2.unpack_from(dados)
+    except (ValueError, struct.error):  # binascii.Error é um ValueError
+        return None
+    if versao != VERSAO_V2:
+        return None
+
+    metadados["doc_hash"] = doc_hash.hex()
+    metadados["timestamp"] = time.strftime(_FORMATO_DATA, time.gmtime(timestamp))
+    posicao = _CABECALHO_V2.size
+    fim = len(dados)
+    while posicao + 2 <= fim:
+        campo = tags.get(dados[posicao])
+        inicio = posicao + 2
+        posicao = inicio + dados[posicao + 1]
+        if campo:
+            metadados[campo] = dados[inicio:posicao].decode("utf-8", "replace")
+    return metadados
+
+
+def _decodificar_memo_v2(memo: str) -> Optional[dict]:
+    return _decodificar_binario(memo, PREFIXO_V2, TAGS_V2, {
+        "version": "2",
+        "tipo": TIPO_PADRAO,
+        "code": None,
+        "name": None,
+        "email": None,
+        "evento": None,
+        "timestamp": None,
+        "doc_hash": None,
+        "network": None,
+        "emissor": EMISSOR_PADRAO
+    })
+
+
+def extrair_memos(transacao: dict) -> List[str]:
+    """
+    Extrai o texto de todas as instruções do Memo Program de uma transação.
+
+    Lê os dados das instruções (encoding "json" do getTransaction) e, se não
+    houver instruções legíveis, recorre aos logs do programa.
+
+    Args:
+        transacao (dict): Campo "result" de getTransaction
+
+    Returns:
+        list: Textos dos memos, na ordem das instruções
+    """
+    memos = []
+    mensagem = transacao.get("transaction", {}).get("message", {})
+    chaves = mensagem.get("accountKeys", [])
+
+    for instrucao in mensagem.get("instructions", []):
+        indice = instrucao.get("programIdIndex")
+        if indice is None or indice >= len(chaves) or chaves[indice] != MEMO_PROGRAM_ID:
+            continue
+        try:
+            memos.append(base58.b58decode(instrucao.get("data", "")).decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            continue
+
+    if memos:
+        return memos
+
+    for log_message in (transacao.get("meta") or {}).get("logMessages") or []:
+        if not log_message.startswith("Program log: Memo"):
+            continue
+        inicio = log_message.find('"')
+        if inicio == -1:
+            continue
+        try:
+            memos.append(json.loads(log_message[inicio:]))
+        except json.JSONDecodeError:
+            continue
+    return memos
+
+
+def decodificar_memo(memo: str) -> Optional[dict]:
+    """
+    Decodifica um memo de certificado.
+
+    Aceita o formato v2 (compacto binário), o v1.0 (JSON completo) e o
+    formato compacto legado usado quando o memo excede o tamanho da transação.
+
+    Args:
+        memo (str): Texto do memo
+
+    Returns:
+        dict: Metadados normalizados (com doc_hash) ou None se não for um certificado
+    """
+    if isinstance(memo, str) and memo.startswith(PREFIXO_V2):
+        return _decodificar_memo_v2(memo)
+
+    try:
+        dados = json.loads(memo)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+    if not isinstance(dados, dict) or dados.get("tipo") == TIPO_REVOGACAO:
+        return None
+
+    if "doc_hash" in dados:
+        doc_hash = dados.get("doc_hash")
+    elif dados.get("tipo") == "cert" and "hash" in dados:
+        doc_hash = dados.get("hash")
+    else:
+        return None
+    if not hash_valido(doc_hash):
+        # Um memo malformado não pode chegar ao armazenamento (bytes.fromhex falharia no lote inteiro)
+        logger.warning("Memo de certificado com doc_hash inválido ignorado: %.80s", memo)
+        return None
+
+    if "doc_hash" in dados:
+        return {
+            "version": dados.get("version"),
+            "tipo": dados.get("tipo"),
+            "code": dados.get("code"),
+            "name": dados.get("name"),
+            "email": dados.get("email"),
+            "evento": dados.get("evento"),
+            "timestamp": dados.get("timestamp"),
+            "doc_hash": doc_hash,
+            "network": dados.get("network"),
+            "emissor": dados.get("emissor")
+        }
+
+    return {
+        "version": None,
+        "tipo": "cert",
+        "code": None,
+        "name": dados.get("participante"),
+        "email": None,
+        "evento": dados.get("evento"),
+        "timestamp": dados.get("timestamp"),
+        "doc_hash": doc_hash,
+        "network": None,
+        "emissor": None
+    }
+
+
+def decodificar_memos_transacao(transacao: dict) -> List[dict]:
+    """Decodifica todos os memos de certificado de uma transação"""
+    return [
+        metadados
+        for metadados in (decodificar_memo(memo) for memo in extrair_memos(transacao))
+        if metadados
+    ]
+
+
+def decodificar_revogacao(memo: str) -> Optional[dict]:
+    """
+    Decodifica um memo de revogação ("r2:" ou JSON com "tipo":"revogacao").
+
+    Args:
+        memo (str): Texto do memo
+
+    Returns:
+        dict: doc_hash, timestamp, txid (da emissão) e motivo, ou None se não for uma revogação
+    """
+    if not isinstance(memo, str):
+        return None
+    if memo.startswith(PREFIXO_REVOGACAO):
+        return _decodificar_binario(
+            memo, PREFIXO_REVOGACAO, TAGS_REVOGACAO,
+            {"doc_hash": None, "timestamp": None, "txid": None, "motivo": None}
+        )
+    if '"revogacao"' not in memo:
+        return None
+    try:
+        dados = json.loads(memo)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(dados, dict) or dados.get("tipo") != TIPO_REVOGACAO or not dados.get("doc_hash"):
+        return None
+    if not hash_valido(dados["doc_hash"]):
+        logger.warning("Memo de revogação com doc_hash inválido ignorado: %.80s", memo)
+        return None
+    return {
+        "doc_hash": dados["doc_hash"],
+        "timestamp": dados.get("timestamp"),
+        "txid": dados.get("txid"),
+        "motivo": dados.get("motivo")
+    }
+
+
+def decodificar_revogacoes_transacao(transacao: dict) -> List[dict]:
+    """Decodifica todos os memos de revogação de uma transação"""
+    return [
+        revogacao
+        for revogacao in (decodificar_revogacao(memo) for memo in extrair_memos(transacao))
+        if revogacao
+    ]
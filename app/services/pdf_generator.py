@@ -2,12 +2,25 @@
 Serviço de geração de certificados em PDF
 """
 
+import asyncio
+import logging
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from fpdf import FPDF
-from ..config import CERTIFICATE_TITLE, CERTIFICATE_ISSUER
+from typing import AsyncIterator, Iterable, Optional
 
+from ..config import get_settings
+from .pdf_template import gerar_certificado_pdf_template
+from .verificacao_pdf import modulos_qrcode, montar_metadados, url_verificacao
 
-def gerar_certificado_pdf(hash_certificado: str, txid_solana: str, nome_participante: str = "Participante", evento: str = "Evento Geral") -> bytes:
+logger = logging.getLogger(__name__)
+
+# Pool de processos compartilhado para renderização em lote
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def gerar_certificado_pdf(hash_certificado: str, txid_solana: str, nome_participante: str = "Participante", evento: str = "Evento Geral", json_canonico: Optional[str] = None) -> bytes:
     """
     Gera um certificado em PDF com as informações do hash e TXID da Solana.
     
@@ -15,21 +28,32 @@ def gerar_certificado_pdf(hash_certificado: str, txid_solana: str, nome_particip
         hash_certificado (str): Hash SHA-256 do certificado
         txid_solana (str): Transaction ID da Solana
         nome_participante (str): Nome do participante do certificado
+        json_canonico (str, opcional): JSON canonizado gravado nos metadados do PDF
         
     Returns:
         bytes: Conteúdo binário do PDF gerado
     """
     
+    # Import tardio: o FPDF só é carregado nos processos que geram PDFs
+    from fpdf import FPDF
+    settings = get_settings()
+    
     # Criar instância do PDF
     pdf = FPDF()
     pdf.add_page()
     
+    # Metadados para verificação offline (JSON canonizado, hash e TXID)
+    metadados = montar_metadados(json_canonico, hash_certificado, txid_solana, settings.solana_network)
+    pdf.set_keywords(metadados["Keywords"])
+    if "Subject" in metadados:
+        pdf.set_subject(metadados["Subject"])
+    
     # Margens personalizadas para melhor uso do espaço
     pdf.set_margins(20, 20, 20)
     
     # Header decorativo
     pdf.set_font("Helvetica", "B", 28)
-    pdf.cell(0, 15, CERTIFICATE_TITLE, ln=True, align='C')
+    pdf.cell(0, 15, settings.certificate_title, ln=True, align='C')
     pdf.ln(5)
     
     # Linha decorativa
@@ -65,6 +89,15 @@ def gerar_certificado_pdf(hash_certificado: str, txid_solana: str, nome_particip
     pdf.set_draw_color(200, 200, 200)
     pdf.rect(25, y_start, 160, 35)
     
+    # QR code com o link de verificação, à direita da caixa
+    qrcode = modulos_qrcode(url_verificacao(txid_solana, hash_certificado)) if settings.pdf_qrcode else None
+    if qrcode:
+        modulos, segmentos = qrcode
+        lado = 30 / modulos
+        pdf.set_fill_color(0, 0, 0)
+        for coluna, linha, comprimento in segmentos:
+            pdf.rect(152 + coluna * lado, y_start + 2.5 + linha * lado, comprimento * lado, lado, style="F")
+    
     # Hash SHA-256 - compacto
     pdf.set_font("Helvetica", "B", 9)
     pdf.cell(35, 6, "Hash SHA-256:", ln=False)
@@ -138,7 +171,7 @@ def gerar_certificado_pdf(hash_certificado: str, txid_solana: str, nome_particip
     
     # Emissor
     pdf.set_font("Helvetica", "I", 10)
-    pdf.cell(0, 6, f"Emitido por: {CERTIFICATE_ISSUER}", ln=True, align='C')
+    pdf.cell(0, 6, f"Emitido por: {settings.certificate_issuer}", ln=True, align='C')
     pdf.ln(8)
     
     # Instruções de verificação - mais compactas
@@ -170,6 +203,8 @@ def gerar_certificado_simples(nome_participante: str, evento: str = "Evento Gera
         bytes: Conteúdo binário do PDF gerado
     """
     
+    from fpdf import FPDF
+    
     pdf = FPDF()
     pdf.add_page()
     
@@ -192,4 +227,143 @@ def gerar_certificado_simples(nome_participante: str, evento: str = "Evento Gera
     pdf_output = pdf.output()
     if isinstance(pdf_output, str):
         return pdf_output.encode('latin-1')
-    return bytes(pdf_output)
\ No newline at end of file
+    return bytes(pdf_output)
+
+
+def obter_pool_pdf() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de renderização, criando-o sob demanda"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=get_settings().pdf_workers)
+    return _pool
+
+
+def encerrar_pool_pdf() -> None:
+    """Encerra o pool de processos de renderização, se existir"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _renderizar_item(item: dict) -> bytes:
+    """Renderiza um item do lote (executado em processo separado)"""
+    settings = get_settings()
+    if settings.pdf_mode == "template":
+        return gerar_certificado_pdf_template(
+            item["hash_sha256"],
+            item["txid_solana"],
+            item["name"],
+            item["event"],
+            item.get("network", settings.solana_network),
+            item.get("json_canonico")
+        )
+    return gerar_certificado_pdf(
+        item["hash_sha256"],
+        item["txid_solana"],
+        item["name"],
+        item["event"],
+        item.get("json_canonico")
+    )
+
+
+def nome_arquivo_pdf(item: dict) -> str:
+    """Nome do arquivo do certificado dentro do ZIP"""
+    return f"certificado_{item['hash_sha256'][:16]}.pdf"
+
+
+async def renderizar_certificado_pdf(item: dict) -> bytes:
+    """
+    Renderiza um único certificado no pool de processos, sem bloquear o event loop.
+
+    Args:
+        item (dict): Dados do certificado (hash_sha256, txid_solana, name, event)
+
+    Returns:
+        bytes: Conteúdo binário do PDF gerado
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(obter_pool_pdf(), _renderizar_item, item)
+
+
+class _BufferZip:
+    """Destino de escrita não pesquisável: acumula os bytes até serem consumidos"""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados: bytes) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self) -> None:
+        pass
+
+    def consumir(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _nome_unico(nome: str, usados: set) -> str:
+    """Acrescenta um sufixo (_2, _3...) se o nome já está no ZIP (mesmo certificado repetido no lote)"""
+    base, extensao = nome.rsplit(".", 1)
+    candidato, contador = nome, 1
+    while candidato in usados:
+        contador += 1
+        candidato = f"{base}_{contador}.{extensao}"
+    usados.add(candidato)
+    return candidato
+
+
+async def gerar_zip_certificados(itens: Iterable[dict], max_em_voo: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Renderiza um lote de certificados em paralelo e produz um ZIP em streaming.
+
+    Os PDFs são renderizados no pool de processos com uma janela limitada de
+    tarefas em andamento, e cada PDF é escrito no ZIP (sem compressão, pois o
+    PDF já é comprimido) e liberado assim que fica pronto, na ordem de entrada.
+
+    Como o status 200 já foi enviado, a falha de um item não interrompe o
+    ZIP: no lugar do PDF entra um arquivo .erro.txt com o motivo.
+
+    Args:
+        itens (Iterable[dict]): Certificados do lote (hash_sha256, txid_solana, name, event)
+        max_em_voo (int, opcional): Máximo de PDFs em renderização simultânea
+
+    Yields:
+        bytes: Pedaços do arquivo ZIP
+    """
+    loop = asyncio.get_running_loop()
+    pool = obter_pool_pdf()
+    janela = max_em_voo or get_settings().pdf_workers * 2
+    pendentes = deque()
+    buffer = _BufferZip()
+    usados: set = set()
+
+    async def escrever(zf: zipfile.ZipFile, item: dict, futuro) -> None:
+        nome = _nome_unico(nome_arquivo_pdf(item), usados)
+        try:
+            zf.writestr(nome, await futuro)
+        except Exception as e:
+            logger.error("Erro ao gerar o PDF %s do lote: %s", nome, e)
+            zf.writestr(nome.removesuffix(".pdf") + ".erro.txt", f"Erro ao gerar o PDF do certificado: {e}\n")
+
+    try:
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as zf:
+            for item in itens:
+                pendentes.append((item, loop.run_in_executor(pool, _renderizar_item, item)))
+                if len(pendentes) < janela:
+                    continue
+                await escrever(zf, *pendentes.popleft())
+                yield buffer.consumir()
+
+            while pendentes:
+                await escrever(zf, *pendentes.popleft())
+                yield buffer.consumir()
+
+        yield buffer.consumir()
+    finally:
+        # Cliente desconectou no meio do lote: descarta o que ainda não foi renderizado
+        for _, futuro in pendentes:
+            futuro.cancel()
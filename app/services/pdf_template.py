@@ -0,0 +1,414 @@
+"""
+Modo template para geração de certificados em PDF
+
+O layout estático (título, linhas decorativas, caixa, rótulos e rodapé) é
+desenhado uma única vez e mantido em cache já serializado em bytes. Cada
+certificado acrescenta apenas um pequeno fluxo de conteúdo com os campos
+variáveis (participante, evento, hash, TXID, data e rede).
+"""
+
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from ..config import get_settings
+from .verificacao_pdf import modulos_qrcode, montar_metadados, texto_pdf, url_verificacao
+
+# Página A4 em milímetros (mesmas dimensões e margens do modo completo)
+LARGURA_MM = 210.0015555555555
+ALTURA_MM = 297.0000833333333
+ESCALA = 72 / 25.4
+MARGEM = 20.0
+MARGEM_CELULA = 1.0
+
+# Fontes base (Type1, não embutidas) disponíveis no template
+FONTES = {
+    "": ("F1", "Helvetica", "helvetica"),
+    "B": ("F2", "Helvetica-Bold", "helveticaB"),
+    "I": ("F3", "Helvetica-Oblique", "helveticaI"),
+}
+
+
+def caracteres_sem_suporte(texto: str) -> str:
+    """
+    Caracteres que as fontes base do PDF não representam (fora do latin-1).
+
+    Vale para os dois modos de renderização (template e FPDF), que usam as
+    mesmas fontes Type1 não embutidas: o texto é recusado em vez de trocado.
+    """
+    return "".join(sorted({caractere for caractere in texto if ord(caractere) > 0xFF}))
+
+
+def _escapar(texto: str) -> bytes:
+    """Codifica texto para uma string literal PDF (WinAnsi); texto fora do latin-1 gera UnicodeEncodeError"""
+    dados = texto.encode("latin-1")
+    return dados.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _largura_texto(texto: str, estilo: str, tamanho: float) -> float:
+    """Largura do texto em milímetros, pelas métricas das fontes base"""
+    from fpdf.fonts import CORE_FONTS_CHARWIDTHS
+    larguras = CORE_FONTS_CHARWIDTHS[FONTES[estilo][2]]
+    return sum(larguras.get(c, 556) for c in texto) * tamanho / 1000 / ESCALA
+
+
+class _Campo:
+    """Posição reservada no layout para um campo variável"""
+
+    __slots__ = ("x", "y", "largura", "altura", "estilo", "tamanho", "alinhamento", "formato")
+
+    def __init__(self, x, y, largura, altura, estilo, tamanho, alinhamento, formato):
+        self.x = x
+        self.y = y
+        self.largura = largura
+        self.altura = altura
+        self.estilo = estilo
+        self.tamanho = tamanho
+        self.alinhamento = alinhamento
+        self.formato = formato
+
+
+class _Layout:
+    """Cursor de desenho com a mesma semântica de células do FPDF"""
+
+    def __init__(self):
+        self.x = MARGEM
+        self.y = MARGEM
+        self.estilo = ""
+        self.tamanho = 12.0
+        self.operacoes: List[bytes] = [b"2 J", b"0.57 w"]
+        self.textos: List[tuple] = []
+        self.campos: List[_Campo] = []
+        self.qrcode: Optional[Tuple[float, float, float]] = None
+
+    def fonte(self, estilo: str, tamanho: float):
+        self.estilo = estilo
+        self.tamanho = tamanho
+
+    def ln(self, altura: float):
+        self.x = MARGEM
+        self.y += altura
+
+    def _avancar(self, largura: float, altura: float, quebra: bool):
+        if quebra:
+            self.ln(altura)
+        else:
+            self.x += largura
+
+    def _largura_celula(self, largura: float) -> float:
+        return largura or (LARGURA_MM - MARGEM - self.x)
+
+    def celula(self, largura: float, altura: float, texto: str, alinhamento: str = "L", quebra: bool = False):
+        largura = self._largura_celula(largura)
+        if texto:
+            self.textos.append(
+                _posicionar_texto(self.x, self.y, largura, altura, self.estilo, self.tamanho, alinhamento, texto)
+            )
+        self._avancar(largura, altura, quebra)
+
+    def campo(self, largura: float, altura: float, formato: str, alinhamento: str = "L", quebra: bool = False):
+        largura = self._largura_celula(largura)
+        self.campos.append(
+            _Campo(self.x, self.y, largura, altura, self.estilo, self.tamanho, alinhamento, formato)
+        )
+        self._avancar(largura, altura, quebra)
+
+    def reservar_qrcode(self, x: float, margem: float, lado: float):
+        self.qrcode = (x, self.y + margem, lado)
+
+    def cor_traco(self, r: int, g: int, b: int):
+        self.operacoes.append(f"{r / 255:.4f} {g / 255:.4f} {b / 255:.4f} RG".encode())
+
+    def linha(self, x1: float, x2: float):
+        y = (ALTURA_MM - self.y) * ESCALA
+        self.operacoes.append(f"{x1 * ESCALA:.2f} {y:.2f} m {x2 * ESCALA:.2f} {y:.2f} l S".encode())
+
+    def retangulo(self, x: float, largura: float, altura: float):
+        self.operacoes.append(
+            f"{x * ESCALA:.2f} {(ALTURA_MM - self.y) * ESCALA:.2f} "
+            f"{largura * ESCALA:.2f} {-altura * ESCALA:.2f} re S".encode()
+        )
+
+
+def _posicionar_texto(x, y, largura, altura, estilo, tamanho, alinhamento, texto) -> tuple:
+    """Posição (em pontos) do texto como o conteúdo de uma célula FPDF"""
+    if alinhamento == "C":
+        tx = x + (largura - _largura_texto(texto, estilo, tamanho)) / 2
+    else:
+        tx = x + MARGEM_CELULA
+    ty = y + altura / 2 + 0.3 * tamanho / ESCALA
+    return estilo, tamanho, round(tx * ESCALA, 2), round((ALTURA_MM - ty) * ESCALA, 2), _escapar(texto)
+
+
+def _bloco_texto(textos: List[tuple]) -> bytes:
+    """
+    Serializa os textos em um único objeto BT/ET.
+
+    A fonte só é trocada quando muda e cada Td é relativo ao texto anterior,
+    o que mantém o fluxo de conteúdo curto.
+    """
+    operacoes = [b"BT"]
+    fonte_atual = None
+    px = py = 0.0
+    for estilo, tamanho, tx, ty, texto in textos:
+        if (estilo, tamanho) != fonte_atual:
+            operacoes.append(b"/%s %.2f Tf" % (FONTES[estilo][0].encode(), tamanho))
+            fonte_atual = (estilo, tamanho)
+        operacoes.append(b"%.2f %.2f Td (%s) Tj" % (tx - px, ty - py, texto))
+        px, py = tx, ty
+    operacoes.append(b"ET")
+    return b"\n".join(operacoes)
+
+
+def _desenhar_layout(c: _Layout):
+    """Layout do certificado; campos variáveis apenas reservam posição"""
+    settings = get_settings()
+
+    c.fonte("B", 28)
+    c.celula(0, 15, settings.certificate_title, "C", True)
+    c.ln(5)
+
+    c.cor_traco(50, 50, 50)
+    c.linha(30, 180)
+    c.ln(8)
+
+    c.fonte("I", 14)
+    c.celula(0, 10, "Autenticado na Blockchain Solana", "C", True)
+    c.ln(8)
+
+    c.fonte("", 16)
+    c.celula(0, 10, "Certificamos que", "C", True)
+    c.ln(3)
+
+    c.fonte("B", 22)
+    c.campo(0, 12, "{name}", "C", True)
+    c.ln(3)
+
+    c.fonte("", 14)
+    c.campo(0, 10, "participou com sucesso do evento: {event}", "C", True)
+    c.ln(12)
+
+    c.fonte("B", 13)
+    c.celula(0, 8, "AUTENTICAÇÃO BLOCKCHAIN", "C", True)
+    c.ln(5)
+
+    c.cor_traco(200, 200, 200)
+    c.retangulo(25, 160, 35)
+    c.reservar_qrcode(152, 2.5, 30)
+
+    c.fonte("B", 9)
+    c.celula(35, 6, "Hash SHA-256:")
+    c.fonte("", 8)
+    c.campo(0, 6, "{hash_1}", quebra=True)
+    c.celula(35, 6, "")
+    c.campo(0, 6, "{hash_2}", quebra=True)
+
+    c.fonte("B", 9)
+    c.celula(35, 6, "Solana TXID:")
+    c.fonte("", 8)
+    c.campo(0, 6, "{txid_1}", quebra=True)
+    c.celula(35, 6, "")
+    c.campo(0, 6, "{txid_2}", quebra=True)
+
+    c.fonte("B", 9)
+    c.celula(35, 6, "Rede:")
+    c.fonte("", 9)
+    c.campo(0, 6, "Solana {rede}", quebra=True)
+    c.ln(8)
+
+    c.fonte("B", 12)
+    c.celula(0, 8, "VERIFICAÇÃO NA BLOCKCHAIN:", "C", True)
+    c.ln(5)
+
+    c.fonte("B", 10)
+    c.celula(30, 6, "Explorer:")
+    c.fonte("", 9)
+    c.celula(0, 6, "https://explorer.solana.com/tx/", quebra=True)
+
+    c.fonte("B", 10)
+    c.celula(30, 6, "TX ID:")
+    c.fonte("", 9)
+    c.campo(0, 6, "{txid}", quebra=True)
+
+    c.fonte("B", 10)
+    c.celula(30, 6, "Cluster:")
+    c.fonte("", 9)
+    c.campo(0, 6, "{cluster}", quebra=True)
+    c.ln(10)
+
+    c.fonte("", 11)
+    c.campo(0, 6, "Emitido em: {data}", "C", True)
+    c.ln(5)
+
+    c.fonte("I", 10)
+    c.celula(0, 6, f"Emitido por: {settings.certificate_issuer}", "C", True)
+    c.ln(8)
+
+    c.fonte("", 8)
+    c.celula(0, 4, "Para verificar este certificado, acesse o Solana Explorer com o TXID acima.", "C", True)
+    c.celula(0, 4, "A autenticidade é garantida pela imutabilidade da blockchain Solana.", "C", True)
+
+    c.ln(5)
+    c.cor_traco(50, 50, 50)
+    c.linha(30, 180)
+
+
+def _operacoes_qrcode(x: float, y: float, lado: float, conteudo: str) -> bytes:
+    """Desenha o QR code como retângulos preenchidos (um por segmento horizontal)"""
+    qrcode = modulos_qrcode(conteudo)
+    if not qrcode:
+        return b""
+    modulos, segmentos = qrcode
+    m = lado / modulos * ESCALA
+    x0 = x * ESCALA
+    y0 = (ALTURA_MM - y) * ESCALA
+    operacoes = [b"0 g"]
+    operacoes += [
+        b"%.2f %.2f %.2f %.2f re" % (x0 + coluna * m, y0 - (linha + 1) * m, comprimento * m, m)
+        for coluna, linha, comprimento in segmentos
+    ]
+    operacoes.append(b"f")
+    return b"\n".join(operacoes)
+
+
+def _objeto(numero: int, corpo: bytes) -> bytes:
+    return b"%d 0 obj\n" % numero + corpo + b"\nendobj\n"
+
+
+def _objeto_stream(numero: int, conteudo: bytes, nivel: int = 6) -> bytes:
+    comprimido = zlib.compress(conteudo, nivel)
+    return _objeto(
+        numero,
+        b"<</Length %d /Filter /FlateDecode>>\nstream\n" % len(comprimido) + comprimido + b"\nendstream"
+    )
+
+
+class TemplateCertificado:
+    """Página estática pré-serializada mais a lista de campos variáveis"""
+
+    # Objetos fixos: 1 catálogo, 2 páginas, 3 página, 4-6 fontes, 7 layout estático.
+    # Por certificado: 8 conteúdo variável, 9 informações do documento.
+    OBJETO_SOBREPOSICAO = 8
+    OBJETO_INFO = 9
+
+    def __init__(self):
+        layout = _Layout()
+        _desenhar_layout(layout)
+        self.campos = layout.campos
+        self.qrcode = layout.qrcode
+
+        fontes = b" ".join(b"/%s %d 0 R" % (FONTES[e][0].encode(), 4 + i) for i, e in enumerate(FONTES))
+        objetos = [
+            b"<</Type /Catalog /Pages 2 0 R>>",
+            b"<</Type /Pages /Kids [3 0 R] /Count 1>>",
+            b"<</Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources <</Font <<%s>> >> /Contents [7 0 R 8 0 R]>>"
+            % (LARGURA_MM * ESCALA, ALTURA_MM * ESCALA, fontes),
+        ]
+        objetos += [
+            b"<</Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding>>" % FONTES[e][1].encode()
+            for e in FONTES
+        ]
+
+        partes = [b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"]
+        self.offsets: List[int] = []
+        for numero, corpo in enumerate(objetos, start=1):
+            self.offsets.append(sum(map(len, partes)))
+            partes.append(_objeto(numero, corpo))
+        self.offsets.append(sum(map(len, partes)))
+        # Compressão máxima: o custo é pago uma única vez por processo
+        estatico = b"\n".join(layout.operacoes) + b"\n" + _bloco_texto(layout.textos)
+        partes.append(_objeto_stream(7, estatico, 9))
+        self.prefixo = b"".join(partes)
+
+    def _sobreposicao(self, valores: Dict[str, str], qrcode: Optional[str]) -> bytes:
+        conteudo = _bloco_texto([
+            _posicionar_texto(
+                campo.x, campo.y, campo.largura, campo.altura,
+                campo.estilo, campo.tamanho, campo.alinhamento,
+                campo.formato.format(**valores)
+            )
+            for campo in self.campos
+        ])
+        if qrcode and self.qrcode:
+            conteudo += b"\n" + _operacoes_qrcode(*self.qrcode, qrcode)
+        return conteudo
+
+    def _info(self, info: Dict[str, str]) -> bytes:
+        entradas = b" ".join(b"/%s %s" % (chave.encode(), texto_pdf(valor)) for chave, valor in info.items())
+        return b"<<" + entradas + b">>"
+
+    def renderizar(self, valores: Dict[str, str], info: Optional[Dict[str, str]] = None, qrcode: Optional[str] = None) -> bytes:
+        """Monta o PDF final: prefixo em cache + sobreposição + xref"""
+        partes = [self.prefixo]
+        offsets = list(self.offsets)
+        tamanho = len(self.prefixo)
+
+        for numero, corpo in (
+            (self.OBJETO_SOBREPOSICAO, _objeto_stream(self.OBJETO_SOBREPOSICAO, self._sobreposicao(valores, qrcode))),
+            (self.OBJETO_INFO, _objeto(self.OBJETO_INFO, self._info(info or {}))),
+        ):
+            offsets.append(tamanho)
+            partes.append(corpo)
+            tamanho += len(corpo)
+
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)]
+        xref += [b"%010d 00000 n \n" % offset for offset in offsets]
+        partes += xref
+        partes.append(
+            b"trailer\n<</Size %d /Root 1 0 R /Info %d 0 R>>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(offsets) + 1, self.OBJETO_INFO, tamanho)
+        )
+        return b"".join(partes)
+
+
+@lru_cache(maxsize=1)
+def obter_template() -> TemplateCertificado:
+    """Template construído uma única vez por processo"""
+    return TemplateCertificado()
+
+
+def _dividir(texto: str, tamanho: int = 32) -> Tuple[str, str]:
+    return texto[:tamanho], texto[tamanho:]
+
+
+def gerar_certificado_pdf_template(hash_certificado: str, txid_solana: str, nome_participante: str = "Participante", evento: str = "Evento Geral", rede: str = "devnet", json_canonico: Optional[str] = None) -> bytes:
+    """
+    Gera um certificado em PDF preenchendo apenas os campos variáveis do template.
+
+    Args:
+        hash_certificado (str): Hash SHA-256 do certificado
+        txid_solana (str): Transaction ID da Solana
+        nome_participante (str): Nome do participante do certificado
+        evento (str): Nome do evento
+        rede (str): Rede Solana onde o certificado foi registrado
+        json_canonico (str, opcional): JSON canonizado gravado nos metadados do PDF
+
+    Returns:
+        bytes: Conteúdo binário do PDF gerado
+    """
+    settings = get_settings()
+    agora = datetime.now()
+    hash_1, hash_2 = _dividir(hash_certificado)
+    txid_1, txid_2 = _dividir(txid_solana)
+
+    valores = {
+        "name": nome_participante,
+        "event": evento,
+        "hash_1": hash_1,
+        "hash_2": hash_2,
+        "txid_1": txid_1,
+        "txid_2": txid_2,
+        "txid": txid_solana,
+        "rede": rede.title(),
+        "cluster": rede,
+        "data": agora.strftime("%d/%m/%Y às %H:%M:%S"),
+    }
+    info = {
+        "Title": f"{settings.certificate_title} - {nome_participante}",
+        "Producer": settings.certificate_issuer,
+        "CreationDate": agora.strftime("D:%Y%m%d%H%M%S"),
+        **montar_metadados(json_canonico, hash_certificado, txid_solana, rede),
+    }
+    qrcode = url_verificacao(txid_solana, hash_certificado) if settings.pdf_qrcode else None
+    return obter_template().renderizar(valores, info, qrcode)
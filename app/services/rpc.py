@@ -0,0 +1,152 @@
+"""
+Chamadas JSON-RPC diretas ao nó Solana (individuais e em lote)
+
+As chamadas ao RPC padrão (SOLANA_URL) passam por um disjuntor: depois de
+rpc_breaker_failures falhas seguidas ele abre e as chamadas falham na hora
+(RPCIndisponivelError) em vez de esperar o timeout; após rpc_breaker_reset
+segundos uma única chamada de teste é liberada e, se der certo, o circuito
+fecha de novo.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from typing import List, Optional, Tuple
+
+from ..config import get_settings
+
+
+class RPCIndisponivelError(ConnectionError):
+    """O disjuntor do RPC está aberto"""
+
+
+class DisjuntorRPC:
+    """Disjuntor (circuit breaker) das chamadas ao RPC"""
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, falhas_para_abrir: int = 5, tempo_aberto: float = 30):
+        self.falhas_para_abrir = falhas_para_abrir
+        self.tempo_aberto = tempo_aberto
+        self.estado = self.FECHADO
+        self.falhas_consecutivas = 0
+        self.aberto_em = 0.0
+        self.ultimo_sucesso: Optional[float] = None
+        self.ultima_falha: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def permite(self) -> bool:
+        """Indica se uma chamada pode ser feita agora (no estado meio aberto, apenas uma)"""
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return True
+            # Aberto há tempo suficiente (ou chamada de teste sem resultado): libera uma chamada de teste
+            if time.monotonic() - self.aberto_em >= self.tempo_aberto:
+                self.estado = self.MEIO_ABERTO
+                self.aberto_em = time.monotonic()
+                return True
+            return False
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self.estado = self.FECHADO
+            self.falhas_consecutivas = 0
+            self.ultimo_sucesso = time.time()
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            self.falhas_consecutivas += 1
+            self.ultima_falha = time.time()
+            if self.estado == self.MEIO_ABERTO or self.falhas_consecutivas >= self.falhas_para_abrir:
+                self.estado = self.ABERTO
+                self.aberto_em = time.monotonic()
+
+
+_disjuntor: Optional[DisjuntorRPC] = None
+
+
+def obter_disjuntor() -> DisjuntorRPC:
+    """Retorna o disjuntor do RPC padrão, criado na primeira chamada"""
+    global _disjuntor
+    if _disjuntor is None:
+        settings = get_settings()
+        _disjuntor = DisjuntorRPC(settings.rpc_breaker_failures, settings.rpc_breaker_reset)
+    return _disjuntor
+
+
+def _post(payload, url: Optional[str] = None):
+    settings = get_settings()
+    disjuntor = obter_disjuntor() if url is None else None
+    if disjuntor is not None and not disjuntor.permite():
+        raise RPCIndisponivelError(f"RPC indisponível ({disjuntor.falhas_consecutivas} falhas seguidas); circuito aberto")
+
+    json_data = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(
+        url or settings.solana_url,
+        data=json_data,
+        headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=settings.rpc_timeout) as response:
+            dados = json.loads(response.read().decode('utf-8'))
+    except Exception:
+        if disjuntor is not None:
+            disjuntor.registrar_falha()
+        raise
+    if disjuntor is not None:
+        disjuntor.registrar_sucesso()
+    return dados
+
+
+def rpc_call(metodo: str, params: list, url: Optional[str] = None) -> dict:
+    """
+    Executa uma chamada JSON-RPC.
+
+    Args:
+        metodo (str): Método RPC (ex.: getTransaction)
+        params (list): Parâmetros do método
+        url (str, opcional): URL do RPC (padrão: SOLANA_URL)
+
+    Returns:
+        dict: Resposta completa (com "result" ou "error")
+    """
+    return _post({"jsonrpc": "2.0", "id": 1, "method": metodo, "params": params}, url)
+
+
+def rpc_batch(chamadas: List[Tuple[str, list]], url: Optional[str] = None) -> List[dict]:
+    """
+    Executa várias chamadas JSON-RPC em uma única requisição HTTP.
+
+    Args:
+        chamadas (list): Lista de (método, parâmetros)
+        url (str, opcional): URL do RPC (padrão: SOLANA_URL)
+
+    Returns:
+        list: Respostas na mesma ordem das chamadas
+    """
+    if not chamadas:
+        return []
+    payload = [
+        {"jsonrpc": "2.0", "id": i, "method": metodo, "params": params}
+        for i, (metodo, params) in enumerate(chamadas)
+    ]
+    respostas = _post(payload, url)
+    if isinstance(respostas, dict):
+        # Alguns provedores respondem ao lote inteiro com um único erro
+        return [respostas] * len(chamadas)
+    por_id = {resposta.get("id"): resposta for resposta in respostas}
+    return [por_id.get(i, {"error": "sem resposta"}) for i in range(len(chamadas))]
+
+
+async def rpc_call_async(metodo: str, params: list, url: Optional[str] = None) -> dict:
+    """Versão assíncrona de rpc_call (executa em thread)"""
+    return await asyncio.to_thread(rpc_call, metodo, params, url)
+
+
+async def rpc_batch_async(chamadas: List[Tuple[str, list]], url: Optional[str] = None) -> List[dict]:
+    """Versão assíncrona de rpc_batch (executa em thread)"""
+    return await asyncio.to_thread(rpc_batch, chamadas, url)
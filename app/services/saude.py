@@ -0,0 +1,159 @@
+"""
+Monitor de saúde da aplicação (liveness e readiness)
+
+Os probes (/health/live e /health/ready) não fazem chamadas de rede: apenas
+leem o estado mantido por uma tarefa em segundo plano, que a cada
+health_interval segundos consulta o RPC (getLatestBlockhash e getBalance da
+carteira pagadora). Os valores obtidos também aquecem os caches de blockhash
+e saldo do registro, de modo que as requisições de registro não precisam
+buscá-los.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from ..config import get_settings
+from .agendador import obter_agendador
+from .blockchain import obter_registry
+from .rpc import DisjuntorRPC, obter_disjuntor, rpc_call_async
+
+logger = logging.getLogger(__name__)
+
+
+def _idade(momento: Optional[float]) -> Optional[float]:
+    return round(time.time() - momento, 3) if momento else None
+
+
+class MonitorSaude:
+    """Estado de saúde atualizado em segundo plano"""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.iniciado_em = time.time()
+        self.ultima_verificacao: Optional[float] = None
+        self.blockhash_em: Optional[float] = None
+        self.saldo_lamports: Optional[int] = None
+        self.saldo_em: Optional[float] = None
+        self.versao_no: Optional[str] = None
+        self.erro: Optional[str] = None
+
+    async def verificar(self) -> None:
+        """Consulta o RPC e atualiza o estado (e os caches de blockhash e saldo do registro)"""
+        registry = obter_registry()
+        if registry.simulado:
+            self._verificar_simulado(registry)
+            return
+        try:
+            resposta = await rpc_call_async("getLatestBlockhash", [{"commitment": "confirmed"}])
+            blockhash = resposta["result"]["value"]["blockhash"]
+            registry.estado.definir(f"blockhash:{registry.network}", blockhash, ttl=self.settings.blockhash_ttl)
+            self.blockhash_em = time.time()
+
+            if registry.keypair:
+                resposta = await rpc_call_async("getBalance", [str(registry.keypair.pubkey())])
+                self.saldo_lamports = resposta["result"]["value"]
+                registry.estado.definir(registry._chave_saldo(), str(self.saldo_lamports), ttl=self.settings.balance_ttl)
+                self.saldo_em = time.time()
+
+            if self.versao_no is None:
+                resposta = await rpc_call_async("getVersion", [])
+                self.versao_no = resposta["result"]["solana-core"]
+            self.erro = None
+        except Exception as e:
+            self.erro = f"{type(e).__name__}: {e}"
+            logger.warning("Verificação de saúde falhou: %s", self.erro)
+        finally:
+            self.ultima_verificacao = time.time()
+
+    def _verificar_simulado(self, registry) -> None:
+        """Com o livro-razão simulado não há RPC: blockhash e saldo vêm do próprio simulador"""
+        ledger = registry.ledger
+        registry.estado.definir(
+            f"blockhash:{registry.network}",
+            str(ledger.get_latest_blockhash().value.blockhash),
+            ttl=self.settings.blockhash_ttl
+        )
+        self.saldo_lamports = ledger.get_balance(registry.keypair.pubkey()).value
+        registry.estado.definir(registry._chave_saldo(), str(self.saldo_lamports), ttl=self.settings.balance_ttl)
+        obter_disjuntor().registrar_sucesso()
+        self.blockhash_em = self.saldo_em = self.ultima_verificacao = time.time()
+        self.versao_no = "simulado"
+        self.erro = None
+
+    async def executar_periodicamente(self, intervalo: float) -> None:
+        """Laço da tarefa em segundo plano (iniciada no lifespan da aplicação)"""
+        while True:
+            await self.verificar()
+            await asyncio.sleep(intervalo)
+
+    def vivo(self) -> dict:
+        return {
+            "status": "vivo",
+            "uptime_s": round(time.time() - self.iniciado_em, 3),
+            "ultima_verificacao_s": _idade(self.ultima_verificacao)
+        }
+
+    def prontidao(self) -> dict:
+        """
+        Avalia se a instância pode receber registros, a partir do estado em memória.
+
+        Returns:
+            dict: "pronto" (bool) e o resultado de cada verificação
+        """
+        settings = self.settings
+        disjuntor = obter_disjuntor()
+        registry = obter_registry()
+        pendentes = obter_agendador().pendentes()
+
+        idade_rpc = _idade(disjuntor.ultimo_sucesso)
+        idade_blockhash = _idade(self.blockhash_em)
+        # Na devnet o saldo baixo é resolvido com airdrop; nas demais redes impede o registro
+        saldo_obrigatorio = registry.network != "devnet"
+        saldo_ok = (
+            not saldo_obrigatorio
+            or (self.saldo_lamports is not None and self.saldo_lamports >= registry.SALDO_MINIMO_LAMPORTS)
+        )
+
+        verificacoes = {
+            "rpc": {
+                "ok": disjuntor.estado != DisjuntorRPC.ABERTO
+                      and idade_rpc is not None and idade_rpc <= settings.health_max_rpc_age,
+                "ultimo_sucesso_s": idade_rpc,
+                "disjuntor": disjuntor.estado,
+                "falhas_consecutivas": disjuntor.falhas_consecutivas
+            },
+            "blockhash": {
+                "ok": idade_blockhash is not None and idade_blockhash <= settings.health_max_blockhash_age,
+                "idade_s": idade_blockhash
+            },
+            "carteira": {
+                "ok": registry.keypair is not None and saldo_ok,
+                "saldo_lamports": self.saldo_lamports,
+                "idade_s": _idade(self.saldo_em),
+                "saldo_obrigatorio": saldo_obrigatorio
+            },
+            "fila_envios": {
+                "ok": pendentes < settings.health_max_outbox,
+                "pendentes": pendentes,
+                "limite": settings.health_max_outbox
+            }
+        }
+        return {
+            "pronto": all(verificacao["ok"] for verificacao in verificacoes.values()),
+            "verificacoes": verificacoes,
+            "ultima_verificacao_s": _idade(self.ultima_verificacao),
+            "erro": self.erro
+        }
+
+
+_monitor: Optional[MonitorSaude] = None
+
+
+def obter_monitor() -> MonitorSaude:
+    """Retorna o monitor de saúde, criado na primeira chamada"""
+    global _monitor
+    if _monitor is None:
+        _monitor = MonitorSaude()
+    return _monitor
@@ -0,0 +1,504 @@
+"""
+Armazenamento local de certificados (SQLite)
+
+Guarda os certificados registrados por esta API e os indexados a partir do
+histórico da carteira emissora, além dos checkpoints do indexador.
+
+Consultas por hash passam primeiro por um filtro de Bloom (hashes
+desconhecidos são rejeitados sem acessar o disco) e por um cache LRU em
+memória dos registros já lidos.
+
+O commitment em que cada certificado foi confirmado fica gravado, de modo
+que uma confirmação rápida ("confirmed") pode ser promovida a "finalized"
+numa verificação posterior. Registros confirmados sem commitment gravado
+(de versões anteriores ou do indexador) são finalizados.
+
+Os certificados de um evento são listados em ordem de emissão (time, uuid)
+por paginação keyset: cada página continua a partir da chave da última linha
+da anterior, numa busca direta no índice (event, ordem_time, ordem_uuid),
+sem o custo crescente de OFFSET. As colunas de ordenação são geradas
+(virtuais) para que certificados conhecidos só pelo indexador, sem time e
+uuid, também entrem na listagem.
+
+Revogações ficam na tabela revogacoes e, em memória, num conjunto com os
+hashes revogados (32 bytes cada), carregado na abertura: saber se um
+certificado foi revogado é uma consulta O(1), sem disco nem RPC. Um filtro de
+Bloom não serve aqui, porque um falso positivo daria como revogado um
+certificado válido.
+
+Com vários workers, cada processo mantém seu próprio filtro, cache e conjunto
+de revogações; as gravações dos demais são detectadas por PRAGMA
+data_version e incorporadas (por rowid) antes de cada consulta.
+"""
+
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from ..config import get_settings
+from .bloom import BloomFilter
+from .memo import hash_valido
+
+logger = logging.getLogger(__name__)
+
+COLUNAS = (
+    "doc_hash", "txid", "uuid", "event", "code", "name", "email", "time",
+    "network", "origem", "confirmado", "slot", "block_time", "registrado_em", "commitment"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificados (
+    doc_hash TEXT PRIMARY KEY,
+    txid TEXT,
+    uuid TEXT,
+    event TEXT,
+    code TEXT,
+    name TEXT,
+    email TEXT,
+    time TEXT,
+    network TEXT,
+    origem TEXT NOT NULL,
+    confirmado INTEGER NOT NULL DEFAULT 0,
+    slot INTEGER,
+    block_time INTEGER,
+    registrado_em REAL NOT NULL,
+    commitment TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_certificados_txid ON certificados (txid);
+CREATE INDEX IF NOT EXISTS idx_certificados_code ON certificados (code);
+
+CREATE TABLE IF NOT EXISTS revogacoes (
+    doc_hash TEXT PRIMARY KEY,
+    txid TEXT,
+    txid_original TEXT,
+    motivo TEXT,
+    origem TEXT NOT NULL,
+    revogado_em REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS auditoria (
+    doc_hash TEXT PRIMARY KEY,
+    txid TEXT,
+    status TEXT NOT NULL,
+    detalhe TEXT,
+    auditado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_auditoria_status ON auditoria (status, auditado_em);
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Chave de ordenação da listagem por evento (sem NULLs, para a comparação keyset)
+_COLUNAS_ORDEM = {
+    "ordem_time": "IFNULL(time, '')",
+    "ordem_uuid": "IFNULL(uuid, doc_hash)"
+}
+
+_SELECIONAR = ", ".join(COLUNAS)
+
+COLUNAS_REVOGACAO = ("doc_hash", "txid", "txid_original", "motivo", "origem", "revogado_em")
+
+# Certificados auditáveis: com TXID e já confirmados ou registrados há algum tempo
+_AUDITAVEL = "txid IS NOT NULL AND (confirmado = 1 OR registrado_em <= ?)"
+
+
+# Novo commitment de um registro, sem rebaixar um já finalizado
+_PROMOVER_COMMITMENT = (
+    "CASE WHEN certificados.commitment = 'finalized' "
+    "OR (certificados.confirmado = 1 AND certificados.commitment IS NULL) THEN 'finalized' "
+    "ELSE COALESCE({novo}, certificados.commitment) END"
+)
+
+
+def nivel_confirmacao(registro: dict) -> Optional[str]:
+    """Commitment em que o certificado foi confirmado (None se ainda não foi)"""
+    if not registro.get("confirmado"):
+        return None
+    return registro.get("commitment") or "finalized"
+
+
+class CertificateStore:
+    """Armazenamento de certificados com índice por hash, código e evento"""
+
+    def __init__(self, caminho: Path):
+        settings = get_settings()
+        self.caminho = Path(caminho)
+        self.tamanho_cache = settings.store_cache_size
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        with self._lock:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+            self._conexao.executescript(_SCHEMA)
+            colunas = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(certificados)")}
+            if "commitment" not in colunas:
+                self._conexao.execute("ALTER TABLE certificados ADD COLUMN commitment TEXT")
+            colunas = {linha[1] for linha in self._conexao.execute("PRAGMA table_xinfo(certificados)")}
+            for coluna, expressao in _COLUNAS_ORDEM.items():
+                if coluna not in colunas:
+                    self._conexao.execute(
+                        f"ALTER TABLE certificados ADD COLUMN {coluna} TEXT "
+                        f"GENERATED ALWAYS AS ({expressao}) VIRTUAL"
+                    )
+            self._conexao.execute("DROP INDEX IF EXISTS idx_certificados_event")
+            self._conexao.execute(
+                "CREATE INDEX IF NOT EXISTS idx_certificados_evento_ordem "
+                "ON certificados (event, ordem_time, ordem_uuid)"
+            )
+
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self.bloom = BloomFilter(settings.bloom_capacity, settings.bloom_error_rate)
+        self._ultimo_rowid = 0
+        self.revogados: Set[bytes] = set()
+        self._ultimo_rowid_revogacao = 0
+        self._versao = None
+        with self._lock:
+            self._sincronizar_outros_processos()
+
+    def _sincronizar_outros_processos(self) -> None:
+        """Incorpora ao filtro e ao cache as gravações de outras conexões (chamar com o lock)"""
+        versao = self._conexao.execute("PRAGMA data_version").fetchone()[0]
+        if versao == self._versao:
+            return
+        if self._versao is not None:
+            self._cache.clear()
+        self._versao = versao
+        for rowid, doc_hash in self._conexao.execute(
+            "SELECT rowid, doc_hash FROM certificados WHERE rowid > ? ORDER BY rowid",
+            (self._ultimo_rowid,)
+        ):
+            self.bloom.adicionar(doc_hash)
+            self._ultimo_rowid = rowid
+        for rowid, doc_hash in self._conexao.execute(
+            "SELECT rowid, doc_hash FROM revogacoes WHERE rowid > ? ORDER BY rowid",
+            (self._ultimo_rowid_revogacao,)
+        ):
+            self.revogados.add(bytes.fromhex(doc_hash))
+            self._ultimo_rowid_revogacao = rowid
+
+    def salvar(self, registros: Iterable[dict]) -> int:
+        """
+        Insere ou atualiza certificados.
+
+        Campos ausentes (None) não sobrescrevem valores já conhecidos. Em um
+        certificado registrado por esta API (origem "registro"), os dados de
+        outras origens (o indexador) só preenchem as colunas vazias, como slot
+        e block_time: evento, código e demais dados do registro são mantidos.
+
+        Args:
+            registros (Iterable[dict]): Certificados (doc_hash obrigatório)
+
+        Returns:
+            int: Quantidade de registros gravados
+        """
+        linhas = []
+        agora = time.time()
+        for registro in registros:
+            linha = {coluna: registro.get(coluna) for coluna in COLUNAS}
+            linha["origem"] = linha["origem"] or "registro"
+            linha["confirmado"] = int(bool(linha["confirmado"]))
+            linha["registrado_em"] = linha["registrado_em"] or agora
+            linhas.append(linha)
+
+        atualizacoes = ", ".join(
+            f"{coluna} = CASE WHEN certificados.origem = 'registro' AND excluded.origem <> 'registro' "
+            f"THEN COALESCE(certificados.{coluna}, excluded.{coluna}) "
+            f"ELSE COALESCE(excluded.{coluna}, certificados.{coluna}) END"
+            for coluna in COLUNAS
+            if coluna not in ("doc_hash", "origem", "confirmado", "registrado_em", "commitment")
+        )
+        sql = (
+            f"INSERT INTO certificados ({', '.join(COLUNAS)}) "
+            f"VALUES ({', '.join(':' + coluna for coluna in COLUNAS)}) "
+            f"ON CONFLICT(doc_hash) DO UPDATE SET {atualizacoes}, "
+            f"confirmado = MAX(certificados.confirmado, excluded.confirmado), "
+            f"commitment = {_PROMOVER_COMMITMENT.format(novo='excluded.commitment')}"
+        )
+        with self._lock, self._conexao:
+            self._conexao.executemany(sql, linhas)
+            for linha in linhas:
+                self.bloom.adicionar(linha["doc_hash"])
+                self._cache.pop(linha["doc_hash"], None)
+        return len(linhas)
+
+    def pode_conter(self, doc_hash: str) -> bool:
+        """Consulta o filtro de Bloom: False garante que o hash não está no armazenamento"""
+        with self._lock:
+            self._sincronizar_outros_processos()
+        return doc_hash.lower() in self.bloom
+
+    def buscar_por_hash(self, doc_hash: str) -> Optional[dict]:
+        """Busca um certificado pelo hash SHA-256 do JSON canonizado"""
+        doc_hash = doc_hash.lower()
+        with self._lock:
+            self._sincronizar_outros_processos()
+            if doc_hash not in self.bloom:
+                return None
+
+            registro = self._cache.get(doc_hash)
+            if registro is not None:
+                self._cache.move_to_end(doc_hash)
+                return dict(registro)
+
+            linha = self._conexao.execute(
+                f"SELECT {_SELECIONAR} FROM certificados WHERE doc_hash = ?", (doc_hash,)
+            ).fetchone()
+            if not linha:
+                return None
+
+            registro = dict(linha)
+            self._cache[doc_hash] = registro
+            if len(self._cache) > self.tamanho_cache:
+                self._cache.popitem(last=False)
+        return dict(registro)
+
+    def marcar_confirmado(
+        self,
+        doc_hash: str,
+        slot: Optional[int] = None,
+        block_time: Optional[int] = None,
+        commitment: str = "finalized"
+    ) -> None:
+        """Marca um certificado como confirmado na blockchain, no commitment informado"""
+        doc_hash = doc_hash.lower()
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "UPDATE certificados SET confirmado = 1, "
+                f"commitment = {_PROMOVER_COMMITMENT.format(novo='?')}, "
+                "slot = COALESCE(?, slot), block_time = COALESCE(?, block_time) WHERE doc_hash = ?",
+                (commitment, slot, block_time, doc_hash)
+            )
+            self._cache.pop(doc_hash, None)
+
+    def buscar_por_codigo(self, code: str) -> List[dict]:
+        """Busca certificados pelo código do certificado"""
+        with self._lock:
+            linhas = self._conexao.execute(
+                f"SELECT {_SELECIONAR} FROM certificados WHERE code = ?", (code.lower(),)
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def buscar_por_evento(
+        self,
+        event: str,
+        limite: int = 100,
+        apos: Optional[Tuple[str, str]] = None
+    ) -> List[dict]:
+        """
+        Busca certificados de um evento, em ordem de emissão (time, uuid).
+
+        Args:
+            event (str): Nome do evento
+            limite (int): Máximo de certificados retornados
+            apos (tuple, opcional): Chave (ordem_time, ordem_uuid) do último
+                certificado da página anterior; a busca continua depois dela
+
+        Returns:
+            List[dict]: Certificados, cada um com sua chave de ordenação
+        """
+        sql = f"SELECT {_SELECIONAR}, ordem_time, ordem_uuid FROM certificados WHERE event = ?"
+        parametros: list = [event.lower()]
+        if apos is not None:
+            sql += " AND (ordem_time, ordem_uuid) > (?, ?)"
+            parametros += list(apos)
+        sql += " ORDER BY ordem_time, ordem_uuid LIMIT ?"
+        parametros.append(limite)
+        with self._lock:
+            linhas = self._conexao.execute(sql, parametros).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def buscar_por_txid(self, txid: str) -> List[dict]:
+        """Busca os certificados gravados em uma transação"""
+        with self._lock:
+            linhas = self._conexao.execute(
+                f"SELECT {_SELECIONAR} FROM certificados WHERE txid = ?", (txid,)
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def salvar_revogacoes(self, registros: Iterable[dict]) -> int:
+        """
+        Grava revogações (doc_hash obrigatório); uma revogação já gravada é mantida.
+
+        Args:
+            registros (Iterable[dict]): Revogações com doc_hash, txid (da
+                revogação), txid_original, motivo e origem
+
+        Returns:
+            int: Quantidade de revogações novas
+        """
+        agora = time.time()
+        linhas = []
+        for registro in registros:
+            # Uma linha inválida é descartada; abortar o lote travaria a sincronização do indexador
+            if not hash_valido(registro.get("doc_hash")):
+                logger.warning("Revogação com doc_hash inválido ignorada (txid %s)", registro.get("txid"))
+                continue
+            linhas.append({
+                **{coluna: registro.get(coluna) for coluna in COLUNAS_REVOGACAO},
+                "doc_hash": registro["doc_hash"].lower(),
+                "origem": registro.get("origem") or "revogacao",
+                "revogado_em": registro.get("revogado_em") or agora
+            })
+        with self._lock, self._conexao:
+            antes = self._conexao.total_changes
+            self._conexao.executemany(
+                f"INSERT OR IGNORE INTO revogacoes ({', '.join(COLUNAS_REVOGACAO)}) "
+                f"VALUES ({', '.join(':' + coluna for coluna in COLUNAS_REVOGACAO)})",
+                linhas
+            )
+            novas = self._conexao.total_changes - antes
+            for linha in linhas:
+                self.revogados.add(bytes.fromhex(linha["doc_hash"]))
+        return novas
+
+    def revogado(self, doc_hash: str) -> bool:
+        """Indica se o certificado foi revogado (consulta ao conjunto em memória)"""
+        with self._lock:
+            self._sincronizar_outros_processos()
+        try:
+            return bytes.fromhex(doc_hash) in self.revogados
+        except ValueError:
+            return False
+
+    def buscar_revogacao(self, doc_hash: str) -> Optional[dict]:
+        """Dados da revogação de um certificado (None se não foi revogado)"""
+        if not self.revogado(doc_hash):
+            return None
+        with self._lock:
+            linha = self._conexao.execute(
+                f"SELECT {', '.join(COLUNAS_REVOGACAO)} FROM revogacoes WHERE doc_hash = ?", (doc_hash.lower(),)
+            ).fetchone()
+        return dict(linha) if linha else None
+
+    def pagina_auditoria(self, apos_rowid: int, limite: int, registrado_ate: float) -> List[dict]:
+        """
+        Próximos certificados auditáveis em ordem de rowid (varredura).
+
+        Args:
+            apos_rowid (int): Rowid do último certificado já auditado
+            limite (int): Máximo de certificados
+            registrado_ate (float): Certificados não confirmados só entram se
+                registrados até este instante
+
+        Returns:
+            List[dict]: Certificados, cada um com seu rowid
+        """
+        with self._lock:
+            linhas = self._conexao.execute(
+                f"SELECT rowid, {_SELECIONAR} FROM certificados WHERE rowid > ? AND {_AUDITAVEL} "
+                "ORDER BY rowid LIMIT ?",
+                (apos_rowid, registrado_ate, limite)
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def amostra_auditoria(self, quantidade: int, registrado_ate: float, aleatorio=None) -> List[dict]:
+        """
+        Amostra de certificados auditáveis, por rowids sorteados (sem ORDER BY RANDOM()).
+
+        Args:
+            quantidade (int): Tamanho máximo da amostra
+            registrado_ate (float): Ver pagina_auditoria
+            aleatorio (random.Random, opcional): Gerador dos sorteios
+
+        Returns:
+            List[dict]: Certificados distintos
+        """
+        aleatorio = aleatorio or random
+        with self._lock:
+            maximo = self._conexao.execute("SELECT MAX(rowid) FROM certificados").fetchone()[0]
+            if not maximo:
+                return []
+            amostra = {}
+            for _ in range(quantidade * 2):
+                linha = self._conexao.execute(
+                    f"SELECT rowid, {_SELECIONAR} FROM certificados WHERE rowid >= ? AND {_AUDITAVEL} "
+                    "ORDER BY rowid LIMIT 1",
+                    (aleatorio.randint(1, maximo), registrado_ate)
+                ).fetchone()
+                if linha is not None:
+                    amostra[linha["rowid"]] = dict(linha)
+                if len(amostra) >= quantidade:
+                    break
+        return list(amostra.values())
+
+    def salvar_auditoria(self, resultados: Iterable[dict]) -> None:
+        """Grava o último resultado da auditoria de cada certificado (doc_hash, txid, status, detalhe)"""
+        agora = time.time()
+        with self._lock, self._conexao:
+            self._conexao.executemany(
+                "INSERT INTO auditoria (doc_hash, txid, status, detalhe, auditado_em) "
+                "VALUES (:doc_hash, :txid, :status, :detalhe, :auditado_em) "
+                "ON CONFLICT(doc_hash) DO UPDATE SET txid = excluded.txid, status = excluded.status, "
+                "detalhe = excluded.detalhe, auditado_em = excluded.auditado_em",
+                [{"detalhe": None, "auditado_em": agora, **resultado} for resultado in resultados]
+            )
+
+    def resumo_auditoria(self) -> dict:
+        """Quantidade de certificados por status da última auditoria"""
+        with self._lock:
+            return dict(self._conexao.execute("SELECT status, COUNT(*) FROM auditoria GROUP BY status").fetchall())
+
+    def listar_auditoria(self, status: str, limite: int = 100) -> List[dict]:
+        """Resultados de auditoria com o status informado, dos mais recentes aos mais antigos"""
+        with self._lock:
+            linhas = self._conexao.execute(
+                "SELECT doc_hash, txid, status, detalhe, auditado_em FROM auditoria "
+                "WHERE status = ? ORDER BY auditado_em DESC LIMIT ?",
+                (status, limite)
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def contar(self) -> int:
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM certificados").fetchone()[0]
+
+    def obter_checkpoint(self, chave: str) -> Optional[str]:
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT valor FROM checkpoints WHERE chave = ?", (chave,)
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def salvar_checkpoint(self, chave: str, valor: Optional[str]) -> None:
+        with self._lock, self._conexao:
+            if valor is None:
+                self._conexao.execute("DELETE FROM checkpoints WHERE chave = ?", (chave,))
+            else:
+                self._conexao.execute(
+                    "INSERT INTO checkpoints (chave, valor) VALUES (?, ?) "
+                    "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+                    (chave, valor)
+                )
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+
+_store: Optional[CertificateStore] = None
+
+
+def obter_store() -> CertificateStore:
+    """Retorna o armazenamento local, abrindo-o sob demanda"""
+    global _store
+    if _store is None:
+        _store = CertificateStore(get_settings().certificate_store_path)
+    return _store
+
+
+def fechar_store() -> None:
+    """Fecha o armazenamento local; a próxima chamada a obter_store() o reabre"""
+    global _store
+    if _store is not None:
+        _store.fechar()
+        _store = None
@@ -0,0 +1,195 @@
+"""
+Serviço de verificação offline de certificados em PDF
+
+Cada PDF carrega um QR code apontando para a rota de verificação e, nos
+metadados do documento (dicionário Info), o JSON canonizado, o hash SHA-256
+e o TXID. Os metadados são lidos direto da estrutura do arquivo, sem
+renderizar a página.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import segno
+    SEGNO_AVAILABLE = True
+except ImportError:
+    SEGNO_AVAILABLE = False
+    logger.warning("Biblioteca segno não instalada. PDFs serão gerados sem QR code.")
+
+
+def url_verificacao(txid: str, doc_hash: Optional[str] = None) -> str:
+    """URL de verificação do certificado (GET /certificados/verify/{txid}?hash=...)"""
+    url = f"{get_settings().public_base_url}/certificados/verify/{txid}"
+    return f"{url}?hash={doc_hash}" if doc_hash else url
+
+
+def modulos_qrcode(conteudo: str) -> Optional[Tuple[int, List[Tuple[int, int, int]]]]:
+    """
+    Gera o QR code e agrupa os módulos escuros em segmentos horizontais.
+
+    A máscara é fixa para evitar a avaliação das oito máscaras possíveis,
+    que domina o custo de geração.
+
+    Args:
+        conteudo (str): Conteúdo do QR code
+
+    Returns:
+        tuple: (lado em módulos, lista de (coluna, linha, comprimento)) ou None sem segno
+    """
+    if not SEGNO_AVAILABLE:
+        return None
+
+    matriz = segno.make_qr(conteudo, error="m", mask=0, boost_error=False).matrix
+    segmentos = []
+    for linha, valores in enumerate(matriz):
+        inicio = None
+        for coluna, escuro in enumerate(valores):
+            if escuro and inicio is None:
+                inicio = coluna
+            elif not escuro and inicio is not None:
+                segmentos.append((inicio, linha, coluna - inicio))
+                inicio = None
+        if inicio is not None:
+            segmentos.append((inicio, linha, len(valores) - inicio))
+    return len(matriz), segmentos
+
+
+def montar_metadados(json_canonico: Optional[str], hash_certificado: str, txid: str, rede: str) -> Dict[str, str]:
+    """
+    Monta as entradas de metadados (Subject/Keywords) do PDF.
+
+    Args:
+        json_canonico (str, opcional): JSON canonizado do certificado
+        hash_certificado (str): Hash SHA-256 do JSON canonizado
+        txid (str): Transaction ID da Solana
+        rede (str): Rede Solana
+
+    Returns:
+        dict: Entradas do dicionário Info
+    """
+    metadados = {"Keywords": f"doc_hash:{hash_certificado} txid:{txid} network:{rede}"}
+    if json_canonico:
+        metadados["Subject"] = json_canonico
+    return metadados
+
+
+def texto_pdf(valor: str) -> bytes:
+    """Serializa texto como string PDF: literal se ASCII, UTF-16BE em hex caso contrário"""
+    if valor.isascii():
+        return b"(" + valor.encode("ascii").replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+    return b"<feff" + valor.encode("utf-16-be").hex().encode() + b">"
+
+
+_ESCAPES = {ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t", ord("b"): b"\b", ord("f"): b"\f"}
+
+
+def _ler_literal(dados: bytes, pos: int) -> Tuple[bytes, int]:
+    """Lê uma string literal PDF a partir do '(' em pos"""
+    saida = bytearray()
+    nivel = 1
+    pos += 1
+    while pos < len(dados):
+        c = dados[pos]
+        if c == 0x5C:  # barra invertida
+            pos += 1
+            if pos >= len(dados):
+                raise ValueError("String literal truncada após a barra invertida")
+            e = dados[pos]
+            if e in _ESCAPES:
+                saida += _ESCAPES[e]
+            elif 0x30 <= e <= 0x37:
+                octal = re.match(rb"[0-7]{1,3}", dados[pos:pos + 3]).group()
+                saida.append(int(octal, 8) & 0xFF)
+                pos += len(octal) - 1
+            elif e not in (0x0A, 0x0D):
+                saida.append(e)
+        elif c == 0x28:
+            nivel += 1
+            saida.append(c)
+        elif c == 0x29:
+            nivel -= 1
+            if nivel == 0:
+                return bytes(saida), pos + 1
+            saida.append(c)
+        else:
+            saida.append(c)
+        pos += 1
+    raise ValueError("String literal não terminada")
+
+
+def _decodificar_texto(bruto: bytes) -> str:
+    if bruto.startswith(b"\xfe\xff"):
+        return bruto[2:].decode("utf-16-be")
+    return bruto.decode("latin-1")
+
+
+def _ler_dicionario_info(corpo: bytes) -> Dict[str, str]:
+    """Lê as entradas de texto de um dicionário Info"""
+    entradas = {}
+    pos = corpo.find(b"<<") + 2
+    while True:
+        nome = re.compile(rb"/([A-Za-z0-9_.#-]+)\s*").search(corpo, pos)
+        if not nome:
+            return entradas
+        pos = nome.end()
+        if corpo[pos:pos + 1] == b"(":
+            bruto, pos = _ler_literal(corpo, pos)
+        elif corpo[pos:pos + 1] == b"<" and corpo[pos:pos + 2] != b"<<":
+            fim = corpo.index(b">", pos)
+            bruto = bytes.fromhex(re.sub(rb"\s", b"", corpo[pos + 1:fim]).decode())
+            pos = fim + 1
+        else:
+            continue
+        entradas[nome.group(1).decode()] = _decodificar_texto(bruto)
+
+
+def extrair_metadados_pdf(pdf: bytes) -> Dict[str, str]:
+    """
+    Extrai os metadados de verificação de um PDF de certificado.
+
+    Args:
+        pdf (bytes): Conteúdo do PDF
+
+    Returns:
+        dict: json_canonico, doc_hash, txid e network
+
+    Raises:
+        ValueError: Se o arquivo não for um PDF de certificado válido
+    """
+    if not pdf.startswith(b"%PDF"):
+        raise ValueError("Arquivo não é um PDF")
+
+    referencia = None
+    for referencia in re.finditer(rb"/Info\s+(\d+)\s+(\d+)\s+R", pdf):
+        pass
+    if referencia is None:
+        raise ValueError("PDF sem dicionário de informações")
+
+    inicio = None
+    padrao = rb"(?<![0-9])%s\s+%s\s+obj" % (referencia.group(1), referencia.group(2))
+    for inicio in re.finditer(padrao, pdf):
+        pass
+    if inicio is None:
+        raise ValueError("Dicionário de informações não encontrado")
+
+    corpo = pdf[inicio.end():pdf.index(b"endobj", inicio.end())]
+    info = _ler_dicionario_info(corpo)
+
+    campos = dict(
+        item.split(":", 1) for item in info.get("Keywords", "").split() if ":" in item
+    )
+    if "doc_hash" not in campos or "txid" not in campos or "Subject" not in info:
+        raise ValueError("PDF sem metadados de verificação do certificado")
+
+    return {
+        "json_canonico": info["Subject"],
+        "doc_hash": campos["doc_hash"],
+        "txid": campos["txid"],
+        "network": campos.get("network"),
+    }
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark da auditoria: consultas em lote x individuais e efeito no tráfego
+dos usuários com e sem orçamento de RPC
+
+Sobe um RPC simulado (HTTP local) com 20 ms de latência por requisição e um
+limite de taxa do provedor (LIMITE_PROVEDOR chamadas getTransaction por
+segundo, somando as de um lote; acima dele responde 429). O armazenamento
+temporário tem N certificados, 4 por transação.
+
+- vazão: certificados auditados por segundo com lotes de 1 e de 20
+  transações por requisição (sem orçamento);
+- interferência: durante DURACAO_S segundos, um "usuário" faz 10
+  verificações por segundo enquanto a auditoria roda sem orçamento e com
+  AUDIT_RPC_RATE=10; mede a fração de chamadas do usuário recusadas (429).
+
+Uso:
+    python benchmarks/bench_auditoria.py [certificados]
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base58
+
+from app.config import Settings
+from app.services.auditoria import AuditorCertificados
+from app.services.ledger import SolanaLedger
+from app.services.memo import MEMO_PROGRAM_ID
+from app.services.rpc import DisjuntorRPC, rpc_call
+from app.services.store import CertificateStore
+
+LATENCIA_S = 0.020
+LIMITE_PROVEDOR = 40
+DURACAO_S = 5
+POR_TRANSACAO = 4
+
+_memos = {}
+_limite = {"fichas": LIMITE_PROVEDOR, "atualizado": time.monotonic(), "lock": threading.Lock()}
+
+
+def _consumir(quantidade: int) -> bool:
+    with _limite["lock"]:
+        agora = time.monotonic()
+        _limite["fichas"] = min(LIMITE_PROVEDOR, _limite["fichas"] + (agora - _limite["atualizado"]) * LIMITE_PROVEDOR)
+        _limite["atualizado"] = agora
+        if _limite["fichas"] < quantidade:
+            return False
+        _limite["fichas"] -= quantidade
+        return True
+
+
+def _transacao(txid: str) -> dict:
+    memos = _memos.get(txid)
+    if memos is None:
+        return None
+    return {
+        "slot": 1, "blockTime": 0, "meta": {"err": None, "logMessages": []},
+        "transaction": {"signatures": [txid], "message": {
+            "accountKeys": ["pagador", MEMO_PROGRAM_ID],
+            "instructions": [{"programIdIndex": 1, "data": base58.b58encode(m.encode()).decode()} for m in memos]
+        }}
+    }
+
+
+class RPCSimulado(BaseHTTPRequestHandler):
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        pedido = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        pedidos = pedido if isinstance(pedido, list) else [pedido]
+        time.sleep(LATENCIA_S)
+        if not _consumir(len(pedidos)):
+            self.send_response(429)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        respostas = [{"jsonrpc": "2.0", "id": p["id"], "result": _transacao(p["params"][0])} for p in pedidos]
+        corpo = json.dumps(respostas if isinstance(pedido, list) else respostas[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+def _popular(store: CertificateStore, total: int) -> None:
+    registros = []
+    for i in range(total):
+        doc_hash = hashlib.sha256(str(i).encode()).hexdigest()
+        txid = f"tx{i // POR_TRANSACAO}"
+        _memos.setdefault(txid, []).append(json.dumps({"version": "1.0", "doc_hash": doc_hash}))
+        registros.append({"doc_hash": doc_hash, "txid": txid, "confirmado": True})
+    store.salvar(registros)
+
+
+async def _vazao(url: str, store: CertificateStore, total: int, lote: int) -> float:
+    settings = Settings(audit_per_round=total, audit_batch_size=lote, audit_rpc_rate=1e9, audit_rpc_url=url, audit_min_age=0)
+    auditor = AuditorCertificados(store, SolanaLedger(url), DisjuntorRPC(), settings)
+    inicio = time.perf_counter()
+    resultado = await auditor.auditar()
+    return resultado["auditados"] / (time.perf_counter() - inicio)
+
+
+def _usuario(url: str, parar: threading.Event, contagem: dict) -> None:
+    while not parar.is_set():
+        try:
+            rpc_call("getTransaction", ["tx0", {"encoding": "json"}], url)
+            contagem["ok"] += 1
+        except Exception:
+            contagem["recusadas"] += 1
+        time.sleep(0.1)
+
+
+async def _interferencia(url: str, store: CertificateStore, taxa: float) -> tuple:
+    settings = Settings(
+        audit_per_round=100000, audit_batch_size=20, audit_rpc_rate=taxa, audit_rpc_url=url,
+        audit_min_age=0, audit_yield_interval=0
+    )
+    auditor = AuditorCertificados(store, SolanaLedger(url), DisjuntorRPC(), settings)
+    await asyncio.sleep(1)  # bucket do provedor cheio
+    contagem = {"ok": 0, "recusadas": 0}
+    parar = threading.Event()
+    usuario = threading.Thread(target=_usuario, args=(url, parar, contagem))
+    usuario.start()
+    tarefa = asyncio.create_task(auditor.auditar())
+    await asyncio.sleep(DURACAO_S)
+    tarefa.cancel()
+    parar.set()
+    usuario.join()
+    auditados = auditor.status["consultas_rpc"] * POR_TRANSACAO
+    return contagem["recusadas"] / max(1, contagem["ok"] + contagem["recusadas"]), auditados / DURACAO_S
+
+
+async def main(total: int) -> None:
+    # Os 429 da auditoria sem orçamento são esperados aqui
+    logging.getLogger("app.services.auditoria").setLevel(logging.ERROR)
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), RPCSimulado)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_port}"
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        store = CertificateStore(Path(diretorio) / "certificados.db")
+        _popular(store, total)
+
+        global LIMITE_PROVEDOR
+        limite, LIMITE_PROVEDOR = LIMITE_PROVEDOR, 10 ** 9
+        print(f"{'lote':>6} {'cert/s':>8}")
+        for lote in (1, 20):
+            print(f"{lote:>6} {await _vazao(url, store, min(total, 400 * lote), lote):>8.0f}")
+        LIMITE_PROVEDOR = limite
+        _limite["fichas"] = LIMITE_PROVEDOR
+
+        print(f"\nProvedor com limite de {LIMITE_PROVEDOR} getTransaction/s; usuário a 10 verificações/s")
+        print(f"{'orçamento':>12} {'usuário 429':>12} {'auditoria cert/s':>17}")
+        for nome, taxa in (("sem", 1e9), ("10/s", 10)):
+            recusadas, vazao = await _interferencia(url, store, taxa)
+            print(f"{nome:>12} {recusadas:>11.0%} {vazao:>17.0f}")
+        store.fechar()
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
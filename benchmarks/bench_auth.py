@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark do middleware de API key: custo por requisição
+
+Compara o middleware antigo (função em BaseHTTPMiddleware, uma chave em
+os.environ) com o APIKeyMiddleware em ASGI puro, chamando a pilha ASGI
+diretamente (sem rede) sobre um endpoint vazio. Também mede a requisição
+sem nenhum middleware, como referência.
+
+Uso:
+    python benchmarks/bench_auth.py [requisicoes] [chaves]
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.middleware import auth as auth_module
+from app.middleware.auth import APIKeyMiddleware, ChaveAPI, ControleAcesso
+
+
+async def middleware_antigo(request: Request, call_next):
+    """Cópia do middleware anterior, para referência"""
+    public_routes = ["/health", "/docs", "/redoc", "/openapi.json"]
+    if request.url.path in public_routes:
+        return await call_next(request)
+    valid_api_key = os.getenv("API_KEY")
+    if not valid_api_key:
+        return await call_next(request)
+    provided_api_key = request.headers.get("x-api-key")
+    if not provided_api_key or provided_api_key != valid_api_key:
+        return JSONResponse(status_code=401, content={"detail": "Invalid API Key"})
+    return await call_next(request)
+
+
+def criar_app(tipo: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if tipo == "antigo":
+        app.middleware("http")(middleware_antigo)
+    elif tipo == "asgi":
+        app.add_middleware(APIKeyMiddleware)
+    return app
+
+
+async def medir(app, requisicoes: int, chave: bytes) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/ping", "raw_path": b"/ping",
+        "root_path": "", "query_string": b"", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(b"host", b"bench"), (b"x-api-key", chave)],
+    }
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    async def chamar():
+        mensagens = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            # Depois do corpo, o cliente só "desconecta" quando a resposta termina
+            if mensagens:
+                return mensagens.pop()
+            await asyncio.Event().wait()
+
+        await app(dict(scope), receive, send)
+
+    for _ in range(200):  # aquecimento
+        await chamar()
+    status.clear()
+
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        await chamar()
+    duracao = time.perf_counter() - inicio
+    assert set(status) == {200}, set(status)
+    return duracao / requisicoes
+
+
+if __name__ == "__main__":
+    requisicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    total_chaves = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    chave = b"segredo-0"
+    os.environ["API_KEY"] = chave.decode()
+    auth_module._controle = ControleAcesso([
+        ChaveAPI(f"cliente-{i}", hashlib.sha256(f"segredo-{i}".encode()).digest(), 0)
+        for i in range(total_chaves)
+    ])
+
+    base = asyncio.run(medir(criar_app("nenhum"), requisicoes, chave))
+    print(f"{'sem middleware':<28} {base * 1e6:8.1f} us/req")
+    for tipo, nome in (("antigo", "BaseHTTPMiddleware (antigo)"), ("asgi", f"ASGI puro ({total_chaves} chaves)")):
+        duracao = asyncio.run(medir(criar_app(tipo), requisicoes, chave))
+        print(f"{nome:<28} {duracao * 1e6:8.1f} us/req  (+{(duracao - base) * 1e6:6.1f} us)")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latência de envio e de verificação por nível de commitment
+
+Sobe um RPC simulado (HTTP local) e mede, com o cliente solana-py real:
+
+- envio: latência do sendTransaction para cada combinação de skipPreflight
+  e preflightCommitment (a simulação prévia custa mais quanto mais alto o
+  commitment, porque o banco do nó está mais atrás);
+- verificação: tempo desde o envio até a primeira verificação bem-sucedida
+  (_verificar_por_txid, consultando a cada 20 ms) em "confirmed" e em
+  "finalized".
+
+As latências do RPC simulado seguem a proporção da devnet em escala 1/10
+(confirmação em ~0,06 s, finalização em ~1,3 s).
+
+Uso:
+    python benchmarks/bench_commitment.py [envios_por_combinacao]
+"""
+
+import asyncio
+import base64
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import base58
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENVIO_S = 0.010
+SIMULACAO_S = {"processed": 0.015, "confirmed": 0.020, "finalized": 0.030}
+CONSULTA_S = 0.005
+VISIVEL_APOS_S = {"confirmed": 0.06, "finalized": 1.3}
+
+_transacoes = {}
+
+
+class RPCSimulado(BaseHTTPRequestHandler):
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        pedido = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        resultado = getattr(self, "_" + pedido["method"])(pedido["params"])
+        corpo = json.dumps({"jsonrpc": "2.0", "id": pedido["id"], "result": resultado}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _getLatestBlockhash(self, params):
+        from solders.hash import Hash
+        time.sleep(CONSULTA_S)
+        return {"context": {"slot": 1}, "value": {"blockhash": str(Hash.new_unique()), "lastValidBlockHeight": 150}}
+
+    def _getBalance(self, params):
+        return {"context": {"slot": 1}, "value": 5_000_000_000}
+
+    def _sendTransaction(self, params):
+        from solders.transaction import VersionedTransaction
+        opcoes = params[1]
+        time.sleep(ENVIO_S + (0 if opcoes.get("skipPreflight") else SIMULACAO_S[opcoes["preflightCommitment"]]))
+        transacao = VersionedTransaction.from_bytes(base64.b64decode(params[0]))
+        mensagem = transacao.message
+        _transacoes[str(transacao.signatures[0])] = (time.monotonic(), {
+            "slot": 1,
+            "blockTime": int(time.time()),
+            "transaction": {"message": {
+                "accountKeys": [str(chave) for chave in mensagem.account_keys],
+                "instructions": [
+                    {"programIdIndex": instrucao.program_id_index, "data": base58.b58encode(bytes(instrucao.data)).decode()}
+                    for instrucao in mensagem.instructions
+                ]
+            }}
+        })
+        return str(transacao.signatures[0])
+
+    def _getTransaction(self, params):
+        time.sleep(CONSULTA_S)
+        enviada, transacao = _transacoes.get(params[0], (None, None))
+        commitment = params[1].get("commitment", "finalized")
+        if enviada is None or time.monotonic() - enviada < VISIVEL_APOS_S[commitment]:
+            return None
+        return transacao
+
+
+def _ms(valores):
+    return f"p50 {statistics.median(valores) * 1000:7.1f} ms  max {max(valores) * 1000:7.1f} ms"
+
+
+async def main(envios):
+    from app.config import get_settings
+    from app.routes.certificados import CertificadoVerificacao, _verificar_por_txid
+    from app.services.blockchain import OpcoesEnvio, SolanaCertificateRegistry
+    from app.services.estado import MemoryState
+
+    registry = SolanaCertificateRegistry(settings=get_settings(), estado=MemoryState())
+    dados = CertificadoVerificacao(
+        event="evento", uuid="u", name="nome", email="e@x", certificate_code="1", time="2025-01-01 00:00:00"
+    )
+
+    print("Envio (sendTransaction):")
+    for skip in (False, True):
+        for commitment in ("processed", "confirmed", "finalized"):
+            if skip and commitment != "finalized":
+                continue
+            opcoes = OpcoesEnvio(skip_preflight=skip, preflight_commitment=commitment, max_retries=0)
+            duracoes = []
+            for i in range(envios):
+                inicio = time.perf_counter()
+                await registry.register_certificate(f"{i:064x}", "Nome", "Evento", str(i), "e@x", opcoes)
+                duracoes.append(time.perf_counter() - inicio)
+            rotulo = "skipPreflight" if skip else f"preflight {commitment}"
+            print(f"  {rotulo:<22} {_ms(duracoes)}")
+
+    print("Verificação (envio até a primeira resposta encontrada):")
+    for commitment in ("confirmed", "finalized"):
+        duracoes = []
+        for i in range(max(3, envios // 10)):
+            inicio = time.perf_counter()
+            txid = await registry.register_certificate(f"{i:064x}", "Nome", "Evento", str(i), "e@x", OpcoesEnvio(True))
+            while (await _verificar_por_txid(txid, dados, commitment))["status"] != "encontrado":
+                await asyncio.sleep(0.02)
+            duracoes.append(time.perf_counter() - inicio)
+        print(f"  {commitment:<22} {_ms(duracoes)}")
+    await registry.parar_pipeline()
+
+
+if __name__ == "__main__":
+    envios = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), RPCSimulado)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        "SOLANA_URL": f"http://127.0.0.1:{servidor.server_port}",
+        "STATE_BACKEND": "memoria",
+        "WALLET_CONFIGURED": "false",
+        "REQUIRE_MANUAL_SETUP": "false"
+    })
+    asyncio.run(main(envios))
+    servidor.shutdown()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark do empacotamento de memos em transações
+
+Gera memos de certificado reais (_create_metadata), nos formatos JSON v1.0 e
+compacto v2, e compara um memo por transação com o empacotamento first-fit
+decreasing do registro: transações, certificados por transação, taxa por
+certificado e tempo de planejamento. Os tamanhos usados são os da transação
+serializada. Também mede o tempo de decodificação de cada formato.
+
+Uso:
+    python benchmarks/bench_empacotamento.py [certificados]
+"""
+
+import hashlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("STATE_BACKEND", "memoria")
+
+from solders.keypair import Keypair
+
+from app.config import Settings
+from app.services.blockchain import SolanaCertificateRegistry
+from app.services.estado import MemoryState
+from app.services.memo import decodificar_memo
+
+NOMES = ["Ana Souza", "David Richard Miranda da Silva", "Maria Eduarda Albuquerque Figueiredo", "Li Wei"]
+EVENTOS = ["PythonFloripa 25/10/2025", "Semana Acadêmica de Engenharia de Software da UFSC 2025"]
+
+
+def relatorio(nome, certificados, grupos, taxa, duracao=None):
+    transacoes = len(grupos)
+    tempo = f"  planejamento {duracao * 1000:7.2f} ms" if duracao is not None else ""
+    print(
+        f"{nome:<26} {transacoes:6d} transações  {certificados / transacoes:5.2f} cert/tx  "
+        f"{taxa * transacoes / certificados:7.0f} lamports/cert{tempo}"
+    )
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    aleatorio = random.Random(42)
+
+    settings = Settings(require_manual_setup=False, wallet_configured=False, state_backend="memoria")
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    registry.keypair = Keypair()
+
+    taxa = registry.TAXA_ESTIMADA_LAMPORTS
+    participantes = [
+        (hashlib.sha256(str(i).encode()).hexdigest(), aleatorio.choice(NOMES), aleatorio.choice(EVENTOS),
+         f"{aleatorio.randrange(10 ** 12)}", "participante@exemplo.com")
+        for i in range(total)
+    ]
+
+    for formato in ("json", "compacto"):
+        registry.settings.memo_format = formato
+        memos = [registry._create_metadata(*participante).encode("utf-8") for participante in participantes]
+
+        inicio = time.perf_counter()
+        for memo in memos:
+            decodificar_memo(memo.decode("utf-8"))
+        decodificacao = (time.perf_counter() - inicio) / total
+        print(f"\n[{formato}] {sum(map(len, memos)) / total:.0f} bytes por memo, decodificação {decodificacao * 1e6:.1f} us")
+
+        relatorio("um memo por transação", total, [[i] for i in range(total)], taxa)
+        for maximo in (4, 16):
+            registry.settings.pack_max_memos = maximo
+            inicio = time.perf_counter()
+            grupos = registry.planejar_transacoes(memos)
+            duracao = time.perf_counter() - inicio
+            relatorio(f"empacotado (máx. {maximo})", total, grupos, taxa, duracao)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark da listagem de certificados por evento: cursor (keyset) x OFFSET
+
+Grava um evento com muitos certificados (vários por segundo, como numa
+importação) e mede o tempo de uma página no início, no meio e no fim da
+listagem:
+
+- keyset: buscar_por_evento a partir da chave da página anterior;
+- offset: a mesma consulta com OFFSET, que percorre todas as linhas puladas.
+
+Uso:
+    python benchmarks/bench_eventos.py [certificados] [por_pagina]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.store import _SELECIONAR, CertificateStore
+
+REPETICOES = 20
+
+
+def _medir(funcao) -> float:
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main(total: int, por_pagina: int) -> None:
+    store = CertificateStore(os.path.join(tempfile.mkdtemp(), "certificados.db"))
+    inicio = time.perf_counter()
+    lote = 20000
+    for base in range(0, total, lote):
+        store.salvar(
+            {
+                "doc_hash": f"{i:064x}", "txid": f"{i:088d}", "uuid": f"{(i * 7919) % total:032x}",
+                "event": "evento grande", "code": f"c-{i}", "name": f"Pessoa {i}",
+                # 1000 certificados por segundo
+                "time": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1700000000 + i // 1000))
+            }
+            for i in range(base, min(base + lote, total))
+        )
+    # Outro evento no mesmo índice
+    store.salvar({"doc_hash": f"f{i:063x}", "event": "outro", "time": "2025-01-01"} for i in range(total // 10))
+    print(f"{total} certificados gravados em {time.perf_counter() - inicio:.1f}s; página de {por_pagina}")
+
+    # Chaves de início de cada página, percorrendo o evento inteiro pelo cursor
+    chaves, apos = [], None
+    while True:
+        chaves.append(apos)
+        linhas = store.buscar_por_evento("evento grande", por_pagina, apos)
+        if len(linhas) < por_pagina:
+            break
+        apos = (linhas[-1]["ordem_time"], linhas[-1]["ordem_uuid"])
+
+    sql_offset = (
+        f"SELECT {_SELECIONAR} FROM certificados WHERE event = ? "
+        "ORDER BY ordem_time, ordem_uuid LIMIT ? OFFSET ?"
+    )
+
+    print(f"{'posição':>10} {'keyset ms':>10} {'offset ms':>10}")
+    for fracao in (0, 0.5, 0.99):
+        pagina = int((len(chaves) - 1) * fracao)
+        keyset = _medir(lambda: store.buscar_por_evento("evento grande", por_pagina, chaves[pagina]))
+        offset = _medir(lambda: [dict(linha) for linha in store._conexao.execute(
+            sql_offset, ("evento grande", por_pagina, pagina * por_pagina)
+        )])
+        print(f"{pagina * por_pagina:>10} {keyset:>10.2f} {offset:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 300000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    )
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos arquivos do frontend: StaticFiles + gzip a cada requisição x
+variantes pré-comprimidas na inicialização
+
+Para main.js, mede (chamando a aplicação ASGI diretamente, sem rede):
+
+- estaticos: StaticFiles do Starlette lendo o arquivo do disco, comprimido
+  pelo GZipMiddleware a cada requisição;
+- pre-comprimido: rota /assets com a variante gzip já pronta na memória;
+- 304: a mesma rota com If-None-Match do ETag atual.
+
+Uso:
+    python benchmarks/bench_frontend.py [requisicoes]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from starlette.staticfiles import StaticFiles
+
+from app.config import get_settings
+from app.middleware import GZipMiddleware
+from app.routes.frontend import router
+from app.services.frontend import Frontend, obter_frontend
+
+
+async def _requisitar(app, caminho: str, headers: dict) -> tuple:
+    recebido = {"status": None, "bytes": 0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            recebido["status"] = message["status"]
+        else:
+            recebido["bytes"] += len(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": caminho, "raw_path": caminho.encode(), "query_string": b"",
+        "root_path": "", "server": ("teste", 80), "client": ("teste", 1),
+        "headers": [(chave.lower().encode(), valor.encode()) for chave, valor in headers.items()]
+    }
+    await app(scope, receive, send)
+    return recebido["status"], recebido["bytes"]
+
+
+async def _medir(app, caminho: str, headers: dict, total: int) -> tuple:
+    status, tamanho = await _requisitar(app, caminho, headers)
+    inicio = time.perf_counter()
+    for _ in range(total):
+        await _requisitar(app, caminho, headers)
+    return (time.perf_counter() - inicio) / total * 1e6, status, tamanho
+
+
+async def main(total: int) -> None:
+    diretorio = get_settings().frontend_dir
+
+    inicio = time.perf_counter()
+    Frontend(diretorio)
+    print(f"Carga e compressão na inicialização: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    estaticos = FastAPI()
+    estaticos.mount("/static", StaticFiles(directory=diretorio))
+    pre_comprimido = FastAPI()
+    pre_comprimido.include_router(router)
+
+    caminho = obter_frontend().nomes["js/main.js"]
+    gzip = {"Accept-Encoding": "gzip"}
+    etag = obter_frontend().obter(caminho).variantes["gzip"].headers["ETag"]
+
+    casos = [
+        ("estaticos", GZipMiddleware(estaticos), "/static/js/main.js", gzip),
+        ("pre-comprimido", GZipMiddleware(pre_comprimido), caminho, gzip),
+        ("304", GZipMiddleware(pre_comprimido), caminho, {**gzip, "If-None-Match": etag})
+    ]
+    print(f"{'caso':>16} {'us/req':>8} {'status':>7} {'bytes':>7}")
+    for nome, app, rota, headers in casos:
+        por_requisicao, status, tamanho = await _medir(app, rota, headers, total)
+        print(f"{nome:>16} {por_requisicao:>8.1f} {status:>7} {tamanho:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark da importação em lote: throughput e pico de memória x tamanho do arquivo
+
+O registro na blockchain é substituído por um stub; o benchmark mede a
+leitura incremental, a validação, o hash e a emissão dos resultados NDJSON.
+
+Uso:
+    python benchmarks/bench_import.py [linhas ...]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("STATE_BACKEND", "memoria")
+
+from app.routes import certificados as certificados_module
+from app.routes.importacao import _processar
+from app.services import store as store_module
+from app.services.importacao import ler_registros
+
+
+async def _registrar_stub(certificado_hash, *args):
+    return "5" * 88
+
+
+async def _arquivo_csv(linhas, tamanho_parte=64 * 1024):
+    """Gera o CSV em partes, sem montá-lo inteiro na memória"""
+    buffer = bytearray(b"name,event,email,certificate_code\n")
+    for i in range(linhas):
+        buffer += f"Participante {i},Evento,p{i}@exemplo.com,c-{i}\n".encode()
+        if len(buffer) >= tamanho_parte:
+            yield bytes(buffer)
+            buffer.clear()
+    yield bytes(buffer)
+
+
+async def importar(linhas):
+    bytes_saida = 0
+    registros = ler_registros(_arquivo_csv(linhas), "csv", 64 * 1024)
+    async for parte in _processar(registros, 50, None):
+        bytes_saida += len(parte)
+    return bytes_saida
+
+
+if __name__ == "__main__":
+    tamanhos = [int(n) for n in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    certificados_module.registrar_hash_solana = _registrar_stub
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in tamanhos:
+            store_module._store = store_module.CertificateStore(os.path.join(diretorio, f"{linhas}.db"))
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            saida = asyncio.run(importar(linhas))
+            duracao = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            store_module.fechar_store()
+            print(
+                f"{linhas:>8} linhas  {linhas / duracao:8.0f} linhas/s  "
+                f"pico {pico / 1024:8.0f} KiB  saida {saida / 1024:8.0f} KiB"
+            )
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark do job em lote com progresso em SSE x consulta periódica do status
+
+Registra um lote de certificados (envio à blockchain simulado com latência
+fixa) e, enquanto o job roda, mede:
+
+- SSE: uma única requisição; escritas e bytes do stream, com o resultado de
+  cada certificado;
+- polling: GET do status a cada intervalo, que traz apenas as contagens.
+
+Uso:
+    python benchmarks/bench_jobs.py [certificados] [latencia_ms] [intervalo_polling_ms]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("STATE_BACKEND", "memoria")
+
+from app.routes import certificados as certificados_module
+from app.routes.certificados import CertificadoRequest
+from app.routes.jobs import _executar, _registrar_item, _transmitir
+from app.services import store as store_module
+from app.services.jobs import obter_jobs
+
+
+async def main(total, latencia, intervalo):
+    async def registrar(certificado_hash, *args):
+        await asyncio.sleep(latencia)
+        return "5" * 88
+
+    certificados_module.registrar_hash_solana = registrar
+
+    job = obter_jobs().criar("registro", total, "anonimo")
+    lote = [
+        CertificadoRequest(name=f"Participante {i}", event="Evento", email=f"p{i}@exemplo.com", certificate_code=str(i))
+        for i in range(total)
+    ]
+    tarefas = [(lambda i=i, c=c: _registrar_item(job, i, c, None, None)) for i, c in enumerate(lote)]
+
+    async def consumir_sse():
+        escritas = bytes_ = 0
+        async for parte in _transmitir(job, 0, 15):
+            escritas += 1
+            bytes_ += len(parte)
+        return escritas, bytes_
+
+    async def consultar():
+        requisicoes = bytes_ = 0
+        while not job.concluido:
+            requisicoes += 1
+            bytes_ += len(json.dumps(job.resumo()))
+            await asyncio.sleep(intervalo)
+        return requisicoes, bytes_
+
+    inicio = time.perf_counter()
+    _, (escritas, bytes_sse), (requisicoes, bytes_polling) = await asyncio.gather(
+        _executar(job, tarefas), consumir_sse(), consultar()
+    )
+    duracao = time.perf_counter() - inicio
+
+    print(f"{total} certificados em {duracao:.2f} s ({total / duracao:.0f} cert/s), {len(job.eventos)} eventos")
+    print(f"SSE:     1 requisição, {escritas} escritas, {bytes_sse / 1024:.0f} KiB (resultado de cada certificado)")
+    print(f"polling: {requisicoes} requisições a cada {intervalo * 1000:.0f} ms, {bytes_polling / 1024:.1f} KiB (apenas contagens)")
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    intervalo = (float(sys.argv[3]) if len(sys.argv) > 3 else 500) / 1000
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        store_module._store = store_module.CertificateStore(os.path.join(diretorio, "certificados.db"))
+        asyncio.run(main(total, latencia, intervalo))
+        store_module.fechar_store()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark do custo dos logs na thread que atende a requisição: formatação e
+gravação síncronas x fila com formatação preguiçosa e amostragem
+
+Simula as linhas emitidas em um registro de certificado (envio, tamanho do
+memo, TXID, hash e a linha de acesso) e mede o tempo gasto por quem chama:
+
+- antes: f-strings e print, StreamHandler gravando na própria thread (o
+  debug do memo é montado mesmo com LOG_LEVEL=INFO);
+- fila: logs preguiçosos com extra={"tipo": ...}, formatados em JSON pela
+  thread de gravação;
+- fila + amostragem: o mesmo com LOG_SAMPLE_RATES mantendo 1% das linhas de
+  acesso e de registro.
+
+Cada caso roda com dois destinos: /dev/null e um destino lento (cada write
+leva 100 us, como um pipe cheio ou um coletor de logs sob carga). "total"
+inclui o tempo até a thread de gravação esvaziar a fila.
+
+Uso:
+    python benchmarks/bench_logs.py [registros]
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Settings
+from app.services.logs import configurar_logs, contexto_log, encerrar_logs
+
+logger = logging.getLogger("app.bench")
+TXID = "5" * 88
+HASH = "ab" * 32
+MEMO = "x" * 420
+
+
+def _antes(i: int, destino) -> None:
+    logger.info(f"Enviando transação com {1} certificado(s) para Solana devnet...")
+    logger.debug(f"Tamanho do memo: {len(MEMO.encode('utf-8'))} bytes")
+    logger.info(f"Certificado registrado - TXID: {TXID}")
+    print(f"Certificado hash: {HASH}", file=destino)
+    logger.info(f"POST /certificados/register 200 req-{i}")
+
+
+def _depois(i: int, destino) -> None:
+    token = contexto_log.set({"request_id": f"req-{i}", "metodo": "POST", "rota": "/certificados/register"})
+    logger.info("Enviando transação com %d certificado(s) para Solana %s", 1, "devnet", extra={"tipo": "envio", "certificados": 1})
+    logger.debug("Tamanho do memo: %d bytes", len(MEMO))
+    logger.info("Certificado registrado - TXID: %s", TXID, extra={"tipo": "registro", "txid": TXID})
+    logger.debug("Certificado hash: %s", HASH)
+    logger.info("%s %s %d", "POST", "/certificados/register", 200, extra={"tipo": "requisicao", "status": 200, "latencia_ms": 1.0})
+    contexto_log.reset(token)
+
+
+class DestinoLento:
+    """Destino em que cada escrita bloqueia por alguns microssegundos"""
+
+    def __init__(self, atraso: float):
+        self.atraso = atraso
+
+    def write(self, texto: str) -> int:
+        time.sleep(self.atraso)
+        return len(texto)
+
+    def flush(self) -> None:
+        pass
+
+
+def _medir(funcao, total: int, destino) -> float:
+    inicio = time.perf_counter()
+    for i in range(total):
+        funcao(i, destino)
+    return (time.perf_counter() - inicio) / total * 1e6
+
+
+def _comparar(total: int, nome_destino: str, destino) -> None:
+    # Antes: handler síncrono no logger "app", formatação na thread que chama
+    app_logger = logging.getLogger("app")
+    handler = logging.StreamHandler(destino)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    app_logger.addHandler(handler)
+    app_logger.setLevel(logging.INFO)
+    inicio = time.perf_counter()
+    por_registro = _medir(_antes, total, destino)
+    print(f"{nome_destino:>9} {'antes':>18} {por_registro:>24.2f} {time.perf_counter() - inicio:>10.2f}")
+    app_logger.removeHandler(handler)
+
+    for nome, taxas in [("fila", ""), ("fila + amostragem", "requisicao:0.01,registro:0.01")]:
+        configurar_logs(Settings(log_sample_rates=taxas), destino=destino)
+        inicio = time.perf_counter()
+        por_registro = _medir(_depois, total, destino)
+        encerrar_logs()
+        print(f"{nome_destino:>9} {nome:>18} {por_registro:>24.2f} {time.perf_counter() - inicio:>10.2f}")
+
+
+def main(total: int) -> None:
+    print(f"{'destino':>9} {'caso':>18} {'us/registro (chamador)':>24} {'total (s)':>10}")
+    with open(os.devnull, "w") as destino:
+        _comparar(total, "devnull", destino)
+    _comparar(total // 10, "lento", DestinoLento(0.0001))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Benchmark de geração de PDF: modo completo (FPDF) x modo template
+
+Uso:
+    python benchmarks/bench_pdf.py [quantidade]
+"""
+
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pdf_generator import gerar_certificado_pdf
+from app.services.pdf_template import gerar_certificado_pdf_template, obter_template
+
+HASH = "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+TXID = "2bV1kzbigzvtEUjh9Z27YX8HPbaKTycoRX1GNTbfvqWqjp3PWh6MhqeYnc7kt4m9JWbfA6rZfC4TCLZTviPCJnNQ"
+
+
+def medir(nome, funcao, quantidade):
+    inicio = time.perf_counter()
+    tamanho = 0
+    for i in range(quantidade):
+        tamanho += len(funcao(HASH, TXID, f"Participante {i}", "PythonFloripa 2025"))
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<10} {duracao / quantidade * 1000:8.3f} ms/pdf  {quantidade / duracao:10.0f} pdf/s  {tamanho / quantidade:8.0f} bytes/pdf")
+    return duracao
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore", DeprecationWarning)
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    # Construção do template fora da medição (custo único por processo)
+    obter_template()
+
+    completo = medir("completo", gerar_certificado_pdf, quantidade)
+    template = medir("template", gerar_certificado_pdf_template, quantidade)
+    print(f"speedup: {completo / template:.1f}x")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark do middleware de perfilamento: custo desligado e ligado
+
+Chama a pilha ASGI diretamente (sem rede) sobre um endpoint vazio, sem o
+middleware de perfilamento, com ele desligado (padrão) e com ele perfilando
+todas as requisições (gravação do perfil incluída). Cada cenário é medido algumas
+vezes, alternando os cenários, e o melhor resultado é mostrado.
+
+Uso:
+    python benchmarks/bench_perfil.py [requisicoes]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+
+from app.config import get_settings
+from app.middleware.perfil import perfil_middleware
+
+
+def criar_app(com_middleware: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/certificados/register")
+    async def registrar():
+        return {"ok": True}
+
+    if com_middleware:
+        app.add_middleware(perfil_middleware)
+    return app
+
+
+async def medir(app, requisicoes: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/certificados/register",
+        "raw_path": b"/certificados/register", "root_path": "", "query_string": b"",
+        "server": ("bench", 80), "client": ("bench", 1), "headers": [(b"host", b"bench")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(100):  # aquecimento
+        await app(dict(scope), receive, send)
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - inicio) / requisicoes
+
+
+if __name__ == "__main__":
+    requisicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    settings = get_settings()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        settings.profile_dir = Path(diretorio)
+        settings.profile_retention = 10
+
+        settings.profile_enabled = False
+        sem, com = criar_app(False), criar_app(True)
+        rodadas = [(asyncio.run(medir(sem, requisicoes)), asyncio.run(medir(com, requisicoes))) for _ in range(5)]
+        base = min(sem_middleware for sem_middleware, _ in rodadas)
+        desligado = min(desligado for _, desligado in rodadas)
+        print(f"{'sem middleware':<24} {base * 1e6:8.1f} us/req")
+        print(f"{'desligado':<24} {desligado * 1e6:8.1f} us/req  (+{(desligado - base) * 1e6:5.2f} us)")
+
+        settings.profile_enabled = True
+        settings.profile_sample_rate = 1.0
+        ligado = asyncio.run(medir(criar_app(True), max(1, requisicoes // 10)))
+        print(f"{'perfilando tudo':<24} {ligado * 1e6:8.1f} us/req  (+{(ligado - base) * 1e6:5.0f} us)")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pipeline de envio (montagem, assinatura e envio)
+
+Registra certificados simultâneos com um cliente RPC simulado cuja latência
+de envio é fixa, variando o número de trabalhadores de envio. Mostra a
+vazão em certificados por segundo e, por estágio, a espera média na fila.
+
+Uso:
+    python benchmarks/bench_pipeline.py [certificados] [latencia_ms] [memos_por_tx]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("STATE_BACKEND", "memoria")
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+
+from app.config import Settings
+from app.services import agendador as agendador_module
+from app.services.agendador import AgendadorJusto
+from app.services.blockchain import SolanaCertificateRegistry
+from app.services.estado import MemoryState
+
+
+class ClienteSimulado:
+    """Cliente RPC com latência fixa (bloqueante, como o cliente síncrono do solana-py)"""
+
+    def __init__(self, latencia):
+        self.latencia = latencia
+
+    def get_latest_blockhash(self):
+        time.sleep(self.latencia)
+        return SimpleNamespace(value=SimpleNamespace(blockhash=Hash.new_unique()))
+
+    def get_balance(self, pubkey):
+        return SimpleNamespace(value=5_000_000_000)
+
+    def send_transaction(self, transacao, opts=None):
+        time.sleep(self.latencia)
+        return SimpleNamespace(value=transacao.signatures[0])
+
+
+def medir(total, latencia, memos_por_tx, enviadores):
+    agendador_module._agendador = AgendadorJusto(concorrencia=total, limite_fila=total)
+    settings = Settings(
+        require_manual_setup=False, wallet_configured=False, solana_network="devnet",
+        pack_max_memos=memos_por_tx, pipeline_senders=enviadores, payer_max_in_flight=64
+    )
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    registry.keypair = Keypair()
+    registry.client = ClienteSimulado(latencia)
+
+    async def executar():
+        inicio = time.perf_counter()
+        await asyncio.gather(*(
+            registry.register_certificate(f"{i:064x}", f"Participante {i}", "Evento", f"c-{i}", "p@exemplo.com")
+            for i in range(total)
+        ))
+        duracao = time.perf_counter() - inicio
+        await registry.parar_pipeline()
+        return duracao
+
+    duracao = asyncio.run(executar())
+    metricas = registry.metricas_pipeline()
+    esperas = "  ".join(f"{nome} {dados['espera_media_ms']:7.1f} ms" for nome, dados in metricas.items())
+    print(f"{enviadores:2d} enviadores  {total / duracao:7.1f} cert/s  {duracao:6.2f} s  espera: {esperas}")
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    memos_por_tx = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+    print(f"{total} certificados, {memos_por_tx} memo(s) por transação, latência {latencia * 1000:.0f} ms")
+    for enviadores in (1, 2, 4, 8):
+        medir(total, latencia, memos_por_tx, enviadores)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos formatos de resposta: bytes e tempo de serialização
+
+Compara a resposta completa e a compacta do registro e da verificação em
+JSON (json e orjson), MessagePack e gzip, além de um lote de resultados
+NDJSON como o do POST /certificados/import.
+
+Uso:
+    python benchmarks/bench_respostas.py [repeticoes]
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import uuid
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("STATE_BACKEND", "memoria")
+
+from app.routes import certificados as certificados_module
+from app.routes.certificados import (
+    CertificadoRequest, _compactar_registro, _compactar_verificacao, _registrar
+)
+from app.routes.formatos import MSGPACK_AVAILABLE, ORJSON_AVAILABLE
+from app.services import store as store_module
+
+TXID = "2bV1kzbigzvtEUjh9Z27YX8HPbaKTycoRX1GNTbfvqWqjp3PWh6MhqeYnc7kt4m9JWbfA6rZfC4TCLZTviPCJnNQ"
+
+
+async def _registrar_stub(certificado_hash, *args):
+    return TXID
+
+
+def serializadores():
+    yield "json", lambda dados: json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if ORJSON_AVAILABLE:
+        import orjson
+        yield "orjson", orjson.dumps
+    if MSGPACK_AVAILABLE:
+        import msgpack
+        yield "msgpack", lambda dados: msgpack.packb(dados, use_bin_type=True)
+
+
+def medir(nome, dados, repeticoes):
+    for serializador, funcao in serializadores():
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            corpo = funcao(dados)
+        duracao = (time.perf_counter() - inicio) / repeticoes
+        print(
+            f"{nome:<22} {serializador:<8} {len(corpo):8d} bytes  "
+            f"gzip {len(gzip.compress(corpo, 6)):8d} bytes  {duracao * 1e6:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    certificados_module.registrar_hash_solana = _registrar_stub
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        store_module._store = store_module.CertificateStore(os.path.join(diretorio, "certificados.db"))
+        registro = asyncio.run(_registrar(CertificadoRequest(
+            name="David Richard Miranda da Silva",
+            event="PythonFloripa 25/10/2025",
+            email="davidrichard.ms@gmail.com",
+            certificate_code="18927398127398127319"
+        )))
+        store_module.fechar_store()
+
+    certificado = registro["certificado"]["json_canonico"]
+    verificacao = {
+        "status": "encontrado",
+        "txid": TXID,
+        "rede": "Solana Devnet",
+        "explorer_url": f"https://explorer.solana.com/tx/{TXID}?cluster=devnet",
+        "fonte": "indice_local",
+        "validacao": {
+            "hash_blockchain": registro["certificado"]["hash_sha256"],
+            "hash_gerado": registro["certificado"]["hash_sha256"],
+            "hash_valido": True,
+            "json_canonico_usado": registro["validacao"]["json_canonico_string"],
+            "certificado_autentico": True
+        },
+        "certificado_dados": certificado
+    }
+
+    medir("registro completo", registro, repeticoes)
+    medir("registro compacto", _compactar_registro(registro), repeticoes)
+    medir("verificacao completa", verificacao, repeticoes)
+    medir("verificacao compacta", _compactar_verificacao(verificacao, certificado["uuid"]), repeticoes)
+
+    lote = "".join(
+        json.dumps({"linha": i, "status": "sucesso", "uuid": str(uuid.uuid4()),
+                    "hash_sha256": hashlib.sha256(str(i).encode()).hexdigest(), "txid_solana": TXID}) + "\n"
+        for i in range(1000)
+    ).encode()
+    print(f"{'lote NDJSON (1000)':<22} {'json':<8} {len(lote):8d} bytes  gzip {len(gzip.compress(lote, 6)):8d} bytes")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark da consulta de revogação: conjunto em memória x consulta ao SQLite
+
+Cria um armazenamento temporário com N revogações e mede:
+
+- carga: tempo para abrir o armazenamento (o conjunto é lido na abertura) e
+  memória do conjunto;
+- consulta por hash, com metade dos hashes revogados e metade não, pelo
+  conjunto em memória (store.revogado, que antes confere PRAGMA data_version
+  para incorporar revogações de outros workers), pelo conjunto sozinho e por
+  SELECT na tabela revogacoes.
+
+Uso:
+    python benchmarks/bench_revogacao.py [revogacoes] [consultas]
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.store import CertificateStore
+
+
+def _hash(i: int) -> str:
+    return hashlib.sha256(str(i).encode()).hexdigest()
+
+
+def main(total: int, consultas: int) -> None:
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = Path(diretorio) / "certificados.db"
+        store = CertificateStore(caminho)
+        store.salvar_revogacoes(
+            {"doc_hash": _hash(i), "txid": f"rev{i}", "txid_original": f"tx{i}"} for i in range(total)
+        )
+        store.fechar()
+
+        inicio = time.perf_counter()
+        store = CertificateStore(caminho)
+        carga = time.perf_counter() - inicio
+        memoria = sys.getsizeof(store.revogados) + sum(sys.getsizeof(h) for h in store.revogados)
+        print(f"{total} revogações: abertura {carga * 1000:.1f} ms, conjunto {memoria / 1e6:.1f} MB")
+
+        # Metade revogados, metade desconhecidos
+        hashes = [_hash(i if i % 2 else total + i) for i in range(consultas)]
+
+        inicio = time.perf_counter()
+        encontrados = sum(store.revogado(h) for h in hashes)
+        conjunto = (time.perf_counter() - inicio) / consultas * 1e6
+
+        inicio = time.perf_counter()
+        encontrados_conjunto = sum(bytes.fromhex(h) in store.revogados for h in hashes)
+        somente_conjunto = (time.perf_counter() - inicio) / consultas * 1e6
+        assert encontrados == encontrados_conjunto
+
+        conexao = store._conexao
+        inicio = time.perf_counter()
+        encontrados_sql = sum(
+            conexao.execute("SELECT 1 FROM revogacoes WHERE doc_hash = ?", (h,)).fetchone() is not None
+            for h in hashes
+        )
+        sql = (time.perf_counter() - inicio) / consultas * 1e6
+        assert encontrados == encontrados_sql
+
+        print(f"{'consulta':>18} {'us/hash':>8}")
+        print(f"{'revogado()':>18} {conjunto:>8.2f}")
+        print(f"{'conjunto sozinho':>18} {somente_conjunto:>8.2f}")
+        print(f"{'sqlite':>18} {sql:>8.2f}")
+        store.fechar()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    )
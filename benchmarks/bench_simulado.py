@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga com o livro-razão simulado (LEDGER_BACKEND=simulado)
+
+Mede, sem blockchain e sem rede:
+
+- registro: certificados por segundo chamando register_certificate
+  (agendador, empacotamento, assinatura e envio reais; só o nó é simulado);
+- HTTP: POST /certificados/register e POST /certificados/verify/{txid} pela
+  aplicação ASGI inteira (middlewares, validação, índice local);
+- TXID: custo de gerar um TXID simulado (antigo: random.choice 88 vezes;
+  atual: a assinatura já calculada pela etapa de assinatura).
+
+Uso:
+    python benchmarks/bench_simulado.py [certificados] [requisicoes_http] [concorrencia]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("STATE_BACKEND", "memoria")
+os.environ["LEDGER_BACKEND"] = "simulado"
+os.environ.setdefault("SIM_CONFIRM_MS", "0")
+os.environ.setdefault("SIM_FINALIZE_MS", "0")
+os.environ["CERTIFICATE_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "certificados.db")
+
+import httpx
+
+from app.config import get_settings
+from app.main import app
+from app.services import agendador as agendador_module
+from app.services.agendador import AgendadorJusto
+from app.services.blockchain import obter_registry
+
+ALFABETO = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def medir_txid(total: int = 20000) -> None:
+    inicio = time.perf_counter()
+    for _ in range(total):
+        "".join(random.choice(ALFABETO) for _ in range(88))
+    antigo = (time.perf_counter() - inicio) / total * 1e6
+    print(f"TXID simulado: random.choice x88 {antigo:.1f} us; atual: assinatura já calculada (0 us extra)")
+
+
+async def medir_registro(total: int) -> None:
+    registry = obter_registry()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        registry.register_certificate(f"{i:064x}", f"Participante {i}", "Evento", f"c-{i}", "p@exemplo.com")
+        for i in range(total)
+    ))
+    duracao = time.perf_counter() - inicio
+    metricas = registry.ledger.metricas()
+    print(
+        f"registro: {total} certificados em {duracao:.2f} s = {total / duracao:,.0f} cert/s "
+        f"({metricas['enviadas']} transações, {metricas['memos'] / metricas['enviadas']:.1f} memos/tx)"
+    )
+
+
+async def medir_http(total: int, concorrencia: int) -> None:
+    participante = {"event": "Evento", "email": "p@exemplo.com"}
+    limite = asyncio.Semaphore(concorrencia)
+    registrados = []
+
+    async with httpx.AsyncClient(app=app, base_url="http://teste") as cliente:
+        async def registrar(i):
+            async with limite:
+                resposta = await cliente.post(
+                    "/certificados/register",
+                    json={**participante, "name": f"Pessoa {i}", "certificate_code": f"c-{i}"}
+                )
+                registrados.append((resposta.json()["certificado"], f"c-{i}"))
+
+        async def verificar(certificado, codigo):
+            async with limite:
+                dados = {campo: certificado[campo] for campo in ("event", "uuid", "name", "email", "time")}
+                resposta = await cliente.post(
+                    f"/certificados/verify/{certificado['txid_solana']}",
+                    json={**dados, "certificate_code": codigo}
+                )
+                assert resposta.json()["validacao"]["certificado_autentico"]
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(registrar(i) for i in range(total)))
+        duracao = time.perf_counter() - inicio
+        print(f"HTTP register: {total / duracao:,.0f} req/s (concorrência {concorrencia})")
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(verificar(*item) for item in registrados))
+        duracao = time.perf_counter() - inicio
+        print(f"HTTP verify/{{txid}}: {total / duracao:,.0f} req/s")
+
+    await obter_registry().parar_pipeline()
+
+
+async def main(total: int, requisicoes: int, concorrencia: int) -> None:
+    settings = get_settings()
+    agendador_module._agendador = AgendadorJusto(concorrencia=total, limite_fila=total)
+    print(f"pack_max_memos={settings.pack_max_memos}, pipeline_senders={settings.pipeline_senders}")
+    medir_txid()
+    await medir_registro(total)
+    await medir_http(requisicoes, concorrencia)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 64
+    ))
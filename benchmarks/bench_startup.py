@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização: importação a frio da aplicação e lifespan
+
+Cada importação roda em um processo novo (sem módulos em cache). O lifespan
+é medido com TestClient, incluindo a carga das configurações, da carteira e
+do armazenamento local.
+
+Uso:
+    python benchmarks/bench_startup.py [repeticoes]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+IMPORTACAO = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def medir_importacao(repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", IMPORTACAO], cwd=RAIZ, capture_output=True, text=True, check=True
+        )
+        tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+    return tempos
+
+
+def medir_lifespan(repeticoes):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        with TestClient(app):
+            tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def relatar(nome, tempos):
+    print(
+        f"{nome:<12} mediana {statistics.median(tempos) * 1000:8.1f} ms  "
+        f"min {min(tempos) * 1000:8.1f} ms  max {max(tempos) * 1000:8.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.environ.setdefault("CERTIFICATE_STORE_PATH", os.path.join(diretorio, "certificados.db"))
+        relatar("importacao", medir_importacao(repeticoes))
+        relatar("lifespan", medir_lifespan(repeticoes))
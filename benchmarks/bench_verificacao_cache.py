@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark da verificação por GET com cache HTTP: resposta completa x 304
+
+Registra um certificado no livro-razão simulado (getTransaction com
+LATENCIA_RPC_S de latência, como um RPC público) e mede, pela aplicação
+inteira (TestClient), N verificações repetidas:
+
+- completa: GET /certificados/verify/{txid} sem If-None-Match (consulta a
+  transação a cada vez, como o POST);
+- 304: mesma URL com o If-None-Match da primeira resposta, como faz um CDN ou
+  navegador ao revalidar (sem consulta à blockchain).
+
+Uso:
+    python benchmarks/bench_verificacao_cache.py [verificacoes]
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.main import app
+from app.services import agendador as agendador_module
+from app.services import blockchain as blockchain_module
+from app.services import estado as estado_module
+from app.services import store as store_module
+from app.services.agendador import AgendadorJusto
+from app.services.blockchain import SolanaCertificateRegistry
+from app.services.estado import MemoryState
+
+LATENCIA_RPC_S = 0.030
+
+PARTICIPANTE = {"name": "Ana Souza", "event": "PythonFloripa", "email": "ana@exemplo.com", "certificate_code": "c-1"}
+
+
+def _medir(client: TestClient, url: str, params: dict, headers: dict, total: int, esperado: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(total):
+        assert client.get(url, params=params, headers=headers).status_code == esperado
+    return (time.perf_counter() - inicio) / total * 1000
+
+
+def main(total: int) -> None:
+    logging.getLogger("app").setLevel(logging.WARNING)
+    settings = Settings(ledger_backend="simulado", sim_confirm_ms=0, sim_finalize_ms=0)
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    blockchain_module._registry = registry
+    agendador_module._agendador = AgendadorJusto(concorrencia=64)
+    estado_module._estado = MemoryState()
+
+    consultas = {"getTransaction": 0}
+    original = registry.ledger.obter_transacao
+
+    async def obter_transacao(txid, commitment="finalized"):
+        consultas["getTransaction"] += 1
+        await asyncio.sleep(LATENCIA_RPC_S)
+        return await original(txid, commitment)
+
+    registry.ledger.obter_transacao = obter_transacao
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        store_module._store = store_module.CertificateStore(Path(diretorio) / "certificados.db")
+        client = TestClient(app)
+        certificado = client.post("/certificados/register", json=PARTICIPANTE).json()["certificado"]
+        url = f"/certificados/verify/{certificado['txid_solana']}"
+        campos = {campo: certificado[campo] for campo in ("event", "uuid", "name", "email", "time")} | {
+            "certificate_code": PARTICIPANTE["certificate_code"]
+        }
+        etag = client.get(url, params=campos).headers["etag"]
+
+        print(f"getTransaction com {LATENCIA_RPC_S * 1000:.0f} ms de latência; {total} verificações repetidas")
+        print(f"{'requisição':>12} {'ms/req':>8} {'getTransaction':>15}")
+        for nome, headers, esperado in (("completa", {}, 200), ("304", {"If-None-Match": etag}, 304)):
+            consultas["getTransaction"] = 0
+            ms = _medir(client, url, campos, headers, total, esperado)
+            print(f"{nome:>12} {ms:>8.2f} {consultas['getTransaction']:>15}")
+        store_module._store.fechar()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
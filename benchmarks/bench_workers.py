@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalabilidade com vários workers e estado compartilhado
+
+Cada worker é um processo com seu próprio SolanaCertificateRegistry, todos
+com a mesma carteira. O cliente RPC é simulado com latência fixa, de modo
+que o resultado mede o ganho de throughput com mais processos e a economia
+de chamadas RPC (getLatestBlockhash/getBalance) do estado compartilhado.
+
+Uso:
+    python benchmarks/bench_workers.py [registros_por_worker] [latencia_ms]
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HASH = "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+
+
+class ClienteSimulado:
+    """Cliente RPC com latência fixa que conta as chamadas"""
+
+    def __init__(self, latencia):
+        from solders.hash import Hash
+        self.latencia = latencia
+        self.chamadas = {"getLatestBlockhash": 0, "getBalance": 0, "sendTransaction": 0}
+        self._hash = Hash
+
+    def _rpc(self, metodo):
+        self.chamadas[metodo] += 1
+        time.sleep(self.latencia)
+
+    def get_latest_blockhash(self):
+        self._rpc("getLatestBlockhash")
+        return SimpleNamespace(value=SimpleNamespace(blockhash=self._hash.new_unique()))
+
+    def get_balance(self, pubkey):
+        self._rpc("getBalance")
+        return SimpleNamespace(value=5_000_000_000)
+
+    def send_transaction(self, transacao, opts=None):
+        self._rpc("sendTransaction")
+        return SimpleNamespace(value=transacao.signatures[0])
+
+
+def worker(registros, latencia, inicio):
+    from app.services.blockchain import SolanaCertificateRegistry
+
+    registry = SolanaCertificateRegistry()
+    registry.client = ClienteSimulado(latencia)
+
+    async def executar():
+        for i in range(registros):
+            await registry.register_certificate(HASH, f"Participante {i}", "Evento", f"c-{i}", "p@exemplo.com")
+
+    while time.time() < inicio:
+        time.sleep(0.001)
+    asyncio.run(executar())
+    return registry.client.chamadas
+
+
+def medir(backend, workers, registros, latencia, diretorio):
+    os.environ["STATE_BACKEND"] = backend
+    os.environ["STATE_PATH"] = os.path.join(diretorio, f"estado-{backend}-{workers}.db")
+
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Pool(workers) as pool:
+        inicio = time.time() + 2
+        resultados = pool.starmap(worker, [(registros, latencia, inicio)] * workers)
+        duracao = time.time() - inicio
+
+    total = {metodo: sum(r[metodo] for r in resultados) for metodo in resultados[0]}
+    print(
+        f"{backend:<8} workers={workers}  {workers * registros / duracao:8.1f} registros/s  "
+        f"blockhash={total['getLatestBlockhash']:5d}  saldo={total['getBalance']:3d}  "
+        f"envios={total['sendTransaction']:5d}"
+    )
+
+
+if __name__ == "__main__":
+    registros = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 5) / 1000
+
+    from solders.keypair import Keypair
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        carteira = os.path.join(diretorio, "carteira.json")
+        with open(carteira, "w") as arquivo:
+            json.dump(list(bytes(Keypair())), arquivo)
+        os.environ.update({"SOLANA_WALLET_PATH": carteira, "SOLANA_NETWORK": "devnet", "WALLET_CONFIGURED": "true"})
+
+        for backend in ("memoria", "sqlite"):
+            for workers in (1, 2, 4):
+                medir(backend, workers, registros, latencia, diretorio)
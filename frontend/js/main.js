@@ -1,7 +1,9 @@
 class CertificadosSolanaPy {
     constructor() {
         this.currentPage = 'register';
-        this.apiBaseUrl = 'http://localhost:8000';
+        // Servido pela própria API: mesma origem; aberto como arquivo local: API em localhost
+        this.apiBaseUrl = window.location.protocol.startsWith('http') ? window.location.origin : 'http://localhost:8000';
+        this.jobEvents = null;
         this.init();
     }
 
@@ -53,6 +55,9 @@ class CertificadosSolanaPy {
             case 'verify':
                 this.loadVerifyPage();
                 break;
+            case 'batch':
+                this.loadBatchPage();
+                break;
         }
     }
 
@@ -234,6 +239,52 @@ class CertificadosSolanaPy {
         this.setupVerifyForm();
     }
 
+    loadBatchPage() {
+        const batchPage = document.getElementById('batch-page');
+        batchPage.innerHTML = `
+            <div class="card">
+                <div class="card-header">
+                    <h2 class="card-title">Registrar em Lote</h2>
+                    <p class="card-subtitle">Registre vários certificados e acompanhe o progresso em tempo real</p>
+                </div>
+
+                <form id="batch-form" class="batch-form">
+                    <div class="form-group">
+                        <label class="form-label" for="batch-event">Evento</label>
+                        <input 
+                            type="text" 
+                            id="batch-event" 
+                            class="form-input" 
+                            placeholder="Ex: PlythonFloripa 25/10/2025"
+                            required
+                        >
+                    </div>
+
+                    <div class="form-group">
+                        <label class="form-label" for="batch-lines">Participantes (nome, email, código por linha)</label>
+                        <textarea 
+                            id="batch-lines" 
+                            class="form-input form-textarea" 
+                            placeholder="Ana Souza, ana@exemplo.com, 0001"
+                            required
+                        ></textarea>
+                    </div>
+
+                    <div id="batch-alert-container"></div>
+
+                    <button type="submit" class="btn btn-primary btn-full" id="batch-submit-btn">
+                        <span></span>
+                        Registrar Lote na Blockchain
+                    </button>
+                </form>
+
+                <div id="batch-result-container"></div>
+            </div>
+        `;
+
+        this.setupBatchForm();
+    }
+
     setupRegisterForm() {
         const form = document.getElementById('register-form');
         const submitBtn = document.getElementById('register-submit-btn');
@@ -331,6 +382,153 @@ class CertificadosSolanaPy {
         });
     }
 
+    setupBatchForm() {
+        const form = document.getElementById('batch-form');
+        const submitBtn = document.getElementById('batch-submit-btn');
+
+        form.addEventListener('submit', async (e) => {
+            e.preventDefault();
+
+            const event = document.getElementById('batch-event').value.trim();
+            const certificados = document.getElementById('batch-lines').value
+                .split('\n')
+                .map(line => line.split(',').map(field => field.trim()))
+                .filter(fields => fields[0])
+                .map(([name, email = '', certificate_code = '']) => ({ name, email, certificate_code, event }));
+
+            if (certificados.length === 0) {
+                this.showAlert('batch-alert-container', 'error', 'Informe ao menos um participante');
+                return;
+            }
+
+            submitBtn.disabled = true;
+            submitBtn.innerHTML = '<span class="loading"></span>Registrando...';
+            this.clearAlerts('batch-alert-container');
+            this.clearResults('batch-result-container');
+
+            try {
+                const job = await this.createBatchJob(certificados);
+                this.followJobEvents(job, () => {
+                    submitBtn.disabled = false;
+                    submitBtn.innerHTML = '<span></span>Registrar Lote na Blockchain';
+                });
+            } catch (error) {
+                this.showAlert('batch-alert-container', 'error', 'Erro de conexão com o servidor. Verifique se a API está rodando.');
+                console.error('Batch error:', error);
+                submitBtn.disabled = false;
+                submitBtn.innerHTML = '<span></span>Registrar Lote na Blockchain';
+            }
+        });
+    }
+
+    async createBatchJob(certificados) {
+        const response = await fetch(`${this.apiBaseUrl}/certificados/jobs/register`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ certificados })
+        });
+
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        return await response.json();
+    }
+
+    followJobEvents(job, onDone) {
+        // O servidor envia um evento por certificado (hashed, sent, failed) e done no final;
+        // o EventSource reconecta sozinho com Last-Event-ID, sem consultas periódicas
+        if (this.jobEvents) this.jobEvents.close();
+
+        const progress = { total: job.total, hashed: 0, sent: 0, failed: 0, failures: [] };
+        let scheduled = false;
+        const render = () => {
+            if (scheduled) return;
+            scheduled = true;
+            // Milhares de eventos por segundo: redesenha no máximo uma vez por quadro
+            requestAnimationFrame(() => {
+                scheduled = false;
+                this.showBatchProgress(progress);
+            });
+        };
+
+        const source = new EventSource(`${this.apiBaseUrl}${job.eventos_url}`);
+        this.jobEvents = source;
+
+        ['hashed', 'sent', 'failed'].forEach(type => {
+            source.addEventListener(type, (e) => {
+                const data = JSON.parse(e.data);
+                progress[type] += 1;
+                if (type === 'failed') {
+                    progress.failures.push(`#${data.indice + 1}: ${data.erro || data.status}`);
+                }
+                render();
+            });
+        });
+
+        source.addEventListener('done', (e) => {
+            source.close();
+            this.jobEvents = null;
+            const summary = JSON.parse(e.data);
+            this.showBatchProgress(progress);
+            this.showAlert(
+                'batch-alert-container',
+                summary.contagem.failed ? 'error' : 'success',
+                `Lote concluído em ${summary.duracao_s}s: ${summary.contagem.sent} registrados, ${summary.contagem.failed} com falha`
+            );
+            onDone();
+        });
+
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                this.showAlert('batch-alert-container', 'error', 'Conexão com o progresso do lote perdida');
+                onDone();
+            }
+        };
+
+        this.showBatchProgress(progress);
+    }
+
+    showBatchProgress(progress) {
+        const container = document.getElementById('batch-result-container');
+        if (!container) return;
+        const done = progress.sent + progress.failed;
+        const percent = progress.total ? Math.round(done * 100 / progress.total) : 100;
+
+        container.innerHTML = `
+            <div class="result-card">
+                <div class="result-header">
+                    <h3 style="color: var(--text-primary);">Progresso do Lote</h3>
+                    <span class="result-status ${progress.failed ? 'error' : 'success'}">${done}/${progress.total}</span>
+                </div>
+
+                <div class="progress-bar">
+                    <div class="progress-fill" style="width: ${percent}%;"></div>
+                </div>
+
+                <div class="progress-counts">
+                    <span>Hash calculado: <strong>${progress.hashed}</strong></span>
+                    <span>Enviados: <strong>${progress.sent}</strong></span>
+                    <span>Falhas: <strong>${progress.failed}</strong></span>
+                </div>
+
+                ${progress.failures.length ? `
+                <ul class="batch-failures">
+                    ${progress.failures.slice(-100).map(failure => `<li>${this.escapeHtml(failure)}</li>`).join('')}
+                </ul>
+                ` : ''}
+            </div>
+        `;
+    }
+
+    escapeHtml(text) {
+        const element = document.createElement('span');
+        element.textContent = text;
+        return element.innerHTML;
+    }
+
     async registerCertificate(data) {
         const response = await fetch(`${this.apiBaseUrl}/certificados/register`, {
             method: 'POST',
@@ -29,7 +29,9 @@ if __name__ == "__main__":
     port = int(os.getenv('PORT', 8000))
     host = os.getenv('HOST', '0.0.0.0')
     log_level = os.getenv('LOG_LEVEL', 'info')
-    reload = os.getenv('RELOAD', 'true').lower() == 'true'
+    workers = int(os.getenv('WORKERS', 1))
+    # O reload do uvicorn só funciona com um único processo
+    reload = workers == 1 and os.getenv('RELOAD', 'true').lower() == 'true'
     
     print("Iniciando Certificados na Solana...")
     print(f"Documentação: http://localhost:{port}/docs")
@@ -43,5 +45,6 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=reload,
+        workers=workers,
         log_level=log_level
     )
\ No newline at end of file
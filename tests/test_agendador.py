@@ -0,0 +1,106 @@
+import os
+import sys
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.main import app
+from app.services import agendador as agendador_module
+from app.services.agendador import AgendadorJusto, FilaCheiaError, _ler_inquilinos
+
+client = TestClient(app)
+
+
+async def _executar(agendador, pedidos):
+    """Enfileira (cliente, quantidade) na ordem dada e devolve a ordem de atendimento"""
+    ordem = []
+
+    async def enviar(nome):
+        async with agendador.vez(nome):
+            ordem.append(nome)
+            await asyncio.sleep(0)
+
+    tarefas = []
+    for nome, quantidade in pedidos:
+        tarefas += [asyncio.create_task(enviar(nome)) for _ in range(quantidade)]
+        await asyncio.sleep(0)
+    await asyncio.gather(*tarefas)
+    return ordem
+
+
+def test_cliente_pequeno_nao_espera_o_lote_grande():
+    """Testa que um cliente chegando depois de um lote grande é atendido logo"""
+    agendador = AgendadorJusto(concorrencia=1)
+    ordem = asyncio.run(_executar(agendador, [("organizador", 50), ("pequeno", 2)]))
+    assert len(ordem) == 52
+    assert max(i for i, nome in enumerate(ordem) if nome == "pequeno") <= 4
+
+
+def test_pesos():
+    """Testa a divisão das vagas proporcional ao peso de cada cliente"""
+    agendador = AgendadorJusto(concorrencia=1, configuracao=_ler_inquilinos("painel:3,parceiro:1"))
+    ordem = asyncio.run(_executar(agendador, [("painel", 40), ("parceiro", 40)]))
+    primeiros = ordem[1:41]
+    assert primeiros.count("painel") == 30
+    assert primeiros.count("parceiro") == 10
+
+
+def test_cota_e_rajada():
+    """Testa o limite de fila (FilaCheiaError) e o limite de envios simultâneos por cliente"""
+    agendador = AgendadorJusto(concorrencia=4, configuracao=_ler_inquilinos("lote:1:3:1"))
+    simultaneos = []
+
+    async def cenario():
+        async def enviar():
+            async with agendador.vez("lote"):
+                simultaneos.append(agendador._inquilinos["lote"].em_voo)
+                await asyncio.sleep(0.01)
+
+        tarefas = [asyncio.create_task(enviar()) for _ in range(3)]
+        await asyncio.sleep(0)
+        with pytest.raises(FilaCheiaError):
+            async with agendador.vez("lote"):
+                pass
+        await asyncio.gather(*tarefas)
+
+    asyncio.run(cenario())
+    assert simultaneos == [1, 1, 1]
+    metricas = agendador.metricas()["clientes"][0]
+    assert metricas["concluidos"] == 3 and metricas["recusados"] == 1 and metricas["fila"] == 0
+    assert metricas["espera_p95_ms"] >= 10
+
+
+def test_cancelamento_libera_vaga():
+    """Testa que pedidos cancelados (na fila ou já atendidos) não prendem vagas"""
+    agendador = AgendadorJusto(concorrencia=1)
+
+    async def cenario():
+        async def enviar():
+            async with agendador.vez("a"):
+                await asyncio.sleep(0.05)
+
+        primeira = asyncio.create_task(enviar())
+        segunda = asyncio.create_task(enviar())
+        await asyncio.sleep(0.01)
+        segunda.cancel()
+        primeira.cancel()
+        await asyncio.gather(primeira, segunda, return_exceptions=True)
+        assert agendador.livres == 1 and not agendador._inquilinos["a"].fila
+        await enviar()
+
+    asyncio.run(cenario())
+
+
+def test_fila_cheia_responde_429(monkeypatch):
+    """Testa que o registro recusado pelo agendador vira HTTP 429 e aparece em /admin/envios"""
+    monkeypatch.setattr(agendador_module, "_agendador", AgendadorJusto(concorrencia=1, limite_fila=0))
+    payload = {"name": "Ana", "event": "Evento", "email": "ana@exemplo.com", "certificate_code": "C1"}
+
+    response = client.post("/certificados/register", json=payload)
+    assert response.status_code == 429
+
+    clientes = client.get("/admin/envios").json()["clientes"]
+    assert clientes[0]["nome"] == "anonimo" and clientes[0]["recusados"] == 1
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+pytest.importorskip("solders")
+
+from app.main import app
+from app.config import Settings
+from app.services import agendador as agendador_module
+from app.services import auditoria as auditoria_module
+from app.services import blockchain as blockchain_module
+from app.services import estado as estado_module
+from app.services import rpc as rpc_module
+from app.services import store as store_module
+from app.services.agendador import AgendadorJusto
+from app.services.auditoria import AuditorCertificados
+from app.services.blockchain import SolanaCertificateRegistry
+from app.services.estado import MemoryState
+from app.services.rpc import DisjuntorRPC
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    """Aplicação com o livro-razão simulado e um armazenamento local vazio"""
+    settings = Settings(ledger_backend="simulado", sim_confirm_ms=0, sim_finalize_ms=0)
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    monkeypatch.setattr(blockchain_module, "_registry", registry)
+    monkeypatch.setattr(agendador_module, "_agendador", AgendadorJusto(concorrencia=64))
+    monkeypatch.setattr(estado_module, "_estado", MemoryState())
+    monkeypatch.setattr(rpc_module, "_disjuntor", DisjuntorRPC())
+    monkeypatch.setattr(store_module, "_store", store_module.CertificateStore(tmp_path / "certificados.db"))
+    return registry
+
+
+def _registrar(nome: str) -> dict:
+    participante = {"name": nome, "event": "PythonFloripa", "email": f"{nome}@exemplo.com", "certificate_code": nome}
+    return client.post("/certificados/register", json=participante).json()["certificado"]
+
+
+def test_auditoria_detecta_problemas(registry, monkeypatch):
+    """Testa a auditoria: transação ausente, doc_hash fora dos memos e campos locais adulterados"""
+    ok, ausente, adulterado = (_registrar(nome) for nome in ("ana", "bia", "caio"))
+    store = store_module.obter_store()
+
+    # Transação perdida (ex.: reset da devnet), campos alterados no índice e hash que não está na transação
+    del registry.ledger._transacoes[ausente["txid_solana"]]
+    store._conexao.execute("UPDATE certificados SET name = 'outro' WHERE doc_hash = ?", (adulterado["hash_sha256"],))
+    store.salvar([{"doc_hash": "ef" * 32, "txid": ok["txid_solana"], "confirmado": True}])
+
+    auditor = AuditorCertificados(settings=Settings(audit_min_age=0, audit_rpc_rate=1000, audit_batch_size=2))
+    monkeypatch.setattr(auditoria_module, "_auditor", auditor)
+
+    assert client.post("/admin/auditoria/executar").status_code == 202
+    resposta = client.get("/admin/auditoria").json()
+
+    assert resposta["por_status"] == {"ok": 1, "ausente": 1, "divergente": 1, "hash_local_divergente": 1}
+    assert resposta["problemas_recentes"]["ausente"][0]["doc_hash"] == ausente["hash_sha256"]
+    assert resposta["problemas_recentes"]["hash_local_divergente"][0]["doc_hash"] == adulterado["hash_sha256"]
+    assert resposta["rodadas"] == 1
+    # Três transações distintas em lotes de até duas
+    assert resposta["consultas_rpc"] == 3
+    # A varredura chegou ao fim e recomeça na próxima rodada
+    assert resposta["varreduras_completas"] == 1
+    assert store.obter_checkpoint(auditoria_module.CHECKPOINT_CURSOR) is None
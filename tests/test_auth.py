@@ -0,0 +1,83 @@
+import os
+import sys
+import hashlib
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.main import app
+from app.middleware import auth as auth_module
+from app.middleware.auth import ChaveAPI, ControleAcesso
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def chaves(monkeypatch):
+    """Duas chaves: 'painel' (administrativa) sem limite e 'parceiro' com 1 req/s e rajada de 2"""
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "admin_api_keys", "painel")
+    controle = ControleAcesso([
+        ChaveAPI("painel", hashlib.sha256(b"segredo-painel").digest(), 0),
+        ChaveAPI("parceiro", hashlib.sha256(b"segredo-parceiro").digest(), 1),
+    ], rajada=2)
+    monkeypatch.setattr(auth_module, "_controle", controle)
+    return controle
+
+
+def test_api_key_invalida(chaves):
+    """Testa a rejeição de requisições sem chave ou com chave desconhecida"""
+    assert client.get("/certificados/info-rede").status_code == 401
+    assert client.get("/certificados/info-rede", headers={"x-api-key": "errada"}).status_code == 401
+    assert client.get("/health").status_code == 200
+    assert chaves.rejeitadas == 2
+
+
+def test_api_key_limite_e_uso(chaves):
+    """Testa o limite por chave (429 com Retry-After) e os contadores de uso"""
+    parceiro = {"x-api-key": "segredo-parceiro"}
+    respostas = [client.get("/admin/api-keys", headers=parceiro) for _ in range(3)]
+    # O limite é aplicado antes da rota; 'parceiro' não tem acesso administrativo
+    assert [r.status_code for r in respostas] == [403, 403, 429]
+    assert respostas[2].headers["retry-after"] == "1"
+
+    uso = client.get("/admin/api-keys", headers={"x-api-key": "segredo-painel"}).json()
+    por_nome = {chave["nome"]: chave for chave in uso["chaves"]}
+    assert por_nome["parceiro"]["requisicoes"] == 2
+    assert por_nome["parceiro"]["limitadas"] == 1
+    assert por_nome["painel"]["requisicoes"] == 1
+
+
+def test_verificacao_get_publica(chaves):
+    """Testa que a verificação por GET (link do QR code) dispensa a API key e o POST não"""
+    txid = "1" * 88
+    # Campos incompletos: 400 da própria rota, sem passar pela autenticação
+    assert client.get(f"/certificados/verify/{txid}", params={"name": "Ana"}).status_code == 400
+    assert client.post(f"/certificados/verify/{txid}", json={}).status_code == 401
+    assert client.post("/certificados/verify/pdf", content=b"%PDF").status_code == 401
+    assert client.get("/certificados/info-rede").status_code == 401
+
+
+def test_rotas_admin_restritas(chaves):
+    """Testa que só as API keys de ADMIN_API_KEYS acessam /admin"""
+    resposta = client.get("/admin/api-keys", headers={"x-api-key": "segredo-parceiro"})
+    assert resposta.status_code == 403
+    assert client.get("/admin/perfis", headers={"x-api-key": "segredo-parceiro"}).status_code == 403
+    assert client.get("/admin/api-keys", headers={"x-api-key": "segredo-painel"}).status_code == 200
+
+
+def test_carregar_chaves(monkeypatch):
+    """Testa a leitura de chaves em texto, em hash e da variável legada API_KEY"""
+    from app.config import get_settings
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "api_keys", "painel:abc, parceiro:def:5")
+    monkeypatch.setattr(settings, "api_key_hashes", f"ci:{hashlib.sha256(b'ghi').hexdigest()}")
+    monkeypatch.setattr(settings, "api_key", "legada")
+
+    chaves = auth_module.carregar_chaves()
+    assert [(c.nome, c.limite) for c in chaves] == [("painel", 0), ("parceiro", 5), ("ci", 0), ("default", 0)]
+    assert ControleAcesso(chaves).identificar(b"ghi").nome == "ci"
@@ -0,0 +1,115 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+pytest.importorskip("solders")
+
+from app.main import app
+from app.config import Settings
+from app.services import agendador as agendador_module
+from app.services import blockchain as blockchain_module
+from app.services import estado as estado_module
+from app.services import rpc as rpc_module
+from app.services import store as store_module
+from app.services.agendador import AgendadorJusto
+from app.services.blockchain import SolanaCertificateRegistry
+from app.services.estado import MemoryState
+from app.services.rpc import DisjuntorRPC
+
+client = TestClient(app)
+
+PARTICIPANTE = {"name": "Ana Souza", "event": "PythonFloripa", "email": "ana@exemplo.com", "certificate_code": "c-1"}
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    """Aplicação com o livro-razão simulado e um armazenamento local vazio"""
+    settings = Settings(ledger_backend="simulado", sim_confirm_ms=0, sim_finalize_ms=0)
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    monkeypatch.setattr(blockchain_module, "_registry", registry)
+    monkeypatch.setattr(agendador_module, "_agendador", AgendadorJusto(concorrencia=64))
+    monkeypatch.setattr(estado_module, "_estado", MemoryState())
+    monkeypatch.setattr(rpc_module, "_disjuntor", DisjuntorRPC())
+    monkeypatch.setattr(store_module, "_store", store_module.CertificateStore(tmp_path / "certificados.db"))
+    return registry
+
+
+def _contar_consultas(monkeypatch, registry) -> dict:
+    contagem = {"getTransaction": 0}
+    original = registry.ledger.obter_transacao
+
+    async def obter_transacao(txid, commitment="finalized"):
+        contagem["getTransaction"] += 1
+        return await original(txid, commitment)
+
+    monkeypatch.setattr(registry.ledger, "obter_transacao", obter_transacao)
+    return contagem
+
+
+def test_verificacao_get_com_etag(registry, monkeypatch):
+    """Testa o ETag da verificação por GET e o 304 sem consultar a blockchain"""
+    certificado = client.post("/certificados/register", json=PARTICIPANTE).json()["certificado"]
+    txid = certificado["txid_solana"]
+    campos = {campo: certificado[campo] for campo in ("event", "uuid", "name", "email", "time")} | {
+        "certificate_code": PARTICIPANTE["certificate_code"]
+    }
+    consultas = _contar_consultas(monkeypatch, registry)
+
+    response = client.get(f"/certificados/verify/{txid}", params=campos)
+    assert response.status_code == 200
+    assert response.json()["validacao"]["certificado_autentico"] is True
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert consultas["getTransaction"] == 1
+
+    response = client.get(f"/certificados/verify/{txid}", params=campos, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert consultas["getTransaction"] == 1
+
+    # Pelo hash o resultado é o mesmo, com outro ETag (o corpo não traz os dados do certificado)
+    response = client.get(f"/certificados/verify/{txid}", params={"hash": certificado["hash_sha256"]})
+    assert response.json()["validacao"]["certificado_autentico"] is True
+    assert response.headers["etag"] != etag
+
+    # A revogação muda o ETag: o cache revalidado recebe o novo resultado
+    client.post(f"/certificados/revoke/{txid}", json={"motivo": "emitido por engano"})
+    response = client.get(f"/certificados/verify/{txid}", params=campos, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["status"] == "revogado"
+    assert response.headers["etag"] != etag
+
+
+def test_link_de_verificacao(registry):
+    """Testa que o verificacao_url devolvido no registro (o mesmo do QR code) responde pela verificação"""
+    from urllib.parse import urlsplit
+
+    resposta = client.post("/certificados/register", json=PARTICIPANTE).json()
+    link = urlsplit(resposta["blockchain"]["verificacao_url"])
+    response = client.get(f"{link.path}?{link.query}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "encontrado"
+    assert response.json()["validacao"]["certificado_autentico"] is True
+
+    # Links só com o TXID (PDFs anteriores ao ?hash=) funcionam em transações de um certificado
+    response = client.get(link.path)
+    assert response.status_code == 200
+    assert response.json()["validacao"]["hash_gerado"] == resposta["certificado"]["hash_sha256"]
+    assert client.get("/certificados/verify/" + "1" * 88).status_code == 404
+
+
+def test_verificacao_get_sem_cache(registry):
+    """Testa que verificações que ainda podem mudar não são cacheadas"""
+    response = client.get("/certificados/verify/" + "1" * 88, params={"hash": "ab" * 32})
+    assert response.status_code == 200
+    assert response.json()["status"] == "nao_encontrado"
+    assert "etag" not in response.headers
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = client.get(f"/certificados/verify/{'1' * 88}", params={"name": "Ana"})
+    assert response.status_code == 400
@@ -0,0 +1,169 @@
+import os
+import sys
+import asyncio
+import hashlib
+import time
+import pytest
+from types import SimpleNamespace
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+pytest.importorskip("solders")
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+
+from app.config import Settings
+from app.services import agendador as agendador_module
+from app.services.agendador import AgendadorJusto
+from app.services.blockchain import LIMITE_TRANSACAO_BYTES, OpcoesEnvio, SolanaCertificateRegistry
+from app.services.estado import MemoryState
+from app.services.memo import decodificar_memo
+
+
+class ClienteFalso:
+    """Cliente RPC em memória que guarda as transações enviadas"""
+
+    def __init__(self):
+        self.enviadas = []
+        self.opcoes = []
+
+    def get_latest_blockhash(self):
+        return SimpleNamespace(value=SimpleNamespace(blockhash=Hash.new_unique()))
+
+    def get_balance(self, pubkey):
+        return SimpleNamespace(value=5_000_000_000)
+
+    def send_transaction(self, transacao, opts=None):
+        self.enviadas.append(transacao)
+        self.opcoes.append(opts)
+        return SimpleNamespace(value=transacao.signatures[0])
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(agendador_module, "_agendador", AgendadorJusto(concorrencia=64))
+    settings = Settings(require_manual_setup=False, wallet_configured=False, solana_network="devnet")
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    registry.keypair = Keypair()
+    registry.client = ClienteFalso()
+    return registry
+
+
+def _memos(transacao):
+    return [bytes(instrucao.data).decode("utf-8") for instrucao in transacao.message.instructions]
+
+
+def test_tamanho_calculado_igual_ao_serializado(registry):
+    """Testa que a conta de bytes do planejador bate com a transação serializada"""
+    memos = [b"a" * 10, b"b" * 127, b"c" * 128, b"d" * 300]
+    assert registry._tamanho_transacao(memos) == registry._medir_transacao(memos)
+
+
+def test_planejar_transacoes(registry):
+    """Testa que o empacotamento usa o mínimo de transações e respeita o limite de bytes"""
+    memos = [bytes(300)] * 3 + [bytes(100)] * 6 + [bytes(900)]
+    grupos = registry.planejar_transacoes(memos)
+
+    assert sorted(i for grupo in grupos for i in grupo) == list(range(len(memos)))
+    for grupo in grupos:
+        assert registry._medir_transacao([memos[i] for i in grupo]) <= LIMITE_TRANSACAO_BYTES
+    total = sum(len(memo) + 4 for memo in memos)
+    assert len(grupos) == -(-total // (LIMITE_TRANSACAO_BYTES - registry._tamanho_transacao([])))
+
+    with pytest.raises(ValueError):
+        registry.planejar_transacoes([bytes(LIMITE_TRANSACAO_BYTES)])
+
+
+def test_registros_simultaneos_compartilham_transacoes(registry):
+    """Testa que registros que chegam juntos saem em poucas transações, cada um com o seu memo"""
+    hashes = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(10)]
+
+    async def registrar():
+        return await asyncio.gather(*(
+            registry.register_certificate(doc_hash, f"Participante {i}", "Evento", f"c-{i}", "p@exemplo.com")
+            for i, doc_hash in enumerate(hashes)
+        ))
+
+    txids = asyncio.run(registrar())
+    enviadas = registry.client.enviadas
+
+    assert len(enviadas) < len(hashes)
+    for transacao in enviadas:
+        assert len(bytes(transacao)) <= LIMITE_TRANSACAO_BYTES
+    por_txid = {
+        str(transacao.signatures[0]): {decodificar_memo(memo)["doc_hash"] for memo in _memos(transacao)}
+        for transacao in enviadas
+    }
+    for doc_hash, txid in zip(hashes, txids):
+        assert doc_hash in por_txid[txid]
+
+    metricas = registry.metricas_empacotamento()
+    assert metricas["certificados"] == 10 and metricas["transacoes"] == len(enviadas)
+    assert metricas["taxa_por_certificado_lamports"] < registry.TAXA_ESTIMADA_LAMPORTS
+
+
+class ClienteLento(ClienteFalso):
+    """Cliente que demora no envio, como um RPC remoto"""
+
+    def send_transaction(self, transacao, opts=None):
+        time.sleep(0.1)
+        return super().send_transaction(transacao, opts)
+
+
+def test_pipeline_envia_em_paralelo(monkeypatch):
+    """Testa que as transações são enviadas em paralelo e que cada estágio reporta métricas"""
+    monkeypatch.setattr(agendador_module, "_agendador", AgendadorJusto(concorrencia=64))
+    settings = Settings(
+        require_manual_setup=False, wallet_configured=False, solana_network="devnet",
+        pack_max_memos=1, pipeline_senders=4
+    )
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    registry.keypair = Keypair()
+    registry.client = ClienteLento()
+
+    async def registrar():
+        inicio = time.monotonic()
+        txids = await asyncio.gather(*(
+            registry.register_certificate(f"{i:064x}", f"Participante {i}", "Evento", f"c-{i}", "p@exemplo.com")
+            for i in range(4)
+        ))
+        duracao = time.monotonic() - inicio
+        await registry.parar_pipeline()
+        return txids, duracao
+
+    txids, duracao = asyncio.run(registrar())
+
+    assert len(set(txids)) == 4
+    assert duracao < 0.3
+    metricas = registry.metricas_pipeline()
+    assert metricas["montagem"]["processados"] == 4
+    assert metricas["assinatura"]["processados"] == 4
+    assert metricas["envio"]["processados"] == 4 and metricas["envio"]["trabalhadores"] == 4
+    assert metricas["envio"]["erros"] == 0 and metricas["envio"]["espera_p95_ms"] is not None
+
+
+def test_opcoes_envio_combinadas(registry):
+    """Testa que a transação compartilhada usa as opções de envio mais cautelosas dos seus certificados"""
+    opcoes = [
+        OpcoesEnvio(skip_preflight=True, preflight_commitment="processed", max_retries=0),
+        OpcoesEnvio(skip_preflight=True, preflight_commitment="confirmed", max_retries=3)
+    ]
+
+    async def registrar(lista):
+        return await asyncio.gather(*(
+            registry.register_certificate(f"{i:064x}", f"Participante {i}", "Evento", f"c-{i}", "p@exemplo.com", opcao)
+            for i, opcao in enumerate(lista)
+        ))
+
+    asyncio.run(registrar(opcoes))
+    enviada = registry.client.opcoes[-1]
+    assert enviada.skip_preflight is True
+    assert enviada.preflight_commitment == "confirmed" and enviada.max_retries == 3
+
+    # Um certificado sem opções usa as configuradas (simulação prévia em finalized, sem limite de reenvios)
+    asyncio.run(registrar([opcoes[0], None]))
+    enviada = registry.client.opcoes[-1]
+    assert enviada.skip_preflight is False
+    assert enviada.preflight_commitment == "finalized" and enviada.max_retries is None
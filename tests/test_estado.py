@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.services.estado import MemoryState, SQLiteState
+from app.services.store import CertificateStore
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def estado(request, tmp_path):
+    if request.param == "memoria":
+        return MemoryState()
+    return SQLiteState(tmp_path / "estado.db")
+
+
+def test_definir_se_ausente_e_ttl(estado):
+    """Testa a gravação condicional (SET NX) e a expiração das chaves"""
+    assert estado.definir_se_ausente("lease:a", "w1", ttl=0.05)
+    assert not estado.definir_se_ausente("lease:a", "w2", ttl=0.05)
+    assert estado.obter("lease:a") == "w1"
+
+    time.sleep(0.06)
+    assert estado.obter("lease:a") is None
+    assert estado.definir_se_ausente("lease:a", "w2")
+
+
+def test_remover_se_igual(estado):
+    """Testa que um arrendamento só é liberado por quem o detém"""
+    estado.definir("lease:b", "w1")
+    assert not estado.remover("lease:b", "w2")
+    assert estado.remover("lease:b", "w1")
+    assert estado.obter("lease:b") is None
+
+
+def test_incrementar(estado):
+    """Testa o contador de saldo estimado (não cria a chave se ausente)"""
+    assert estado.incrementar("saldo", -5000) is None
+    estado.definir("saldo", "1000000")
+    assert estado.incrementar("saldo", -5000) == 995000
+    assert estado.obter("saldo") == "995000"
+
+
+def test_sqlite_compartilhado_entre_conexoes(tmp_path):
+    """Testa que dois workers (conexões) disputam a mesma chave no mesmo arquivo"""
+    worker_1 = SQLiteState(tmp_path / "estado.db")
+    worker_2 = SQLiteState(tmp_path / "estado.db")
+
+    assert worker_1.definir_se_ausente("idem:x", "pendente", ttl=60)
+    assert not worker_2.definir_se_ausente("idem:x", "pendente", ttl=60)
+    worker_1.definir("blockhash:devnet", "abc", ttl=60)
+    assert worker_2.obter("blockhash:devnet") == "abc"
+
+
+def test_store_ve_gravacoes_de_outro_worker(tmp_path):
+    """Testa que o filtro de Bloom de um worker incorpora certificados gravados por outro"""
+    worker_1 = CertificateStore(tmp_path / "certificados.db")
+    worker_2 = CertificateStore(tmp_path / "certificados.db")
+    doc_hash = "ab" * 32
+
+    assert worker_2.buscar_por_hash(doc_hash) is None
+    worker_1.salvar([{"doc_hash": doc_hash, "txid": "5" * 88}])
+    assert worker_2.buscar_por_hash(doc_hash)["txid"] == "5" * 88
+
+    worker_1.marcar_confirmado(doc_hash, slot=10)
+    assert worker_2.buscar_por_hash(doc_hash)["confirmado"] == 1
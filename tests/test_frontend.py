@@ -0,0 +1,51 @@
+import os
+import re
+import sys
+import gzip
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_pagina_inicial_e_assets():
+    """Testa o index.html com nomes por hash, as variantes comprimidas e o cache dos assets"""
+
+    pagina = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert pagina.status_code == 200
+    assert pagina.headers["cache-control"] == "no-cache"
+    assets = re.findall(r'"(/assets/[^"]+)"', pagina.text)
+    assert {re.sub(r"\.[0-9a-f]{12}\.", ".", a) for a in assets} == {"/assets/css/main.css", "/assets/js/main.js"}
+
+    js = next(a for a in assets if a.endswith(".js"))
+    comprimido = client.get(js, headers={"Accept-Encoding": "gzip"})
+    assert comprimido.headers["content-encoding"] == "gzip"
+    assert comprimido.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert "Accept-Encoding" in comprimido.headers["vary"]
+
+    original = client.get(js, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in original.headers
+    assert original.content == comprimido.content
+    assert int(original.headers["content-length"]) > len(gzip.compress(original.content)) * 2
+    assert original.headers["etag"] != comprimido.headers["etag"]
+
+    assert client.get("/assets/js/main.js").status_code == 404
+    assert client.get("/assets/js/main.000000000000.js").status_code == 404
+
+
+def test_assets_304():
+    """Testa o 304 com If-None-Match (ETag atual, lista de ETags e *) e o 200 com ETag antigo"""
+
+    etag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    resposta = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert resposta.status_code == 304
+    assert resposta.content == b""
+    assert resposta.headers["etag"] == etag
+
+    assert client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": f'"velho", {etag}'}).status_code == 304
+    assert client.get("/", headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": '"velho"'}).status_code == 200
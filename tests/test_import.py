@@ -0,0 +1,125 @@
+import os
+import sys
+import json
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.main import app
+from app.services.importacao import ler_registros
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def registro_local(tmp_path, monkeypatch):
+    """Registro na blockchain simulado, com estado e índice local isolados"""
+    from app.routes import certificados as certificados_module
+    from app.services import estado as estado_module
+    from app.services import store as store_module
+
+    monkeypatch.setattr(estado_module, "_estado", estado_module.MemoryState())
+    monkeypatch.setattr(store_module, "_store", store_module.CertificateStore(tmp_path / "certificados.db"))
+
+    chamadas = []
+
+    async def registrar(certificado_hash, *args):
+        chamadas.append(certificado_hash)
+        return f"{len(chamadas):088d}"
+
+    monkeypatch.setattr(certificados_module, "registrar_hash_solana", registrar)
+    return chamadas
+
+
+def _resultados(response):
+    return [json.loads(linha) for linha in response.text.splitlines()]
+
+
+def _partes(conteudo: bytes, tamanho: int):
+    async def gerar():
+        for i in range(0, len(conteudo), tamanho):
+            yield conteudo[i:i + tamanho]
+    return gerar()
+
+
+async def _coletar(registros):
+    return [registro async for registro in registros]
+
+
+def test_import_csv(registro_local):
+    """Testa a importação de um CSV com campo multilinha e linha inválida"""
+
+    csv = (
+        "name,event,email,certificate_code\r\n"
+        "Ana,PythonFloripa,ana@exemplo.com,c-1\r\n"
+        "\"Bruno\nda Silva\",PythonFloripa,bruno@exemplo.com,c-2\r\n"
+        "Carla,PythonFloripa\r\n"
+    )
+    response = client.post("/certificados/import", content=csv, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    resultados = _resultados(response)
+    assert [r["status"] for r in resultados[:3]] == ["sucesso", "sucesso", "invalido"]
+    assert [r["linha"] for r in resultados[:3]] == [2, 3, 5]
+    assert resultados[-1]["resumo"] == {"total": 3, "sucesso": 2, "invalido": 1, "erro": 0}
+    assert len(registro_local) == 2
+
+
+def test_import_ndjson_idempotente(registro_local):
+    """Testa NDJSON com JSON inválido e reenvio com a mesma Idempotency-Key"""
+
+    linhas = [
+        {"name": "Ana", "event": "Evento", "email": "ana@exemplo.com", "certificate_code": "c-1"},
+        {"name": "Bruno", "event": "Evento"},
+    ]
+    corpo = "\n".join(json.dumps(linha) for linha in linhas) + "\n{quebrado\n"
+    cabecalhos = {"Content-Type": "application/x-ndjson", "Idempotency-Key": "importacao-1"}
+
+    primeira = _resultados(client.post("/certificados/import", content=corpo, headers=cabecalhos))
+    assert [r["status"] for r in primeira[:3]] == ["sucesso", "invalido", "invalido"]
+
+    segunda = _resultados(client.post("/certificados/import", content=corpo, headers=cabecalhos))
+    assert segunda[0]["txid_solana"] == primeira[0]["txid_solana"]
+    assert len(registro_local) == 1
+
+
+def test_import_formato_nao_suportado():
+    """Testa a rejeição de um Content-Type desconhecido"""
+
+    response = client.post("/certificados/import", content=b"{}", headers={"Content-Type": "application/xml"})
+    assert response.status_code == 415
+
+
+def test_leitura_incremental():
+    """Testa a leitura em partes pequenas (caractere multibyte dividido entre partes)"""
+
+    conteudo = "﻿name,event\r\nJoão,Café\r\n\"Ma\nria\",\"x,y\"\r\n".encode("utf-8")
+    registros = asyncio.run(_coletar(ler_registros(_partes(conteudo, 3), "csv", 1024)))
+    assert registros == [
+        (2, {"name": "João", "event": "Café"}, None),
+        (3, {"name": "Ma\nria", "event": "x,y"}, None),
+    ]
+
+    with pytest.raises(ValueError):
+        asyncio.run(_coletar(ler_registros(_partes(b"a" * 100, 10), "ndjson", 50)))
+
+
+def test_import_gzip(registro_local):
+    """Testa que o resultado NDJSON em streaming é comprimido com gzip"""
+
+    corpo = "".join(
+        json.dumps({"name": f"P{i}", "event": "Evento", "email": f"p{i}@exemplo.com", "certificate_code": f"c-{i}"}) + "\n"
+        for i in range(60)
+    )
+    response = client.post(
+        "/certificados/import",
+        content=corpo,
+        headers={"Content-Type": "application/x-ndjson", "Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    resultados = _resultados(response)
+    assert resultados[-1]["resumo"]["sucesso"] == 60
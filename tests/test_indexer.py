@@ -0,0 +1,326 @@
+import os
+import sys
+import json
+import asyncio
+import base58
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.config import get_settings
+from app.services import indexer as indexer_module
+from app.services.indexer import ChainIndexer, CHECKPOINT_HEAD, CHECKPOINT_CURSOR
+from app.services.memo import MEMO_PROGRAM_ID, PREFIXO_V2, codificar_memo_v2, decodificar_memo
+from app.services.store import CertificateStore
+
+PAYER = "4Nd1mBQtrMJVYVfKf2PJy9NZUZdTAsp7D4xWLs4gDB4T"
+
+
+def _transacao(doc_hash, pagador=PAYER):
+    memo = json.dumps({
+        "version": "1.0",
+        "tipo": "certificado_participacao",
+        "code": "ev-001",
+        "evento": "pythonfloripa",
+        "doc_hash": doc_hash,
+        "network": "devnet"
+    })
+    return {
+        "slot": 10,
+        "blockTime": 1700000000,
+        "transaction": {
+            "message": {
+                "accountKeys": [pagador, MEMO_PROGRAM_ID],
+                "instructions": [
+                    {"programIdIndex": 1, "accounts": [], "data": base58.b58encode(memo.encode()).decode()}
+                ]
+            }
+        },
+        "meta": {"err": None, "logMessages": []}
+    }
+
+
+class FakeRPC:
+    """Histórico simulado: assinaturas da mais recente para a mais antiga"""
+
+    def __init__(self, quantidade, falhar_apos=None):
+        self.assinaturas = [f"sig{i:04d}" for i in range(quantidade, 0, -1)]
+        self.falhar_apos = falhar_apos
+        self.paginas = 0
+
+    async def call(self, metodo, params):
+        assert metodo == "getSignaturesForAddress"
+        opcoes = params[1]
+        if self.falhar_apos is not None and self.paginas >= self.falhar_apos:
+            raise RuntimeError("RPC indisponível")
+        self.paginas += 1
+        lista = self.assinaturas
+        if "before" in opcoes:
+            lista = lista[lista.index(opcoes["before"]) + 1:]
+        if "until" in opcoes:
+            lista = lista[:lista.index(opcoes["until"])]
+        return {"result": [{"signature": s, "err": None} for s in lista[:opcoes["limit"]]]}
+
+    async def batch(self, chamadas):
+        return [{"result": _transacao(f"{int(params[0][3:]):064x}")} for _, params in chamadas]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CertificateStore(tmp_path / "certificados.db")
+
+
+def _usar_rpc(monkeypatch, rpc):
+    monkeypatch.setattr(indexer_module, "rpc_call_async", rpc.call)
+    monkeypatch.setattr(indexer_module, "rpc_batch_async", rpc.batch)
+    monkeypatch.setattr(get_settings(), "indexer_page_size", 10)
+    monkeypatch.setattr(get_settings(), "indexer_batch_size", 3)
+
+
+def test_decodificar_memo_v1():
+    """Testa a decodificação do memo v1.0"""
+
+    metadados = decodificar_memo(json.dumps({"version": "1.0", "doc_hash": "ab" * 32, "code": "x"}))
+    assert metadados["doc_hash"] == "ab" * 32
+    assert decodificar_memo("texto livre") is None
+    assert decodificar_memo(json.dumps({"version": "1.0", "doc_hash": "zz", "code": "x"})) is None
+    assert decodificar_memo(json.dumps({"tipo": "cert", "hash": None})) is None
+
+
+def test_memo_v2():
+    """Testa o memo compacto v2: ida e volta, tamanho e campos desconhecidos ignorados"""
+    from base64 import b64decode, b64encode
+    from datetime import datetime
+
+    doc_hash = "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+    momento = datetime(2025, 10, 25, 14, 30, 5)
+    campos = {"code": "18927398", "name": "da****va", "email": "da*s@g**com",
+              "evento": "pythonfloripa 25/10/2025", "network": "devnet"}
+    memo = codificar_memo_v2(doc_hash, momento, emissor="Sistema de Certificados Blockchain", **campos)
+
+    metadados = decodificar_memo(memo)
+    assert metadados == {
+        "version": "2", "tipo": "certificado_participacao", "timestamp": "2025-10-25 14:30:05",
+        "doc_hash": doc_hash, "emissor": "Sistema de Certificados Blockchain", **campos
+    }
+    v1 = json.dumps({"version": "1.0", "tipo": "certificado_participacao", **metadados}, separators=(",", ":"))
+    assert len(memo) < len(v1) / 2
+
+    # Uma tag nova (99) acrescentada por uma versão futura não quebra a leitura
+    codificado = memo[len(PREFIXO_V2):]
+    dados = b64decode(codificado + "=" * (-len(codificado) % 4)) + bytes([99, 2]) + b"ok"
+    assert decodificar_memo(PREFIXO_V2 + b64encode(dados).decode())["code"] == "18927398"
+
+    assert decodificar_memo(PREFIXO_V2 + "não é base64") is None
+    assert decodificar_memo(PREFIXO_V2 + b64encode(bytes([3]) + bytes(36)).decode()) is None
+
+
+def test_memo_v2_campo_longo():
+    """Testa que um campo acima de 255 bytes não é truncado e que o timestamp é lido em UTC"""
+    from datetime import datetime, timedelta, timezone
+    from app.services.memo import CampoMemoLongoError
+
+    doc_hash = "ab" * 32
+    with pytest.raises(CampoMemoLongoError):
+        codificar_memo_v2(doc_hash, datetime(2025, 1, 1), evento="é" * 128)
+
+    momento = datetime(2025, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=-3)))
+    assert decodificar_memo(codificar_memo_v2(doc_hash, momento))["timestamp"] == "2025-01-01 15:00:00"
+
+
+def test_memo_com_campo_longo_usa_json(tmp_path):
+    """Testa que o registro recorre ao memo JSON v1.0 quando um campo não cabe no v2"""
+    pytest.importorskip("solders")
+    from app.config import Settings
+    from app.services.blockchain import SolanaCertificateRegistry
+    from app.services.estado import MemoryState
+
+    registry = SolanaCertificateRegistry(settings=Settings(ledger_backend="simulado"), estado=MemoryState())
+    evento = "congresso " * 30
+    memo = registry._create_metadata("ab" * 32, "Ana Souza", evento, "c-1", "ana@exemplo.com")
+    assert not memo.startswith(PREFIXO_V2)
+    assert decodificar_memo(memo)["evento"] == evento
+
+    curto = registry._create_metadata("ab" * 32, "Ana Souza", "PythonFloripa", "c-1", "ana@exemplo.com")
+    assert curto.startswith(PREFIXO_V2)
+
+
+def test_sincronizacao_completa(monkeypatch, store):
+    """Testa a indexação de todo o histórico em várias páginas"""
+
+    rpc = FakeRPC(25)
+    _usar_rpc(monkeypatch, rpc)
+
+    indexer = ChainIndexer(PAYER, store)
+    assert asyncio.run(indexer.sincronizar()) == 25
+    assert store.contar() == 25
+    assert store.obter_checkpoint(CHECKPOINT_HEAD) == "sig0025"
+
+    certificado = store.buscar_por_hash(f"{7:064x}")
+    assert certificado["txid"] == "sig0007"
+    assert certificado["event"] == "pythonfloripa"
+    assert len(store.buscar_por_codigo("EV-001")) == 25
+
+    # Sem novas transações, nada é reprocessado
+    rpc.assinaturas.insert(0, "sig0026")
+    assert asyncio.run(indexer.sincronizar()) == 1
+
+
+def test_indexacao_mantem_dados_do_registro(monkeypatch, store):
+    """Testa que o indexador não sobrescreve evento e código de um certificado registrado pela API"""
+
+    doc_hash = f"{1:064x}"
+    store.salvar([{"doc_hash": doc_hash, "txid": "sig0001", "event": "PythonFloripa", "code": "c-1", "name": "Ana"}])
+    _usar_rpc(monkeypatch, FakeRPC(1))
+
+    assert asyncio.run(ChainIndexer(PAYER, store).sincronizar()) == 1
+    certificado = store.buscar_por_hash(doc_hash)
+    assert certificado["event"] == "PythonFloripa"
+    assert certificado["code"] == "c-1"
+    assert certificado["name"] == "Ana"
+    assert certificado["slot"] == 10
+
+
+def test_retomada_do_checkpoint(monkeypatch, store):
+    """Testa a retomada de uma sincronização interrompida"""
+
+    rpc = FakeRPC(25, falhar_apos=2)
+    _usar_rpc(monkeypatch, rpc)
+
+    indexer = ChainIndexer(PAYER, store)
+    with pytest.raises(RuntimeError):
+        asyncio.run(indexer.sincronizar())
+    assert store.contar() == 20
+    assert store.obter_checkpoint(CHECKPOINT_CURSOR) == "sig0006"
+
+    rpc.falhar_apos = None
+    assert asyncio.run(indexer.sincronizar()) == 5
+    assert store.contar() == 25
+    assert store.obter_checkpoint(CHECKPOINT_HEAD) == "sig0025"
+    assert store.obter_checkpoint(CHECKPOINT_CURSOR) is None
+
+
+def test_memo_com_hash_invalido(monkeypatch, store):
+    """Testa que um memo com doc_hash inválido é ignorado sem travar a sincronização"""
+
+    rpc = FakeRPC(3)
+    _usar_rpc(monkeypatch, rpc)
+
+    async def batch(chamadas):
+        return [{"result": _transacao("zz" if params[0] == "sig0002" else f"{int(params[0][3:]):064x}")}
+                for _, params in chamadas]
+
+    monkeypatch.setattr(indexer_module, "rpc_batch_async", batch)
+    assert asyncio.run(ChainIndexer(PAYER, store).sincronizar()) == 2
+    assert store.obter_checkpoint(CHECKPOINT_HEAD) == "sig0003"
+
+
+def test_ignora_transacao_de_terceiros(monkeypatch, store):
+    """Testa que memos de transações pagas por outra conta (que só mencionam a carteira) não são indexados"""
+
+    rpc = FakeRPC(3)
+    _usar_rpc(monkeypatch, rpc)
+
+    async def batch(chamadas):
+        return [
+            {"result": _transacao(f"{int(params[0][3:]):064x}", "Terceiro111" if params[0] == "sig0002" else PAYER)}
+            for _, params in chamadas
+        ]
+
+    monkeypatch.setattr(indexer_module, "rpc_batch_async", batch)
+    indexer = ChainIndexer(PAYER, store)
+    assert asyncio.run(indexer.sincronizar()) == 2
+    assert store.buscar_por_hash(f"{2:064x}") is None
+    assert store.buscar_por_hash(f"{1:064x}")["txid"] == "sig0001"
+
+
+def test_ignora_revogacao_de_terceiros(monkeypatch, store):
+    """Testa que revogações de transações pagas por outra conta não são indexadas"""
+    from datetime import datetime
+    from app.services.memo import codificar_revogacao
+
+    rpc = FakeRPC(2)
+    _usar_rpc(monkeypatch, rpc)
+    doc_hash = f"{1:064x}"
+
+    def revogacao(pagador):
+        transacao = _transacao(f"{9:064x}", pagador)
+        memo = codificar_revogacao(doc_hash, datetime(2025, 1, 1), txid="sig0001")
+        transacao["transaction"]["message"]["instructions"] = [
+            {"programIdIndex": 1, "accounts": [], "data": base58.b58encode(memo.encode()).decode()}
+        ]
+        return transacao
+
+    async def batch(chamadas):
+        return [
+            {"result": _transacao(doc_hash) if params[0] == "sig0001" else revogacao("Terceiro111")}
+            for _, params in chamadas
+        ]
+
+    monkeypatch.setattr(indexer_module, "rpc_batch_async", batch)
+    asyncio.run(ChainIndexer(PAYER, store).sincronizar())
+    assert store.buscar_por_hash(doc_hash) is not None
+    assert not store.revogado(doc_hash)
+
+    # A mesma revogação paga pela carteira emissora é indexada
+    async def batch_emissor(chamadas):
+        return [{"result": revogacao(PAYER)} for _ in chamadas]
+
+    monkeypatch.setattr(indexer_module, "rpc_batch_async", batch_emissor)
+    rpc.assinaturas.insert(0, "sig0003")
+    asyncio.run(ChainIndexer(PAYER, store).sincronizar())
+    assert store.revogado(doc_hash)
+
+
+def test_listar_certificados_evento(monkeypatch, tmp_path):
+    """Testa a listagem por evento: páginas por cursor sem repetições, cursor inválido e status on-chain"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.routes import indexer as rotas_indexer
+    from app.services import store as store_module
+
+    store = CertificateStore(tmp_path / "certificados.db")
+    monkeypatch.setattr(store_module, "_store", store)
+    # Vários certificados no mesmo segundo, um de outro evento e dois conhecidos só pelo indexador
+    store.salvar(
+        [{"doc_hash": f"{i:064x}", "txid": f"tx{i}", "uuid": f"u{i:03d}", "event": "pythonfloripa",
+          "time": f"2025-10-25 14:30:0{i // 4}", "name": f"Pessoa {i}"} for i in range(10)]
+        + [{"doc_hash": f"{i:064x}", "txid": f"tx{i}", "event": "pythonfloripa", "origem": "indice",
+            "confirmado": True} for i in (10, 11)]
+        + [{"doc_hash": f"{99:064x}", "txid": "tx99", "uuid": "u099", "event": "outro", "time": "2025-01-01"}]
+    )
+
+    client = TestClient(app)
+    vistos, cursor = [], None
+    while True:
+        params = {"limite": 5, **({"cursor": cursor} if cursor else {})}
+        resposta = client.get("/certificados/events/PythonFloripa", params=params).json()
+        vistos += [c["doc_hash"] for c in resposta["certificados"]]
+        cursor = resposta["proximo_cursor"]
+        if cursor is None:
+            break
+    assert len(vistos) == len(set(vistos)) == 12
+    # Os do indexador (sem time) vêm antes, depois a ordem de emissão
+    assert vistos[2:] == [f"{i:064x}" for i in range(10)]
+    assert "email" not in resposta["certificados"][0]
+
+    assert client.get("/certificados/events/pythonfloripa", params={"cursor": "x!"}).status_code == 400
+
+    consultas = []
+
+    async def batch(chamadas):
+        consultas.append(chamadas)
+        return [{"result": {"value": [
+            {"slot": 50, "confirmationStatus": "finalized", "err": None} if txid != "tx10" else None
+            for txid in params[0]
+        ]}} for _, params in chamadas]
+
+    monkeypatch.setattr(rotas_indexer, "rpc_batch_async", batch)
+    resposta = client.get("/certificados/events/pythonfloripa", params={"limite": 3, "status_onchain": True}).json()
+    assert len(consultas) == 1 and consultas[0][0][0] == "getSignatureStatuses"
+    status = {c["txid"]: c for c in resposta["certificados"]}
+    assert status["tx0"]["status_onchain"]["confirmation_status"] == "finalized"
+    assert status["tx0"]["commitment"] == "finalized"
+    assert status["tx10"]["status_onchain"] is None
+    assert store.buscar_por_hash(f"{0:064x}")["confirmado"] == 1
@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def registro_local(tmp_path, monkeypatch):
+    """Registro na blockchain simulado, com estado e índice local isolados"""
+    from app.routes import certificados as certificados_module
+    from app.services import estado as estado_module
+    from app.services import store as store_module
+
+    monkeypatch.setattr(estado_module, "_estado", estado_module.MemoryState())
+    monkeypatch.setattr(store_module, "_store", store_module.CertificateStore(tmp_path / "certificados.db"))
+
+    chamadas = []
+
+    async def registrar(certificado_hash, nome, *args):
+        if nome == "Falha":
+            raise RuntimeError("RPC indisponível")
+        chamadas.append(certificado_hash)
+        return f"{len(chamadas):088d}"
+
+    monkeypatch.setattr(certificados_module, "registrar_hash_solana", registrar)
+    return chamadas
+
+
+def _eventos(texto):
+    """Lê o stream SSE em uma lista de (id, evento, dados)"""
+    eventos = []
+    for bloco in texto.split("\n\n"):
+        campos = dict(linha.split(": ", 1) for linha in bloco.splitlines() if ": " in linha and not linha.startswith(":"))
+        if "event" in campos:
+            eventos.append((int(campos["id"]), campos["event"], json.loads(campos["data"])))
+    return eventos
+
+
+def _participante(nome, i):
+    return {"name": nome, "event": "Evento", "email": f"p{i}@exemplo.com", "certificate_code": f"c-{i}"}
+
+
+def test_job_registro_eventos(registro_local):
+    """Testa o job de registro: eventos por certificado em SSE, resumo e retomada com Last-Event-ID"""
+
+    lote = {"certificados": [_participante("Ana", 0), _participante("Falha", 1), _participante("Bruno", 2)]}
+    criado = client.post("/certificados/jobs/register", json=lote)
+    assert criado.status_code == 202
+    job = criado.json()
+    assert job["total"] == 3
+
+    response = client.get(job["eventos_url"])
+    assert response.headers["content-type"].startswith("text/event-stream")
+    eventos = _eventos(response.text)
+
+    assert [numero for numero, _, _ in eventos] == list(range(1, len(eventos) + 1))
+    por_indice = {}
+    for _, tipo, dados in eventos[:-1]:
+        por_indice.setdefault(dados["indice"], []).append(tipo)
+    assert por_indice == {0: ["hashed", "sent"], 1: ["hashed", "failed"], 2: ["hashed", "sent"]}
+    assert eventos[-1][1] == "done"
+    assert eventos[-1][2]["contagem"] == {"hashed": 3, "sent": 2, "confirmed": 0, "failed": 1}
+    assert len(registro_local) == 2
+
+    retomada = _eventos(client.get(job["eventos_url"], headers={"Last-Event-ID": "4"}).text)
+    assert [numero for numero, _, _ in retomada] == list(range(5, len(eventos) + 1))
+
+    status = client.get(job["status_url"]).json()
+    assert status["concluido"] and status["processados"] == 3
+
+
+def test_job_verificacao(registro_local):
+    """Testa o job de verificação pelo hash no índice local"""
+
+    from app.services.store import obter_store
+
+    registrado = client.post("/certificados/register", json=_participante("Ana", 0)).json()["certificado"]
+    obter_store().marcar_confirmado(registrado["hash_sha256"])
+    dados = {**registrado["json_canonico"], "txid": None}
+    desconhecido = {**dados, "uuid": "00000000-0000-0000-0000-000000000000"}
+
+    job = client.post("/certificados/jobs/verify", json={"certificados": [dados, desconhecido]}).json()
+    eventos = _eventos(client.get(job["eventos_url"]).text)
+    finais = {dados["indice"]: tipo for _, tipo, dados in eventos if tipo in ("confirmed", "failed")}
+    assert finais == {0: "confirmed", 1: "failed"}
+
+    assert client.get("/certificados/jobs/inexistente/events").status_code == 404
+
+
+def test_job_erro_inesperado(registro_local, monkeypatch):
+    """Testa que um erro fora de HTTPException vira failed do certificado e o job ainda termina com done"""
+    from app.routes import jobs as jobs_module
+
+    async def verificar(txid, dados, commitment):
+        if txid == "quebra":
+            raise RuntimeError("resposta inesperada do RPC")
+        return {"status": "encontrado", "txid": txid, "validacao": {"certificado_autentico": True}}
+
+    monkeypatch.setattr(jobs_module, "_verificar_por_txid", verificar)
+    dados = {"event": "Evento", "uuid": "u", "name": "Ana", "email": "a@b.com", "certificate_code": "c", "time": "t"}
+    lote = {"certificados": [{**dados, "txid": "quebra"}, {**dados, "txid": "ok"}]}
+
+    job = client.post("/certificados/jobs/verify", json=lote).json()
+    eventos = _eventos(client.get(job["eventos_url"]).text)
+    finais = {dados["indice"]: tipo for _, tipo, dados in eventos if tipo in ("confirmed", "failed")}
+    assert finais == {0: "failed", 1: "confirmed"}
+    assert eventos[-1][1] == "done"
+    assert eventos[-1][2]["processados"] == 2
+
+
+def test_stream_ao_vivo():
+    """Testa que o stream envia os eventos à medida que são publicados, com keep-alive entre eles"""
+    from app.routes.jobs import _transmitir
+    from app.services.jobs import Job
+
+    async def executar():
+        job = Job("registro", 2, "anonimo")
+        partes = []
+
+        async def consumir():
+            async for parte in _transmitir(job, 0, 0.05):
+                partes.append(parte)
+
+        tarefa = asyncio.create_task(consumir())
+        await asyncio.sleep(0.12)
+        job.registrar(0, "hashed", hash="a" * 64)
+        job.registrar(1, "failed", erro="dados inválidos")
+        await asyncio.sleep(0.01)
+        recebidos = len(_eventos(b"".join(partes).decode()))
+        job.concluir()
+        await asyncio.wait_for(tarefa, 1)
+        return recebidos, b"".join(partes).decode()
+
+    recebidos, texto = asyncio.run(executar())
+    assert recebidos == 2
+    assert ": ping" in texto
+    assert [tipo for _, tipo, _ in _eventos(texto)] == ["hashed", "failed", "done"]
@@ -0,0 +1,92 @@
+import os
+import sys
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+pytest.importorskip("solders")
+
+from app.main import app
+from app.config import Settings
+from app.services import agendador as agendador_module
+from app.services import blockchain as blockchain_module
+from app.services import estado as estado_module
+from app.services import rpc as rpc_module
+from app.services import store as store_module
+from app.services.agendador import AgendadorJusto
+from app.services.blockchain import SolanaCertificateRegistry
+from app.services.estado import MemoryState
+from app.services.rpc import DisjuntorRPC
+
+client = TestClient(app)
+
+PARTICIPANTE = {"name": "Ana Souza", "event": "PythonFloripa", "email": "ana@exemplo.com", "certificate_code": "c-1"}
+
+
+@pytest.fixture
+def simulado(monkeypatch, tmp_path):
+    """Aplicação com o livro-razão simulado, sem atrasos de confirmação"""
+
+    def criar(**opcoes):
+        settings = Settings(ledger_backend="simulado", sim_confirm_ms=0, sim_finalize_ms=0, **opcoes)
+        registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+        monkeypatch.setattr(blockchain_module, "_registry", registry)
+        return registry
+
+    monkeypatch.setattr(agendador_module, "_agendador", AgendadorJusto(concorrencia=64))
+    monkeypatch.setattr(estado_module, "_estado", MemoryState())
+    monkeypatch.setattr(rpc_module, "_disjuntor", DisjuntorRPC())
+    monkeypatch.setattr(store_module, "_store", store_module.CertificateStore(tmp_path / "certificados.db"))
+    return criar
+
+
+def _verificacao(certificado):
+    return {campo: certificado[campo] for campo in ("event", "uuid", "name", "email", "time")} | {
+        "certificate_code": PARTICIPANTE["certificate_code"]
+    }
+
+
+def test_registro_e_verificacao_simulados(simulado):
+    """Testa registro e verificação pelo TXID de ponta a ponta, sem RPC, com carteira derivada da semente"""
+
+    registry = simulado()
+    assert registry.keypair.pubkey() == SolanaCertificateRegistry(
+        settings=Settings(ledger_backend="simulado"), estado=MemoryState()
+    ).keypair.pubkey()
+
+    registrado = client.post("/certificados/register", json=PARTICIPANTE)
+    assert registrado.status_code == 200
+    certificado = registrado.json()["certificado"]
+    txid = certificado["txid_solana"]
+
+    verificado = client.post(f"/certificados/verify/{txid}", json=_verificacao(certificado)).json()
+    assert verificado["status"] == "encontrado"
+    assert verificado["validacao"]["certificado_autentico"] is True
+
+    assert registry.ledger.metricas()["memos"] == 1
+
+
+def test_falhas_simuladas(simulado):
+    """Testa as taxas de falha: envio recusado e transação aceita que nunca confirma"""
+
+    simulado(sim_failure_rate=1)
+    assert client.post("/certificados/register", json=PARTICIPANTE).status_code == 500
+
+    simulado(sim_drop_rate=1)
+    certificado = client.post("/certificados/register", json=PARTICIPANTE).json()["certificado"]
+    verificado = client.post(f"/certificados/verify/{certificado['txid_solana']}", json=_verificacao(certificado))
+    assert verificado.json()["status"] == "nao_encontrado"
+
+
+def test_backend_incompleto():
+    """Testa que um backend sem todos os métodos da interface falha ao ser instanciado"""
+    from app.services.ledger import LedgerBackend
+
+    class SoLeitura(LedgerBackend):
+        async def obter_transacao(self, txid, commitment="finalized"):
+            return {"result": None}
+
+    with pytest.raises(TypeError):
+        SoLeitura()
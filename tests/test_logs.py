@@ -0,0 +1,65 @@
+import io
+import json
+import logging
+import os
+import sys
+import threading
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config import Settings
+from app.services.logs import configurar_logs, encerrar_logs
+
+client = TestClient(app)
+
+
+def _linhas(saida: io.StringIO) -> list:
+    return [json.loads(linha) for linha in saida.getvalue().splitlines()]
+
+
+def test_linha_de_acesso_com_contexto_e_amostragem():
+    """Testa a linha de acesso em JSON com request_id e a amostragem por tipo"""
+    saida = io.StringIO()
+    configurar_logs(Settings(log_sample_rates="requisicao:0.5"), destino=saida)
+    try:
+        respostas = [client.get("/health/live", headers={"X-Request-ID": f"req-{i}"}) for i in range(4)]
+    finally:
+        encerrar_logs()
+
+    assert [r.headers["X-Request-ID"] for r in respostas] == ["req-0", "req-1", "req-2", "req-3"]
+    acessos = [linha for linha in _linhas(saida) if linha.get("tipo") == "requisicao"]
+    # Taxa 0.5: uma a cada duas linhas, marcadas com a taxa
+    assert [linha["request_id"] for linha in acessos] == ["req-0", "req-2"]
+    assert acessos[0]["rota"] == "/health/live"
+    assert acessos[0]["status"] == 200
+    assert acessos[0]["amostragem"] == 0.5
+    assert "latencia_ms" in acessos[0]
+
+
+def test_mensagem_formatada_fora_da_thread_chamadora():
+    """Testa que a mensagem é montada na thread de gravação e que avisos não são amostrados"""
+    threads = []
+
+    class Valor:
+        def __str__(self):
+            threads.append(threading.current_thread())
+            return "valor"
+
+    saida = io.StringIO()
+    configurar_logs(Settings(log_sample_rates="teste:0"), destino=saida)
+    logger = logging.getLogger("app.teste")
+    try:
+        logger.info("descartada %s", Valor(), extra={"tipo": "teste"})
+        logger.info("gravada %s", Valor())
+        logger.warning("aviso %s", Valor(), extra={"tipo": "teste"})
+        logger.debug("abaixo do nível %s", Valor())
+    finally:
+        encerrar_logs()
+
+    assert [linha["msg"] for linha in _linhas(saida)] == ["gravada valor", "aviso valor"]
+    assert len(threads) == 2
+    assert threading.current_thread() not in threads
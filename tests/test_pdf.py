@@ -0,0 +1,185 @@
+import io
+import hashlib
+import os
+import sys
+import zipfile
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.main import app
+
+client = TestClient(app)
+
+HASH = "a" * 64
+TXID = "2bV1kzbigzvtEUjh9Z27YX8HPbaKTycoRX1GNTbfvqWqjp3PWh6MhqeYnc7kt4m9JWbfA6rZfC4TCLZTviPCJnNQ"
+CERTIFICADO = {
+    "event": "plythonfloripa 25/10/2025",
+    "uuid": "dbd40c12-de5c-460c-aec4-adac8ef3ac88",
+    "name": "joão (silva)",
+    "email": "davidrichard.ms@gmail.com",
+    "certificate_code": "18927398127398127319",
+    "time": "2025-10-28 18:28:59"
+}
+
+def test_gerar_pdf():
+    """Testa a geração de um PDF individual"""
+
+    payload = {
+        "name": "David Richard miranda da silva",
+        "event": "PlythonFloripa 25/10/2025",
+        "hash_sha256": HASH,
+        "txid_solana": TXID
+    }
+
+    response = client.post("/certificados/pdf", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+
+def test_gerar_pdf_lote():
+    """Testa a geração do ZIP com os PDFs de um evento"""
+
+    hashes = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(5)]
+    payload = {
+        "event": "PlythonFloripa 25/10/2025",
+        "certificados": [
+            {"name": f"Participante {i}", "hash_sha256": h, "txid_solana": TXID}
+            for i, h in enumerate(hashes)
+        ]
+    }
+
+    response = client.post("/certificados/pdf/lote", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        nomes = zf.namelist()
+        assert len(nomes) == 5
+        assert nomes == [f"certificado_{h[:16]}.pdf" for h in hashes]
+        for nome in nomes:
+            assert zf.read(nome).startswith(b"%PDF")
+
+def test_gerar_pdf_lote_item_com_erro():
+    """Testa que um item com falha vira um .erro.txt sem truncar o ZIP, e nomes repetidos não colidem"""
+    import asyncio
+    from app.services.pdf_generator import gerar_zip_certificados
+
+    item = {"name": "Participante", "event": "Evento", "hash_sha256": HASH, "txid_solana": TXID}
+    invalido = {"name": "Sem TXID", "event": "Evento", "hash_sha256": "b" * 64}
+
+    async def gerar():
+        return b"".join([parte async for parte in gerar_zip_certificados([item, invalido, item])])
+
+    with zipfile.ZipFile(io.BytesIO(asyncio.run(gerar()))) as zf:
+        assert zf.namelist() == [
+            f"certificado_{HASH[:16]}.pdf", f"certificado_{'b' * 16}.erro.txt", f"certificado_{HASH[:16]}_2.pdf"
+        ]
+        assert zf.read(f"certificado_{HASH[:16]}_2.pdf").startswith(b"%PDF")
+        assert b"txid_solana" in zf.read(f"certificado_{'b' * 16}.erro.txt")
+
+@pytest.mark.parametrize("modo", ["template", "completo"])
+def test_gerar_pdf_caracteres_sem_suporte(monkeypatch, modo):
+    """Testa que nomes fora do latin-1 são recusados com 400 nos dois modos (sem virar "?")"""
+    from app.config import get_settings
+    from app.services.pdf_template import _escapar
+
+    monkeypatch.setattr(get_settings(), "pdf_mode", modo)
+    payload = {"name": "Nguyễn Trường", "event": "Evento", "hash_sha256": HASH, "txid_solana": TXID}
+    response = client.post("/certificados/pdf", json=payload)
+    assert response.status_code == 400
+    assert "ễ" in response.json()["detail"]
+
+    lote = {"event": "Evento", "certificados": [{"name": "Nguyễn", "hash_sha256": HASH, "txid_solana": TXID}]}
+    assert client.post("/certificados/pdf/lote", json=lote).status_code == 400
+
+    with pytest.raises(UnicodeEncodeError):
+        _escapar("Nguyễn")
+
+@pytest.mark.parametrize("campo,valor", [
+    ("hash_sha256", "a" * 63),
+    ("hash_sha256", "g" * 64),
+    ("txid_solana", "0" * 88),
+    ("txid_solana", "abc"),
+])
+def test_gerar_pdf_identificadores_invalidos(campo, valor):
+    """Testa que hash e TXID malformados são recusados com 400 antes de renderizar"""
+    payload = {"name": "Participante", "event": "Evento", "hash_sha256": HASH, "txid_solana": TXID, campo: valor}
+    response = client.post("/certificados/pdf", json=payload)
+    assert response.status_code == 400
+    assert campo in response.json()["detail"]
+
+    lote = {"event": "Evento", "certificados": [{"name": "Participante", "hash_sha256": HASH, "txid_solana": TXID, campo: valor}]}
+    assert client.post("/certificados/pdf/lote", json=lote).status_code == 400
+
+def test_gerar_pdf_lote_vazio():
+    """Testa o lote sem certificados"""
+
+    response = client.post("/certificados/pdf/lote", json={"event": "Evento", "certificados": []})
+    assert response.status_code == 400
+
+def test_gerar_pdf_template_xref():
+    """Testa se o PDF do modo template tem a tabela xref consistente"""
+
+    from app.services.pdf_template import gerar_certificado_pdf_template
+
+    pdf = gerar_certificado_pdf_template(HASH, TXID, "João (Silva)", "PlythonFloripa 25/10/2025")
+    assert pdf.startswith(b"%PDF")
+    assert pdf.rstrip().endswith(b"%%EOF")
+
+    inicio_xref = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    linhas = pdf[inicio_xref:].split(b"\n")
+    assert linhas[0] == b"xref"
+    quantidade = int(linhas[1].split()[1])
+    for numero in range(1, quantidade):
+        offset = int(linhas[2 + numero].split()[0])
+        assert pdf[offset:].startswith(b"%d 0 obj" % numero)
+
+def test_metadados_verificacao_pdf():
+    """Testa a leitura do JSON canonizado e do hash gravados nos dois modos"""
+
+    from app.services.hashing import gerar_hash_texto, gerar_json_canonico
+    from app.services.pdf_generator import gerar_certificado_pdf
+    from app.services.pdf_template import gerar_certificado_pdf_template
+    from app.services.verificacao_pdf import extrair_metadados_pdf
+
+    json_canonico = gerar_json_canonico(CERTIFICADO)
+    doc_hash = gerar_hash_texto(json_canonico)
+
+    for pdf in (
+        gerar_certificado_pdf_template(doc_hash, TXID, "João (Silva)", "Evento", "devnet", json_canonico),
+        gerar_certificado_pdf(doc_hash, TXID, "João (Silva)", "Evento", json_canonico),
+    ):
+        metadados = extrair_metadados_pdf(pdf)
+        assert metadados["json_canonico"] == json_canonico
+        assert metadados["doc_hash"] == doc_hash
+        assert metadados["txid"] == TXID
+
+def test_verificar_pdf_adulterado():
+    """Testa a verificação de um PDF cujo JSON não corresponde ao hash"""
+
+    from app.services.hashing import gerar_json_canonico
+    from app.services.pdf_template import gerar_certificado_pdf_template
+
+    pdf = gerar_certificado_pdf_template(HASH, TXID, "João", "Evento", "devnet", gerar_json_canonico(CERTIFICADO))
+
+    response = client.post("/certificados/verify/pdf", content=pdf, headers={"content-type": "application/pdf"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "pdf_adulterado"
+    assert data["pdf"]["metadados_integros"] == False
+
+def test_verificar_pdf_invalido():
+    """Testa a verificação de um arquivo que não é PDF de certificado"""
+
+    response = client.post("/certificados/verify/pdf", content=b"nao e pdf")
+    assert response.status_code == 400
+
+def test_verificar_pdf_literal_truncada():
+    """Testa que uma string literal terminada em barra invertida é recusada com 400 (e não 500)"""
+
+    pdf = b"%PDF-1.4\n9 0 obj\n<</Subject (abc\\endobj\ntrailer\n<</Info 9 0 R>>\n%%EOF\n"
+    response = client.post("/certificados/verify/pdf", content=pdf, headers={"content-type": "application/pdf"})
+    assert response.status_code == 400
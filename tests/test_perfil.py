@@ -0,0 +1,88 @@
+import os
+import sys
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.main import app
+from app.config import get_settings
+
+client = TestClient(app)
+
+PAYLOAD = {
+    "event": "PythonFloripa 25/10/2025",
+    "name": "David Richard",
+    "email": "davidrichard.ms@gmail.com",
+    "certificate_code": "18927398127398127319"
+}
+
+
+@pytest.fixture
+def perfilamento(tmp_path, monkeypatch):
+    """Registro simulado e perfis gravados em um diretório temporário"""
+    from app.routes import certificados as certificados_module
+    from app.services import estado as estado_module
+    from app.services import store as store_module
+
+    monkeypatch.setattr(estado_module, "_estado", estado_module.MemoryState())
+    monkeypatch.setattr(store_module, "_store", store_module.CertificateStore(tmp_path / "certificados.db"))
+
+    async def registrar(certificado_hash, *args):
+        return "5" * 88
+
+    monkeypatch.setattr(certificados_module, "registrar_hash_solana", registrar)
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "profile_dir", tmp_path / "perfis")
+    monkeypatch.setattr(settings, "profile_retention", 2)
+    return settings
+
+
+def _ligar(monkeypatch, settings, **valores):
+    """Liga o perfilamento e remonta a pilha de middlewares (montada com as configurações)"""
+    monkeypatch.setattr(settings, "profile_enabled", True)
+    for nome, valor in valores.items():
+        monkeypatch.setattr(settings, nome, valor)
+    monkeypatch.setattr(app, "middleware_stack", None)
+
+
+def test_perfil_desligado(perfilamento):
+    """Testa que, com o modo desligado, o cabeçalho X-Profile é ignorado"""
+    response = client.post("/certificados/register", json=PAYLOAD, headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert not perfilamento.profile_dir.exists()
+
+
+def test_perfil_por_cabecalho(perfilamento, monkeypatch):
+    """Testa o perfil pedido por cabeçalho, a listagem, o resumo e a retenção"""
+    _ligar(monkeypatch, perfilamento)
+
+    nomes = []
+    for _ in range(3):
+        response = client.post("/certificados/register", json=PAYLOAD, headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        nomes.append(response.headers["x-profile-id"])
+
+    # Sem o cabeçalho (e sem amostragem), ou fora das rotas perfiladas, não há perfil
+    assert "x-profile-id" not in client.post("/certificados/register", json=PAYLOAD).headers
+    assert "x-profile-id" not in client.get("/health/live", headers={"X-Profile": "1"}).headers
+
+    perfis = client.get("/admin/perfis").json()["perfis"]
+    assert [perfil["nome"] for perfil in perfis] == nomes[:0:-1]
+    assert perfis[0]["rota"] == "/certificados/register"
+
+    resumo = client.get(f"/admin/perfis/{nomes[-1]}", params={"top": 200})
+    assert "registrar_certificado" in resumo.text
+    assert client.get(f"/admin/perfis/{nomes[0]}").status_code == 404
+    assert client.get("/admin/perfis/..%2Fconfig.py").status_code == 404
+
+
+def test_perfil_por_amostragem(perfilamento, monkeypatch):
+    """Testa a amostragem (PROFILE_SAMPLE_RATE) sem cabeçalho"""
+    _ligar(monkeypatch, perfilamento, profile_sample_rate=1.0)
+
+    response = client.post("/certificados/register", json=PAYLOAD)
+    assert response.headers["x-profile-id"].endswith(".prof")
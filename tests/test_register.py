@@ -47,3 +47,67 @@ def test_register_certificate_invalid_payload():
 
     response = client.post("/certificados/register", json=payload)
     assert response.status_code == 422
+
+@pytest.fixture
+def registro_local(tmp_path, monkeypatch):
+    """Registro na blockchain simulado, com estado e índice local isolados"""
+    from app.routes import certificados as certificados_module
+    from app.services import estado as estado_module
+    from app.services import store as store_module
+
+    monkeypatch.setattr(estado_module, "_estado", estado_module.SQLiteState(tmp_path / "estado.db"))
+    monkeypatch.setattr(store_module, "_store", store_module.CertificateStore(tmp_path / "certificados.db"))
+
+    chamadas = []
+
+    async def registrar(certificado_hash, *args):
+        chamadas.append(certificado_hash)
+        return str(len(chamadas)) * 88
+
+    monkeypatch.setattr(certificados_module, "registrar_hash_solana", registrar)
+    return chamadas
+
+def test_register_idempotency_key(registro_local):
+    """Testa que repetir o registro com a mesma Idempotency-Key devolve a primeira resposta"""
+
+    payload = {
+        "event": "PlythonFloripa 25/10/2025",
+        "name": "David Richard",
+        "email": "davidrichard.ms@gmail.com",
+        "certificate_code": "18927398127398127319"
+    }
+    cabecalhos = {"Idempotency-Key": "lote-1-linha-1"}
+
+    primeira = client.post("/certificados/register", json=payload, headers=cabecalhos)
+    segunda = client.post("/certificados/register", json=payload, headers=cabecalhos)
+    assert primeira.status_code == 200
+    assert segunda.json() == primeira.json()
+    assert len(registro_local) == 1
+
+    outra = client.post("/certificados/register", json={**payload, "name": "Outro"}, headers=cabecalhos)
+    assert outra.status_code == 422
+
+    sem_chave = client.post("/certificados/register", json=payload)
+    assert sem_chave.json()["certificado"]["txid_solana"] != primeira.json()["certificado"]["txid_solana"]
+    assert len(registro_local) == 2
+
+def test_register_compact_format(registro_local):
+    """Testa a resposta compacta (?format=compact) e a serialização MessagePack"""
+
+    msgpack = pytest.importorskip("msgpack")
+
+    payload = {
+        "event": "PlythonFloripa 25/10/2025",
+        "name": "David Richard",
+        "email": "davidrichard.ms@gmail.com",
+        "certificate_code": "18927398127398127319"
+    }
+
+    completa = client.post("/certificados/register", json=payload)
+    compacta = client.post("/certificados/register?format=compact", json=payload)
+    assert set(compacta.json()) == {"status", "uuid", "hash_sha256", "txid_solana"}
+    assert len(compacta.content) * 4 < len(completa.content)
+
+    binaria = client.post("/certificados/register?format=compact", json=payload, headers={"Accept": "application/msgpack"})
+    assert binaria.headers["content-type"] == "application/msgpack"
+    assert set(msgpack.unpackb(binaria.content)) == {"status", "uuid", "hash_sha256", "txid_solana"}
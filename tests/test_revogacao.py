@@ -0,0 +1,150 @@
+import hashlib
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+pytest.importorskip("solders")
+
+from app.main import app
+from app.config import Settings
+from app.services import agendador as agendador_module
+from app.services import blockchain as blockchain_module
+from app.services import estado as estado_module
+from app.services import rpc as rpc_module
+from app.services import store as store_module
+from app.services.agendador import AgendadorJusto
+from app.services.blockchain import SolanaCertificateRegistry
+from app.services.estado import MemoryState
+from app.services.memo import codificar_revogacao, decodificar_memo, decodificar_revogacao
+from app.services.rpc import DisjuntorRPC
+from app.middleware import auth as auth_module
+from app.middleware.auth import ChaveAPI, ControleAcesso
+
+client = TestClient(app)
+
+PARTICIPANTE = {"name": "Ana Souza", "event": "PythonFloripa", "email": "ana@exemplo.com", "certificate_code": "c-1"}
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    """Aplicação com o livro-razão simulado e um armazenamento local vazio"""
+    settings = Settings(ledger_backend="simulado", sim_confirm_ms=0, sim_finalize_ms=0)
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    monkeypatch.setattr(blockchain_module, "_registry", registry)
+    monkeypatch.setattr(agendador_module, "_agendador", AgendadorJusto(concorrencia=64))
+    monkeypatch.setattr(estado_module, "_estado", MemoryState())
+    monkeypatch.setattr(rpc_module, "_disjuntor", DisjuntorRPC())
+    monkeypatch.setattr(store_module, "_store", store_module.CertificateStore(tmp_path / "certificados.db"))
+    return registry
+
+
+def test_memo_de_revogacao():
+    """Testa a codificação do memo de revogação e que ele não é lido como certificado"""
+    doc_hash = "ab" * 32
+    memo = codificar_revogacao(doc_hash, datetime(2024, 5, 1, 12, 0), txid="5" * 88, motivo="emitido por engano")
+
+    assert memo.startswith("r2:")
+    assert decodificar_memo(memo) is None
+    revogacao = decodificar_revogacao(memo)
+    assert revogacao["doc_hash"] == doc_hash
+    assert revogacao["txid"] == "5" * 88
+    assert revogacao["motivo"] == "emitido por engano"
+    assert decodificar_revogacao('{"version":"1.0","doc_hash":"%s"}' % doc_hash) is None
+
+
+def test_revogar_certificado(registry, tmp_path):
+    """Testa a revogação pelo TXID e o status revogado nas verificações por TXID e por hash"""
+    certificado = client.post("/certificados/register", json=PARTICIPANTE).json()["certificado"]
+    txid = certificado["txid_solana"]
+    verificacao = {campo: certificado[campo] for campo in ("event", "uuid", "name", "email", "time")} | {
+        "certificate_code": PARTICIPANTE["certificate_code"]
+    }
+    assert client.post(f"/certificados/verify/{txid}", json=verificacao).json()["status"] == "encontrado"
+
+    response = client.post(f"/certificados/revoke/{txid}", json={"motivo": "emitido por engano"})
+    assert response.status_code == 200
+    revogado = response.json()
+    assert revogado["hash_sha256"] == certificado["hash_sha256"]
+    assert revogado["txid_revogacao"] != txid
+
+    # O memo de revogação está na blockchain (simulada) e referencia a emissão
+    memos = registry.ledger._transacoes[revogado["txid_revogacao"]].memos
+    assert decodificar_revogacao(memos[0].decode())["txid"] == txid
+
+    for resultado in (
+        client.post(f"/certificados/verify/{txid}", json=verificacao).json(),
+        client.post("/certificados/verify", json=verificacao).json()
+    ):
+        assert resultado["status"] == "revogado"
+        assert resultado["validacao"]["hash_valido"] is True
+        assert resultado["validacao"]["certificado_autentico"] is False
+        assert resultado["revogacao"]["motivo"] == "emitido por engano"
+
+    assert client.post(f"/certificados/revoke/{txid}").status_code == 409
+
+    # As revogações são recarregadas na abertura do armazenamento
+    reaberto = store_module.CertificateStore(tmp_path / "certificados.db")
+    assert reaberto.revogado(certificado["hash_sha256"])
+    assert not reaberto.revogado("cd" * 32)
+
+
+def test_revogacao_com_hash_invalido(tmp_path):
+    """Testa que uma revogação com doc_hash inválido é descartada sem abortar as demais do lote"""
+    store = store_module.CertificateStore(tmp_path / "certificados.db")
+    novas = store.salvar_revogacoes([
+        {"doc_hash": "zz", "txid": "rev1"},
+        {"doc_hash": None, "txid": "rev2"},
+        {"doc_hash": "AB" * 32, "txid": "rev3"}
+    ])
+    assert novas == 1
+    assert store.revogado("ab" * 32)
+    assert not store.revogado("zz")
+
+
+def test_revogar_transacao_desconhecida(registry):
+    """Testa a recusa de revogar uma transação que não é desta carteira"""
+    response = client.post("/certificados/revoke/" + "1" * 88)
+    assert response.status_code == 404
+
+
+def test_revogacao_restrita_a_admin(registry, monkeypatch):
+    """Testa que só as API keys de ADMIN_API_KEYS revogam certificados"""
+    from app.config import get_settings
+
+    txid = client.post("/certificados/register", json=PARTICIPANTE).json()["certificado"]["txid_solana"]
+    monkeypatch.setattr(get_settings(), "admin_api_keys", "painel")
+    monkeypatch.setattr(auth_module, "_controle", ControleAcesso([
+        ChaveAPI("painel", hashlib.sha256(b"segredo-painel").digest(), 0),
+        ChaveAPI("parceiro", hashlib.sha256(b"segredo-parceiro").digest(), 0),
+    ]))
+
+    response = client.post(f"/certificados/revoke/{txid}", headers={"x-api-key": "segredo-parceiro"})
+    assert response.status_code == 403
+    response = client.post(f"/certificados/revoke/{txid}", headers={"x-api-key": "segredo-painel"})
+    assert response.status_code == 200
+
+
+def test_revogacao_concluida_antes_da_trava(registry, monkeypatch):
+    """Testa o 409 quando outra revogação termina entre a consulta e a obtenção da trava"""
+    certificado = client.post("/certificados/register", json=PARTICIPANTE).json()["certificado"]
+    estado = estado_module.obter_estado()
+    original = estado.definir_se_ausente
+
+    def definir_se_ausente(chave, valor, ttl=None):
+        # A revogação concorrente grava no índice e libera a trava antes desta requisição obtê-la
+        store_module.obter_store().salvar_revogacoes([
+            {"doc_hash": certificado["hash_sha256"], "txid": "4" * 88, "origem": "revogacao"}
+        ])
+        return original(chave, valor, ttl=ttl)
+
+    monkeypatch.setattr(estado, "definir_se_ausente", definir_se_ausente)
+    response = client.post(f"/certificados/revoke/{certificado['txid_solana']}")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Certificado já revogado"
+    assert original(f"revogacao:{certificado['hash_sha256']}", "1", ttl=60)
@@ -0,0 +1,98 @@
+import os
+import sys
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.main import app
+from app.config import Settings
+from app.services import blockchain as blockchain_module
+from app.services import rpc as rpc_module
+from app.services import saude as saude_module
+from app.services.blockchain import SolanaCertificateRegistry
+from app.services.estado import MemoryState
+from app.services.rpc import DisjuntorRPC, RPCIndisponivelError
+
+client = TestClient(app)
+
+BLOCKHASH = "4sGjMW1sUnHzSxGspuhpqLDx6wiyjNtZAMdL4VZHirAn"
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    """Monitor novo, com registro em memória e RPC simulado que conta as chamadas"""
+    settings = Settings(require_manual_setup=False, wallet_configured=False, solana_network="devnet")
+    registry = SolanaCertificateRegistry(settings=settings, estado=MemoryState())
+    monkeypatch.setattr(blockchain_module, "_registry", registry)
+    monkeypatch.setattr(rpc_module, "_disjuntor", DisjuntorRPC(falhas_para_abrir=2, tempo_aberto=60))
+    monitor = saude_module.MonitorSaude()
+    monkeypatch.setattr(saude_module, "_monitor", monitor)
+
+    monitor.chamadas = []
+    respostas = {
+        "getLatestBlockhash": {"value": {"blockhash": BLOCKHASH, "lastValidBlockHeight": 1}},
+        "getBalance": {"value": 2_000_000_000},
+        "getVersion": {"solana-core": "1.18.26"}
+    }
+
+    async def rpc_simulado(metodo, params, url=None):
+        monitor.chamadas.append(metodo)
+        rpc_module.obter_disjuntor().registrar_sucesso()
+        return {"result": respostas[metodo]}
+
+    monkeypatch.setattr(saude_module, "rpc_call_async", rpc_simulado)
+    return monitor
+
+
+def test_probes_nao_chamam_o_rpc(monitor):
+    """Testa que live/ready respondem do estado em memória, sem chamadas RPC"""
+    assert client.get("/health/live").json()["status"] == "vivo"
+    resposta = client.get("/health/ready")
+
+    # Antes da primeira verificação em segundo plano a instância não está pronta
+    assert resposta.status_code == 503
+    assert resposta.json()["verificacoes"]["rpc"]["ok"] is False
+    assert monitor.chamadas == []
+
+
+def test_pronto_apos_verificacao(monitor):
+    """Testa a readiness depois da verificação em segundo plano e o aquecimento dos caches"""
+    asyncio.run(monitor.verificar())
+    assert monitor.chamadas == ["getLatestBlockhash", "getBalance", "getVersion"]
+
+    resposta = client.get("/health/ready")
+    assert resposta.status_code == 200
+    verificacoes = resposta.json()["verificacoes"]
+    assert verificacoes["carteira"]["saldo_lamports"] == 2_000_000_000
+    assert verificacoes["fila_envios"]["pendentes"] == 0
+
+    registry = blockchain_module._registry
+    assert registry.estado.obter(f"blockhash:{registry.network}") == BLOCKHASH
+    assert client.get("/health").json()["status"] == "healthy"
+    assert client.get("/certificados/info-rede").json()["rede"]["version"] == "1.18.26"
+
+
+def test_disjuntor(monitor):
+    """Testa que o disjuntor aberto tira a instância de prontidão e rejeita chamadas RPC"""
+    asyncio.run(monitor.verificar())
+    disjuntor = rpc_module.obter_disjuntor()
+    disjuntor.registrar_falha()
+    disjuntor.registrar_falha()
+
+    assert disjuntor.estado == DisjuntorRPC.ABERTO
+    with pytest.raises(RPCIndisponivelError):
+        rpc_module.rpc_call("getSlot", [])
+    resposta = client.get("/health/ready")
+    assert resposta.status_code == 503
+    assert resposta.json()["verificacoes"]["rpc"]["disjuntor"] == "aberto"
+
+    # Passado o tempo aberto, uma única chamada de teste é liberada
+    disjuntor.tempo_aberto = 0
+    assert disjuntor.permite() and disjuntor.estado == DisjuntorRPC.MEIO_ABERTO
+    disjuntor.tempo_aberto = 60
+    assert not disjuntor.permite()
+    disjuntor.registrar_sucesso()
+    assert disjuntor.estado == DisjuntorRPC.FECHADO
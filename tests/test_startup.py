@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.config import get_settings
+
+AUDITORIA = """
+import sys
+eventos = []
+
+def auditar(evento, args):
+    if evento in ("socket.connect", "socket.getaddrinfo", "os.mkdir"):
+        eventos.append((evento, str(args[0])))
+    elif evento == "open" and isinstance(args[0], str):
+        if not args[0].endswith((".py", ".pyc", ".so", ".pth")) and "python3" not in args[0]:
+            eventos.append((evento, args[0]))
+
+sys.addaudithook(auditar)
+import app.main
+print(eventos)
+"""
+
+
+def test_importacao_sem_efeitos_colaterais():
+    """Testa que importar a aplicação não acessa rede, .env nem carteira, nem cria diretórios"""
+    resultado = subprocess.run(
+        [sys.executable, "-c", AUDITORIA],
+        cwd=project_root, capture_output=True, text=True, check=True
+    )
+    assert resultado.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_configuracoes_carregadas_uma_vez():
+    """Testa que get_settings() devolve sempre a mesma instância"""
+    assert get_settings() is get_settings()
+    assert get_settings().certificate_store_path.is_absolute()
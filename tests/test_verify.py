@@ -113,3 +113,157 @@ def test_verify_modified_certificate():
     data = response.json()
     assert data["status"] == "encontrado"
     assert data["validacao"]["certificado_autentico"] == False
+
+@pytest.fixture
+def store_local(tmp_path, monkeypatch):
+    """Índice local isolado em um diretório temporário"""
+    from app.services import store as store_module
+    store = store_module.CertificateStore(tmp_path / "certificados.db")
+    monkeypatch.setattr(store_module, "_store", store)
+    return store
+
+def _registro_indexado(dados, confirmado=True):
+    from app.services.hashing import gerar_hash_texto, gerar_json_canonico
+    canonico = {k: (v.lower() if k != "time" else v) for k, v in dados.items()}
+    return {
+        **canonico,
+        "doc_hash": gerar_hash_texto(gerar_json_canonico(canonico)),
+        "code": canonico["certificate_code"],
+        "txid": "5" * 88,
+        "origem": "registro",
+        "confirmado": confirmado
+    }
+
+def test_verify_by_hash_confirmed(store_local):
+    """Testa a verificação sem TXID de um certificado confirmado no índice local"""
+
+    dados = {
+        "event": "PlythonFloripa 25/10/2025",
+        "uuid": "dbd40c12-de5c-460c-aec4-adac8ef3ac88",
+        "name": "David Richard",
+        "email": "davidrichard.ms@gmail.com",
+        "certificate_code": "18927398127398127319",
+        "time": "2025-10-28 18:28:59"
+    }
+    store_local.salvar([_registro_indexado(dados)])
+
+    response = client.post("/certificados/verify", json=dados)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["status"] == "encontrado"
+    assert data["txid"] == "5" * 88
+    assert data["fonte"] == "indice_local"
+    assert data["validacao"]["certificado_autentico"] == True
+
+def test_verify_by_hash_unknown(store_local):
+    """Testa a verificação sem TXID de um hash desconhecido (rejeitado pelo filtro de Bloom)"""
+
+    response = client.post("/certificados/verify", json={
+        "event": "Evento Teste",
+        "uuid": "12345678-1234-5678-1234-567812345678",
+        "name": "Nome Teste",
+        "email": "email@teste.com",
+        "certificate_code": "111111",
+        "time": "2023-01-01T00:00:00"
+    })
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "nao_encontrado"
+
+def test_bloom_filter():
+    """Testa o filtro de Bloom: sem falsos negativos e poucos falsos positivos"""
+
+    import hashlib
+    from app.services.bloom import BloomFilter
+
+    bloom = BloomFilter(1000, 0.01)
+    presentes = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(1000)]
+    for doc_hash in presentes:
+        bloom.adicionar(doc_hash)
+
+    assert all(doc_hash in bloom for doc_hash in presentes)
+    ausentes = [hashlib.sha256(f"x{i}".encode()).hexdigest() for i in range(10000)]
+    assert sum(doc_hash in bloom for doc_hash in ausentes) < 300
+    assert "nao-hexadecimal" not in bloom
+
+def test_verify_by_hash_minimal(store_local):
+    """Testa a resposta compacta pedida com Prefer: return=minimal"""
+
+    dados = {
+        "event": "PlythonFloripa 25/10/2025",
+        "uuid": "dbd40c12-de5c-460c-aec4-adac8ef3ac88",
+        "name": "David Richard",
+        "email": "davidrichard.ms@gmail.com",
+        "certificate_code": "18927398127398127319",
+        "time": "2025-10-28 18:28:59"
+    }
+    registro = _registro_indexado(dados)
+    store_local.salvar([registro])
+
+    response = client.post("/certificados/verify", json=dados, headers={"Prefer": "return=minimal"})
+    assert response.json() == {
+        "status": "encontrado",
+        "uuid": dados["uuid"],
+        "hash_sha256": registro["doc_hash"],
+        "txid": "5" * 88,
+        "certificado_autentico": True
+    }
+
+def test_verify_by_hash_commitment(store_local, monkeypatch):
+    """Testa a verificação rápida em "confirmed" promovida depois a "finalized" """
+
+    import base58
+    from datetime import datetime
+    from app.services import ledger as ledger_module
+    from app.services.memo import MEMO_PROGRAM_ID, codificar_memo_v2
+
+    dados = {
+        "event": "PlythonFloripa 25/10/2025",
+        "uuid": "dbd40c12-de5c-460c-aec4-adac8ef3ac88",
+        "name": "David Richard",
+        "email": "davidrichard.ms@gmail.com",
+        "certificate_code": "18927398127398127319",
+        "time": "2025-10-28 18:28:59"
+    }
+    registro = _registro_indexado(dados, confirmado=False)
+    store_local.salvar([registro])
+
+    memo = codificar_memo_v2(registro["doc_hash"], datetime.now())
+    transacao = {
+        "slot": 10,
+        "blockTime": 1700000000,
+        "transaction": {"message": {
+            "accountKeys": ["Pagador", MEMO_PROGRAM_ID],
+            "instructions": [{"programIdIndex": 1, "data": base58.b58encode(memo.encode()).decode()}]
+        }}
+    }
+    finalizada = False
+    consultas = []
+
+    async def rpc(metodo, params):
+        consultas.append(params[1]["commitment"])
+        visivel = params[1]["commitment"] == "confirmed" or finalizada
+        return {"result": transacao if visivel else None}
+
+    monkeypatch.setattr(ledger_module, "rpc_call_async", rpc)
+
+    rapida = client.post("/certificados/verify?commitment=confirmed", json=dados).json()
+    assert rapida["status"] == "encontrado" and rapida["commitment"] == "confirmed"
+    assert rapida["fonte"] == "blockchain"
+
+    # Ainda não finalizada: continua valendo a confirmação anterior
+    pendente = client.post("/certificados/verify?commitment=finalized", json=dados).json()
+    assert pendente["status"] == "encontrado" and pendente["commitment"] == "confirmed"
+
+    finalizada = True
+    final = client.post("/certificados/verify?commitment=finalized", json=dados).json()
+    assert final["commitment"] == "finalized"
+    assert store_local.buscar_por_hash(registro["doc_hash"])["commitment"] == "finalized"
+
+    consultas.clear()
+    local = client.post("/certificados/verify?commitment=confirmed", json=dados).json()
+    assert local["commitment"] == "finalized" and local["fonte"] == "indice_local"
+    assert consultas == []
+
+    assert client.post("/certificados/verify?commitment=processed", json=dados).status_code == 422